@@ -1,33 +1,171 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Blueprint, current_app, request, jsonify, send_from_directory, Response, stream_with_context, g
 from flask_cors import CORS
 import os
 import json
 import base64
-from datetime import datetime
+import hmac
+import math
+import threading
+import time
+from datetime import datetime, date, timedelta
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
-
 # Importar GameManager
 from services.game_manager import GameManager, GameType
+from services.audio_processor import UnsupportedSampleRateError
+from services.frame_codec import FrameEncoder, FrameEncodingError, RESPONSE_MODES
+from services.log_pipeline import configure_logging
+from services.metrics import metrics_registry
+from services.profiler import RequestProfiler
+from services.admission import AdmissionController, AdmissionQueue, AdmissionRejected
+from services.leaderboard import LeaderboardIndex, compact_scores
+from services.activity import ActivityBitmap
+from services.rollups import RollupStore, PERIODS as ROLLUP_PERIODS
+from services.session_archive import SessionArchive
+from services.session_export import EXPORT_FORMATS, export_chunks, iter_sessions as iter_export_sessions
 
-app = Flask(__name__)
-# CORS configurado para aceitar requisições do React Native
-# React Native não usa localhost, então permitimos todas as origens
-CORS(app, resources={
-    r"/api/*": {
-        "origins": "*",
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
-    }
-})
+# Rotas da API (registradas no app por create_app). O GameManager (Singleton)
+# não é criado no import: a primeira requisição ou warm_up() o cria
+api = Blueprint('api', __name__)
+
+# Histórico de frames para respostas compactas (delta/binário) de /audio
+frame_encoder = FrameEncoder()
+
+# Métricas: latência e contagem por rota, jogos em memória e ativos
+metrics_registry.gauge(
+    "aetheria_games_in_memory", "Jogos no store",
+    lambda: GameManager().get_manager_stats()["total_games_in_memory"]
+)
+metrics_registry.gauge(
+    "aetheria_games_active", "Jogos ativos",
+    lambda: GameManager().get_manager_stats()["active_games_count"]
+)
+metrics_registry.gauge(
+    "aetheria_warmup_duration_seconds", "Duração do warmup do caminho de áudio (0 até concluir)",
+    lambda: (GameManager().get_warmup_status() or {"duration_ms": 0})["duration_ms"] / 1000
+)
+metrics_registry.gauge(
+    "aetheria_dsp_pool_pending", "Tarefas no pool de DSP (em execução ou esperando um slot)",
+    lambda: (GameManager().get_manager_stats()["dsp_pool"] or {"pending": 0})["pending"]
+)
+metrics_registry.gauge(
+    "aetheria_overload_degraded", "1 enquanto frames PCM são processados no modo degradado (só RMS)",
+    lambda: int(bool((GameManager().get_manager_stats()["overload"] or {}).get("degraded")))
+)
+metrics_registry.gauge(
+    "aetheria_overload_latency_seconds", "Latência média (EWMA) dos frames PCM usada pela proteção contra sobrecarga",
+    lambda: (GameManager().get_manager_stats()["overload"] or {"latency_ms": 0})["latency_ms"] / 1000
+)
+
+# Profiling sob demanda (ligado pelos endpoints /api/admin/profiling)
+request_profiler = RequestProfiler(dump_dir=os.environ.get('AETHERIA_PROFILE_DIR', 'profiles'))
+
+# Token dos endpoints administrativos (desabilitados se não configurado)
+ADMIN_TOKEN = os.environ.get('AETHERIA_ADMIN_TOKEN')
+
+# Classes de requisição limitadas. Consultas de relatório (listagem de jogos,
+# estatísticas) usam no máximo AETHERIA_REPORTING_CONCURRENCY +
+# AETHERIA_REPORTING_QUEUE threads; as demais ficam para os frames dos jogos
+REQUEST_CLASSES = {
+    ('/api/games', 'GET'): 'reporting',
+    ('/api/stats/recent', 'GET'): 'reporting',
+    ('/api/stats/summary', 'GET'): 'reporting',
+    ('/api/stats/report', 'GET'): 'reporting',
+    ('/api/stats/history', 'GET'): 'reporting',
+    ('/api/stats/export', 'GET'): 'export',
+    ('/api/admin/export', 'GET'): 'export'
+}
+admission_controller = AdmissionController({
+    'reporting': AdmissionQueue(
+        'reporting',
+        max_concurrent=int(os.environ.get('AETHERIA_REPORTING_CONCURRENCY', 1)),
+        max_waiting=int(os.environ.get('AETHERIA_REPORTING_QUEUE', 1)),
+        wait_timeout=float(os.environ.get('AETHERIA_REPORTING_WAIT_SECONDS', 5))
+    ),
+    # Exportações ocupam a vaga até o fim do envio; fila à parte para não
+    # segurar os relatórios
+    'export': AdmissionQueue(
+        'export',
+        max_concurrent=int(os.environ.get('AETHERIA_EXPORT_CONCURRENCY', 1)),
+        max_waiting=int(os.environ.get('AETHERIA_EXPORT_QUEUE', 0)),
+        wait_timeout=float(os.environ.get('AETHERIA_EXPORT_WAIT_SECONDS', 5))
+    )
+}, REQUEST_CLASSES)
+
+def request_route():
+    """Padrão da URL da requisição atual (ex: /api/games/<game_id>/audio)"""
+    return request.url_rule.rule if request.url_rule else '<unmatched>'
+
+@api.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    
+    if request_profiler.enabled and not request.path.startswith('/api/admin/'):
+        game_id = (request.view_args or {}).get('game_id')
+        if request_profiler.should_profile(request_route(), game_id):
+            profile = request_profiler.start()
+            if profile is not None:
+                g.request_profile = (profile, time.perf_counter())
+
+@api.before_app_request
+def admit_request():
+    """Aplica o limite da classe da requisição (503 com Retry-After se não houver vaga)"""
+    request_class = admission_controller.classify(request_route(), request.method)
+    if request_class is None:
+        return None
+    try:
+        admission_controller.queue(request_class).acquire()
+    except AdmissionRejected as e:
+        response = jsonify({'success': False, 'message': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+        return response
+    g.admission_class = request_class
 
-# Instanciar GameManager (Singleton)
-game_manager = GameManager()
+@api.teardown_app_request
+def release_admission(exc):
+    # Em respostas em streaming (GET /api/games), o teardown só roda no fim do envio
+    request_class = g.pop('admission_class', None)
+    if request_class is not None:
+        admission_controller.queue(request_class).release()
+
+@api.teardown_app_request
+def stop_request_profile(exc):
+    # teardown também roda quando a rota lança exceção
+    profiled = g.pop('request_profile', None)
+    if profiled is not None:
+        profile, started = profiled
+        request_profiler.stop(profile, request_route(), time.perf_counter() - started)
+
+@api.after_app_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # Rota (padrão da URL) em vez do caminho, para não criar um label por jogo
+        route = request_route()
+        metrics_registry.observe('aetheria_http_request_duration_seconds',
+                                 time.perf_counter() - started, (route, request.method))
+        metrics_registry.inc('aetheria_http_requests_total', (route, request.method, str(response.status_code)))
+    return response
+
+# Limites da listagem paginada de jogos
+GAMES_PAGE_DEFAULT_LIMIT = 100
+GAMES_PAGE_MAX_LIMIT = 1000
+
+def parse_game_type(game_type_str):
+    """Converte o nome do jogo (pt/en) para GameType, ou None se inválido"""
+    game_type_str = game_type_str.lower()
+    if game_type_str == 'boat' or game_type_str == 'barquinho':
+        return GameType.BOAT
+    elif game_type_str == 'balloon' or game_type_str == 'balao' or game_type_str == 'balão':
+        return GameType.BALLOON
+    return None
+
+# Tamanho máximo dos lotes nos endpoints bulk
+BULK_MAX_GAMES = 500
 
 # Configuração do banco de dados simples (JSON)
-DATA_FILE = 'data.json'
+DATA_FILE = os.environ.get('AETHERIA_DATA_FILE', 'data.json')
 
 def load_data():
     if os.path.exists(DATA_FILE):
@@ -40,11 +178,152 @@ def load_data():
     }
 
 def save_data(data):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
+    # Arquivo temporário + os.replace: quem já abriu o data.json (exportações
+    # em streaming) continua lendo a versão anterior inteira
+    tmp = f'{DATA_FILE}.tmp{os.getpid()}.{threading.get_ident()}'
+    with open(tmp, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, DATA_FILE)
+
+def user_activity(db, user_id):
+    """
+    Bitmap de dias ativos do usuário (dias com sessão completa)
+
+    Usuários anteriores ao bitmap têm os dias reconstruídos a partir das
+    sessões (ver materialize_activity); quem chama salva o db.
+    """
+    materialize_activity(db, [user_id])
+    return ActivityBitmap.from_dict(db['users'].get(user_id, {}).get('activity'))
+
+def materialize_activity(db, user_ids):
+    """
+    Grava em db['users'] o bitmap dos usuários que ainda não têm um,
+    reconstruído a partir das sessões (uma passada para todos)
+
+    Args:
+        db: Dados carregados do data.json (alterados no lugar)
+        user_ids: Usuários a verificar
+
+    Returns:
+        Número de bitmaps criados (se > 0, o db precisa ser salvo)
+    """
+    missing = {u for u in user_ids if u in db['users'] and 'activity' not in db['users'][u]}
+    if not missing:
+        return 0
+    active_days = {}
+    for session in db['sessions']:
+        if session['user_id'] in missing and session.get('completed') and session.get('ended_at'):
+            active_days.setdefault(session['user_id'], set()).add(
+                datetime.fromisoformat(session['ended_at']).date())
+    for user_id in missing:
+        db['users'][user_id]['activity'] = ActivityBitmap.from_days(active_days.get(user_id, ())).to_dict()
+    return len(missing)
+
+# Agregados diários/semanais dos relatórios de evolução, em um SQLite à parte
+# (os relatórios não leem o data.json)
+ROLLUPS_FILE = os.environ.get('AETHERIA_ROLLUPS_FILE', os.path.splitext(DATA_FILE)[0] + '_rollups.db')
+rollup_store = RollupStore(ROLLUPS_FILE)
+
+# Rankings (geral, semanal e por tipo de jogo) derivados do log `scores` do
+# data.json. O fim de sessão aplica a nova pontuação na hora; as consultas só
+# releem o arquivo quando ele mudou (ex: escrito por outro worker)
+LEADERBOARD_WEEKS = int(os.environ.get('AETHERIA_LEADERBOARD_WEEKS', 12))
+leaderboards = LeaderboardIndex(keep_weeks=LEADERBOARD_WEEKS)
+_leaderboards_synced = {'version': None}
+metrics_registry.gauge(
+    "aetheria_leaderboard_scores_indexed", "Entradas do log de pontuações aplicadas aos rankings",
+    lambda: leaderboards.indexed
+)
+
+def data_file_version():
+    """Versão do arquivo de dados (mtime, tamanho), ou None se não existe"""
+    try:
+        stat = os.stat(DATA_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def sync_leaderboards(db=None):
+    """
+    Alcança o log de pontuações no índice dos rankings
+
+    Args:
+        db: Dados recém-salvos por esta requisição (evita reler o arquivo)
+    """
+    version = data_file_version()
+    if db is None:
+        if version == _leaderboards_synced['version']:
+            return
+        db = load_data()
+    leaderboards.sync(db.get('scores', []), db.get('scores_generation', 0))
+    _leaderboards_synced['version'] = version
+
+# Arquivo frio: sessões iniciadas há mais de AETHERIA_ARCHIVE_AFTER_DAYS dias
+# saem do data.json para segmentos compactados (POST /api/admin/archive)
+ARCHIVE_DIR = os.environ.get('AETHERIA_ARCHIVE_DIR', os.path.splitext(DATA_FILE)[0] + '_archive')
+ARCHIVE_AFTER_DAYS = int(os.environ.get('AETHERIA_ARCHIVE_AFTER_DAYS', 180))
+session_archive = SessionArchive(ARCHIVE_DIR)
+
+def archive_old_sessions(older_than_days=None):
+    """
+    Move as sessões antigas do data.json para o arquivo frio
+
+    Antes de tirar sessões do data.json, os agregados e o bitmap de dias
+    ativos dos usuários afetados são montados com o histórico completo
+    (os dois são reconstruídos a partir das sessões quando faltam).
+
+    Args:
+        older_than_days: Idade mínima (pelo início da sessão); padrão ARCHIVE_AFTER_DAYS
+
+    Returns:
+        Dict com o resultado do arquivamento, pontuações compactadas no log
+        dos rankings, sessões restantes no data.json e a duração total
+    """
+    # Uma execução por vez (threads e workers): outra execução concorrente
+    # arquivaria as mesmas sessões ou perderia as regravações do data.json
+    with session_archive.run_lock():
+        started = time.perf_counter()
+        days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        
+        db = load_data()
+        old = [s for s in db['sessions'] if s['started_at'] < cutoff]
+        users = {s['user_id'] for s in old}
+        history = {}
+        for session in db['sessions']:
+            if session['user_id'] in users:
+                history.setdefault(session['user_id'], []).append(session)
+        for user_id in users:
+            if not rollup_store.has_user(user_id):
+                rollup_store.backfill(user_id, history[user_id])
+        del history
+        
+        result = session_archive.archive(old, cutoff)
+        del old
+        
+        # Relê o data.json: o que outras requisições gravaram enquanto os
+        # segmentos eram escritos não se perde
+        db = load_data()
+        materialize_activity(db, users)
+        db['sessions'] = [s for s in db['sessions'] if s['started_at'] >= cutoff]
+        
+        # Log dos rankings: das pontuações antigas basta a melhor de cada usuário
+        # por tipo de jogo (sem tocar nas semanas mantidas pelos placares semanais)
+        before = min(cutoff, (datetime.now() - timedelta(weeks=LEADERBOARD_WEEKS)).isoformat())
+        scores = db.get('scores', [])
+        compacted = compact_scores(scores, before)
+        if len(compacted) < len(scores):
+            db['scores'] = compacted
+            db['scores_generation'] = db.get('scores_generation', 0) + 1
+        save_data(db)
+        
+        result['compacted_scores'] = len(scores) - len(compacted)
+        result['hot_sessions'] = len(db['sessions'])
+        result['total_seconds'] = time.perf_counter() - started
+        return result
 
 # Rotas de autenticação
-@app.route('/api/auth/login', methods=['POST'])
+@api.route('/api/auth/login', methods=['POST'])
 def login():
     data = request.get_json()
     email = data.get('email')
@@ -66,7 +345,8 @@ def login():
                 'total_sessions': 0,
                 'total_time': 0,
                 'total_score': 0,
-                'streak_days': 0
+                'streak_days': 0,
+                'activity': ActivityBitmap().to_dict()
             }
         
         save_data(db)
@@ -79,12 +359,12 @@ def login():
     
     return jsonify({'success': False, 'message': 'Credenciais inválidas'}), 401
 
-@app.route('/api/auth/logout', methods=['POST'])
+@api.route('/api/auth/logout', methods=['POST'])
 def logout():
     return jsonify({'success': True, 'message': 'Logout realizado com sucesso'})
 
 # Rotas de perfil
-@app.route('/api/user/profile', methods=['GET'])
+@api.route('/api/user/profile', methods=['GET'])
 def get_profile():
     user_id = request.headers.get('X-User-ID')
     if not user_id:
@@ -99,7 +379,7 @@ def get_profile():
         'user': db['users'][user_id]
     })
 
-@app.route('/api/user/profile', methods=['PUT'])
+@api.route('/api/user/profile', methods=['PUT'])
 def update_profile():
     user_id = request.headers.get('X-User-ID')
     if not user_id:
@@ -125,7 +405,7 @@ def update_profile():
     })
 
 # Rotas de jogos - CONTROLE COMPLETO NO BACKEND PYTHON
-@app.route('/api/games/create', methods=['POST'])
+@api.route('/api/games/create', methods=['POST'])
 def create_game():
     """Cria um novo jogo usando GameManager (Factory Pattern)"""
     try:
@@ -134,29 +414,90 @@ def create_game():
         player_name = data.get('player_name', 'Jogador')
         
         # Converter string para GameType enum
-        if game_type_str == 'boat' or game_type_str == 'barquinho':
-            game_type = GameType.BOAT
-        elif game_type_str == 'balloon' or game_type_str == 'balao' or game_type_str == 'balão':
-            game_type = GameType.BALLOON
-        else:
+        game_type = parse_game_type(game_type_str)
+        if game_type is None:
             return jsonify({'success': False, 'message': f'Tipo de jogo inválido: {game_type_str}'}), 400
         
         # Criar jogo usando GameManager
-        game_info = game_manager.create_game(game_type, player_name)
+        game_info = GameManager().create_game(game_type, player_name)
         
         return jsonify({
             'success': True,
             'game': game_info
         })
     except Exception as e:
-        app.logger.error(f'Erro ao criar jogo: {str(e)}')
+        current_app.logger.error('Erro ao criar jogo: %s', e)
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@api.route('/api/games/bulk/create', methods=['POST'])
+def bulk_create_games():
+    """
+    Cria e inicia vários jogos em uma única requisição (sessões em grupo)
+    
+    Body: {"games": [{"game_type": "boat", "player_name": "..."}, ...], "start": true}
+    """
+    try:
+        data = request.get_json()
+        items = data.get('games', [])
+        start = bool(data.get('start', True))
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'message': 'Lista de jogos não fornecida'}), 400
+        if len(items) > BULK_MAX_GAMES:
+            return jsonify({'success': False, 'message': f'Máximo de {BULK_MAX_GAMES} jogos por lote'}), 400
+        
+        # Validar cada item; itens inválidos recebem erro individual
+        results = [None] * len(items)
+        valid = []
+        for i, item in enumerate(items):
+            game_type_str = str(item.get('game_type', 'boat')) if isinstance(item, dict) else ''
+            game_type = parse_game_type(game_type_str)
+            if game_type is None:
+                results[i] = {'success': False, 'message': f'Tipo de jogo inválido: {game_type_str}'}
+            else:
+                valid.append((i, game_type, item.get('player_name', 'Jogador')))
+        
+        created = GameManager().create_games([(game_type, player_name) for _, game_type, player_name in valid], start=start)
+        for (i, _, _), game_info in zip(valid, created):
+            results[i] = {'success': True, 'game': game_info}
+        
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+    except Exception as e:
+        current_app.logger.error('Erro ao criar jogos em lote: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/api/games/<game_id>/start', methods=['POST'])
+@api.route('/api/games/bulk/end', methods=['POST'])
+def bulk_end_games():
+    """
+    Finaliza vários jogos em uma única requisição
+    
+    Body: {"game_ids": ["...", ...]}
+    """
+    try:
+        data = request.get_json()
+        game_ids = data.get('game_ids', [])
+        
+        if not isinstance(game_ids, list) or not game_ids:
+            return jsonify({'success': False, 'message': 'Lista de jogos não fornecida'}), 400
+        if len(game_ids) > BULK_MAX_GAMES:
+            return jsonify({'success': False, 'message': f'Máximo de {BULK_MAX_GAMES} jogos por lote'}), 400
+        
+        return jsonify({
+            'success': True,
+            'results': GameManager().end_games([str(game_id) for game_id in game_ids])
+        })
+    except Exception as e:
+        current_app.logger.error('Erro ao finalizar jogos em lote: %s', e)
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@api.route('/api/games/<game_id>/start', methods=['POST'])
 def start_game(game_id):
     """Inicia um jogo"""
     try:
-        result = game_manager.start_game(game_id)
+        result = GameManager().start_game(game_id)
         return jsonify({
             'success': True,
             'game': result
@@ -164,15 +505,29 @@ def start_game(game_id):
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 404
     except Exception as e:
-        app.logger.error(f'Erro ao iniciar jogo: {str(e)}')
+        current_app.logger.error('Erro ao iniciar jogo: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/api/games/<game_id>/audio', methods=['POST'])
+@api.route('/api/games/<game_id>/audio', methods=['POST'])
 def process_audio(game_id):
     """Processa áudio e retorna estado do jogo - LÓGICA DO JOGO AQUI"""
     try:
         data = request.get_json()
         
+        # Modo de resposta negociado: full (padrão), delta (JSON) ou binary
+        response_mode = data.get('response_mode', 'full')
+        if response_mode not in RESPONSE_MODES:
+            return jsonify({'success': False, 'message': f'Modo de resposta inválido: {response_mode}'}), 400
+        try:
+            ack_seq = int(data['ack_seq']) if data.get('ack_seq') is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'ack_seq deve ser um número inteiro'}), 400
+        # Sequência do frame no cliente (opcional): frames atrasados são descartados
+        try:
+            frame_seq = int(data['frame_seq']) if data.get('frame_seq') is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'frame_seq deve ser um número inteiro'}), 400
+        
         # Opção 1: Receber dados de áudio brutos (base64)
         audio_data_b64 = data.get('audio_data', '')
         
@@ -181,11 +536,18 @@ def process_audio(game_id):
         audio_metering_db = data.get('audio_metering_db', None)
         
         if audio_data_b64:
+            # Taxa de amostragem do PCM (opcional; precisa ser a configurada no servidor)
+            try:
+                sample_rate = int(data['sample_rate']) if data.get('sample_rate') is not None else None
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'message': 'sample_rate deve ser um número inteiro'}), 400
             # Se temos dados brutos, decodificar e processar
             try:
                 audio_bytes = base64.b64decode(audio_data_b64)
                 # Processar áudio usando GameManager (que usa as classes Python)
-                game_data = game_manager.process_audio_input(game_id, audio_bytes)
+                game_data = GameManager().process_audio_input(game_id, audio_bytes, sample_rate)
+            except UnsupportedSampleRateError as e:
+                return jsonify({'success': False, 'message': str(e), 'sample_rate': e.supported}), 400
             except Exception as e:
                 return jsonify({'success': False, 'message': f'Erro ao decodificar áudio: {str(e)}'}), 400
         elif audio_intensity is not None or audio_metering_db is not None:
@@ -195,40 +557,74 @@ def process_audio(game_id):
                 intensity = max(0.0, min(1.0, float(audio_intensity)))
             else:
                 # Converter dB para intensidade (0-1)
-                # dB típico: -60 (silêncio) a -2 (sopro forte)
-                intensity = max(0.0, min(1.0, (float(audio_metering_db) + 60) / 58))
+                intensity = GameManager.metering_to_intensity(audio_metering_db)
             
             # USAR INTENSIDADE DIRETAMENTE - não gerar áudio aleatório
             # Isso evita comportamento aleatório e usa os dados reais do microfone
-            game_data = game_manager.process_audio_intensity(game_id, intensity, audio_metering_db)
+            # Só clientes que pedem allow_queued aceitam a resposta "queued" (sem game_state)
+            game_data = GameManager().process_audio_intensity(game_id, intensity, audio_metering_db, frame_seq,
+                                                              bool(data.get('allow_queued')))
         else:
             return jsonify({'success': False, 'message': 'Dados de áudio não fornecidos'}), 400
         
+        # Rajada (cliente com allow_queued): o frame entrou no lote pendente do jogo e será aplicado junto com os outros
+        if game_data.get('queued'):
+            return jsonify({
+                'success': True,
+                'queued': True
+            }), 202
+        # Frame atrasado: o jogo já aplicou um frame mais novo deste cliente
+        if game_data.get('dropped'):
+            return jsonify({
+                'success': True,
+                'dropped': True,
+                'reason': game_data['reason'],
+                'last_frame_seq': game_data['last_frame_seq']
+            })
+        
+        if response_mode != 'full':
+            body, _ = frame_encoder.encode(game_id, game_data, response_mode, ack_seq)
+            if response_mode == 'binary':
+                return Response(body, mimetype='application/octet-stream')
+            return jsonify({
+                'success': True,
+                'frame': body
+            })
+        
+        # Resposta curta quando o estado não mudou (cliente precisa pedir com allow_unchanged)
+        if data.get('allow_unchanged') and not game_data['state_changed']:
+            return jsonify({
+                'success': True,
+                'unchanged': True,
+                'next_poll_ms': game_data['next_poll_ms']
+            })
+        
         return jsonify({
             'success': True,
             'game_state': game_data
         })
+    except FrameEncodingError as e:
+        # Falha do servidor ao codificar o estado, não jogo expirado
+        current_app.logger.error('Erro ao codificar frame do jogo %s: %s', game_id, e)
+        return jsonify({'success': False, 'message': f'Erro ao codificar o estado do jogo: {str(e)}'}), 500
     except ValueError as e:
-        # Jogo não encontrado - pode ter expirado ou backend foi reiniciado
-        app.logger.warning(f'Jogo não encontrado: {game_id} - {str(e)}')
-        # Listar jogos disponíveis para debug
-        available_games = list(game_manager._games.keys()) if hasattr(game_manager, '_games') else []
-        app.logger.info(f'Jogos disponíveis: {available_games}')
+        # Jogo não encontrado - pode ter expirado ou backend foi reiniciado.
+        # Os IDs dos outros jogos não são listados (nem na resposta, nem no log)
+        current_app.logger.warning('Jogo não encontrado: %s - %s', game_id, e)
         return jsonify({
             'success': False, 
             'message': f'Jogo não encontrado: {game_id}. Jogo pode ter expirado ou backend foi reiniciado.',
-            'available_games': available_games,
             'hint': 'Crie um novo jogo usando POST /api/games/create'
         }), 404
     except Exception as e:
-        app.logger.error(f'Erro ao processar áudio para jogo {game_id}: {str(e)}', exc_info=True)
+        current_app.logger.error('Erro ao processar áudio para jogo %s: %s', game_id, e, exc_info=True)
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/api/games/<game_id>/status', methods=['GET'])
+@api.route('/api/games/<game_id>/status', methods=['GET'])
 def get_game_status(game_id):
     """Retorna status atual do jogo"""
     try:
-        status = game_manager.get_game_status(game_id)
+        status = GameManager().get_game_status(game_id)
         return jsonify({
             'success': True,
             'status': status
@@ -236,14 +632,14 @@ def get_game_status(game_id):
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 404
     except Exception as e:
-        app.logger.error(f'Erro ao obter status: {str(e)}')
+        current_app.logger.error('Erro ao obter status: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/api/games/<game_id>/end', methods=['POST'])
+@api.route('/api/games/<game_id>/end', methods=['POST'])
 def end_game(game_id):
     """Finaliza um jogo"""
     try:
-        result = game_manager.end_game(game_id)
+        result = GameManager().end_game(game_id)
         return jsonify({
             'success': True,
             'game': result
@@ -251,24 +647,58 @@ def end_game(game_id):
     except ValueError as e:
         return jsonify({'success': False, 'message': str(e)}), 404
     except Exception as e:
-        app.logger.error(f'Erro ao finalizar jogo: {str(e)}')
+        current_app.logger.error('Erro ao finalizar jogo: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/api/games', methods=['GET'])
+@api.route('/api/games', methods=['GET'])
 def get_all_games():
-    """Retorna lista de todos os jogos"""
+    """
+    Retorna uma página de jogos (paginação por cursor)
+    
+    Query params: limit, cursor, game_type, active (true/false), player
+    """
     try:
-        games = game_manager.get_all_games()
-        return jsonify({
-            'success': True,
-            'games': games
-        })
+        try:
+            limit = int(request.args.get('limit', GAMES_PAGE_DEFAULT_LIMIT))
+        except ValueError:
+            return jsonify({'success': False, 'message': 'limit deve ser um número inteiro'}), 400
+        limit = max(1, min(limit, GAMES_PAGE_MAX_LIMIT))
+        
+        game_type = None
+        if request.args.get('game_type'):
+            game_type = parse_game_type(request.args['game_type'])
+            if game_type is None:
+                return jsonify({'success': False, 'message': f"Tipo de jogo inválido: {request.args['game_type']}"}), 400
+        
+        is_active = None
+        if request.args.get('active'):
+            is_active = request.args['active'].lower() in ('true', '1', 'sim')
+        
+        try:
+            page = GameManager().list_games(
+                game_type=game_type,
+                is_active=is_active,
+                player_name=request.args.get('player'),
+                cursor=request.args.get('cursor'),
+                limit=limit
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        def generate():
+            # Serializar jogo a jogo em vez de montar o JSON inteiro de uma vez
+            yield '{"success": true, "games": ['
+            for i, game in enumerate(page['games']):
+                yield (',' if i else '') + json.dumps(game, ensure_ascii=False)
+            yield '], "next_cursor": ' + json.dumps(page['next_cursor']) + '}'
+        
+        return Response(stream_with_context(generate()), mimetype='application/json')
     except Exception as e:
-        app.logger.error(f'Erro ao listar jogos: {str(e)}')
+        current_app.logger.error('Erro ao listar jogos: %s', e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 # Rotas antigas mantidas para compatibilidade
-@app.route('/api/games/session', methods=['POST'])
+@api.route('/api/games/session', methods=['POST'])
 def start_session():
     user_id = request.headers.get('X-User-ID')
     if not user_id:
@@ -298,7 +728,7 @@ def start_session():
         'session': session
     })
 
-@app.route('/api/games/session/<session_id>/end', methods=['POST'])
+@api.route('/api/games/session/<session_id>/end', methods=['POST'])
 def end_session(session_id):
     user_id = request.headers.get('X-User-ID')
     if not user_id:
@@ -319,26 +749,107 @@ def end_session(session_id):
             session['duration'] = duration
             session['completed'] = completed
             
+            # Agregados diários/semanais dos relatórios de evolução (no primeiro
+            # fim de sessão do usuário, inclui as sessões anteriores)
+            rollup_store.add_session(user_id, session, lambda: (
+                s for s in db['sessions'] if s['user_id'] == user_id
+            ))
+            
+            # Log de pontuações dos rankings
+            if isinstance(score, (int, float)) and not isinstance(score, bool):
+                user = db['users'].get(user_id, {})
+                db.setdefault('scores', []).append({
+                    'session_id': session_id,
+                    'user_id': user_id,
+                    'name': user.get('name', user_id),
+                    'game_type': session.get('game_type'),
+                    'score': score,
+                    'ended_at': session['ended_at']
+                })
+            
             # Atualizar estatísticas do usuário
             if user_id in db['users']:
                 db['users'][user_id]['total_sessions'] += 1
                 db['users'][user_id]['total_time'] += duration
                 db['users'][user_id]['total_score'] += score
                 
+                # Sequência de dias com sessão completa (bitmap de dias ativos)
                 if completed:
-                    db['users'][user_id]['streak_days'] += 1
+                    today = datetime.now().date()
+                    activity = user_activity(db, user_id)
+                    activity.mark(today)
+                    db['users'][user_id]['activity'] = activity.to_dict()
+                    db['users'][user_id]['streak_days'] = activity.current_streak(today)
             
             break
     
     save_data(db)
+    sync_leaderboards(db)
     
     return jsonify({
         'success': True,
         'message': 'Sessão finalizada com sucesso'
     })
 
+# Rankings
+LEADERBOARD_MAX_LIMIT = 100
+
+def leaderboard_query():
+    """Período, tipo de jogo, limite e deslocamento dos parâmetros da consulta"""
+    period = request.args.get('period', 'all')
+    game_type = request.args.get('game_type') or None
+    limit = min(max(request.args.get('limit', 10, type=int), 1), LEADERBOARD_MAX_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return period, game_type, limit, offset
+
+@api.route('/api/leaderboard', methods=['GET'])
+def get_leaderboard():
+    period, game_type, limit, offset = leaderboard_query()
+    sync_leaderboards()
+    
+    try:
+        board = leaderboards.top(period, game_type, limit, offset)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    response = {
+        'success': True,
+        'period': period,
+        'game_type': game_type,
+        'players': board['players'],
+        'leaderboard': board['entries']
+    }
+    
+    # Posição do usuário logado junto com o topo
+    user_id = request.headers.get('X-User-ID')
+    if user_id:
+        response['me'] = leaderboards.rank(user_id, period, game_type)
+    
+    return jsonify(response)
+
+@api.route('/api/leaderboard/rank', methods=['GET'])
+def get_leaderboard_rank():
+    user_id = request.headers.get('X-User-ID')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Usuário não autenticado'}), 401
+    
+    period, game_type, _, _ = leaderboard_query()
+    sync_leaderboards()
+    
+    try:
+        rank = leaderboards.rank(user_id, period, game_type)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'period': period,
+        'game_type': game_type,
+        'rank': rank
+    })
+
 # Rotas de estatísticas
-@app.route('/api/stats/recent', methods=['GET'])
+@api.route('/api/stats/recent', methods=['GET'])
 def get_recent_stats():
     user_id = request.headers.get('X-User-ID')
     if not user_id:
@@ -357,7 +868,10 @@ def get_recent_stats():
         'sessions': recent_sessions
     })
 
-@app.route('/api/stats/summary', methods=['GET'])
+# Maior janela de dias aceita em "dias ativos nos últimos N dias"
+ACTIVITY_MAX_DAYS = 3660
+
+@api.route('/api/stats/summary', methods=['GET'])
 def get_stats_summary():
     user_id = request.headers.get('X-User-ID')
     if not user_id:
@@ -370,20 +884,234 @@ def get_stats_summary():
     
     user = db['users'][user_id]
     
+    # Usuário anterior ao bitmap: reconstruído das sessões uma única vez e salvo
+    if materialize_activity(db, [user_id]):
+        save_data(db)
+    
+    # Sequências calculadas para hoje (a sequência salva pode ter sido quebrada depois)
+    days = min(max(request.args.get('days', 30, type=int), 1), ACTIVITY_MAX_DAYS)
+    activity = user_activity(db, user_id).summary(datetime.now().date(), days)
+    
     return jsonify({
         'success': True,
         'stats': {
             'total_sessions': user['total_sessions'],
             'total_time': user['total_time'],
             'total_score': user['total_score'],
-            'streak_days': user['streak_days'],
+            'streak_days': activity['current_streak'],
+            'longest_streak': activity['longest_streak'],
             'average_score': user['total_score'] / max(user['total_sessions'], 1),
-            'average_duration': user['total_time'] / max(user['total_sessions'], 1)
+            'average_duration': user['total_time'] / max(user['total_sessions'], 1),
+            'activity': activity
         }
     })
 
+# Intervalo padrão dos relatórios de evolução (dias até hoje)
+REPORT_DEFAULT_DAYS = {'day': 30, 'week': 84}
+
+@api.route('/api/stats/report', methods=['GET'])
+def get_stats_report():
+    user_id = request.headers.get('X-User-ID')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Usuário não autenticado'}), 401
+    
+    period = request.args.get('period', 'week')
+    if period not in ROLLUP_PERIODS:
+        return jsonify({'success': False, 'message': f'Período inválido: {period} (use {", ".join(ROLLUP_PERIODS)})'}), 400
+    
+    try:
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else datetime.now().date()
+        start = (date.fromisoformat(request.args['from']) if request.args.get('from')
+                 else end - timedelta(days=REPORT_DEFAULT_DAYS[period] - 1))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Data inválida (use AAAA-MM-DD)'}), 400
+    if start > end:
+        return jsonify({'success': False, 'message': '"from" deve ser anterior a "to"'}), 400
+    
+    game_type = request.args.get('game_type') or None
+    if not rollup_store.has_user(user_id):
+        # Usuário sem fim de sessão desde a criação dos agregados: soma o histórico uma vez
+        db = load_data()
+        rollup_store.backfill(user_id, (s for s in db['sessions'] if s['user_id'] == user_id))
+    rows = rollup_store.query(user_id, period, start, end, game_type)
+    
+    return jsonify({
+        'success': True,
+        'period': period,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'game_type': game_type,
+        'rows': rows
+    })
+
+# Maior número de sessões por resposta do histórico
+HISTORY_MAX_LIMIT = 5000
+
+@api.route('/api/stats/history', methods=['GET'])
+def get_stats_history():
+    user_id = request.headers.get('X-User-ID')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Usuário não autenticado'}), 401
+    
+    try:
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else datetime.now().date()
+        start = (date.fromisoformat(request.args['from']) if request.args.get('from')
+                 else end - timedelta(days=364))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Data inválida (use AAAA-MM-DD)'}), 400
+    if start > end:
+        return jsonify({'success': False, 'message': '"from" deve ser anterior a "to"'}), 400
+    limit = min(max(request.args.get('limit', 500, type=int), 1), HISTORY_MAX_LIMIT)
+    
+    # Sessões iniciadas no intervalo: primeiro as arquivadas (só os segmentos
+    # do usuário e do período), depois as do data.json. O data.json é lido
+    # antes do índice e as sessões dele anteriores ao corte do índice (já
+    # arquivadas) são puladas, como na exportação
+    first, last = start.isoformat(), (end + timedelta(days=1)).isoformat()
+    db = load_data()
+    archived_before, segments = session_archive.snapshot(user_id, first, last)
+    sessions = []
+    for session in session_archive.read_segments(segments, user_id, first, last):
+        sessions.append(session)
+        if len(sessions) > limit:
+            break
+    if len(sessions) <= limit:
+        for session in db['sessions']:
+            if (session['user_id'] == user_id and first <= session['started_at'] < last
+                    and (archived_before is None or session['started_at'] >= archived_before)):
+                sessions.append(session)
+                if len(sessions) > limit:
+                    break
+    
+    return jsonify({
+        'success': True,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'sessions': sessions[:limit],
+        'truncated': len(sessions) > limit,
+        'archived_segments': len(segments)
+    })
+
+def export_response(user_id):
+    """
+    Resposta em streaming com as sessões do usuário (ou de todos, se None)
+
+    Query params: format (ndjson ou csv), from e to (AAAA-MM-DD, pelo início da sessão)
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': f"Formato inválido: {export_format} (use {', '.join(EXPORT_FORMATS)})"}), 400
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Data inválida (use AAAA-MM-DD)'}), 400
+    if start and end and start > end:
+        return jsonify({'success': False, 'message': '"from" deve ser anterior a "to"'}), 400
+    
+    sessions = iter_export_sessions(
+        session_archive, DATA_FILE, user_id,
+        start.isoformat() if start else None,
+        (end + timedelta(days=1)).isoformat() if end else None
+    )
+    response = Response(stream_with_context(export_chunks(sessions, export_format)),
+                        mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="sessoes.{export_format}"'
+    return response
+
+@api.route('/api/stats/export', methods=['GET'])
+def export_user_sessions():
+    user_id = request.headers.get('X-User-ID')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Usuário não autenticado'}), 401
+    return export_response(user_id)
+
+# Métricas no formato texto do Prometheus
+@api.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+# Rotas administrativas de profiling (header X-Admin-Token = AETHERIA_ADMIN_TOKEN)
+def admin_authorized():
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+@api.route('/api/admin/profiling', methods=['GET', 'PUT', 'DELETE'])
+def admin_profiling():
+    if not admin_authorized():
+        return jsonify({'success': False, 'message': 'Não autorizado'}), 403
+    
+    if request.method == 'DELETE':
+        request_profiler.reset()
+    elif request.method == 'PUT':
+        data = request.get_json() or {}
+        try:
+            request_profiler.configure(
+                enabled=bool(data.get('enabled', True)),
+                sample_rate=float(data.get('sample_rate', 0.0)),
+                game_id=data.get('game_id'),
+                route=data.get('route')
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'profiling': request_profiler.get_status()
+    })
+
+@api.route('/api/admin/profiling/report', methods=['GET'])
+def admin_profiling_report():
+    if not admin_authorized():
+        return jsonify({'success': False, 'message': 'Não autorizado'}), 403
+    
+    route = request.args.get('route', '/api/games/<game_id>/audio')
+    try:
+        limit = int(request.args.get('limit', 40))
+        report = request_profiler.report(route, request.args.get('sort', 'cumulative'), limit)
+    except (TypeError, ValueError, KeyError) as e:
+        return jsonify({'success': False, 'message': f'Parâmetro inválido: {str(e)}'}), 400
+    if report is None:
+        return jsonify({'success': False, 'message': f'Nenhum perfil para a rota {route}'}), 404
+    return Response(report, mimetype='text/plain; charset=utf-8')
+
+@api.route('/api/admin/profiling/dump', methods=['POST'])
+def admin_profiling_dump():
+    if not admin_authorized():
+        return jsonify({'success': False, 'message': 'Não autorizado'}), 403
+    
+    return jsonify({
+        'success': True,
+        'files': request_profiler.dump()
+    })
+
+# Arquivamento das sessões antigas (header X-Admin-Token = AETHERIA_ADMIN_TOKEN)
+@api.route('/api/admin/archive', methods=['GET', 'POST'])
+def admin_archive():
+    if not admin_authorized():
+        return jsonify({'success': False, 'message': 'Não autorizado'}), 403
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            older_than_days = int(data.get('older_than_days', ARCHIVE_AFTER_DAYS))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'older_than_days deve ser um inteiro'}), 400
+        if older_than_days < 1:
+            return jsonify({'success': False, 'message': 'older_than_days deve ser pelo menos 1'}), 400
+        return jsonify({'success': True, 'result': archive_old_sessions(older_than_days)})
+    
+    return jsonify({'success': True, 'archive': session_archive.get_stats()})
+
+# Exportação das sessões da clínica (todas ou de um usuário, ?user_id=)
+@api.route('/api/admin/export', methods=['GET'])
+def admin_export():
+    if not admin_authorized():
+        return jsonify({'success': False, 'message': 'Não autorizado'}), 403
+    return export_response(request.args.get('user_id') or None)
+
 # Rota de saúde
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy',
@@ -391,7 +1119,72 @@ def health_check():
         'version': '1.0.0'
     })
 
+# Prontidão: o processo só deve receber tráfego depois do warmup
+@api.route('/api/ready', methods=['GET'])
+def readiness_check():
+    warmup = GameManager().get_warmup_status()
+    if warmup is None:
+        return jsonify({
+            'ready': False,
+            'message': 'Warmup do processamento de áudio ainda não concluído'
+        }), 503
+    return jsonify({
+        'ready': True,
+        'warmup': warmup
+    })
+
+def warm_up(background=False):
+    """
+    Cria o GameManager e aquece o processamento de áudio (SciPy, filtros, FFT)
+    antes da primeira requisição. /api/ready responde 503 até terminar.
+    
+    Args:
+        background: Executar em uma thread, sem atrasar o início do servidor
+    
+    Returns:
+        Relatório do warmup, ou None se executado em segundo plano
+    """
+    if background:
+        threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+        return None
+    return GameManager().warm_up()
+
+def create_app(warm=False):
+    """
+    Factory do app Flask
+    
+    Args:
+        warm: Executar warm_up() antes de retornar (processos que vão atender
+              requisições logo em seguida); sem ele, o import e a criação do
+              app não carregam o SciPy nem criam o GameManager
+    
+    Returns:
+        App configurado
+    """
+    # Configurar logging (fila + thread de escrita, nível em AETHERIA_LOG_LEVEL)
+    configure_logging()
+    
+    app = Flask(__name__)
+    # CORS configurado para aceitar requisições do React Native
+    # React Native não usa localhost, então permitimos todas as origens
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": "*",
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"]
+        }
+    })
+    app.register_blueprint(api)
+    
+    if warm:
+        warm_up()
+    return app
+
+# App padrão (python app.py, flask run, gunicorn app:app)
+app = create_app()
+
 if __name__ == '__main__':
+    warm_up(background=True)
     # Usar porta 5001 para evitar conflito com AirPlay Receiver no macOS
     port = int(os.environ.get('PORT', 5001))
     app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
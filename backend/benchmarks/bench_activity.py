@@ -0,0 +1,110 @@
+"""
+Benchmark das sequências de dias ativos (bitmap por usuário)
+Para históricos de 1 a 10 anos mede o custo de marcar um dia e de
+calcular sequência atual, maior sequência e dias ativos nos últimos 30
+dias no bitmap, contra o cálculo percorrendo as sessões do usuário, e o
+tamanho do bitmap salvo no data.json. Verifica que os dois dão o mesmo
+resultado.
+
+Uso:
+    python benchmarks/bench_activity.py --years 1,5,10 --sessions-per-day 3
+"""
+
+import sys
+import os
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Dict, Any, List
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.activity import ActivityBitmap
+
+
+def sessions_for(years: int, per_day: int, today: date, seed: int = 42) -> List[date]:
+    """Dias das sessões completas: a maioria dos dias ativa, com pausas de alguns dias"""
+    rng = random.Random(seed)
+    days = []
+    day = today - timedelta(days=365 * years)
+    while day <= today:
+        if rng.random() < 0.85:
+            days.extend([day] * rng.randint(1, per_day))
+            day += timedelta(days=1)
+        else:
+            day += timedelta(days=rng.randint(1, 4))
+    return days
+
+
+def scan(session_days: List[date], today: date, window: int) -> Dict[str, int]:
+    """Sequências calculadas percorrendo as sessões (sem bitmap)"""
+    active = set(session_days)
+    current, day = 0, today if today in active else today - timedelta(days=1)
+    while day in active:
+        current += 1
+        day -= timedelta(days=1)
+    longest = run = 0
+    previous = None
+    for day in sorted(active):
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    recent = sum(1 for day in active if (today - day).days < window)
+    return {"current_streak": current, "longest_streak": longest, "active_days": recent}
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def measure(years: int, per_day: int, repeat: int) -> Dict[str, Any]:
+    today = date.today()
+    session_days = sessions_for(years, per_day, today)
+    activity = ActivityBitmap.from_days(session_days)
+    stored = activity.to_dict()
+
+    summary = activity.summary(today, 30)
+    expected = scan(session_days, today, 30)
+    assert {k: summary[k] for k in expected} == expected, "bitmap difere do cálculo pelas sessões"
+
+    def end_session():
+        restored = ActivityBitmap.from_dict(stored)
+        restored.mark(today)
+        restored.current_streak(today)
+        return restored.to_dict()
+
+    return {
+        "years": years,
+        "sessions": len(session_days),
+        "bytes": len(json.dumps(stored)),
+        "scan_us": timed(lambda: scan(session_days, today, 30), max(repeat // 20, 3)),
+        "summary_us": timed(lambda: ActivityBitmap.from_dict(stored).summary(today, 30), repeat),
+        "end_session_us": timed(end_session, repeat)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do bitmap de dias ativos")
+    parser.add_argument("--years", default="1,5,10", help="Anos de histórico, separados por vírgula")
+    parser.add_argument("--sessions-per-day", type=int, default=3, help="Máximo de sessões por dia ativo")
+    parser.add_argument("--repeat", type=int, default=2000, help="Repetições de cada medição")
+    args = parser.parse_args()
+
+    print(f"{'anos':>5} {'sessões':>8} {'bitmap':>8} {'varredura':>11} {'resumo':>9} {'fim sessão':>11}")
+    for years in (int(y) for y in args.years.split(",")):
+        r = measure(years, args.sessions_per_day, args.repeat)
+        print(f"{r['years']:>5} {r['sessions']:>8} {r['bytes']:>6} B {r['scan_us']:>9.0f}us "
+              f"{r['summary_us']:>7.1f}us {r['end_session_us']:>9.1f}us")
+
+
+if __name__ == "__main__":
+    main()
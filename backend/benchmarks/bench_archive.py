@@ -0,0 +1,95 @@
+"""
+Benchmark do arquivamento das sessões antigas
+Gera uma base com um ano de sessões, mede os endpoints que leem o data.json
+(os mesmos de bench_storage), arquiva as sessões mais antigas que a idade
+pedida e mede de novo. Mostra também a duração do arquivamento, o tamanho
+do data.json e do arquivo, e quanto custa uma consulta histórica de um mês
+arquivado (quantos segmentos ela abre).
+
+Uso:
+    python benchmarks/bench_archive.py --sessions 200000 --users 2000 --older-than-days 90
+"""
+
+import sys
+import os
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from typing import Dict
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from benchmarks.generate_dataset import generate_dataset
+from benchmarks.bench_storage import endpoint_calls, use_data_file
+
+
+def measure_endpoints(client, user_id: str, session_ids, requests: int) -> Dict[str, float]:
+    """Latência mediana (ms) de cada endpoint"""
+    results = {}
+    for name, call in endpoint_calls(client, user_id, session_ids):
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = call()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"{name} retornou {response.status_code}")
+        results[name] = statistics.median(latencies) * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do arquivamento das sessões antigas")
+    parser.add_argument("--sessions", type=int, default=200000, help="Sessões na base (um ano)")
+    parser.add_argument("--users", type=int, default=2000, help="Usuários na base")
+    parser.add_argument("--older-than-days", type=int, default=90, help="Idade mínima das sessões arquivadas")
+    parser.add_argument("--requests", type=int, default=5, help="Requisições por endpoint")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.json")
+        summary = generate_dataset(path, args.users, args.sessions)
+        use_data_file(path)
+        user_id = summary["busiest_user"]
+        client = app_module.app.test_client()
+
+        # Sessões recentes do usuário (continuam no data.json depois do arquivamento)
+        data = app_module.load_data()
+        session_ids = [s["id"] for s in data["sessions"] if s["user_id"] == user_id][-4 * args.requests:]
+        del data
+
+        size_before = os.path.getsize(path)
+        before = measure_endpoints(client, user_id, session_ids[:2 * args.requests], args.requests)
+
+        result = app_module.archive_old_sessions(args.older_than_days)
+
+        size_after = os.path.getsize(path)
+        after = measure_endpoints(client, user_id, session_ids[2 * args.requests:], args.requests)
+
+        # Consulta histórica de um mês arquivado: abre só os segmentos do mês
+        month = app_module.session_archive.segments(user_id)[0]["month"]
+        start = time.perf_counter()
+        response = client.get(f"/api/stats/history?from={month}-01&to={month}-28&limit=5000",
+                              headers={"X-User-ID": user_id}).get_json()
+        history_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Arquivamento (> {args.older_than_days} dias): {result['archived']} sessões em "
+          f"{result['segments']} segmentos ({result['bytes'] / 2 ** 20:.1f} MiB), "
+          f"{result['compacted_scores']} pontuações compactadas, {result['total_seconds']:.1f}s "
+          f"(segmentos: {result['seconds']:.1f}s)")
+    print(f"data.json: {size_before / 2 ** 20:.1f} MiB -> {size_after / 2 ** 20:.1f} MiB "
+          f"({result['hot_sessions']} sessões)")
+    print(f"\n{'endpoint':20s} {'antes':>10s} {'depois':>10s}")
+    for name in before:
+        print(f"{name:20s} {before[name]:8.1f}ms {after[name]:8.1f}ms")
+    print(f"\nHistórico de {month}: {len(response['sessions'])} sessões, "
+          f"{response['archived_segments']} segmento(s) lido(s), {history_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
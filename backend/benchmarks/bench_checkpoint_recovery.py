@@ -0,0 +1,105 @@
+"""
+Benchmark do checkpoint incremental e da recuperação de jogos
+Mede o tempo de gravação dos jogos alterados e o tempo de restauração
+de todos os jogos (10 mil por padrão) após um reinício
+
+Uso:
+    python benchmarks/bench_checkpoint_recovery.py --games 10000
+"""
+
+import sys
+import os
+import argparse
+import json
+import random
+import tempfile
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import BoatGame, BalloonGame
+from services.game_store import InMemoryGameStore
+from services.checkpoint import GameCheckpointer
+
+
+def build_store(games: int, frames_per_game: int, seed: int = 42) -> InMemoryGameStore:
+    """Cria jogos ativos com algum histórico de sopros"""
+    rng = random.Random(seed)
+    store = InMemoryGameStore()
+    for i in range(games):
+        game_class = BoatGame if i % 2 == 0 else BalloonGame
+        game = game_class(f"bench_{store.next_sequence()}", f"Paciente {i}")
+        store.add(game)
+        store.update(game.game_id, lambda g: g.start_game())
+        for _ in range(frames_per_game):
+            intensity = rng.random()
+            store.update(game.game_id, lambda g: g.process_intensity(intensity, intensity >= 0.15))
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de checkpoint e recuperação")
+    parser.add_argument("--games", type=int, default=10000, help="Número de jogos ativos")
+    parser.add_argument("--frames", type=int, default=20, help="Frames processados por jogo")
+    parser.add_argument("--dirty-fraction", type=float, default=0.1,
+                        help="Fração de jogos alterados entre checkpoints")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    # Silenciar logs dos jogos durante a criação em massa
+    import logging
+    logging.disable(logging.INFO)
+
+    store = build_store(args.games, args.frames)
+    results = {"games": args.games}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "games.ckpt")
+
+        checkpointer = GameCheckpointer(store, path, interval=3600)
+        checkpointer.restore()  # arquivo inexistente: apenas cria o checkpoint vazio
+        checkpointer.start()
+
+        start = time.perf_counter()
+        checkpointer.checkpoint_once()
+        results["full_checkpoint_ms"] = (time.perf_counter() - start) * 1000
+
+        # Checkpoint incremental: apenas uma fração dos jogos mudou
+        rng = random.Random(7)
+        game_ids = store.game_ids()
+        for game_id in rng.sample(game_ids, int(len(game_ids) * args.dirty_fraction)):
+            store.update(game_id, lambda g: g.process_intensity(0.8, True))
+        start = time.perf_counter()
+        written = checkpointer.checkpoint_once()
+        results["incremental_checkpoint_ms"] = (time.perf_counter() - start) * 1000
+        results["incremental_records"] = written
+
+        checkpointer.stop()
+        results["checkpoint_file_bytes"] = os.path.getsize(path)
+
+        # Simular reinício: novo store vazio restaurado do arquivo
+        restored_store = InMemoryGameStore()
+        recovery = GameCheckpointer(restored_store, path)
+        start = time.perf_counter()
+        restored = recovery.restore()
+        results["recovery_ms"] = (time.perf_counter() - start) * 1000
+        results["restored_games"] = restored
+
+        assert restored == args.games, "Nem todos os jogos foram restaurados"
+        sample_id = game_ids[0]
+        assert restored_store.get(sample_id).score == store.get(sample_id).score
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Jogos: {results['games']}")
+        print(f"Checkpoint completo: {results['full_checkpoint_ms']:.1f} ms")
+        print(f"Checkpoint incremental ({results['incremental_records']} registros): "
+              f"{results['incremental_checkpoint_ms']:.1f} ms")
+        print(f"Tamanho do arquivo: {results['checkpoint_file_bytes'] / 1024:.0f} KiB")
+        print(f"Recuperação de {results['restored_games']} jogos: {results['recovery_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark do DSP do áudio PCM: na thread da requisição x pool de processos
+Cada paciente é uma thread enviando chunks PCM em sequência (como as threads
+do servidor); mede frames/s e latência por frame (detect_blow + features do
+jogo). Na thread, o cálculo disputa o GIL; no pool, roda em processos
+separados e escala com o número de núcleos.
+
+Uso:
+    python benchmarks/bench_dsp_pool.py --patients 32 --frames 50 --workers 1,2,4
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import threading
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from models import BoatGame, BalloonGame
+from services.audio_processor import AudioProcessor
+from services.dsp_pool import DSPPool
+
+
+def make_chunks(count: int, samples: int, seed: int = 42) -> list:
+    """Chunks PCM sintéticos (tom de 440 Hz com ruído, amplitude variável)"""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for _ in range(count):
+        amplitude = rng.uniform(0.01, 0.5)
+        wave = amplitude * np.sin(2 * np.pi * 440 * np.arange(samples) / 44100) + 0.02 * rng.standard_normal(samples)
+        chunks.append((wave * 32767).astype(np.int16).tobytes())
+    return chunks
+
+
+def run(analyze, patients: int, frames: int, chunks: list) -> dict:
+    """
+    Executa `patients` threads, cada uma com `frames` chamadas a analyze
+
+    Returns:
+        Dict com frames/s e latências p50/p99 (ms)
+    """
+    latencies = [[] for _ in range(patients)]
+
+    def patient(index: int) -> None:
+        game_class = BoatGame if index % 2 == 0 else BalloonGame
+        for frame in range(frames):
+            chunk = chunks[(index + frame) % len(chunks)]
+            started = time.perf_counter()
+            analyze(chunk, game_class)
+            latencies[index].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=patient, args=(i,)) for i in range(patients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = sorted(latency for per_patient in latencies for latency in per_patient)
+    return {
+        "frames_per_second": len(all_latencies) / elapsed,
+        "p50_ms": statistics.median(all_latencies) * 1000,
+        "p99_ms": all_latencies[int(len(all_latencies) * 0.99) - 1] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DSP na thread x pool de processos")
+    parser.add_argument("--patients", type=int, default=32, help="Threads enviando áudio")
+    parser.add_argument("--frames", type=int, default=50, help="Frames por paciente")
+    parser.add_argument("--samples", type=int, default=8820, help="Amostras por chunk (8820 = 200 ms)")
+    parser.add_argument("--workers", default="1,2,4", help="Processos do pool, separados por vírgula")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    chunks = make_chunks(64, args.samples)
+    results = {"cpus": os.cpu_count()}
+
+    processor = AudioProcessor()
+    processor.warm_up()
+
+    def analyze_inline(chunk: bytes, game_class) -> None:
+        processor.detect_blow(chunk)
+        game_class.extract_audio_features(np.frombuffer(chunk, dtype=np.int16), 44100)
+
+    results["inline"] = run(analyze_inline, args.patients, args.frames, chunks)
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        pool = DSPPool(workers)
+        pool.warm_up()
+        results[f"pool_{workers}"] = run(pool.analyze, args.patients, args.frames, chunks)
+        pool.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.patients} pacientes x {args.frames} frames de {args.samples} amostras; {results['cpus']} CPUs")
+    print(f"  {'modo':10s} {'frames/s':>9s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for mode, result in results.items():
+        if mode == "cpus":
+            continue
+        print(f"  {mode:10s} {result['frames_per_second']:9.1f} {result['p50_ms']:8.2f} {result['p99_ms']:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
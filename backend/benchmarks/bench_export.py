@@ -0,0 +1,102 @@
+"""
+Benchmark da exportação de sessões em streaming
+Para bases de tamanhos crescentes exporta todas as sessões da clínica em
+NDJSON de duas formas: montando a resposta inteira (ler o data.json e
+serializar tudo, como uma rota sem streaming faria) e pela rota
+GET /api/admin/export, que lê o data.json em blocos. Mede o tempo até o
+primeiro bloco, o tempo total e o pico de memória alocada (tracemalloc), e
+verifica que as duas formas exportam as mesmas sessões.
+
+Uso:
+    python benchmarks/bench_export.py --sizes 10000,100000,500000 --users 2000
+"""
+
+import sys
+import os
+import argparse
+import json
+import logging
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from benchmarks.generate_dataset import generate_dataset
+from benchmarks.bench_storage import use_data_file
+
+
+def export_materialized(path: str) -> str:
+    """Exportação sem streaming: o data.json inteiro em memória e a resposta inteira montada"""
+    with open(path, encoding="utf-8") as f:
+        sessions = json.load(f)["sessions"]
+    return "".join(json.dumps(s, ensure_ascii=False, separators=(",", ":")) + "\n" for s in sessions)
+
+
+def measure_size(sessions: int, users: int, directory: str) -> Dict[str, Any]:
+    """
+    Gera uma base com o número de sessões pedido e mede as duas exportações
+
+    Returns:
+        Dict com tamanho da base e da exportação e, para cada forma, tempo
+        até o primeiro bloco, tempo total (ms) e pico de memória (MiB)
+    """
+    path = os.path.join(directory, f"data_{sessions}.json")
+    generate_dataset(path, users, sessions)
+    use_data_file(path)
+    client = app_module.app.test_client()
+    result: Dict[str, Any] = {"sessions": sessions, "file_mib": os.path.getsize(path) / 2 ** 20}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    body = export_materialized(path)
+    result["full_ms"] = (time.perf_counter() - start) * 1000
+    result["full_mib"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    expected = len(body.encode("utf-8"))
+    del body
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get("/api/admin/export?format=ndjson", buffered=False,
+                          headers={"X-Admin-Token": app_module.ADMIN_TOKEN})
+    size = 0
+    for chunk in response.response:
+        if not size:
+            result["stream_first_ms"] = (time.perf_counter() - start) * 1000
+        size += len(chunk)
+    response.close()
+    result["stream_ms"] = (time.perf_counter() - start) * 1000
+    result["stream_mib"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    assert size == expected, "exportação em streaming difere da montada"
+    result["export_mib"] = size / 2 ** 20
+    os.remove(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da exportação de sessões em streaming")
+    parser.add_argument("--sizes", default="10000,100000,500000", help="Números de sessões, separados por vírgula")
+    parser.add_argument("--users", type=int, default=2000, help="Usuários em cada base")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    app_module.ADMIN_TOKEN = app_module.ADMIN_TOKEN or "bench"
+
+    print(f"{'sessões':>9} {'data.json':>10} {'exportado':>10} {'montada':>10} {'memória':>9} "
+          f"{'1º bloco':>9} {'streaming':>10} {'memória':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(s) for s in args.sizes.split(",")):
+            r = measure_size(size, args.users, directory)
+            print(f"{r['sessions']:>9} {r['file_mib']:>6.1f} MiB {r['export_mib']:>6.1f} MiB "
+                  f"{r['full_ms']:>8.0f}ms {r['full_mib']:>5.0f} MiB {r['stream_first_ms']:>7.1f}ms "
+                  f"{r['stream_ms']:>8.0f}ms {r['stream_mib']:>5.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark e teste de compatibilidade das respostas compactas de /audio
+Compara bytes e tempo de serialização por frame entre a resposta completa
+(JSON), o delta em JSON e o delta binário, e verifica que o estado
+reconstruído pelo cliente é igual ao da resposta completa
+
+Uso:
+    python benchmarks/bench_frame_codec.py --frames 2000
+"""
+
+import sys
+import os
+import argparse
+import json
+import math
+import random
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from services import GameManager, GameType
+from services.frame_codec import FrameEncoder, flatten_state, decode_binary, apply_frame
+
+
+def blow_pattern(frames: int, seed: int = 42) -> list:
+    """Intensidades que alternam entre repouso e sopros, como em uma sessão real"""
+    rng = random.Random(seed)
+    values = []
+    while len(values) < frames:
+        values.extend([rng.uniform(0.0, 0.08)] * rng.randint(5, 20))    # repouso
+        values.extend(rng.uniform(0.5, 1.0) for _ in range(rng.randint(5, 15)))  # sopro
+    return values[:frames]
+
+
+def states_match(expected: dict, actual: dict) -> bool:
+    """Compara estados achatados (floats com a precisão de float32)"""
+    if expected.keys() != actual.keys():
+        return False
+    for key, value in expected.items():
+        other = actual[key]
+        if isinstance(value, float) and not isinstance(value, bool):
+            if math.isinf(value) or math.isnan(value):
+                if not (math.isinf(other) or math.isnan(other)):
+                    return False
+            elif not math.isclose(value, other, rel_tol=1e-6, abs_tol=1e-4):
+                return False
+        elif value != other:
+            return False
+    return True
+
+
+def run(game_type: GameType, frames: int) -> dict:
+    # Mesmo serializador usado pelo jsonify das rotas
+    dumps = Flask(__name__).json.dumps
+    manager = GameManager()
+    game_id = manager.create_game(game_type, "Benchmark")["game_id"]
+    manager.start_game(game_id)
+
+    encoders = {"delta": FrameEncoder(), "binary": FrameEncoder()}
+    totals = {mode: {"bytes": 0, "seconds": 0.0} for mode in ("full", "delta", "binary")}
+    client_state = {"delta": None, "binary": None}
+    ack = {"delta": None, "binary": None}
+
+    for intensity in blow_pattern(frames):
+        game_data = manager.process_audio_intensity(game_id, intensity)
+        expected = flatten_state(game_data)
+
+        start = time.perf_counter()
+        body = dumps({"success": True, "game_state": game_data})
+        totals["full"]["seconds"] += time.perf_counter() - start
+        totals["full"]["bytes"] += len(body)
+
+        start = time.perf_counter()
+        frame, _ = encoders["delta"].encode(game_id, game_data, "delta", ack["delta"])
+        body = dumps({"success": True, "frame": frame})
+        totals["delta"]["seconds"] += time.perf_counter() - start
+        totals["delta"]["bytes"] += len(body)
+
+        # Cliente: aplica o delta JSON sobre o último estado
+        received = flatten_state(json.loads(body)["frame"]["changes"])
+        client_state["delta"] = apply_frame(client_state["delta"], frame["base_seq"] or 0, received)
+        ack["delta"] = frame["seq"]
+        assert states_match(expected, client_state["delta"]), "Delta JSON divergiu da resposta completa"
+
+        start = time.perf_counter()
+        payload, _ = encoders["binary"].encode(game_id, game_data, "binary", ack["binary"])
+        totals["binary"]["seconds"] += time.perf_counter() - start
+        totals["binary"]["bytes"] += len(payload)
+
+        # Cliente: decodifica o frame binário
+        seq, base_seq, fields = decode_binary(payload)
+        client_state["binary"] = apply_frame(client_state["binary"], base_seq, fields)
+        ack["binary"] = seq
+        assert states_match(expected, client_state["binary"]), "Frame binário divergiu da resposta completa"
+
+    manager.end_game(game_id)
+
+    return {
+        mode: {
+            "bytes_per_frame": values["bytes"] / frames,
+            "us_per_frame": values["seconds"] / frames * 1e6
+        }
+        for mode, values in totals.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das respostas compactas de /audio")
+    parser.add_argument("--frames", type=int, default=2000, help="Frames por tipo de jogo")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    results = {game_type.value: run(game_type, args.frames) for game_type in GameType}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for game_type, modes in results.items():
+        print(f"{game_type} ({args.frames} frames, estado reconstruído igual à resposta completa)")
+        for mode, values in modes.items():
+            print(f"  {mode:7s} {values['bytes_per_frame']:7.1f} bytes/frame  {values['us_per_frame']:6.1f} µs/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark do custo por requisição do store de jogos
+Compara o estado em memória com o store compartilhado em SQLite
+
+Uso:
+    python benchmarks/bench_game_store.py --games 200 --frames 20000
+"""
+
+import sys
+import os
+import argparse
+import json
+import random
+import tempfile
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import BoatGame, BalloonGame
+from services.game_store import InMemoryGameStore, SQLiteGameStore
+
+
+def populate(store, games: int) -> list:
+    """Cria e inicia jogos no store, alternando entre barco e balão"""
+    game_ids = []
+    for i in range(games):
+        game_class = BoatGame if i % 2 == 0 else BalloonGame
+        game = game_class(f"bench_{store.next_sequence()}", f"Paciente {i}")
+        store.add(game)
+        store.update(game.game_id, lambda g: g.start_game())
+        game_ids.append(game.game_id)
+    return game_ids
+
+
+def run_frames(store, game_ids: list, frames: int, seed: int = 42) -> float:
+    """
+    Aplica frames de intensidade aleatórios através do store
+
+    Returns:
+        Tempo médio por frame em microssegundos
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(frames):
+        game_id = rng.choice(game_ids)
+        intensity = rng.random()
+        store.update(game_id, lambda g: g.process_intensity(intensity, intensity >= 0.15))
+    elapsed = time.perf_counter() - start
+    return elapsed / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do store de jogos")
+    parser.add_argument("--games", type=int, default=200, help="Número de jogos ativos")
+    parser.add_argument("--frames", type=int, default=20000, help="Número de frames processados")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    results = {}
+
+    memory_store = InMemoryGameStore()
+    results["memory_us_per_frame"] = run_frames(memory_store, populate(memory_store, args.games), args.frames)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = SQLiteGameStore(os.path.join(tmp, "games.db"))
+        results["sqlite_us_per_frame"] = run_frames(sqlite_store, populate(sqlite_store, args.games), args.frames)
+
+    results["overhead_us_per_frame"] = results["sqlite_us_per_frame"] - results["memory_us_per_frame"]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Jogos: {args.games}, frames: {args.frames}")
+        print(f"Memória: {results['memory_us_per_frame']:.1f} µs/frame")
+        print(f"SQLite:  {results['sqlite_us_per_frame']:.1f} µs/frame")
+        print(f"Overhead do store compartilhado: {results['overhead_us_per_frame']:.1f} µs/frame")
+
+
+if __name__ == "__main__":
+    main()
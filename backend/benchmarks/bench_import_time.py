@@ -0,0 +1,115 @@
+"""
+Benchmark do tempo de inicialização do backend
+Cada medição roda em um processo novo (sem módulos em cache) e mede o
+import do app, a criação do app pela factory, a primeira requisição (que
+cria o GameManager), o primeiro frame PCM (que carrega o SciPy) e, à
+parte, o custo do warmup completo.
+
+Uso:
+    python benchmarks/bench_import_time.py --runs 5
+    python benchmarks/bench_import_time.py --importtime   # módulos mais lentos no import
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script executado em cada processo novo; imprime os tempos em JSON
+CHILD_SCRIPT = r"""
+import base64, json, logging, sys, time
+timings = {}
+start = time.perf_counter()
+import app as app_module
+timings["import_app"] = time.perf_counter() - start
+logging.disable(logging.INFO)
+
+start = time.perf_counter()
+flask_app = app_module.create_app()
+timings["create_app"] = time.perf_counter() - start
+timings["scipy_loaded_after_create"] = "scipy.signal" in sys.modules
+
+client = flask_app.test_client()
+if MODE == "warm_up":
+    start = time.perf_counter()
+    app_module.warm_up()
+    timings["warm_up"] = time.perf_counter() - start
+
+start = time.perf_counter()
+game_id = client.post("/api/games/create", json={"game_type": "boat"}).get_json()["game"]["game_id"]
+timings["first_request"] = time.perf_counter() - start
+client.post(f"/api/games/{game_id}/start")
+
+start = time.perf_counter()
+client.post(f"/api/games/{game_id}/audio", json={"intensity": 0.5})
+timings["first_intensity_frame"] = time.perf_counter() - start
+
+import numpy as np
+pcm = (np.sin(np.arange(4410) * 0.1) * 8000).astype(np.int16).tobytes()
+start = time.perf_counter()
+client.post(f"/api/games/{game_id}/audio", json={"audio_data": base64.b64encode(pcm).decode()})
+timings["first_pcm_frame"] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+
+def run_child(mode: str) -> dict:
+    """Executa uma medição em um processo Python novo"""
+    output = subprocess.run(
+        [sys.executable, "-c", f"MODE = {mode!r}\n" + CHILD_SCRIPT],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(limit: int) -> list:
+    """Módulos com maior tempo acumulado de import (python -X importtime)"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização do backend")
+    parser.add_argument("--runs", type=int, default=5, help="Processos por modo")
+    parser.add_argument("--importtime", action="store_true", help="Listar os imports mais lentos")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("lazy", "warm_up"):
+        runs = [run_child(mode) for _ in range(args.runs)]
+        results[mode] = {key: statistics.median(run[key] for run in runs) * 1000
+                         for key in runs[0] if not isinstance(runs[0][key], bool)}
+        results[mode]["scipy_loaded_after_create"] = any(run["scipy_loaded_after_create"] for run in runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Mediana de {args.runs} processos (ms):")
+    for mode, timings in results.items():
+        print(f"\n{mode}:")
+        for key, value in timings.items():
+            print(f"  {key:28s} {value}" if isinstance(value, bool) else f"  {key:28s} {value:9.1f}")
+
+    if args.importtime:
+        print("\nImports mais lentos (acumulado, ms):")
+        for cumulative, name in slowest_imports(15):
+            print(f"  {cumulative:9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark dos rankings: índice incremental contra varredura e ordenação
+Para bases de tamanhos crescentes compara o custo de montar o top 10 e a
+posição de um jogador percorrendo todas as pontuações (o que uma consulta
+sem índice faria) com o LeaderboardIndex, e mede quanto custa aplicar a
+pontuação de um fim de sessão ao índice. Verifica também que as duas
+formas produzem o mesmo ranking. O tempo de leitura do data.json fica de
+fora: os dois lados recebem o log de pontuações já em memória.
+
+Uso:
+    python benchmarks/bench_leaderboard.py --sizes 10000,100000,1000000 --users 5000
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from typing import Dict, Any, List
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_dataset import generate_dataset
+from services.leaderboard import LeaderboardIndex
+
+
+def scan_and_sort(scores: List[Dict[str, Any]], user_id: str, limit: int = 10) -> Dict[str, Any]:
+    """Top e posição calculados percorrendo todas as pontuações"""
+    best = {}
+    for entry in scores:
+        key = (-entry["score"], entry["ended_at"], entry["user_id"])
+        current = best.get(entry["user_id"])
+        if current is None or key < current:
+            best[entry["user_id"]] = key
+    ranking = sorted(best.values())
+    rank = next((i + 1 for i, key in enumerate(ranking) if key[2] == user_id), None)
+    return {"top": [key[2] for key in ranking[:limit]], "rank": rank}
+
+
+def timed(fn, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def measure_size(sessions: int, users: int, repeat: int, directory: str) -> Dict[str, Any]:
+    """
+    Gera uma base com o número de sessões pedido e mede as duas formas
+
+    Returns:
+        Dict com latências (ms) da varredura, das consultas e da
+        atualização do índice, e o tempo de construção inicial
+    """
+    path = os.path.join(directory, f"data_{sessions}.json")
+    summary = generate_dataset(path, users, sessions)
+    with open(path, encoding="utf-8") as f:
+        scores = json.load(f)["scores"]
+    os.remove(path)
+    user_id = summary["busiest_user"]
+
+    index = LeaderboardIndex()
+    start = time.perf_counter()
+    index.sync(scores)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    expected = scan_and_sort(scores, user_id)
+    top = [entry["player_id"] for entry in index.top("all", None, 10)["entries"]]
+    assert top == expected["top"], "top 10 do índice difere da varredura"
+    assert index.rank(user_id)["rank"] == expected["rank"], "posição do índice difere da varredura"
+
+    scan = timed(lambda: scan_and_sort(scores, user_id), max(repeat // 20, 3))
+    top_ms = timed(lambda: index.top("all", None, 10), repeat)
+    rank_ms = timed(lambda: index.rank(user_id), repeat)
+
+    # Fins de sessão: uma nova pontuação por vez, como end_session faz
+    template = dict(scores[-1])
+    update_ms = []
+    for i in range(repeat):
+        scores.append(dict(template, user_id=f"novo{i}", score=i * 7 % 2000,
+                           session_id=f"session_novo{i}"))
+        start = time.perf_counter()
+        index.sync(scores)
+        update_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "sessions": sessions,
+        "scores": len(scores) - repeat,
+        "build_ms": build_ms,
+        "scan_ms": statistics.median(scan),
+        "top_ms": statistics.median(top_ms),
+        "rank_ms": statistics.median(rank_ms),
+        "update_ms": statistics.median(update_ms)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos rankings (índice incremental x varredura)")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Números de sessões, separados por vírgula")
+    parser.add_argument("--users", type=int, default=5000, help="Usuários em cada base")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetições de cada consulta")
+    args = parser.parse_args()
+
+    print(f"{'sessões':>10} {'varredura':>10} {'top 10':>8} {'posição':>8} {'fim sessão':>10} {'construção':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(s) for s in args.sizes.split(",")):
+            r = measure_size(size, args.users, args.repeat, directory)
+            print(f"{r['sessions']:>10} {r['scan_ms']:>8.1f}ms {r['top_ms']:>6.3f}ms {r['rank_ms']:>6.3f}ms "
+                  f"{r['update_ms']:>8.3f}ms {r['build_ms']:>9.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
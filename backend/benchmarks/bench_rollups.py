@@ -0,0 +1,114 @@
+"""
+Benchmark dos relatórios de evolução: agregados contra sessões brutas
+Para bases de tamanhos crescentes compara o relatório de 12 meses (por
+semana e por dia) do paciente mais ativo montado a partir das sessões
+(ler o data.json, filtrar e agrupar) com a consulta aos agregados, e mede
+quanto custa somar uma sessão aos agregados no fim de sessão. Verifica que
+as duas formas dão os mesmos números.
+
+Uso:
+    python benchmarks/bench_rollups.py --sizes 10000,100000,1000000 --users 5000
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_dataset import generate_dataset
+from services.rollups import RollupStore, period_start
+
+
+def from_sessions(path: str, user_id: str, period: str, start: date, end: date) -> List[Dict[str, Any]]:
+    """Relatório montado como um cliente sem agregados faria: lê tudo e agrupa"""
+    with open(path, encoding="utf-8") as f:
+        sessions = json.load(f)["sessions"]
+    rows: Dict[str, Dict[str, Any]] = {}
+    first = period_start(start, period)
+    for session in sessions:
+        if session["user_id"] != user_id or not session.get("ended_at"):
+            continue
+        key = period_start(datetime.fromisoformat(session["ended_at"]).date(), period)
+        if not first <= key <= end:
+            continue
+        row = rows.setdefault(key.isoformat(), {"sessions": 0, "completed": 0, "score_sum": 0, "score_max": None})
+        row["sessions"] += 1
+        row["completed"] += int(session["completed"])
+        row["score_sum"] += session["score"]
+        row["score_max"] = max(row["score_max"] or 0, session["score"])
+    return [{"start": key, **rows[key]} for key in sorted(rows)]
+
+
+def timed(fn, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def measure_size(sessions: int, users: int, repeat: int, directory: str) -> Dict[str, Any]:
+    """
+    Gera uma base com o número de sessões pedido e mede as duas formas
+
+    Returns:
+        Dict com latências (ms) do relatório pelas sessões e pelos
+        agregados, linhas lidas e o custo do fim de sessão
+    """
+    path = os.path.join(directory, f"data_{sessions}.json")
+    summary = generate_dataset(path, users, sessions)
+    user_id = summary["busiest_user"]
+    with open(path, encoding="utf-8") as f:
+        history = [s for s in json.load(f)["sessions"] if s["user_id"] == user_id]
+
+    store = RollupStore(os.path.join(directory, f"rollups_{sessions}.db"))
+    store.backfill(user_id, history)
+
+    end = date.today()
+    start = end - timedelta(days=364)
+    result: Dict[str, Any] = {"sessions": sessions, "user_sessions": len(history)}
+    for period in ("week", "day"):
+        expected = from_sessions(path, user_id, period, start, end)
+        rows = store.query(user_id, period, start, end)
+        assert [{k: row[k] for k in expected[0]} for row in rows] == expected, "agregados diferem das sessões"
+        result[f"{period}_rows"] = len(rows)
+        result[f"{period}_scan_ms"] = statistics.median(timed(
+            lambda: from_sessions(path, user_id, period, start, end), 3))
+        result[f"{period}_rollup_ms"] = statistics.median(timed(
+            lambda: store.query(user_id, period, start, end), repeat))
+
+    session = dict(history[-1], ended_at=datetime.now().isoformat())
+    result["end_session_ms"] = statistics.median(timed(
+        lambda: store.add_session(user_id, session, lambda: history), repeat))
+    os.remove(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos agregados de evolução")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Números de sessões, separados por vírgula")
+    parser.add_argument("--users", type=int, default=5000, help="Usuários em cada base")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetições de cada consulta")
+    args = parser.parse_args()
+
+    print(f"{'sessões':>9} {'do paciente':>11} {'semanas: sessões':>17} {'agregados':>10} "
+          f"{'dias: sessões':>14} {'agregados':>10} {'fim sessão':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(s) for s in args.sizes.split(",")):
+            r = measure_size(size, args.users, args.repeat, directory)
+            print(f"{r['sessions']:>9} {r['user_sessions']:>11} {r['week_scan_ms']:>15.0f}ms "
+                  f"{r['week_rollup_ms']:>6.2f}ms ({r['week_rows']}) {r['day_scan_ms']:>10.0f}ms "
+                  f"{r['day_rollup_ms']:>6.2f}ms ({r['day_rows']}) {r['end_session_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
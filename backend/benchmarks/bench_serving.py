@@ -0,0 +1,118 @@
+"""
+Comparação entre o servidor de desenvolvimento (python app.py) e o modo de
+produção (gunicorn com preload, gunicorn.conf.py)
+Para cada modo, sobe o servidor em um processo separado, espera /api/ready,
+roda o teste de carga (benchmarks/load_test.py) e encerra o servidor.
+Opcionalmente envia SIGHUP ao gunicorn no meio da carga para verificar que
+o reinício gracioso não perde requisições nem jogos.
+
+Uso:
+    python benchmarks/bench_serving.py --patients 50 --frames 100 --rate 10
+    python benchmarks/bench_serving.py --modes gunicorn --workers 4 --threads 8 --reload-during-load
+    python benchmarks/bench_serving.py --modes gunicorn --workers 1 --therapists 4 --report-games 2000
+"""
+
+import sys
+import os
+import argparse
+import json
+import signal
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def server_command(mode: str) -> list:
+    if mode == "debug":
+        return [sys.executable, "app.py"]
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+
+
+def wait_ready(url: str, timeout: float) -> float:
+    """Espera /api/ready responder 200; retorna o tempo até ficar pronto (s)"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(f"{url}/api/ready", timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Servidor não ficou pronto em {timeout:.0f}s")
+
+
+def run_mode(mode: str, args, port: int, directory: str) -> dict:
+    env = dict(os.environ, PORT=str(port), AETHERIA_LOG_LEVEL="WARNING",
+               AETHERIA_WORKERS=str(args.workers), AETHERIA_THREADS=str(args.threads))
+    # O gunicorn usa o store persistente (como no gunicorn.conf.py); o servidor de desenvolvimento usa memória
+    env["AETHERIA_GAME_STORE"] = f"sqlite:///{directory}/games.db" if mode == "gunicorn" else "memory"
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(server_command(mode), cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              start_new_session=True)
+    try:
+        ready_seconds = wait_ready(url, args.ready_timeout)
+        load = subprocess.Popen(
+            [sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "load_test.py"), "--url", url,
+             "--patients", str(args.patients), "--frames", str(args.frames), "--rate", str(args.rate),
+             "--mode", args.mode, "--therapists", str(args.therapists),
+             "--report-games", str(args.report_games), "--burst", str(args.burst), "--json"],
+            stdout=subprocess.PIPE, text=True
+        )
+        if args.reload_during_load and mode == "gunicorn":
+            time.sleep(args.frames / args.rate / 2)
+            server.send_signal(signal.SIGHUP)
+        output, _ = load.communicate()
+        result = json.loads(output)
+        result["ready_seconds"] = ready_seconds
+        return result
+    finally:
+        # Debug server com reloader cria um processo filho: encerra o grupo todo
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de desenvolvimento x gunicorn com preload")
+    parser.add_argument("--modes", default="debug,gunicorn", help="Modos separados por vírgula")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Workers do gunicorn")
+    parser.add_argument("--threads", type=int, default=4, help="Threads por worker do gunicorn")
+    parser.add_argument("--patients", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=10.0)
+    parser.add_argument("--mode", choices=("intensity", "pcm"), default="intensity")
+    parser.add_argument("--therapists", type=int, default=0, help="Terapeutas consultando GET /api/games")
+    parser.add_argument("--report-games", type=int, default=0, help="Jogos extras para as listagens")
+    parser.add_argument("--burst", type=int, default=0, help="Frames enviados em rajada por paciente")
+    parser.add_argument("--port", type=int, default=5090)
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--reload-during-load", action="store_true",
+                        help="Enviar SIGHUP ao gunicorn no meio da carga")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for i, mode in enumerate(args.modes.split(",")):
+            results[mode] = run_mode(mode, args, args.port + i, directory)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.patients} pacientes x {args.frames} frames a {args.rate:g}/s ({args.mode}); "
+          f"gunicorn: {args.workers} workers x {args.threads} threads")
+    print(f"  {'modo':10s} {'pronto s':>9s} {'req/s':>8s} {'erros':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for mode, result in results.items():
+        audio = result["routes"].get("POST /api/games/<id>/audio", {})
+        print(f"  {mode:10s} {result['ready_seconds']:9.2f} {result['throughput_rps']:8.1f} "
+              f"{result['error_rate']:7.2%} {audio.get('p50_ms', 0):8.1f} "
+              f"{audio.get('p95_ms', 0):8.1f} {audio.get('p99_ms', 0):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
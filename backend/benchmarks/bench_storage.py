@@ -0,0 +1,140 @@
+"""
+Benchmark dos endpoints que usam o data.json conforme a base cresce
+Gera bases sintéticas de tamanhos crescentes e mede latência e memória de
+login, end_session, get_recent_stats e get_stats_summary. Como cada
+requisição carrega (e às vezes regrava) o arquivo inteiro, o custo cresce
+com o tamanho da base mesmo quando a requisição toca um único usuário.
+
+Uso:
+    python benchmarks/bench_storage.py --sizes 1000,10000,100000 --users 2000
+"""
+
+import sys
+import os
+import argparse
+import json
+import logging
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any, Callable, List, Tuple
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from benchmarks.generate_dataset import generate_dataset
+from services.rollups import RollupStore
+from services.session_archive import SessionArchive
+
+
+def use_data_file(path: str) -> None:
+    """Aponta o app para outra base (data.json, agregados e arquivo ao lado dela)"""
+    base = os.path.splitext(path)[0]
+    app_module.DATA_FILE = path
+    app_module.rollup_store = RollupStore(base + "_rollups.db")
+    app_module.session_archive = SessionArchive(base + "_archive")
+
+
+def endpoint_calls(client, user_id: str, session_ids: List[str]) -> List[Tuple[str, Callable[[], Any]]]:
+    """Requisições medidas (sempre para o usuário mais ativo da base)"""
+    headers = {"X-User-ID": user_id}
+    pending = iter(session_ids)
+
+    def end_session():
+        return client.post(f"/api/games/session/{next(pending)}/end", headers=headers,
+                           json={"score": 100, "duration": 60, "completed": True})
+
+    return [
+        ("login", lambda: client.post("/api/auth/login",
+                                      json={"email": f"{user_id}@clinica.example", "password": "x"})),
+        ("end_session", end_session),
+        ("get_recent_stats", lambda: client.get("/api/stats/recent", headers=headers)),
+        ("get_stats_summary", lambda: client.get("/api/stats/summary", headers=headers)),
+    ]
+
+
+def measure_size(sessions: int, users: int, requests: int, directory: str) -> Dict[str, Any]:
+    """
+    Gera uma base com o número de sessões pedido e mede os endpoints
+
+    Returns:
+        Dict com tamanho do arquivo e, por endpoint, latência mediana/máxima (ms)
+        e pico de memória alocada por requisição (MiB)
+    """
+    path = os.path.join(directory, f"data_{sessions}.json")
+    summary = generate_dataset(path, users, sessions)
+    use_data_file(path)
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    user_id = summary["busiest_user"]
+    session_ids = [s["id"] for s in data["sessions"] if s["user_id"] == user_id][:2 * requests]
+    del data
+
+    client = app_module.app.test_client()
+    results: Dict[str, Any] = {"sessions": sessions, "users": users,
+                               "file_mib": os.path.getsize(path) / 2 ** 20, "endpoints": {}}
+
+    for name, call in endpoint_calls(client, user_id, session_ids):
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = call()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"{name} retornou {response.status_code}")
+
+        # Memória medida em uma chamada separada (tracemalloc deixa tudo mais lento)
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results["endpoints"][name] = {
+            "median_ms": statistics.median(latencies) * 1000,
+            "max_ms": max(latencies) * 1000,
+            "peak_mib": peak / 2 ** 20
+        }
+
+    os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos endpoints que usam o data.json")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Números de sessões separados por vírgula")
+    parser.add_argument("--users", type=int, default=2000, help="Usuários em cada base")
+    parser.add_argument("--requests", type=int, default=5, help="Requisições por endpoint e tamanho")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [measure_size(size, args.users, args.requests, directory) for size in sizes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    names = list(results[0]["endpoints"])
+    print(f"{'sessões':>10s} {'arquivo':>9s}  " + "  ".join(f"{name:>22s}" for name in names))
+    for result in results:
+        cells = [f"{values['median_ms']:9.1f} ms {values['peak_mib']:6.1f} MiB"
+                 for values in result["endpoints"].values()]
+        print(f"{result['sessions']:10d} {result['file_mib']:6.1f} MiB  " + "  ".join(f"{cell:>22s}" for cell in cells))
+
+    if len(results) > 1:
+        first, last = results[0], results[-1]
+        growth = last["sessions"] / first["sessions"]
+        print(f"\nCrescimento da base: {growth:.0f}x")
+        for name in names:
+            ratio = last["endpoints"][name]["median_ms"] / first["endpoints"][name]["median_ms"]
+            print(f"  {name:20s} latência {ratio:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Gerador de bases sintéticas no formato do data.json
+Cria milhares de usuários e milhões de sessões com atividade concentrada
+(poucos pacientes fazem a maior parte das sessões, distribuição Zipf).
+Os totais de cada usuário, o bitmap de dias ativos e o log de pontuações
+dos rankings são consistentes com as sessões geradas.
+
+Uso:
+    python benchmarks/generate_dataset.py --users 5000 --sessions 2000000 --output /tmp/data_2m.json
+    AETHERIA_DATA_FILE=/tmp/data_2m.json python app.py
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+import numpy as np
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.activity import ActivityBitmap
+
+GAME_TYPES = ("boat", "balloon")
+
+
+def generate_dataset(path: str, users: int, sessions: int, days: int = 365,
+                     skew: float = 1.1, seed: int = 42) -> Dict[str, Any]:
+    """
+    Gera a base e grava em path (JSON compacto, escrito em blocos)
+
+    Args:
+        path: Arquivo de saída
+        users: Número de usuários
+        sessions: Número total de sessões
+        days: Período coberto pelas sessões (até agora)
+        skew: Expoente da distribuição Zipf da atividade por usuário
+        seed: Semente do gerador
+
+    Returns:
+        Dict com o resumo da base (usuários, sessões, usuário mais ativo)
+    """
+    rng = np.random.default_rng(seed)
+    user_ids = [f"paciente{i:06d}" for i in range(users)]
+
+    # Atividade por usuário: peso 1/rank^skew, em ordem aleatória de IDs
+    weights = 1.0 / np.arange(1, users + 1) ** skew
+    weights = rng.permutation(weights / weights.sum())
+    owners = rng.choice(users, size=sessions, p=weights)
+
+    now = time.time()
+    started = np.sort(rng.uniform(now - days * 86400, now, size=sessions))
+    durations = np.round(rng.gamma(2.0, 45.0, size=sessions), 1)
+    scores = rng.integers(0, 2000, size=sessions)
+    completed = rng.random(sessions) < 0.8
+    finished = rng.random(sessions) < 0.97  # algumas sessões nunca foram finalizadas
+    game_types = rng.integers(0, len(GAME_TYPES), size=sessions)
+
+    totals_sessions = np.bincount(owners[finished], minlength=users)
+    totals_time = np.bincount(owners[finished], weights=durations[finished], minlength=users)
+    totals_score = np.bincount(owners[finished], weights=scores[finished], minlength=users)
+    # Dias com sessão completa de cada usuário (bitmap de atividade)
+    active_days = [set() for _ in range(users)]
+    for i in np.flatnonzero(finished & completed):
+        active_days[owners[i]].add(datetime.fromtimestamp(started[i] + durations[i]).date())
+    today = datetime.fromtimestamp(now).date()
+    first_session = np.full(users, now)
+    np.minimum.at(first_session, owners, started)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"users": {')
+        for i, user_id in enumerate(user_ids):
+            activity = ActivityBitmap.from_days(active_days[i])
+            user = {
+                "id": user_id,
+                "email": f"{user_id}@clinica.example",
+                "name": user_id.title(),
+                "created_at": datetime.fromtimestamp(first_session[i] - 3600).isoformat(),
+                "total_sessions": int(totals_sessions[i]),
+                "total_time": round(float(totals_time[i]), 1),
+                "total_score": int(totals_score[i]),
+                "streak_days": activity.current_streak(today),
+                "activity": activity.to_dict()
+            }
+            f.write(("," if i else "") + json.dumps(user_id) + ": " + json.dumps(user, ensure_ascii=False))
+
+        f.write('}, "sessions": [')
+        block = []
+        for i in range(sessions):
+            user_id = user_ids[owners[i]]
+            session = {
+                "id": f"session_{user_id}_{started[i]}",
+                "user_id": user_id,
+                "game_type": GAME_TYPES[game_types[i]],
+                "started_at": datetime.fromtimestamp(started[i]).isoformat(),
+                "score": 0,
+                "duration": 0,
+                "completed": False
+            }
+            if finished[i]:
+                session["ended_at"] = datetime.fromtimestamp(started[i] + durations[i]).isoformat()
+                session["score"] = int(scores[i])
+                session["duration"] = float(durations[i])
+                session["completed"] = bool(completed[i])
+            block.append(json.dumps(session))
+            if len(block) == 10000:
+                f.write(("," if i >= len(block) else "") + ",".join(block))
+                block = []
+        if block:
+            f.write(("," if sessions > len(block) else "") + ",".join(block))
+
+        # Log de pontuações dos rankings: uma entrada por sessão finalizada
+        f.write('], "scores": [')
+        block = []
+        written = 0
+        for i in np.flatnonzero(finished):
+            user_id = user_ids[owners[i]]
+            block.append(json.dumps({
+                "session_id": f"session_{user_id}_{started[i]}",
+                "user_id": user_id,
+                "name": user_id.title(),
+                "game_type": GAME_TYPES[game_types[i]],
+                "score": int(scores[i]),
+                "ended_at": datetime.fromtimestamp(started[i] + durations[i]).isoformat()
+            }))
+            if len(block) == 10000:
+                f.write(("," if written else "") + ",".join(block))
+                written += len(block)
+                block = []
+        if block:
+            f.write(("," if written else "") + ",".join(block))
+        f.write(']}')
+
+    busiest = int(np.argmax(np.bincount(owners, minlength=users))) if sessions else 0
+    return {
+        "path": path,
+        "users": users,
+        "sessions": sessions,
+        "busiest_user": user_ids[busiest] if users else None,
+        "busiest_user_sessions": int(np.sum(owners == busiest)) if sessions else 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera uma base sintética no formato do data.json")
+    parser.add_argument("--users", type=int, default=5000, help="Número de usuários")
+    parser.add_argument("--sessions", type=int, default=1000000, help="Número de sessões")
+    parser.add_argument("--days", type=int, default=365, help="Período coberto (dias)")
+    parser.add_argument("--skew", type=float, default=1.1, help="Expoente Zipf da atividade por usuário")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="data_synthetic.json", help="Arquivo de saída")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = generate_dataset(args.output, args.users, args.sessions, args.days, args.skew, args.seed)
+    print(f"{summary['users']} usuários, {summary['sessions']} sessões em {summary['path']} "
+          f"({time.perf_counter() - start:.1f}s); usuário mais ativo: {summary['busiest_user']} "
+          f"com {summary['busiest_user_sessions']} sessões")
+
+
+if __name__ == "__main__":
+    main()
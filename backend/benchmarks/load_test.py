@@ -0,0 +1,368 @@
+"""
+Gerador de carga de uma clínica contra o backend em execução
+Simula N pacientes simultâneos; cada um cria e inicia um jogo, envia um
+fluxo de frames para /audio na taxa configurada e finaliza o jogo.
+Opcionalmente, terapeutas consultam a listagem de jogos sem parar enquanto
+os pacientes jogam (carga mista), ou os pacientes enviam em rajadas os
+frames acumulados durante uma queda da rede (--burst). Reporta vazão,
+latência p50/p95/p99 por rota e taxa de erros.
+
+Uso:
+    python app.py &
+    python benchmarks/load_test.py --url http://localhost:5001 --patients 50 --frames 100 --rate 10
+    python benchmarks/load_test.py --mode pcm --patients 10 --frames 50 --rate 5
+    python benchmarks/load_test.py --follow-poll-hint --json > resultado.json
+    python benchmarks/load_test.py --therapists 4 --report-games 2000   # carga mista
+    python benchmarks/load_test.py --burst 10   # rajadas de 10 frames em paralelo
+"""
+
+import sys
+import os
+import argparse
+import base64
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from examples.game_demo import simulate_audio_data
+
+GAME_TYPES = ("boat", "balloon")
+
+
+class LoadStats:
+    """Latências e erros por rota, compartilhados entre os pacientes"""
+
+    def __init__(self):
+        self._latencies: Dict[str, List[float]] = defaultdict(list)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, route: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._latencies[route].append(latency)
+            if not ok:
+                self._errors[route] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Resumo por rota
+
+        Args:
+            elapsed: Duração total do teste em segundos
+
+        Returns:
+            Dict com requisições, vazão, erros e percentis (ms) por rota
+        """
+        routes = {}
+        with self._lock:
+            for route, latencies in sorted(self._latencies.items()):
+                ordered = sorted(latencies)
+                routes[route] = {
+                    "requests": len(ordered),
+                    "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+                    "errors": self._errors[route],
+                    "error_rate": self._errors[route] / len(ordered),
+                    "p50_ms": percentile(ordered, 50) * 1000,
+                    "p95_ms": percentile(ordered, 95) * 1000,
+                    "p99_ms": percentile(ordered, 99) * 1000,
+                    "max_ms": ordered[-1] * 1000
+                }
+            total = sum(len(latencies) for latencies in self._latencies.values())
+            errors = sum(self._errors.values())
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": errors / total if total else 0.0,
+            "routes": routes
+        }
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Percentil (nearest-rank) de uma lista ordenada"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def post(url: str, payload: Dict[str, Any], timeout: float) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Envia um POST JSON
+
+    Returns:
+        Tuple (sucesso, corpo da resposta em JSON ou None)
+    """
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = json.loads(response.read())
+            return bool(body.get("success", True)), body
+    except (urllib.error.URLError, OSError, ValueError):
+        return False, None
+
+
+def get(url: str, timeout: float) -> Tuple[bool, int]:
+    """
+    Envia um GET e lê a resposta inteira
+
+    Returns:
+        Tuple (sucesso, status HTTP; 0 se não houve resposta)
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            return True, response.status
+    except urllib.error.HTTPError as e:
+        return False, e.code
+    except (urllib.error.URLError, OSError):
+        return False, 0
+
+
+class Therapist(threading.Thread):
+    """Um terapeuta consultando a listagem de jogos até os pacientes terminarem"""
+
+    def __init__(self, args: argparse.Namespace, stats: LoadStats, done: threading.Event):
+        super().__init__(daemon=True)
+        self._args = args
+        self._stats = stats
+        self._done = done
+        self.rejected = 0
+
+    def run(self) -> None:
+        url = f"{self._args.url}/api/games?limit=1000"
+        while not self._done.is_set():
+            start = time.perf_counter()
+            ok, status = get(url, self._args.timeout)
+            self._stats.record("GET /api/games", time.perf_counter() - start, ok)
+            if status == 503:
+                # Recusada pelo controle de admissão: espera o Retry-After (resumido)
+                self.rejected += 1
+                self._done.wait(0.5)
+
+
+class Patient(threading.Thread):
+    """Um paciente jogando uma sessão completa"""
+
+    def __init__(self, index: int, args: argparse.Namespace, stats: LoadStats,
+                 pcm_chunks: List[str], start_at: float):
+        super().__init__(daemon=True)
+        self._index = index
+        self._args = args
+        self._stats = stats
+        self._pcm_chunks = pcm_chunks
+        self._start_at = start_at
+        self._rng = random.Random(args.seed + index)
+        self.late_frames = 0
+        self.degraded_frames = 0
+        self.queued_frames = 0
+        self.stale_frames = 0
+
+    def _call(self, route: str, path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        ok, body = post(self._args.url + path, payload, self._args.timeout)
+        self._stats.record(route, time.perf_counter() - start, ok)
+        return body if ok else None
+
+    def _audio_payload(self, blowing: bool) -> Dict[str, Any]:
+        if self._args.mode == "pcm":
+            chunks = self._pcm_chunks
+            half = len(chunks) // 2
+            payload = {"audio_data": self._rng.choice(chunks[half:] if blowing else chunks[:half])}
+        else:
+            intensity = self._rng.uniform(0.4, 1.0) if blowing else self._rng.uniform(0.0, 0.08)
+            payload = {
+                "audio_intensity": intensity,
+                "audio_metering_db": -35.0 if blowing else -58.0
+            }
+        if self._args.follow_poll_hint:
+            payload["allow_unchanged"] = True
+        return payload
+
+    def _send_burst(self, game_id: str, payloads: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Envia de uma vez, em paralelo, os frames acumulados (como um celular
+        que recupera a conexão); a ordem de chegada fica por conta da rede
+
+        Returns:
+            Uma das respostas com estado do jogo (ou None)
+        """
+        bodies: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+
+        def send(i: int) -> None:
+            bodies[i] = self._call("POST /api/games/<id>/audio", f"/api/games/{game_id}/audio", payloads[i])
+
+        threads = [threading.Thread(target=send, args=(i,)) for i in range(len(payloads))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        state_body = None
+        for body in bodies:
+            if not body:
+                continue
+            if body.get("queued"):
+                self.queued_frames += 1
+            elif body.get("dropped"):
+                self.stale_frames += 1
+            else:
+                state_body = body
+        return state_body
+
+    def run(self) -> None:
+        time.sleep(max(0.0, self._start_at - time.perf_counter()))
+
+        game_type = GAME_TYPES[self._index % len(GAME_TYPES)]
+        created = self._call("POST /api/games/create", "/api/games/create",
+                             {"game_type": game_type, "player_name": f"Paciente {self._index}"})
+        if not created:
+            return
+        game_id = created["game"]["game_id"]
+        if self._call("POST /api/games/<id>/start", f"/api/games/{game_id}/start", {}) is None:
+            return
+
+        interval = 1.0 / self._args.rate
+        next_send = time.perf_counter()
+        blowing = False
+        pending: List[Dict[str, Any]] = []
+        for frame in range(self._args.frames):
+            # Alterna sopros e pausas como em uma sessão real
+            if self._rng.random() < 0.1:
+                blowing = not blowing
+
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -interval:
+                self.late_frames += 1
+
+            if self._args.burst > 1:
+                # Rede instável: os frames ficam no aparelho e saem juntos a cada --burst frames
+                payload = self._audio_payload(blowing)
+                payload["frame_seq"] = frame + 1
+                payload["allow_queued"] = True
+                pending.append(payload)
+                if len(pending) < self._args.burst and frame < self._args.frames - 1:
+                    next_send += interval
+                    continue
+                body = self._send_burst(game_id, pending)
+                pending = []
+            else:
+                body = self._call("POST /api/games/<id>/audio", f"/api/games/{game_id}/audio",
+                                  self._audio_payload(blowing))
+
+            # Frames PCM processados no modo degradado (servidor sobrecarregado)
+            if body and (body.get("game_state") or {}).get("degraded"):
+                self.degraded_frames += 1
+
+            wait = interval
+            if self._args.follow_poll_hint and body:
+                hint = body.get("next_poll_ms") or (body.get("game_state") or {}).get("next_poll_ms")
+                if hint:
+                    wait = hint / 1000.0
+            next_send = max(next_send + wait, time.perf_counter() - interval)
+
+        self._call("POST /api/games/<id>/end", f"/api/games/{game_id}/end", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga da API de jogos")
+    parser.add_argument("--url", default="http://localhost:5001", help="URL base do backend")
+    parser.add_argument("--patients", type=int, default=20, help="Pacientes simultâneos")
+    parser.add_argument("--frames", type=int, default=100, help="Frames de áudio por paciente")
+    parser.add_argument("--rate", type=float, default=10.0, help="Frames por segundo por paciente")
+    parser.add_argument("--mode", choices=("intensity", "pcm"), default="intensity",
+                        help="Intensidade/metering (padrão) ou áudio PCM em base64")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="Duração de cada chunk PCM (ms)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="Segundos para iniciar todos os pacientes")
+    parser.add_argument("--follow-poll-hint", action="store_true",
+                        help="Respeitar next_poll_ms e pedir respostas curtas (allow_unchanged)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout por requisição (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--therapists", type=int, default=0,
+                        help="Terapeutas consultando GET /api/games durante o teste")
+    parser.add_argument("--report-games", type=int, default=0,
+                        help="Jogos extras (não iniciados) criados antes do teste, para listagens pesadas")
+    parser.add_argument("--burst", type=int, default=0,
+                        help="Frames acumulados e enviados juntos, em paralelo (0 = desligado)")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    # Chunks PCM gerados antes do teste (metade em repouso, metade em sopro)
+    # para o custo de geração não competir com as requisições
+    pcm_chunks: List[str] = []
+    if args.mode == "pcm":
+        for intensity in (0.01, 0.03, 0.05, 0.08, 0.5, 0.7, 0.85, 1.0):
+            chunk = simulate_audio_data(intensity, args.chunk_ms / 1000.0)
+            pcm_chunks.append(base64.b64encode(chunk).decode("ascii"))
+
+    # Histórico da clínica: torna a listagem de jogos dos terapeutas uma consulta pesada
+    for offset in range(0, args.report_games, 500):
+        batch = [{"game_type": GAME_TYPES[i % len(GAME_TYPES)], "player_name": f"Histórico {i}"}
+                 for i in range(offset, min(offset + 500, args.report_games))]
+        post(f"{args.url}/api/games/bulk/create", {"games": batch, "start": False}, args.timeout)
+
+    stats = LoadStats()
+    done = threading.Event()
+    therapists = [Therapist(args, stats, done) for _ in range(args.therapists)]
+    for therapist in therapists:
+        therapist.start()
+    start = time.perf_counter()
+    patients = [
+        Patient(i, args, stats, pcm_chunks, start + args.ramp * i / max(args.patients, 1))
+        for i in range(args.patients)
+    ]
+    for patient in patients:
+        patient.start()
+    for patient in patients:
+        patient.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for therapist in therapists:
+        therapist.join()
+
+    summary = stats.summary(elapsed)
+    summary["config"] = {
+        "patients": args.patients, "frames": args.frames, "rate": args.rate,
+        "mode": args.mode, "follow_poll_hint": args.follow_poll_hint,
+        "therapists": args.therapists, "report_games": args.report_games, "burst": args.burst
+    }
+    summary["late_frames"] = sum(patient.late_frames for patient in patients)
+    summary["degraded_frames"] = sum(patient.degraded_frames for patient in patients)
+    summary["rejected_reports"] = sum(therapist.rejected for therapist in therapists)
+    summary["queued_frames"] = sum(patient.queued_frames for patient in patients)
+    summary["stale_frames"] = sum(patient.stale_frames for patient in patients)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{args.patients} pacientes, {summary['requests']} requisições em {elapsed:.1f}s "
+          f"({summary['throughput_rps']:.0f} req/s, erros {summary['error_rate']:.2%}, "
+          f"frames atrasados {summary['late_frames']}, degradados {summary['degraded_frames']}, "
+          f"relatórios recusados {summary['rejected_reports']}, "
+          f"frames combinados sem espera {summary['queued_frames']}, descartados {summary['stale_frames']})")
+    print(f"  {'rota':30s} {'req':>7s} {'req/s':>8s} {'erros':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for route, values in summary["routes"].items():
+        print(f"  {route:30s} {values['requests']:7d} {values['throughput_rps']:8.1f} "
+              f"{values['error_rate']:7.2%} {values['p50_ms']:8.1f} {values['p95_ms']:8.1f} {values['p99_ms']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
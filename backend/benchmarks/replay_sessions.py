@@ -0,0 +1,60 @@
+"""
+Replay das sessões gravadas (AETHERIA_RECORD_DIR) para testes de regressão
+Reproduz todas as sessões com relógio virtual e compara o resultado de
+cada uma (score, nível, digest dos estados) com um replay de referência
+
+Uso:
+    # Gerar a referência antes da mudança de física/pontuação
+    python benchmarks/replay_sessions.py /tmp/aetheria_sessions --output baseline.json
+    # Depois da mudança: falha (código 1) se alguma sessão mudou
+    python benchmarks/replay_sessions.py /tmp/aetheria_sessions --baseline baseline.json
+"""
+
+import sys
+import os
+import argparse
+import json
+import logging
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.session_replay import replay_directory, compare_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay das sessões gravadas")
+    parser.add_argument("directory", help="Diretório das gravações (AETHERIA_RECORD_DIR)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: número de CPUs)")
+    parser.add_argument("--output", help="Salvar o resultado do replay em JSON")
+    parser.add_argument("--baseline", help="Comparar com um resultado salvo anteriormente")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    start = time.perf_counter()
+    results = replay_directory(args.directory, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    frames = sum(result["frames"] for result in results)
+    print(f"{len(results)} sessões, {frames} frames em {elapsed:.2f}s "
+          f"({frames / elapsed if elapsed else 0:.0f} frames/s)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        differences = compare_results(baseline, results)
+        for difference in differences:
+            print(f"  {difference['game_id']}: {difference['change']}")
+        print(f"{len(differences)} sessões diferentes da referência")
+        if differences:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Suite de microbenchmarks dos caminhos críticos de DSP e dos jogos
+Mede AudioProcessor.detect_blow (e cada etapa), process_intensity e
+process_audio_input dos jogos e GameManager.process_audio_intensity em
+várias taxas de amostragem e tamanhos de chunk. O resultado é salvo em
+JSON e pode ser comparado com uma referência: o script falha (código 1)
+se algum caso ficou mais lento que o limite.
+
+Uso:
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --threshold 0.15
+    python benchmarks/run_benchmarks.py --filter detect_blow --quick
+"""
+
+import sys
+import os
+import argparse
+import itertools
+import json
+import logging
+import platform
+import re
+import statistics
+import timeit
+from typing import Callable, Dict, Any, List, Tuple
+
+import numpy as np
+import scipy
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import BoatGame, BalloonGame
+from services import AudioProcessor, GameManager, GameType
+from examples.game_demo import simulate_audio_data
+
+SAMPLE_RATES = (16000, 44100, 48000)
+CHUNK_SIZES = (1024, 4096, 8820)  # amostras por frame (8820 = 200 ms a 44,1 kHz)
+
+
+def dsp_cases(sample_rate: int, chunk: int) -> List[Tuple[str, Callable[[], Any]]]:
+    """Casos do AudioProcessor para uma taxa de amostragem e tamanho de chunk"""
+    processor = AudioProcessor(sample_rate=sample_rate)
+    audio_data = simulate_audio_data(0.6, chunk / sample_rate, sample_rate)
+    # Mesmas entradas que detect_blow passa para cada etapa
+    audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
+    audio_array = audio_array / np.max(np.abs(audio_array))
+    processed = processor._preprocess_audio(audio_array)
+    filtered = processor._apply_blow_filters(processed)
+
+    suffix = f"[sr={sample_rate},n={chunk}]"
+    return [
+        ("AudioProcessor.detect_blow" + suffix, lambda: processor.detect_blow(audio_data)),
+        ("AudioProcessor._preprocess_audio" + suffix, lambda: processor._preprocess_audio(audio_array)),
+        ("AudioProcessor._apply_blow_filters" + suffix, lambda: processor._apply_blow_filters(processed)),
+        ("AudioProcessor._calculate_audio_metadata" + suffix,
+         lambda: processor._calculate_audio_metadata(audio_array, filtered)),
+    ]
+
+
+def game_audio_cases(sample_rate: int, chunk: int) -> List[Tuple[str, Callable[[], Any]]]:
+    """process_audio_input dos jogos para uma taxa de amostragem e tamanho de chunk"""
+    audio_data = simulate_audio_data(0.6, chunk / sample_rate, sample_rate)
+    cases = []
+    for game_class in (BoatGame, BalloonGame):
+        game = game_class("bench", "Benchmark")
+        game.start_game()
+        cases.append((f"{game_class.__name__}.process_audio_input[sr={sample_rate},n={chunk}]",
+                      lambda game=game: game.process_audio_input(audio_data, sample_rate)))
+    return cases
+
+
+def intensity_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    """process_intensity dos jogos e o caminho completo do GameManager"""
+    intensities = [0.05, 0.2, 0.6, 0.9, 0.4, 0.0, 0.75, 0.1]
+    cases = []
+    for game_class in (BoatGame, BalloonGame):
+        game = game_class("bench", "Benchmark")
+        game.start_game()
+        values = itertools.cycle(intensities)
+        cases.append((f"{game_class.__name__}.process_intensity",
+                      lambda game=game, values=values: game.process_intensity(next(values), True)))
+
+    manager = GameManager()
+    for game_type in GameType:
+        game_id = manager.create_game(game_type, "Benchmark")["game_id"]
+        manager.start_game(game_id)
+        values = itertools.cycle(intensities)
+        cases.append((f"GameManager.process_audio_intensity[{game_type.value}]",
+                      lambda game_id=game_id, values=values:
+                          manager.process_audio_intensity(game_id, next(values), -40.0)))
+    return cases
+
+
+def all_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    cases = intensity_cases()
+    for sample_rate in SAMPLE_RATES:
+        for chunk in CHUNK_SIZES:
+            cases.extend(dsp_cases(sample_rate, chunk))
+            cases.extend(game_audio_cases(sample_rate, chunk))
+    return cases
+
+
+def measure(function: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """
+    Mede o tempo por chamada (µs) com o número de iterações calibrado
+
+    Returns:
+        Dict com mediana, mínimo e iterações por repetição
+    """
+    timer = timeit.Timer(function)
+    iterations = 1
+    while True:
+        elapsed = timer.timeit(iterations)
+        if elapsed >= min_time:
+            break
+        iterations = max(iterations * 2, int(iterations * min_time / max(elapsed, 1e-9)))
+    samples = [timer.timeit(iterations) / iterations * 1e6 for _ in range(repeat)]
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "iterations": iterations
+    }
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Casos cujo tempo mínimo piorou mais que o limite em relação à referência
+    (o mínimo é menos sensível a ruído da máquina que a mediana)
+
+    Args:
+        baseline: JSON salvo anteriormente
+        results: JSON da execução atual
+        threshold: Piora relativa tolerada (0.15 = 15%)
+    """
+    regressions = []
+    for name, current in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = current["min_us"] / before["min_us"]
+        if ratio > 1.0 + threshold:
+            regressions.append({
+                "name": name,
+                "baseline_us": before["min_us"],
+                "current_us": current["min_us"],
+                "ratio": ratio
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks de DSP e dos jogos")
+    parser.add_argument("--output", help="Salvar o resultado em JSON")
+    parser.add_argument("--baseline", help="Comparar com um resultado salvo anteriormente")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Piora tolerada (padrão: 0.15 = 15%%)")
+    parser.add_argument("--filter", help="Executar apenas os casos cujo nome casa com a regex")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições por caso")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Tempo mínimo por repetição (s)")
+    parser.add_argument("--quick", action="store_true", help="Menos repetições (verificação rápida)")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.02
+
+    logging.disable(logging.INFO)
+    pattern = re.compile(args.filter) if args.filter else None
+
+    results: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor()
+        },
+        "results": {}
+    }
+
+    for name, function in all_cases():
+        if pattern and not pattern.search(name):
+            continue
+        measured = measure(function, args.repeat, args.min_time)
+        results["results"][name] = measured
+        if not args.json:
+            print(f"{name:70s} {measured['median_us']:10.1f} µs  (min {measured['min_us']:.1f})")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression['name']}: {regression['baseline_us']:.1f} µs -> "
+                  f"{regression['current_us']:.1f} µs ({regression['ratio']:.2f}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,18 +14,18 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models import BoatGame, BalloonGame
 from services import GameManager, GameType, AudioProcessor
 
-def simulate_audio_data(intensity: float = 0.5, duration: float = 1.0) -> bytes:
+def simulate_audio_data(intensity: float = 0.5, duration: float = 1.0, sample_rate: int = 44100) -> bytes:
     """
     Simula dados de áudio para demonstração
     
     Args:
         intensity: Intensidade do sopro (0-1)
         duration: Duração em segundos
+        sample_rate: Taxa de amostragem
         
     Returns:
         Dados de áudio simulados em bytes
     """
-    sample_rate = 44100
     samples = int(sample_rate * duration)
     
     # Gerar sinal senoidal na frequência de sopro (400 Hz)
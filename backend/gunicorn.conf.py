@@ -0,0 +1,76 @@
+"""
+Configuração do servidor de produção (gunicorn)
+O app é importado uma vez no processo master (preload) e os workers são
+criados por fork, compartilhando as páginas dos módulos (Flask, NumPy,
+SciPy) em copy-on-write. Cada worker cria o próprio GameManager e faz o
+warmup antes de aceitar conexões.
+
+Uso:
+    gunicorn -c gunicorn.conf.py
+    AETHERIA_WORKERS=4 AETHERIA_THREADS=8 gunicorn -c gunicorn.conf.py
+
+Variáveis de ambiente:
+    PORT                       Porta (padrão 5001)
+    AETHERIA_WORKERS           Processos worker (padrão: número de CPUs)
+    AETHERIA_THREADS           Threads por worker (padrão 4)
+    AETHERIA_GRACEFUL_TIMEOUT  Segundos para um worker terminar as requisições
+                               em andamento ao reiniciar (padrão 30)
+    AETHERIA_MAX_REQUESTS      Reciclar cada worker após N requisições (padrão 0 = nunca)
+    AETHERIA_GAME_STORE        Store dos jogos (padrão sqlite:///tmp/aetheria_games.db)
+"""
+
+import gc
+import os
+
+wsgi_app = "app:create_app()"
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+workers = int(os.environ.get("AETHERIA_WORKERS", os.cpu_count() or 1))
+threads = int(os.environ.get("AETHERIA_THREADS", 4))
+worker_class = "gunicorn_worker.DrainingThreadWorker"
+preload_app = True
+
+# Reinício gracioso (SIGHUP ou reciclagem): o worker antigo para de aceitar
+# conexões e termina as requisições em andamento antes de sair
+graceful_timeout = int(os.environ.get("AETHERIA_GRACEFUL_TIMEOUT", 30))
+timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get("AETHERIA_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+# Os jogos ficam em um store persistente mesmo com um só worker: qualquer
+# worker pode receber o áudio de qualquer jogo, e o worker que substitui
+# outro (SIGHUP, AETHERIA_MAX_REQUESTS) continua os jogos de onde pararam
+# enquanto o antigo ainda termina suas requisições
+if not os.environ.get("AETHERIA_GAME_STORE"):
+    os.environ["AETHERIA_GAME_STORE"] = "sqlite:///tmp/aetheria_games.db"
+
+
+def when_ready(server):
+    """Master, depois do preload e antes do primeiro fork"""
+    # SciPy e filtros (na taxa configurada) carregados uma vez; os workers herdam as páginas
+    from services.audio_processor import AudioProcessor
+    AudioProcessor(int(os.environ.get("AETHERIA_AUDIO_SAMPLE_RATE", 44100))).warm_up()
+
+    # As consultas de relatório não podem ocupar todas as threads dos workers
+    import app
+    reserved = app.admission_controller.reserved_threads()
+    if reserved >= threads:
+        server.log.warning("Classes limitadas podem ocupar %d de %d threads: os frames dos jogos "
+                           "ficam sem capacidade garantida (aumente AETHERIA_THREADS)", reserved, threads)
+
+    # Objetos atuais fora do GC: a coleta nos workers não reescreve (e
+    # portanto não copia) as páginas herdadas do master
+    gc.freeze()
+    store = os.environ["AETHERIA_GAME_STORE"]
+    if store == "memory":
+        server.log.warning("Store de jogos em memória: os jogos em andamento se perdem quando "
+                           "um worker é reiniciado (SIGHUP, AETHERIA_MAX_REQUESTS)")
+    server.log.info("Módulos pré-carregados; store de jogos: %s", store)
+
+
+def post_fork(server, worker):
+    """Worker, antes de aceitar conexões: cria o GameManager e faz o warmup"""
+    import app
+    report = app.warm_up()
+    server.log.info("Worker %s pronto (warmup %.0f ms)", worker.pid, report["duration_ms"])
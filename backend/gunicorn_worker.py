@@ -0,0 +1,26 @@
+"""
+Worker do gunicorn usado em produção (gunicorn.conf.py)
+"""
+
+import errno
+
+from gunicorn.workers.gthread import ThreadWorker, TConn
+
+
+class DrainingThreadWorker(ThreadWorker):
+    """
+    Worker gthread que entrega cada conexão nova direto ao pool de threads.
+    No gthread padrão, uma conexão aceita espera no poller até ficar legível;
+    se o reinício gracioso começa nesse intervalo, ela é fechada sem resposta
+    (connection reset). No pool, ela é atendida antes do worker sair.
+    """
+
+    def accept(self, server, listener):
+        try:
+            sock, client = listener.accept()
+        except EnvironmentError as e:
+            if e.errno not in (errno.EAGAIN, errno.ECONNABORTED, errno.EWOULDBLOCK):
+                raise
+            return
+        self.nr_conns += 1
+        self.enqueue_req(TConn(self.cfg, sock, client, server))
@@ -5,15 +5,18 @@ Demonstra herança e polimorfismo em POO
 
 import numpy as np
 from typing import Dict, Any
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.base_game import BaseGame
 import logging
 
 class BalloonGame(BaseGame):
     
+    # Configurações de áudio para sopro contínuo (usadas por extract_audio_features,
+    # que não tem acesso à instância)
+    _blow_frequency_min = 150  # Hz - frequência mínima de sopro
+    _blow_frequency_max = 600  # Hz - frequência máxima de sopro
+    _continuous_blow_threshold = 0.3  # Threshold para sopro contínuo
+    
     def __init__(self, game_id: str, player_name: str = "Jogador"):
         """
         Construtor específico do BalloonGame
@@ -30,11 +33,6 @@ class BalloonGame(BaseGame):
         self._balloon_pressure = 0.0  # Pressão interna do balão
         self._max_pressure = 100.0    # Pressão máxima antes de estourar
         
-        # Configurações específicas de áudio para sopro contínuo
-        self._blow_frequency_min = 150  # Hz - frequência mínima de sopro
-        self._blow_frequency_max = 600  # Hz - frequência máxima de sopro
-        self._continuous_blow_threshold = 0.3  # Threshold para sopro contínuo
-        
         # Sistema de vazamento do balão
         self._leak_rate = 0.5  # Taxa de vazamento por segundo
         self._last_blow_time = None
@@ -59,8 +57,21 @@ class BalloonGame(BaseGame):
         # Converter bytes para array numpy
         audio_array = np.frombuffer(audio_data, dtype=np.int16)
         
-        # Detectar sopro contínuo
-        blow_detected, blow_intensity, blow_duration = self._detect_continuous_blow(audio_array, sample_rate)
+        return self._apply_audio_features(self.extract_audio_features(audio_array, sample_rate))
+    
+    def _apply_audio_features(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enche o balão a partir das features de áudio
+        
+        Args:
+            features: Dict retornado por extract_audio_features
+            
+        Returns:
+            Dict com dados processados do jogo do balão
+        """
+        blow_detected = features["blow_detected"]
+        blow_intensity = features["blow_intensity"]
+        blow_duration = features["blow_duration"]
         
         if blow_detected:
             # Adicionar pressão ao balão
@@ -105,12 +116,27 @@ class BalloonGame(BaseGame):
         Returns:
             Tuple (blow_detected, intensity, duration)
         """
+        features = self.extract_audio_features(audio_array, sample_rate)
+        return features["blow_detected"], features["blow_intensity"], features["blow_duration"]
+    
+    @classmethod
+    def extract_audio_features(cls, audio_array: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """
+        Espectro na faixa de sopro usado pelo balão (não depende do estado do jogo)
+        
+        Args:
+            audio_array: Array de áudio (int16)
+            sample_rate: Taxa de amostragem
+            
+        Returns:
+            Dict com blow_detected, blow_intensity (0-1) e blow_duration
+        """
         # Calcular FFT para análise de frequência
         fft = np.fft.fft(audio_array)
         frequencies = np.fft.fftfreq(len(audio_array), 1/sample_rate)
         
         # Filtrar frequências de sopro
-        blow_mask = (frequencies >= self._blow_frequency_min) & (frequencies <= self._blow_frequency_max)
+        blow_mask = (frequencies >= cls._blow_frequency_min) & (frequencies <= cls._blow_frequency_max)
         blow_spectrum = np.abs(fft[blow_mask])
         
         # Calcular intensidade do sopro
@@ -118,12 +144,16 @@ class BalloonGame(BaseGame):
         normalized_intensity = min(blow_intensity / 1000, 1.0)
         
         # Detectar sopro contínuo baseado no threshold
-        blow_detected = normalized_intensity > self._continuous_blow_threshold
+        blow_detected = normalized_intensity > cls._continuous_blow_threshold
         
         # Calcular duração do sopro (simulado baseado na intensidade)
         blow_duration = normalized_intensity * 0.5  # 0-0.5 segundos
         
-        return blow_detected, normalized_intensity, blow_duration
+        return {
+            "blow_detected": blow_detected,
+            "blow_intensity": normalized_intensity,
+            "blow_duration": blow_duration
+        }
     
     def _calculate_pressure_increase(self, blow_intensity: float, blow_duration: float) -> float:
         """
@@ -182,9 +212,14 @@ class BalloonGame(BaseGame):
         if len(self._pressure_history) > 50:
             self._pressure_history.pop(0)
     
-    def _apply_balloon_leak(self) -> None:
-        """Aplica vazamento natural do balão"""
-        self._balloon_pressure = max(self._balloon_pressure - self._leak_rate, 0)
+    def _apply_balloon_leak(self, frames: int = 1) -> None:
+        """
+        Aplica vazamento natural do balão
+        
+        Args:
+            frames: Número de frames de vazamento
+        """
+        self._balloon_pressure = max(self._balloon_pressure - self._leak_rate * frames, 0)
     
     def _update_balloon_and_clown(self) -> None:
         """Atualiza tamanho do balão (palhaço removido)"""
@@ -225,33 +260,38 @@ class BalloonGame(BaseGame):
         if len(self._blow_sessions) > 50:
             self._blow_sessions.pop(0)
     
-    def _process_intensity(self, intensity: float, blow_detected: bool) -> Dict[str, Any]:
+    def _process_intensity(self, intensity: float, blow_detected: bool,
+                           frames: int = 1, blow_frames: int = 1) -> Dict[str, Any]:
         """
         Processa intensidade de áudio diretamente (sem áudio real)
         Usa dados reais do microfone do frontend
         
         Args:
-            intensity: Intensidade do áudio (0-1) do frontend
+            intensity: Intensidade do áudio (0-1) do frontend (a maior, se combinados)
             blow_detected: Se um sopro foi detectado
+            frames: Número de frames combinados
+            blow_frames: Quantos desses frames foram sopro
             
         Returns:
             Dict com dados processados do jogo
         """
+        pressure_start = self._balloon_pressure
+        
         # Se detectou sopro, adicionar pressão ao balão
         # FILTRO: Só adiciona pressão se a intensidade for significativa (>= 50%)
         # Isso filtra ruído ambiente que pode passar pelo threshold
-        if blow_detected and intensity >= 0.5:
+        if blow_detected and blow_frames and intensity >= 0.5:
             # Calcular pressão baseado na intensidade (dados REAIS do microfone)
             # Usar apenas a parte acima de 50% para evitar ruído
             effective_intensity = (intensity - 0.5) * 2  # Normalizar para 0-1 considerando apenas acima de 50%
-            pressure_added = effective_intensity * 10  # Pressão proporcional à intensidade
+            pressure_added = effective_intensity * 10 * blow_frames  # Pressão proporcional à intensidade e ao tempo de sopro
             self._add_pressure(pressure_added)
             
             # Registrar sessão de sopro
-            self._record_blow_session(intensity, 0.1)  # 0.1s = duração de cada frame
+            self._record_blow_session(intensity, 0.1 * blow_frames)  # 0.1s = duração de cada frame
         
         # Aplicar vazamento natural do balão
-        self._apply_balloon_leak()
+        self._apply_balloon_leak(frames)
         
         # Atualizar tamanho do balão
         self._update_balloon_and_clown()
@@ -261,10 +301,10 @@ class BalloonGame(BaseGame):
         # Verificar se balão está cheio (meta: 80% da pressão máxima)
         is_full = self._balloon_pressure >= self._max_pressure * 0.8
         
-        return {
+        processed_data = {
             "blow_detected": blow_detected,
             "blow_intensity": intensity,
-            "blow_duration": 0.1 if blow_detected else 0,
+            "blow_duration": 0.1 * blow_frames if blow_detected else 0,
             "balloon_size": self._balloon_size,  # 1.0 a 10.0
             "balloon_pressure": self._balloon_pressure,
             "balloon_pressure_percent": (self._balloon_pressure / self._max_pressure) * 100,  # 0-100%
@@ -273,6 +313,10 @@ class BalloonGame(BaseGame):
             "is_balloon_popped": is_popped,
             "balloon_size_percent": 20 + ((self._balloon_size - 1.0) / 9.0) * 180  # 20-200% para frontend
         }
+        if frames > 1:
+            # Pressão antes dos frames combinados (a pontuação usa a subida de pressão)
+            processed_data["balloon_pressure_start"] = pressure_start
+        return processed_data
     
     def _update_score(self, processed_data: Dict[str, Any]) -> None:
         """
@@ -285,13 +329,22 @@ class BalloonGame(BaseGame):
             # Score baseado na intensidade do sopro
             blow_score = int(processed_data["blow_intensity"] * 10)
             
-            # Bonus por pressão do balão
-            pressure_bonus = int(self._balloon_pressure / 5)
+            # Frames combinados pontuam como cada frame de sopro
+            blow_frames = processed_data.get("blow_frames", 1)
+            
+            # Bonus por pressão do balão (com frames combinados, a pressão de cada
+            # frame é interpolada entre a pressão inicial e a final)
+            if blow_frames > 1:
+                start = processed_data["balloon_pressure_start"]
+                step = (self._balloon_pressure - start) / blow_frames
+                pressure_bonus = sum(int((start + step * i) / 5) for i in range(1, blow_frames + 1))
+            else:
+                pressure_bonus = int(self._balloon_pressure / 5)
             
             # Bonus por não estourar o balão
             no_burst_bonus = 10 if not processed_data.get("is_balloon_popped", False) else 0
             
-            self._score += blow_score + pressure_bonus + no_burst_bonus
+            self._score += (blow_score + no_burst_bonus) * blow_frames + pressure_bonus
         
         # Bonus por completar objetivo (balão cheio mas não estourou) - apenas uma vez
         if processed_data.get("is_balloon_full") and not processed_data.get("is_balloon_popped", False):
@@ -315,8 +368,20 @@ class BalloonGame(BaseGame):
         max_height = max([session["intensity"] for session in self._blow_sessions]) if self._blow_sessions else 0
         total_sessions = len(self._blow_sessions)
         
-        self._logger.info(f"BalloonGame finalizado - Altura máxima: {self._clown_height:.1f}, "
-                         f"Total de sessões: {total_sessions}")
+        self._logger.info("BalloonGame finalizado - Altura máxima: %.1f, Total de sessões: %d",
+                          self._clown_height, total_sessions)
+    
+    def get_activity_state(self, blow_detected: bool) -> str:
+        """Balão vazio = ocioso; balão com pressão sem sopro = vazando"""
+        if blow_detected:
+            return "blowing"
+        return "leaking" if self._balloon_pressure > 0 else "idle"
+    
+    def _state_signature(self) -> tuple:
+        return super()._state_signature() + (
+            round(self._balloon_pressure, 2),
+            round(self._balloon_size, 3)
+        )
     
     def get_game_stats(self) -> Dict[str, Any]:
         """
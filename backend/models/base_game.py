@@ -5,15 +5,20 @@ Demonstra conceitos de POO: herança, polimorfismo e encapsulamento
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 import logging
 
+import numpy as np
+
 class BaseGame(ABC):
     """
     Classe abstrata base para todos os jogos de terapia respiratória.
     Implementa o padrão Template Method.
     """
     
+    # Relógio usado no início/fim do jogo (o replay de sessões usa um relógio virtual)
+    _clock: Callable[[], datetime] = staticmethod(datetime.now)
+    
     def __init__(self, game_id: str, player_name: str = "Jogador"):
         """
         Construtor da classe base
@@ -30,6 +35,8 @@ class BaseGame(ABC):
         self._score = 0
         self._level = 1
         self._difficulty = "Fácil"
+        self._last_state_signature: Optional[tuple] = None
+        self._frame_seq = 0
         
         # Configurações de áudio
         self._audio_threshold = 0.5
@@ -70,11 +77,11 @@ class BaseGame(ABC):
         Returns:
             Dict com informações do jogo iniciado
         """
-        self._start_time = datetime.now()
+        self._start_time = self._clock()
         self._is_active = True
         self._score = 0
         
-        self._logger.info(f"Jogo {self._game_id} iniciado para {self._player_name}")
+        self._logger.info("Jogo %s iniciado para %s", self._game_id, self._player_name)
         
         # Hook para subclasses personalizarem a inicialização
         self._on_game_start()
@@ -94,12 +101,12 @@ class BaseGame(ABC):
         Returns:
             Dict com estatísticas finais do jogo
         """
-        self._end_time = datetime.now()
+        self._end_time = self._clock()
         self._is_active = False
         
         duration = (self._end_time - self._start_time).total_seconds() if self._start_time else 0
         
-        self._logger.info(f"Jogo {self._game_id} finalizado. Score: {self._score}, Duração: {duration}s")
+        self._logger.info("Jogo %s finalizado. Score: %s, Duração: %ss", self._game_id, self._score, duration)
         
         # Hook para subclasses personalizarem a finalização
         self._on_game_end()
@@ -135,6 +142,26 @@ class BaseGame(ABC):
         
         return processed_data
     
+    def process_audio_features(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Aplica ao jogo features de áudio já extraídas com extract_audio_features
+        (ex: em um processo do pool de DSP). Equivale a process_audio_input
+        com o áudio que originou as features.
+        
+        Args:
+            features: Dict retornado por extract_audio_features
+            
+        Returns:
+            Dict com dados processados do jogo
+        """
+        if not self._is_active:
+            raise ValueError("Jogo não está ativo")
+        
+        processed_data = self._apply_audio_features(features)
+        self._update_score(processed_data)
+        
+        return processed_data
+    
     def set_difficulty(self, difficulty: str) -> None:
         """
         Define a dificuldade do jogo
@@ -159,14 +186,22 @@ class BaseGame(ABC):
         self._audio_threshold = background_noise_level * 1.5  # 50% acima do ruído
         self._logger.info(f"Threshold calibrado para: {self._audio_threshold}")
     
-    def process_intensity(self, intensity: float, blow_detected: bool) -> Dict[str, Any]:
+    def process_intensity(self, intensity: float, blow_detected: bool,
+                          frames: int = 1, blow_frames: Optional[int] = None) -> Dict[str, Any]:
         """
         Processa intensidade de áudio diretamente (sem áudio real)
         Usa dados reais do frontend
         
+        Vários frames acumulados (ex: rajada de um cliente com rede instável)
+        podem ser aplicados de uma vez: intensity é a maior intensidade entre
+        eles e blow_frames quantos foram sopro, para que o tempo de sopro
+        (e a pontuação) seja o mesmo de frames aplicados um a um.
+        
         Args:
             intensity: Intensidade do áudio (0-1)
             blow_detected: Se um sopro foi detectado
+            frames: Número de frames combinados
+            blow_frames: Quantos desses frames foram sopro (padrão: 1 se blow_detected)
             
         Returns:
             Dict com dados processados do jogo
@@ -174,23 +209,117 @@ class BaseGame(ABC):
         if not self._is_active:
             raise ValueError("Jogo não está ativo")
         
+        if blow_frames is None:
+            blow_frames = 1 if blow_detected else 0
+        
         # Processar intensidade (será implementado nas subclasses)
-        processed_data = self._process_intensity(intensity, blow_detected)
+        processed_data = self._process_intensity(intensity, blow_detected, frames, blow_frames)
+        if frames > 1:
+            processed_data["coalesced_frames"] = frames
+            processed_data["blow_frames"] = blow_frames
         
         # Atualizar score baseado no processamento
         self._update_score(processed_data)
         
         return processed_data
     
+    def get_activity_state(self, blow_detected: bool) -> str:
+        """
+        Estado de atividade do jogo após o último frame (usado para
+        recomendar o intervalo de envio ao cliente)
+        
+        Args:
+            blow_detected: Se o último frame teve sopro
+            
+        Returns:
+            "blowing" ou "idle" (subclasses podem retornar outros estados)
+        """
+        return "blowing" if blow_detected else "idle"
+    
+    def consume_state_change(self) -> bool:
+        """
+        Verifica se o estado visível do jogo mudou desde a última chamada
+        
+        Returns:
+            True se o estado mudou
+        """
+        signature = self._state_signature()
+        changed = signature != getattr(self, '_last_state_signature', None)
+        self._last_state_signature = signature
+        return changed
+    
+    def _state_signature(self) -> tuple:
+        """Valores que, se iguais, indicam que o estado do jogo não mudou"""
+        return (self._is_active, self._score, self._level)
+    
+    @property
+    def frame_sequence(self) -> int:
+        """Sequência do último frame processado"""
+        return getattr(self, '_frame_seq', 0)
+    
+    def set_clock(self, clock: Callable[[], datetime]) -> None:
+        """
+        Substitui o relógio do jogo (ex: relógio virtual no replay de sessões)
+        
+        Args:
+            clock: Função sem argumentos que retorna o datetime atual
+        """
+        self._clock = clock
+    
+    @property
+    def client_frame_sequence(self) -> int:
+        """Maior sequência de frame enviada pelo cliente já aplicada (0 = nenhuma)"""
+        return getattr(self, '_client_frame_seq', 0)
+    
+    def accept_client_sequence(self, frame_seq: int, window: int = 1) -> bool:
+        """
+        Registra a sequência enviada pelo cliente, recusando frames atrasados
+        (a `window` frames ou mais atrás do mais novo já aplicado)
+        
+        Args:
+            frame_seq: Sequência do frame no cliente
+            window: Frames fora de ordem tolerados
+            
+        Returns:
+            True se o frame ainda pode ser aplicado
+        """
+        last = getattr(self, '_client_frame_seq', 0)
+        if frame_seq <= last - window:
+            return False
+        self._client_frame_seq = max(last, frame_seq)
+        return True
+    
+    def next_frame_sequence(self) -> int:
+        """
+        Numera o frame processado (monótono por jogo, inclusive entre workers)
+        
+        Returns:
+            Sequência do frame
+        """
+        self._frame_seq = getattr(self, '_frame_seq', 0) + 1
+        return self._frame_seq
+    
     # Métodos abstratos que devem ser implementados pelas subclasses
     @abstractmethod
     def _process_audio(self, audio_data: bytes, sample_rate: int) -> Dict[str, Any]:
         """Processa dados de áudio específicos do jogo"""
         pass
     
+    @classmethod
     @abstractmethod
-    def _process_intensity(self, intensity: float, blow_detected: bool) -> Dict[str, Any]:
-        """Processa intensidade de áudio diretamente (sem áudio real)"""
+    def extract_audio_features(cls, audio_array: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """Extrai do áudio as features usadas pelo jogo (não lê nem altera o estado do jogo)"""
+        pass
+    
+    @abstractmethod
+    def _apply_audio_features(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Atualiza o estado do jogo a partir das features de áudio"""
+        pass
+    
+    @abstractmethod
+    def _process_intensity(self, intensity: float, blow_detected: bool,
+                           frames: int = 1, blow_frames: int = 1) -> Dict[str, Any]:
+        """Processa intensidade de áudio diretamente (sem áudio real), de um ou mais frames"""
         pass
     
     @abstractmethod
@@ -219,6 +348,28 @@ class BaseGame(ABC):
         multiplier = difficulty_multipliers[self._difficulty]
         self._audio_threshold *= multiplier
     
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Snapshot compacto do estado do jogo (usado pelos stores externos)
+
+        Returns:
+            Dict com os atributos do jogo, sem o logger e o relógio
+        """
+        state = self.__dict__.copy()
+        state.pop('_logger', None)
+        state.pop('_clock', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restaura o jogo a partir de um snapshot
+
+        Args:
+            state: Dict gerado por __getstate__
+        """
+        self.__dict__.update(state)
+        self._logger = logging.getLogger(f"{self.__class__.__name__}")
+
     def __str__(self) -> str:
         """Representação string do objeto"""
         return f"{self.__class__.__name__}(id={self._game_id}, player={self._player_name}, active={self._is_active})"
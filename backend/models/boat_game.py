@@ -1,8 +1,5 @@
 import numpy as np
 from typing import Dict, Any
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.base_game import BaseGame
 import logging
@@ -41,7 +38,26 @@ class BoatGame(BaseGame):
         audio_array = np.frombuffer(audio_data, dtype=np.int16)
         
         # Aplicar filtros de sopro
-        blow_detected, blow_intensity = self._detect_blow(audio_array, sample_rate)
+        return self._apply_audio_features(self.extract_audio_features(audio_array, sample_rate))
+    
+    def _apply_audio_features(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move o barco a partir das features de áudio
+        
+        Args:
+            features: Dict retornado por extract_audio_features
+            
+        Returns:
+            Dict com dados processados do jogo
+        """
+        blow_detected = features["blow_detected"]
+        blow_intensity = features["blow_intensity"]
+        
+        # Log para debug (só no nível DEBUG; amostrado por jogo pelo filtro de log_pipeline)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("RMS Energy: %.1f, Normalized: %.3f, Blow Detected: %s",
+                               features["rms_energy"], blow_intensity, blow_detected,
+                               extra={"sample_key": self._game_id})
         
         # Sempre aplicar movimento baseado na intensidade do áudio (mesmo que não seja sopro detectado)
         # Isso torna o jogo mais responsivo
@@ -75,6 +91,21 @@ class BoatGame(BaseGame):
         Returns:
             Tuple (blow_detected, intensity)
         """
+        features = self.extract_audio_features(audio_array, sample_rate)
+        return features["blow_detected"], features["blow_intensity"]
+    
+    @classmethod
+    def extract_audio_features(cls, audio_array: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """
+        Energia do áudio usada pelo barco (não depende do estado do jogo)
+        
+        Args:
+            audio_array: Array de áudio (int16)
+            sample_rate: Taxa de amostragem
+            
+        Returns:
+            Dict com blow_detected, blow_intensity (0-1) e rms_energy
+        """
         # Converter para float64 para evitar problemas de precisão
         audio_float = audio_array.astype(np.float64)
         
@@ -87,10 +118,11 @@ class BoatGame(BaseGame):
         # Normalizar energia (0-1) para retorno
         normalized_intensity = min(rms_energy / 1000, 1.0)
         
-        # Log para debug
-        print(f"DEBUG: RMS Energy: {rms_energy}, Normalized: {normalized_intensity}, Blow Detected: {blow_detected}")
-        
-        return blow_detected, normalized_intensity
+        return {
+            "blow_detected": blow_detected,
+            "blow_intensity": normalized_intensity,
+            "rms_energy": rms_energy
+        }
     
     def _calculate_boat_movement(self, blow_intensity: float) -> float:
         """
@@ -130,58 +162,71 @@ class BoatGame(BaseGame):
         if self._boat_position >= 100.0:
             self._level_up()
     
-    def _apply_water_resistance(self) -> None:
-        """Aplica resistência da água (barco desacelera)"""
-        self._boat_speed *= (1 - self._water_resistance)
+    def _apply_water_resistance(self, frames: int = 1) -> None:
+        """
+        Aplica resistência da água (barco desacelera)
+        
+        Args:
+            frames: Número de frames de desaceleração
+        """
+        self._boat_speed *= (1 - self._water_resistance) ** frames
         if self._boat_speed < 0.1:
             self._boat_speed = 0
     
-    def _record_blow(self, intensity: float) -> None:
+    def _record_blow(self, intensity: float, count: int = 1) -> None:
         """
         Registra sopro no histórico
         
         Args:
             intensity: Intensidade do sopro
+            count: Número de frames de sopro (frames combinados)
         """
-        self._blow_history.append({
-            "intensity": intensity,
-            "timestamp": self._start_time
-        })
+        for _ in range(min(count, 100)):
+            self._blow_history.append({
+                "intensity": intensity,
+                "timestamp": self._start_time
+            })
         
-        self._consecutive_blows += 1
+        self._consecutive_blows += count
         
         # Limitar histórico
         if len(self._blow_history) > 100:
-            self._blow_history.pop(0)
+            del self._blow_history[:len(self._blow_history) - 100]
     
-    def _process_intensity(self, intensity: float, blow_detected: bool) -> Dict[str, Any]:
+    def _process_intensity(self, intensity: float, blow_detected: bool,
+                           frames: int = 1, blow_frames: int = 1) -> Dict[str, Any]:
         """
         Processa intensidade de áudio diretamente (sem áudio real)
         Usa dados reais do microfone do frontend
         
         Args:
-            intensity: Intensidade do áudio (0-1) do frontend
+            intensity: Intensidade do áudio (0-1) do frontend (a maior, se combinados)
             blow_detected: Se um sopro foi detectado
+            frames: Número de frames combinados
+            blow_frames: Quantos desses frames foram sopro
             
         Returns:
             Dict com dados processados do jogo
         """
         # FILTRO: Só mover o barco se um sopro foi detectado
         # Se o backend detectou sopro, move o barco (frontend já fez filtragem básica)
-        if blow_detected:
+        if blow_detected and blow_frames:
             # Calcular movimento baseado na intensidade REAL do microfone
             # Usar intensidade diretamente (frontend já fez a filtragem)
             boat_movement = self._calculate_boat_movement(intensity)
-            self._update_boat_position(boat_movement)
+            # Frames combinados: o barco anda o que andaria em cada frame de sopro,
+            # mas a velocidade continua sendo a de um frame
+            self._update_boat_position(boat_movement * blow_frames)
+            self._boat_speed = boat_movement
             
             # Registrar sopro no histórico
-            self._record_blow(intensity)
+            self._record_blow(intensity, blow_frames)
         else:
             # Se não detectou sopro, resetar sopros consecutivos
             self._consecutive_blows = 0
         
         # Aplicar resistência da água (barco desacelera naturalmente)
-        self._apply_water_resistance()
+        self._apply_water_resistance(frames)
         
         return {
             "blow_detected": bool(blow_detected),
@@ -200,11 +245,12 @@ class BoatGame(BaseGame):
             processed_data: Dados processados do jogo
         """
         if processed_data["blow_detected"]:
-            # Score baseado na intensidade do sopro
-            blow_score = int(processed_data["blow_intensity"] * 10)
+            # Score baseado na intensidade do sopro (de cada frame, se combinados)
+            blow_frames = processed_data.get("blow_frames", 1)
+            blow_score = int(processed_data["blow_intensity"] * 10) * blow_frames
             
-            # Bonus por sopros consecutivos
-            consecutive_bonus = min(self._consecutive_blows * 2, 20)
+            # Bonus por sopros consecutivos (o que cada frame combinado teria recebido)
+            consecutive_bonus = sum(min((self._consecutive_blows - i) * 2, 20) for i in range(blow_frames))
             
             self._score += blow_score + consecutive_bonus
     
@@ -222,8 +268,8 @@ class BoatGame(BaseGame):
         total_blows = len(self._blow_history)
         avg_intensity = np.mean([blow["intensity"] for blow in self._blow_history]) if self._blow_history else 0
         
-        self._logger.info(f"BoatGame finalizado - Total de sopros: {total_blows}, "
-                         f"Intensidade média: {avg_intensity:.2f}")
+        self._logger.info("BoatGame finalizado - Total de sopros: %d, Intensidade média: %.2f",
+                          total_blows, avg_intensity)
     
     def _level_up(self) -> None:
         """Avança para o próximo nível"""
@@ -234,7 +280,20 @@ class BoatGame(BaseGame):
         self._max_speed += 1.0
         self._water_resistance += 0.05
         
-        self._logger.info(f"Level up! Novo nível: {self._level}")
+        self._logger.info("Level up! Novo nível: %d", self._level)
+    
+    def get_activity_state(self, blow_detected: bool) -> str:
+        """Barco parado = ocioso; barco ainda em movimento sem sopro = desacelerando"""
+        if blow_detected:
+            return "blowing"
+        return "decelerating" if self._boat_speed > 0 else "idle"
+    
+    def _state_signature(self) -> tuple:
+        return super()._state_signature() + (
+            round(self._boat_position, 2),
+            round(self._boat_speed, 2),
+            self._consecutive_blows
+        )
     
     def get_game_stats(self) -> Dict[str, Any]:
         """
@@ -3,11 +3,18 @@ Módulo de serviços - Lógica de negócio e processamento
 Demonstra composição e padrões de design
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+__all__ = ['AudioProcessor', 'GameManager', 'GameType']
 
-from services.audio_processor import AudioProcessor
-from services.game_manager import GameManager, GameType
+# Importados sob demanda: importar um submódulo leve (ex: services.metrics)
+# não deve carregar o GameManager, os jogos e o processamento de áudio
+_EXPORTS = {
+    'AudioProcessor': 'services.audio_processor',
+    'GameManager': 'services.game_manager',
+    'GameType': 'services.game_manager'
+}
 
-__all__ = ['AudioProcessor', 'GameManager', 'GameType']
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'services' has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
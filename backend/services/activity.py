@@ -0,0 +1,189 @@
+"""
+Dias de atividade de cada paciente em um bitmap
+Cada bit é um dia de calendário (a partir do primeiro dia ativo), então
+anos de histórico ocupam poucas centenas de bytes. Sequência atual, maior
+sequência e dias ativos nos últimos N dias saem de deslocamentos, máscaras
+e contagem de bits sobre esse inteiro, sem percorrer as sessões.
+"""
+
+from typing import Dict, Any, Optional, Iterable
+from datetime import date, timedelta
+
+
+class ActivityBitmap:
+    """
+    Bitmap de dias ativos: o bit i indica atividade no dia start + i.
+
+    A maior sequência é mantida a cada dia marcado (só a sequência que
+    contém o novo dia pode crescer), então consultá-la não custa nada.
+    """
+
+    def __init__(self, start: Optional[date] = None, bits: int = 0, longest: Optional[int] = None):
+        """
+        Args:
+            start: Dia do bit 0 (None para um bitmap vazio)
+            bits: Inteiro com um bit por dia
+            longest: Maior sequência já calculada (None para calcular)
+        """
+        self._start = start
+        self._bits = bits if start is not None else 0
+        self._longest = longest if longest is not None else self._compute_longest()
+
+    @classmethod
+    def from_days(cls, days: Iterable[date]) -> "ActivityBitmap":
+        """
+        Monta o bitmap a partir de dias ativos (ex: sessões antigas)
+
+        Args:
+            days: Dias com atividade (repetições são ignoradas)
+        """
+        days = set(days)
+        if not days:
+            return cls()
+        start = min(days)
+        bits = 0
+        for day in days:
+            bits |= 1 << (day - start).days
+        return cls(start, bits)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ActivityBitmap":
+        """
+        Restaura o bitmap salvo por to_dict
+
+        Args:
+            data: Dict com start (ISO), days (hex) e longest, ou None
+        """
+        if not data or not data.get("start"):
+            return cls()
+        return cls(date.fromisoformat(data["start"]), int(data.get("days") or "0", 16), data.get("longest"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Forma serializável (JSON) do bitmap
+
+        Returns:
+            Dict com o primeiro dia, os bits em hexadecimal e a maior sequência
+        """
+        return {
+            "start": self._start.isoformat() if self._start else None,
+            "days": format(self._bits, "x"),
+            "longest": self._longest
+        }
+
+    @property
+    def total_days(self) -> int:
+        """Número de dias ativos"""
+        return bin(self._bits).count("1")
+
+    @property
+    def longest_streak(self) -> int:
+        """Maior sequência de dias ativos seguidos"""
+        return self._longest
+
+    def _offset(self, day: date) -> int:
+        return (day - self._start).days
+
+    def mark(self, day: date) -> bool:
+        """
+        Marca um dia como ativo
+
+        Args:
+            day: Dia com atividade
+
+        Returns:
+            True se o dia ainda não estava marcado
+        """
+        if self._start is None:
+            self._start = day
+        elif day < self._start:
+            # Dia anterior ao primeiro: desloca o bitmap para abrir espaço
+            self._bits <<= (self._start - day).days
+            self._start = day
+        offset = self._offset(day)
+        if self._bits >> offset & 1:
+            return False
+        self._bits |= 1 << offset
+        self._longest = max(self._longest, self._run_through(offset))
+        return True
+
+    def is_active(self, day: date) -> bool:
+        """Se houve atividade no dia"""
+        if self._start is None or day < self._start:
+            return False
+        return bool(self._bits >> self._offset(day) & 1)
+
+    def _run_ending(self, offset: int) -> int:
+        """Dias ativos seguidos terminando no bit offset (inclusive)"""
+        if offset < 0:
+            return 0
+        gaps = ~self._bits & ((1 << (offset + 1)) - 1)
+        if gaps == 0:
+            return offset + 1
+        return offset - (gaps.bit_length() - 1)
+
+    def _run_through(self, offset: int) -> int:
+        """Tamanho da sequência que contém o bit offset (ativo)"""
+        after = self._bits >> offset
+        # Uns consecutivos a partir do bit 0 de `after`: posição do primeiro zero
+        ahead = ((~after) & (after + 1)).bit_length() - 1
+        return self._run_ending(offset) + ahead - 1
+
+    def current_streak(self, today: date) -> int:
+        """
+        Sequência atual: dias ativos seguidos até hoje. Um dia ainda sem
+        sessão não quebra a sequência (ela vale até ontem).
+
+        Args:
+            today: Dia de referência
+        """
+        if self._start is None or today < self._start:
+            return 0
+        offset = self._offset(today)
+        if not self._bits >> offset & 1:
+            offset -= 1
+        return self._run_ending(offset)
+
+    def active_days(self, today: date, days: int) -> int:
+        """
+        Dias ativos entre today - days + 1 e today (inclusive)
+
+        Args:
+            today: Último dia do intervalo
+            days: Tamanho do intervalo em dias
+        """
+        if self._start is None or days <= 0:
+            return 0
+        first = self._offset(today) - days + 1
+        window = (self._bits >> first) if first >= 0 else (self._bits << -first)
+        return bin(window & ((1 << days) - 1)).count("1")
+
+    def _compute_longest(self) -> int:
+        """Maior sequência recalculada: cada x & (x >> 1) encurta todas as sequências em 1"""
+        bits, longest = self._bits, 0
+        while bits:
+            bits &= bits >> 1
+            longest += 1
+        return longest
+
+    def summary(self, today: date, days: int = 30) -> Dict[str, Any]:
+        """
+        Resumo da atividade
+
+        Args:
+            today: Dia de referência
+            days: Janela de dias para active_days
+
+        Returns:
+            Dict com sequência atual, maior sequência, dias ativos na janela
+            e no total, e o último dia ativo
+        """
+        last = self._start + timedelta(days=self._bits.bit_length() - 1) if self._bits else None
+        return {
+            "current_streak": self.current_streak(today),
+            "longest_streak": self._longest,
+            "active_days": self.active_days(today, days),
+            "window_days": days,
+            "total_active_days": self.total_days,
+            "last_active_day": last.isoformat() if last else None
+        }
@@ -0,0 +1,159 @@
+"""
+Controle de admissão por classe de requisição
+Os frames de áudio dos jogos (interativos) e as consultas de relatório
+(listagens, estatísticas) disputam as mesmas threads do servidor. As
+classes limitadas têm um número máximo de requisições em execução e em
+espera; o restante das threads fica sempre disponível para os jogos.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+import threading
+import time
+
+from services.metrics import metrics_registry
+
+
+class AdmissionRejected(Exception):
+    """Requisição recusada: a fila da classe está cheia ou a espera expirou"""
+
+    def __init__(self, request_class: str, reason: str, retry_after: float):
+        super().__init__(f"Servidor ocupado ({request_class}: {reason})")
+        self.request_class = request_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """
+    Limite de uma classe de requisições: até `max_concurrent` em execução e
+    até `max_waiting` esperando por no máximo `wait_timeout` segundos.
+    Enquanto esperam, as requisições ocupam threads do servidor; a classe
+    usa no máximo max_concurrent + max_waiting threads.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_waiting: int = 0,
+                 wait_timeout: float = 5.0):
+        """
+        Args:
+            name: Nome da classe (usado nas métricas)
+            max_concurrent: Requisições da classe em execução ao mesmo tempo
+            max_waiting: Requisições esperando; além disso são recusadas na hora
+            wait_timeout: Espera máxima por uma vaga (segundos)
+        """
+        self.name = name
+        self._max_concurrent = max(max_concurrent, 1)
+        self._max_waiting = max(max_waiting, 0)
+        self._wait_timeout = wait_timeout
+
+        self._running = 0
+        self._waiting = 0
+        self._counts = {"admitted": 0, "rejected": 0, "timeout": 0}
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Ocupa uma vaga da classe, esperando se necessário
+
+        Raises:
+            AdmissionRejected: fila cheia ou espera maior que wait_timeout
+        """
+        started = time.perf_counter()
+        with self._condition:
+            if self._running >= self._max_concurrent:
+                if self._waiting >= self._max_waiting:
+                    self._reject("rejected")
+                self._waiting += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self._running < self._max_concurrent,
+                                                        timeout=self._wait_timeout)
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._reject("timeout")
+            self._running += 1
+            self._counts["admitted"] += 1
+
+        metrics_registry.inc("aetheria_admission_total", (self.name, "admitted"))
+        metrics_registry.observe("aetheria_admission_wait_seconds", time.perf_counter() - started, (self.name,))
+
+    def _reject(self, outcome: str) -> None:
+        self._counts[outcome] += 1
+        metrics_registry.inc("aetheria_admission_total", (self.name, outcome))
+        raise AdmissionRejected(self.name, "fila cheia" if outcome == "rejected" else "tempo de espera esgotado",
+                                retry_after=max(self._wait_timeout, 1.0))
+
+    def release(self) -> None:
+        """Libera a vaga ocupada por acquire()"""
+        with self._condition:
+            self._running -= 1
+            self._condition.notify()
+
+    @property
+    def threads(self) -> int:
+        """Máximo de threads do servidor que a classe pode ocupar"""
+        return self._max_concurrent + self._max_waiting
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas da classe
+
+        Returns:
+            Dict com limites, requisições em execução/esperando e contadores
+        """
+        return {
+            "max_concurrent": self._max_concurrent,
+            "max_waiting": self._max_waiting,
+            "wait_timeout": self._wait_timeout,
+            "running": self._running,
+            "waiting": self._waiting,
+            **self._counts
+        }
+
+
+class AdmissionController:
+    """
+    Classifica cada requisição pela rota e aplica o limite da classe.
+    Rotas sem classe (ex: frames de áudio) não passam por fila nenhuma.
+    """
+
+    def __init__(self, queues: Dict[str, AdmissionQueue], routes: Dict[Tuple[str, str], str]):
+        """
+        Args:
+            queues: Fila de cada classe limitada
+            routes: Classe de cada (padrão da rota, método HTTP)
+        """
+        unknown = set(routes.values()) - queues.keys()
+        if unknown:
+            raise ValueError(f"Classes de requisição sem fila: {sorted(unknown)}")
+        self._queues = queues
+        self._routes = routes
+
+    def classify(self, rule: str, method: str) -> Optional[str]:
+        """
+        Classe da requisição
+
+        Args:
+            rule: Padrão da rota (ex: /api/games/<game_id>/audio)
+            method: Método HTTP
+
+        Returns:
+            Nome da classe, ou None se a rota não é limitada
+        """
+        return self._routes.get((rule, method))
+
+    def queue(self, request_class: str) -> AdmissionQueue:
+        """Fila da classe"""
+        return self._queues[request_class]
+
+    def reserved_threads(self) -> int:
+        """Threads que as classes limitadas podem ocupar juntas"""
+        return sum(queue.threads for queue in self._queues.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas de todas as classes
+
+        Returns:
+            Dict com as estatísticas de cada classe limitada
+        """
+        return {name: queue.get_stats() for name, queue in self._queues.items()}
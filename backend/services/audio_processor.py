@@ -4,9 +4,32 @@ Demonstra composição e encapsulamento em POO
 """
 
 import numpy as np
-from scipy import signal
 from typing import Tuple, Optional, List
 import logging
+import threading
+import time
+
+from services.metrics import metrics_registry
+
+# scipy.signal é importado no primeiro uso: o import leva cerca de 1 s e só
+# o caminho de áudio bruto (PCM) precisa dele
+_signal = None
+
+def _scipy_signal():
+    """Retorna o módulo scipy.signal, importando-o na primeira chamada"""
+    global _signal
+    if _signal is None:
+        from scipy import signal
+        _signal = signal
+    return _signal
+
+class UnsupportedSampleRateError(Exception):
+    """Áudio PCM enviado com taxa de amostragem diferente da configurada no servidor"""
+
+    def __init__(self, sample_rate: int, supported: int):
+        super().__init__(f"Taxa de amostragem não suportada: {sample_rate} Hz (use {supported} Hz)")
+        self.sample_rate = sample_rate
+        self.supported = supported
 
 class AudioProcessor:
     """
@@ -14,19 +37,32 @@ class AudioProcessor:
     para detectar sopros e filtrar ruídos ambientais.
     """
     
+    # Menor taxa em que os filtros (até 2000 Hz) ficam abaixo da frequência de Nyquist
+    MIN_SAMPLE_RATE = 8000
+    
     def __init__(self, sample_rate: int = 44100):
         """
         Construtor do processador de áudio
         
         Args:
             sample_rate: Taxa de amostragem do áudio
+            
+        Raises:
+            ValueError: taxa menor que MIN_SAMPLE_RATE
         """
+        if sample_rate < self.MIN_SAMPLE_RATE:
+            raise ValueError(f"Taxa de amostragem não suportada: {sample_rate} Hz "
+                             f"(mínimo {self.MIN_SAMPLE_RATE} Hz)")
         self.sample_rate = sample_rate
         self.frame_size = 1024
         self.hop_length = 512
         
-        # Filtros para diferentes tipos de sopro
-        self._setup_blow_filters()
+        # Filtros para diferentes tipos de sopro (projetados no primeiro uso;
+        # low_pass_filter é o último atribuído e indica que os três estão prontos)
+        self.blow_filter = None
+        self.high_pass_filter = None
+        self.low_pass_filter = None
+        self._filters_lock = threading.Lock()
         
         # Sistema de calibração de ruído ambiente
         self.background_noise_level = 0.0
@@ -36,27 +72,48 @@ class AudioProcessor:
         self._logger = logging.getLogger("AudioProcessor")
     
     def _setup_blow_filters(self) -> None:
-        """Configura filtros específicos para detecção de sopros"""
-        # Filtro passa-banda para frequências de sopro (200-800 Hz)
-        self.blow_filter = signal.butter(
-            4, 
-            [200 / (self.sample_rate/2), 800 / (self.sample_rate/2)], 
-            btype='band'
-        )
-        
-        # Filtro passa-alta para remover ruídos de baixa frequência
-        self.high_pass_filter = signal.butter(
-            2, 
-            100 / (self.sample_rate/2), 
-            btype='high'
-        )
-        
-        # Filtro passa-baixa para remover ruídos de alta frequência
-        self.low_pass_filter = signal.butter(
-            2, 
-            2000 / (self.sample_rate/2), 
-            btype='low'
-        )
+        """
+        Configura filtros específicos para detecção de sopros
+        
+        O warm-up em segundo plano e os primeiros frames podem chegar aqui ao
+        mesmo tempo: os filtros são projetados uma vez, sob o lock, e os três
+        são publicados juntos (low_pass_filter por último)
+        """
+        if self.low_pass_filter is not None:
+            return
+        with self._filters_lock:
+            if self.low_pass_filter is not None:
+                return
+            signal = _scipy_signal()
+            
+            # Filtro passa-banda para frequências de sopro (200-800 Hz)
+            blow_filter = signal.butter(
+                4, 
+                [200 / (self.sample_rate/2), 800 / (self.sample_rate/2)], 
+                btype='band'
+            )
+            
+            # Filtro passa-alta para remover ruídos de baixa frequência
+            high_pass_filter = signal.butter(
+                2, 
+                100 / (self.sample_rate/2), 
+                btype='high'
+            )
+            
+            # Filtro passa-baixa para remover ruídos de alta frequência
+            low_pass_filter = signal.butter(
+                2, 
+                2000 / (self.sample_rate/2), 
+                btype='low'
+            )
+            
+            self.blow_filter = blow_filter
+            self.high_pass_filter = high_pass_filter
+            self.low_pass_filter = low_pass_filter
+    
+    def warm_up(self) -> None:
+        """Importa o SciPy e projeta os filtros antes do primeiro áudio"""
+        self._setup_blow_filters()
     
     def calibrate_background_noise(self, audio_samples: List[np.ndarray], duration: float = 3.0) -> None:
         """
@@ -92,41 +149,84 @@ class AudioProcessor:
         Returns:
             Tuple (blow_detected, intensity, metadata)
         """
-        # Log para debug
-        print(f"DEBUG: Tipo dos dados de áudio: {type(audio_data)}")
-        print(f"DEBUG: Tamanho dos dados: {len(audio_data)} bytes")
-        print(f"DEBUG: Primeiros 20 bytes: {audio_data[:20]}")
+        started = time.perf_counter()
+        
+        # Log para debug (só no nível DEBUG; amostrado pelo filtro de log_pipeline)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("Áudio recebido: %s, %d bytes, primeiros 20 bytes: %r",
+                               type(audio_data).__name__, len(audio_data), audio_data[:20],
+                               extra={"sample_key": "detect_blow"})
         
         # Converter bytes para array numpy
         try:
             audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
         except ValueError as e:
-            print(f"DEBUG: Erro ao converter áudio: {e}")
+            self._logger.warning("Erro ao converter áudio como int16: %s", e)
             # Tentar com dtype diferente se necessário
             try:
                 audio_array = np.frombuffer(audio_data, dtype=np.uint8).astype(np.float32)
-                print("DEBUG: Convertido com uint8")
+                self._logger.debug("Áudio convertido com uint8")
             except ValueError as e2:
-                print(f"DEBUG: Erro também com uint8: {e2}")
+                self._logger.warning("Erro também com uint8: %s", e2)
                 raise e
         
         # Normalizar áudio
         audio_array = audio_array / np.max(np.abs(audio_array))
+        started = self._record_stage("decode", started)
         
         # Pré-processar áudio
         processed_audio = self._preprocess_audio(audio_array)
+        started = self._record_stage("preprocess", started)
         
         # Aplicar filtros específicos para sopro
         filtered_audio = self._apply_blow_filters(processed_audio)
+        started = self._record_stage("filter", started)
         
         # Detectar sopro
         blow_detected, intensity = self._analyze_blow_pattern(filtered_audio)
+        started = self._record_stage("analyze", started)
         
         # Calcular metadados
         metadata = self._calculate_audio_metadata(audio_array, filtered_audio)
+        self._record_stage("metadata", started)
         
         return blow_detected, intensity, metadata
     
+    @staticmethod
+    def estimate_level_db(audio_data: bytes) -> float:
+        """
+        Estimativa barata do nível do áudio (só RMS, sem filtros nem FFT),
+        usada no modo degradado em vez de detect_blow
+
+        Args:
+            audio_data: Dados de áudio em bytes (PCM int16)
+
+        Returns:
+            Nível RMS em dBFS (-100 para silêncio), na mesma escala do
+            metering enviado pelo frontend
+        """
+        audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(audio_array ** 2))) if len(audio_array) else 0.0
+        if rms <= 0:
+            return -100.0
+        return max(20 * np.log10(rms / 32768), -100.0)
+
+    @staticmethod
+    def _record_stage(stage: str, started: float) -> float:
+        """
+        Registra o tempo de uma etapa de detect_blow nas métricas
+        
+        Args:
+            stage: Nome da etapa
+            started: perf_counter no início da etapa
+            
+        Returns:
+            perf_counter no fim da etapa (início da próxima)
+        """
+        now = time.perf_counter()
+        metrics_registry.observe("aetheria_dsp_stage_duration_seconds", now - started, (stage,))
+        return now
+    
     def _preprocess_audio(self, audio_array: np.ndarray) -> np.ndarray:
         """
         Pré-processa áudio removendo DC offset e aplicando normalização
@@ -141,7 +241,7 @@ class AudioProcessor:
         audio_array = audio_array - np.mean(audio_array)
         
         # Aplicar janela de Hamming para reduzir vazamento espectral
-        window = signal.windows.hamming(len(audio_array))
+        window = _scipy_signal().windows.hamming(len(audio_array))
         audio_array = audio_array * window
         
         return audio_array
@@ -156,6 +256,9 @@ class AudioProcessor:
         Returns:
             Áudio filtrado
         """
+        self._setup_blow_filters()
+        signal = _scipy_signal()
+        
         # Aplicar filtro passa-banda para frequências de sopro
         filtered = signal.filtfilt(*self.blow_filter, audio_array)
         
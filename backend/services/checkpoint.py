@@ -0,0 +1,239 @@
+"""
+Checkpoint incremental dos jogos em memória
+Grava em segundo plano apenas os jogos alterados em um arquivo append-only
+e restaura todos os jogos em lote quando o backend reinicia
+"""
+
+from typing import Dict, Any, Optional
+import os
+import atexit
+import pickle
+import struct
+import threading
+import time
+import logging
+
+from services.game_store import InMemoryGameStore
+
+
+class GameCheckpointer:
+    """
+    Mantém um log append-only com snapshots dos jogos.
+
+    Formato de cada registro: cabeçalho (tipo, tamanho do id, tamanho do
+    payload) seguido do id do jogo e do snapshot (pickle). O último registro
+    de cada jogo vence; registros de remoção apagam o jogo. Quando o log
+    cresce demais em relação ao número de jogos vivos, ele é compactado.
+    """
+
+    RECORD_PUT = 1
+    RECORD_DELETE = 2
+    RECORD_SEQUENCE = 3
+
+    _HEADER = struct.Struct("<BHI")
+    _SEQUENCE = struct.Struct("<Q")
+
+    def __init__(self, store: InMemoryGameStore, path: str, interval: float = 2.0,
+                 compact_ratio: int = 4, compact_min_records: int = 1000):
+        """
+        Args:
+            store: Store em memória cujos jogos serão salvos
+            path: Caminho do arquivo de checkpoint
+            interval: Intervalo entre checkpoints em segundos
+            compact_ratio: Compacta quando registros > compact_ratio * jogos vivos
+            compact_min_records: Número mínimo de registros antes de compactar
+        """
+        self._store = store
+        self._path = path
+        self._interval = interval
+        self._compact_ratio = compact_ratio
+        self._compact_min_records = compact_min_records
+
+        self._file = None
+        self._records = 0
+        self._last_sequence = 0
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats = {
+            "restored_games": 0,
+            "restore_seconds": 0.0,
+            "checkpoints": 0,
+            "games_written": 0,
+            "last_checkpoint_seconds": 0.0,
+            "compactions": 0
+        }
+
+        self._logger = logging.getLogger("GameCheckpointer")
+
+    def restore(self) -> int:
+        """
+        Restaura os jogos do arquivo de checkpoint para o store (em lote)
+
+        Returns:
+            Número de jogos restaurados
+        """
+        start = time.perf_counter()
+        payloads: Dict[str, bytes] = {}
+        sequence = 0
+
+        if os.path.exists(self._path):
+            with open(self._path, "rb") as f:
+                data = f.read()
+            view = memoryview(data)
+            offset = 0
+            while offset + self._HEADER.size <= len(data):
+                kind, id_len, payload_len = self._HEADER.unpack_from(data, offset)
+                end = offset + self._HEADER.size + id_len + payload_len
+                if end > len(data):
+                    # Registro incompleto (processo interrompido durante a escrita)
+                    self._logger.warning("Registro truncado no checkpoint, ignorando o final do arquivo")
+                    break
+                id_start = offset + self._HEADER.size
+                game_id = bytes(view[id_start:id_start + id_len]).decode("utf-8")
+                payload = view[id_start + id_len:end]
+                if kind == self.RECORD_PUT:
+                    payloads[game_id] = payload
+                elif kind == self.RECORD_DELETE:
+                    payloads.pop(game_id, None)
+                elif kind == self.RECORD_SEQUENCE:
+                    sequence = self._SEQUENCE.unpack(payload)[0]
+                offset = end
+
+        games = [pickle.loads(payload) for payload in payloads.values()]
+        restored = self._store.restore(games, sequence)
+        self._last_sequence = sequence
+
+        # Reescrever o arquivo compactado, reaproveitando os snapshots já lidos
+        self._rewrite({game_id: bytes(payload) for game_id, payload in payloads.items()}, sequence)
+
+        elapsed = time.perf_counter() - start
+        self._stats["restored_games"] = restored
+        self._stats["restore_seconds"] = elapsed
+        self._logger.info(f"{restored} jogos restaurados do checkpoint em {elapsed * 1000:.1f} ms")
+
+        return restored
+
+    def start(self) -> None:
+        """Inicia a thread de checkpoint em segundo plano"""
+        if self._thread is not None:
+            return
+        if self._file is None:
+            self._file = open(self._path, "ab")
+        self._thread = threading.Thread(target=self._run, name="GameCheckpointer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Para a thread e grava um último checkpoint"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._interval * 2)
+            self._thread = None
+        self.checkpoint_once()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.checkpoint_once()
+            except Exception as e:
+                self._logger.error(f"Erro ao gravar checkpoint: {str(e)}", exc_info=True)
+
+    def checkpoint_once(self) -> int:
+        """
+        Grava os jogos alterados desde o último checkpoint
+
+        Returns:
+            Número de registros gravados
+        """
+        with self._write_lock:
+            if self._file is None:
+                return 0
+
+            start = time.perf_counter()
+            dirty, removed = self._store.drain_changes()
+            sequence = self._store.sequence
+
+            buffer = bytearray()
+            count = 0
+            for game_id in removed:
+                self._append_record(buffer, self.RECORD_DELETE, game_id, b"")
+                count += 1
+            for game_id in dirty:
+                snapshot = self._store.snapshot(game_id)
+                if snapshot is None:
+                    continue
+                self._append_record(buffer, self.RECORD_PUT, game_id, snapshot)
+                count += 1
+            if sequence != self._last_sequence:
+                self._append_record(buffer, self.RECORD_SEQUENCE, "", self._SEQUENCE.pack(sequence))
+                self._last_sequence = sequence
+
+            if not buffer:
+                return 0
+
+            self._file.write(buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._records += count
+
+            self._stats["checkpoints"] += 1
+            self._stats["games_written"] += len(dirty)
+            self._stats["last_checkpoint_seconds"] = time.perf_counter() - start
+
+            if self._records > max(self._compact_ratio * len(self._store), self._compact_min_records):
+                self._compact()
+
+            return count
+
+    def _compact(self) -> None:
+        """Reescreve o log apenas com o estado atual de cada jogo"""
+        payloads = {}
+        for game_id in self._store.game_ids():
+            snapshot = self._store.snapshot(game_id)
+            if snapshot is not None:
+                payloads[game_id] = snapshot
+        self._rewrite(payloads, self._store.sequence)
+        self._stats["compactions"] += 1
+
+    def _rewrite(self, payloads: Dict[str, bytes], sequence: int) -> None:
+        """Grava um novo arquivo com os snapshots e substitui o atual de forma atômica"""
+        buffer = bytearray()
+        for game_id, payload in payloads.items():
+            self._append_record(buffer, self.RECORD_PUT, game_id, payload)
+        self._append_record(buffer, self.RECORD_SEQUENCE, "", self._SEQUENCE.pack(sequence))
+
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+
+        if self._file is not None:
+            self._file.close()
+            self._file = open(self._path, "ab")
+        self._records = len(payloads)
+
+    def _append_record(self, buffer: bytearray, kind: int, game_id: str, payload: bytes) -> None:
+        encoded_id = game_id.encode("utf-8")
+        buffer += self._HEADER.pack(kind, len(encoded_id), len(payload))
+        buffer += encoded_id
+        buffer += payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do checkpoint
+
+        Returns:
+            Dict com estatísticas de gravação e recuperação
+        """
+        stats = dict(self._stats)
+        stats["path"] = self._path
+        stats["file_size_bytes"] = os.path.getsize(self._path) if os.path.exists(self._path) else 0
+        return stats
@@ -0,0 +1,229 @@
+"""
+Pool de processos para o DSP do áudio bruto (PCM)
+O detect_blow e as features de cada jogo são CPU (NumPy/SciPy) e, na thread
+da requisição, disputam o GIL com as demais requisições. O pool executa
+esse cálculo em outros processos: o áudio é copiado para um bloco de
+memória compartilhada e o processo devolve apenas valores escalares. O
+estado dos jogos continua sendo alterado só no processo dono do store.
+"""
+
+from typing import Dict, Any, Deque, List, Optional, Tuple, Type
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from models.base_game import BaseGame
+from services.audio_processor import AudioProcessor
+from services.metrics import metrics_registry
+
+# Estado de cada processo do pool (criado por _init_worker)
+_worker_slots: List[SharedMemory] = []
+_worker_processor: Optional[AudioProcessor] = None
+_worker_sample_rate = 44100
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Abre um bloco criado pelo processo principal. Só quem cria o bloco deve
+    registrá-lo no resource_tracker; senão o tracker o removeria quando o
+    processo do pool terminasse.
+    """
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _init_worker(slot_names: List[str], sample_rate: int) -> None:
+    """Inicializador de cada processo: abre os blocos e aquece o DSP"""
+    global _worker_slots, _worker_processor, _worker_sample_rate
+    _worker_slots = [_attach(name) for name in slot_names]
+    _worker_sample_rate = sample_rate
+    _worker_processor = AudioProcessor(sample_rate)
+    _worker_processor.warm_up()
+
+
+def _analyze_slot(slot: int, length: int, game_class: Type[BaseGame],
+                  noise_level: Optional[float]) -> Tuple[bool, float, Dict[str, Any], Dict[str, Any]]:
+    """
+    Executado no processo do pool: DSP sobre o áudio do bloco `slot`
+
+    Args:
+        slot: Índice do bloco de memória compartilhada
+        length: Bytes de áudio no bloco
+        game_class: Classe do jogo (define as features extraídas)
+        noise_level: Ruído ambiente calibrado no processo principal (None = sem calibração)
+
+    Returns:
+        Tuple (blow_detected, intensity, metadata, features do jogo)
+    """
+    # A calibração é feita no processo principal; cada tarefa leva o valor atual
+    _worker_processor.is_calibrated = noise_level is not None
+    _worker_processor.background_noise_level = noise_level or 0.0
+    
+    audio = _worker_slots[slot].buf[:length]
+    try:
+        blow_detected, intensity, metadata = _worker_processor.detect_blow(audio)
+        features = game_class.extract_audio_features(np.frombuffer(audio, dtype=np.int16), _worker_sample_rate)
+    finally:
+        # A view precisa ser liberada para o bloco poder ser fechado
+        audio.release()
+    return blow_detected, intensity, metadata, features
+
+
+def _ping() -> int:
+    """Tarefa vazia usada para iniciar os processos do pool"""
+    return os.getpid()
+
+
+class DSPPool:
+    """
+    Pool limitado de processos para o DSP do áudio bruto.
+
+    Cada tarefa ocupa um bloco de memória compartilhada (slot) do início ao
+    fim; com todos os slots ocupados, a requisição espera (em ordem de
+    chegada) um slot livre, o que limita a fila do pool a `slots` tarefas.
+    """
+
+    def __init__(self, workers: int, slots: Optional[int] = None,
+                 slot_bytes: int = 1 << 20, sample_rate: int = 44100):
+        """
+        Args:
+            workers: Processos do pool
+            slots: Tarefas simultâneas (em execução + na fila), padrão 2x workers
+            slot_bytes: Tamanho máximo de um chunk de áudio; maiores são
+                        processados na thread da requisição
+            sample_rate: Taxa de amostragem do áudio
+        """
+        self._workers = workers
+        self._slot_bytes = slot_bytes
+        self._slots = [SharedMemory(create=True, size=slot_bytes) for _ in range(slots or 2 * workers)]
+        self._free: List[int] = list(range(len(self._slots)))
+        # Requisições esperando um slot, em ordem de chegada: o slot liberado
+        # vai direto para a mais antiga (sem isso, a thread que acabou de
+        # liberar o slot tende a pegá-lo de volta e as outras esperam demais)
+        self._waiters: Deque[Tuple[threading.Event, List[int]]] = deque()
+
+        # forkserver: os processos não herdam as threads nem os locks do servidor
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["services.dsp_pool"])
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker,
+            initargs=([slot.name for slot in self._slots], sample_rate)
+        )
+
+        self._pending = 0
+        self._completed = 0
+        self._oversized = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> int:
+        """Tarefas em execução ou esperando um slot"""
+        return self._pending
+
+    def fits(self, audio_data: bytes) -> bool:
+        """Se o chunk cabe em um slot"""
+        return len(audio_data) <= self._slot_bytes
+
+    def analyze(self, audio_data: bytes, game_class: Type[BaseGame],
+                noise_level: Optional[float] = None) -> Tuple[bool, float, Dict[str, Any], Dict[str, Any]]:
+        """
+        Executa detect_blow e as features do jogo em um processo do pool
+
+        Args:
+            audio_data: Áudio PCM (int16), até slot_bytes
+            game_class: Classe do jogo (define as features extraídas)
+            noise_level: Ruído ambiente calibrado (None = sem calibração)
+
+        Returns:
+            Tuple (blow_detected, intensity, metadata, features do jogo)
+        """
+        if not self.fits(audio_data):
+            raise ValueError(f"Chunk de {len(audio_data)} bytes maior que o slot ({self._slot_bytes})")
+
+        started = time.perf_counter()
+        slot = self._acquire_slot()
+        queued = time.perf_counter()
+        try:
+            self._slots[slot].buf[:len(audio_data)] = audio_data
+            result = self._executor.submit(_analyze_slot, slot, len(audio_data), game_class, noise_level).result()
+        finally:
+            self._release_slot(slot)
+        finished = time.perf_counter()
+
+        metrics_registry.observe("aetheria_dsp_pool_task_seconds", queued - started, ("wait",))
+        metrics_registry.observe("aetheria_dsp_pool_task_seconds", finished - queued, ("run",))
+        return result
+
+    def _acquire_slot(self) -> int:
+        """Reserva um slot livre, esperando em ordem de chegada se não houver"""
+        with self._lock:
+            self._pending += 1
+            if self._free and not self._waiters:
+                return self._free.pop()
+            waiter = (threading.Event(), [])
+            self._waiters.append(waiter)
+        waiter[0].wait()
+        return waiter[1][0]
+
+    def _release_slot(self, slot: int) -> None:
+        """Libera o slot, entregando-o à requisição que espera há mais tempo"""
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            if self._waiters:
+                event, holder = self._waiters.popleft()
+                holder.append(slot)
+                event.set()
+            else:
+                self._free.append(slot)
+
+    def warm_up(self) -> None:
+        """Inicia todos os processos do pool (cada um importa o SciPy e projeta os filtros)"""
+        futures = [self._executor.submit(_ping) for _ in range(self._workers)]
+        for future in futures:
+            future.result()
+
+    def record_oversized(self) -> None:
+        """Conta um chunk processado fora do pool por ser maior que o slot"""
+        with self._lock:
+            self._oversized += 1
+
+    def close(self) -> None:
+        """Encerra os processos e libera a memória compartilhada"""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do pool
+
+        Returns:
+            Dict com processos, slots, tarefas pendentes/concluídas e chunks fora do pool
+        """
+        return {
+            "workers": self._workers,
+            "slots": len(self._slots),
+            "slot_bytes": self._slot_bytes,
+            "pending": self._pending,
+            "completed": self._completed,
+            "oversized_inline": self._oversized
+        }
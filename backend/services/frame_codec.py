@@ -0,0 +1,311 @@
+"""
+Codificação compacta do estado do jogo nas respostas de /audio
+Envia apenas os campos que mudaram desde o último frame confirmado pelo
+cliente (ack_seq), em JSON ou em um layout binário fixo
+"""
+
+from typing import Dict, Any, Optional, Tuple, List
+from collections import OrderedDict, deque
+import json
+import struct
+import threading
+
+
+# Layout fixo de campos (a posição define o bit na máscara de presença).
+# Novos campos devem ser adicionados sempre ao final. Campos fora do layout
+# (ou com valor que não cabe no tipo) vão na seção extra do frame binário.
+#   f = float32, i = int32, b = flag (bit em "flags"), e = enum (uint8)
+FIELD_LAYOUT: List[Tuple[str, str]] = [
+    ("blow_detected", "b"),
+    ("blow_intensity", "f"),
+    ("score", "i"),
+    ("game_progress", "f"),
+    ("activity", "e"),
+    ("state_changed", "b"),
+    ("next_poll_ms", "i"),
+    ("seq", "i"),
+    ("audio_metering_db", "f"),
+    # Barco
+    ("boat_position", "f"),
+    ("boat_speed", "f"),
+    ("consecutive_blows", "i"),
+    # Balão
+    ("blow_duration", "f"),
+    ("balloon_size", "f"),
+    ("balloon_pressure", "f"),
+    ("balloon_pressure_percent", "f"),
+    ("is_balloon_full", "b"),
+    ("is_balloon_popped", "b"),
+    ("balloon_size_percent", "f"),
+    # Metadados do áudio bruto (audio_metadata.*)
+    ("audio_metadata.dominant_frequency", "f"),
+    ("audio_metadata.low_frequency_energy", "f"),
+    ("audio_metadata.mid_frequency_energy", "f"),
+    ("audio_metadata.high_frequency_energy", "f"),
+    ("audio_metadata.total_energy", "f"),
+    ("audio_metadata.snr", "f"),
+    # Frame PCM processado no modo degradado (só RMS, ver OverloadGuard)
+    ("degraded", "b"),
+    # Frames de intensidade combinados pela caixa de entrada do jogo (GameInbox)
+    ("coalesced_frames", "i"),
+    ("blow_frames", "i"),
+    ("balloon_pressure_start", "f"),
+]
+
+FIELD_INDEX = {name: i for i, (name, _) in enumerate(FIELD_LAYOUT)}
+_FIELD_KINDS = dict(FIELD_LAYOUT)
+_FLAG_FIELDS = [(name, i) for i, (name, kind) in enumerate(FIELD_LAYOUT) if kind == "b"]
+_STRUCT_CODES = {"f": "f", "i": "i", "e": "B"}
+
+ACTIVITY_CODES = ["idle", "blowing", "decelerating", "leaking"]
+
+# version (u8), seq (u32), base_seq (u32, 0 = keyframe), presença (u64), flags (u32)
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<BIIQI")
+
+# Bit da máscara de presença que indica a seção extra no fim do frame:
+# tamanho (u32) + JSON UTF-8 com os campos achatados fora do layout
+EXTRA_FIELDS_BIT = 63
+EXTRA_LENGTH = struct.Struct("<I")
+
+RESPONSE_MODES = ("full", "delta", "binary")
+
+
+class FrameEncodingError(Exception):
+    """Estado do jogo que não pôde ser codificado no modo compacto pedido"""
+
+
+def flatten_state(game_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Achata o estado do jogo (audio_metadata vira audio_metadata.*)
+
+    Campos fora de FIELD_LAYOUT são mantidos (vão na seção extra do frame binário)
+    """
+    flat = {}
+    for key, value in game_state.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[key + "." + sub_key] = sub_value
+        else:
+            flat[key] = value
+    return flat
+
+
+def unflatten_state(flat: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverso de flatten_state"""
+    state: Dict[str, Any] = {}
+    for key, value in flat.items():
+        if "." in key:
+            parent, child = key.split(".", 1)
+            state.setdefault(parent, {})[child] = value
+        else:
+            state[key] = value
+    return state
+
+
+def diff_states(base: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Campos de current que diferem de base
+
+    Returns:
+        Dict com os campos alterados, ou None se o conjunto de campos mudou
+        (nesse caso é preciso enviar um keyframe)
+    """
+    if base.keys() != current.keys():
+        return None
+    # NaN nunca é igual a si mesmo: o campo apenas é reenviado
+    return {key: value for key, value in current.items() if base[key] != value}
+
+
+def encode_binary(seq: int, base_seq: int, fields: Dict[str, Any], flag_values: Dict[str, Any]) -> bytes:
+    """
+    Empacota campos achatados no layout binário
+
+    Args:
+        seq: Sequência do frame
+        base_seq: Sequência de referência do delta (0 = keyframe)
+        fields: Campos presentes neste frame
+        flag_values: Estado atual de todos os campos booleanos
+
+    Raises:
+        FrameEncodingError: campo extra que não é serializável em JSON
+    """
+    flags = 0
+    for name, i in _FLAG_FIELDS:
+        if flag_values.get(name):
+            flags |= 1 << i
+
+    presence = 0
+    values = []
+    formats = ["<"]
+    extra = {}
+    for name in sorted(fields, key=lambda name: FIELD_INDEX.get(name, len(FIELD_LAYOUT))):
+        kind = _FIELD_KINDS.get(name)
+        value = fields[name]
+        if kind == "b":
+            if isinstance(value, bool):
+                presence |= 1 << FIELD_INDEX[name]
+                continue
+        elif kind is not None:
+            try:
+                packed = _pack_value(kind, value)
+            except (TypeError, ValueError, OverflowError, struct.error):
+                pass
+            else:
+                presence |= 1 << FIELD_INDEX[name]
+                formats.append(_STRUCT_CODES[kind])
+                values.append(packed)
+                continue
+        # Fora do layout ou com valor que não cabe no tipo do layout
+        extra[name] = value
+
+    body = struct.pack("".join(formats), *values)
+    if extra:
+        presence |= 1 << EXTRA_FIELDS_BIT
+        try:
+            encoded = json.dumps(extra, ensure_ascii=False, allow_nan=True).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            raise FrameEncodingError(f"Campos extras não serializáveis: {sorted(extra)}: {e}") from e
+        body += EXTRA_LENGTH.pack(len(encoded)) + encoded
+
+    header = BINARY_HEADER.pack(BINARY_VERSION, seq, base_seq, presence, flags)
+    return header + body
+
+
+def _pack_value(kind: str, value: Any) -> Any:
+    """Valor convertido para o tipo do layout (levanta erro se não couber)"""
+    if kind == "f":
+        struct.pack("<f", float(value))
+        return float(value)
+    if kind == "i":
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError("inteiro esperado")
+        struct.pack("<i", int(value))
+        return int(value)
+    return ACTIVITY_CODES.index(value)
+
+
+def decode_binary(payload: bytes) -> Tuple[int, int, Dict[str, Any]]:
+    """
+    Desempacota um frame binário
+
+    Returns:
+        Tuple (seq, base_seq, campos presentes achatados)
+    """
+    version, seq, base_seq, presence, flags = BINARY_HEADER.unpack_from(payload, 0)
+    if version != BINARY_VERSION:
+        raise ValueError(f"Versão de frame binário não suportada: {version}")
+
+    present = [(i, name, kind) for i, (name, kind) in enumerate(FIELD_LAYOUT) if presence & (1 << i)]
+    formats = "<" + "".join(_STRUCT_CODES[kind] for _, _, kind in present if kind != "b")
+    values = iter(struct.unpack_from(formats, payload, BINARY_HEADER.size))
+
+    fields = {}
+    for i, name, kind in present:
+        if kind == "b":
+            fields[name] = bool(flags & (1 << i))
+        elif kind == "e":
+            fields[name] = ACTIVITY_CODES[next(values)]
+        else:
+            fields[name] = next(values)
+
+    if presence & (1 << EXTRA_FIELDS_BIT):
+        offset = BINARY_HEADER.size + struct.calcsize(formats)
+        (length,) = EXTRA_LENGTH.unpack_from(payload, offset)
+        start = offset + EXTRA_LENGTH.size
+        fields.update(json.loads(payload[start:start + length].decode("utf-8")))
+    return seq, base_seq, fields
+
+
+def apply_frame(base_flat: Optional[Dict[str, Any]], base_seq: int, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reconstrói o estado achatado no cliente (keyframe ou delta)
+
+    Args:
+        base_flat: Estado achatado do frame base (None se o cliente não tem base)
+        base_seq: Sequência base indicada pelo servidor (0 = keyframe)
+        fields: Campos recebidos
+    """
+    if not base_seq:
+        return dict(fields)
+    if base_flat is None:
+        raise ValueError("Delta recebido sem o frame base")
+    state = dict(base_flat)
+    state.update(fields)
+    return state
+
+
+class FrameEncoder:
+    """
+    Guarda, por jogo, os últimos estados enviados para calcular deltas
+    em relação ao frame confirmado pelo cliente (ack_seq).
+
+    O histórico é local ao processo: se o cliente confirmar um frame
+    gerado por outro worker, o encoder simplesmente envia um keyframe.
+    """
+
+    def __init__(self, history_size: int = 8, max_games: int = 10000):
+        """
+        Args:
+            history_size: Frames guardados por jogo
+            max_games: Número máximo de jogos com histórico (LRU)
+        """
+        self._history_size = history_size
+        self._max_games = max_games
+        self._history: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, game_id: str, seq: int, state: Dict[str, Any]) -> Optional[deque]:
+        with self._lock:
+            frames = self._history.get(game_id)
+            if frames is None:
+                frames = deque(maxlen=self._history_size)
+                self._history[game_id] = frames
+                if len(self._history) > self._max_games:
+                    self._history.popitem(last=False)
+            else:
+                self._history.move_to_end(game_id)
+            snapshot = list(frames)
+            frames.append((seq, state))
+        return snapshot
+
+    def encode(self, game_id: str, game_state: Dict[str, Any], mode: str,
+               ack_seq: Optional[int] = None) -> Tuple[Any, bool]:
+        """
+        Codifica o estado para o modo pedido pelo cliente
+
+        Args:
+            game_id: ID do jogo
+            game_state: Estado completo retornado pelo GameManager (com "seq")
+            mode: "delta" (JSON) ou "binary"
+            ack_seq: Último frame que o cliente aplicou
+
+        Returns:
+            Tuple (corpo da resposta: dict ou bytes, é keyframe)
+
+        Raises:
+            FrameEncodingError: estado que não pôde ser codificado no modo pedido
+        """
+        seq = int(game_state["seq"])
+        previous = self._remember(game_id, seq, game_state)
+
+        # O delta é calculado no primeiro nível: audio_metadata, quando
+        # muda, é reenviado inteiro (muda junto com o frame de áudio)
+        base_seq = 0
+        changes = game_state
+        if ack_seq:
+            for frame_seq, frame in previous:
+                if frame_seq == ack_seq:
+                    delta = diff_states(frame, game_state)
+                    if delta is not None:
+                        base_seq, changes = ack_seq, delta
+                    break
+
+        if mode == "binary":
+            return encode_binary(seq, base_seq, flatten_state(changes), game_state), base_seq == 0
+
+        return {
+            "seq": seq,
+            "base_seq": base_seq or None,
+            "changes": changes
+        }, base_seq == 0
@@ -0,0 +1,304 @@
+"""
+Caixa de entrada limitada por jogo para frames de intensidade
+Clientes móveis com rede instável enviam de uma vez vários frames que
+ficaram na fila do aparelho. Em vez de simular cada um (e em ordem
+arbitrária) contra o mesmo jogo, os frames que chegam enquanto o jogo está
+ocupado são combinados em um só: maior intensidade e número de frames de
+sopro (tempo de sopro integrado). Frames atrasados são descartados pela
+sequência do cliente: repetidos ou mais antigos que a janela de reordenação.
+"""
+
+from typing import Dict, Any, Optional, Callable, Tuple
+from collections import OrderedDict
+import logging
+import threading
+
+from services.metrics import metrics_registry
+
+
+class CoalescedFrame:
+    """Frames de intensidade de um jogo acumulados para uma única aplicação"""
+
+    __slots__ = ("intensity", "metering_db", "frames", "blow_frames", "frame_seq")
+
+    def __init__(self):
+        self.intensity = 0.0
+        self.metering_db: Optional[float] = None
+        self.frames = 0
+        self.blow_frames = 0
+        self.frame_seq: Optional[int] = None
+
+    def add(self, intensity: float, metering_db: Optional[float], blow_detected: bool,
+            frame_seq: Optional[int]) -> None:
+        """Combina mais um frame (mantém os maiores valores e soma os frames)"""
+        if self.frames == 0 or intensity > self.intensity:
+            self.intensity = intensity
+        if metering_db is not None and (self.metering_db is None or metering_db > self.metering_db):
+            self.metering_db = metering_db
+        self.frames += 1
+        if blow_detected:
+            self.blow_frames += 1
+        if frame_seq is not None and (self.frame_seq is None or frame_seq > self.frame_seq):
+            self.frame_seq = frame_seq
+
+    @property
+    def blow_detected(self) -> bool:
+        """Se algum dos frames combinados foi sopro"""
+        return self.blow_frames > 0
+
+
+class _GameSlot:
+    """Estado da caixa de entrada de um jogo (protegido por `condition`)"""
+
+    __slots__ = ("condition", "users", "busy", "pending", "pending_batch", "next_batch",
+                 "waiting", "readers", "results", "highest_seq", "seen")
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.users = 0             # threads dentro de submit (slots em uso não são descartados)
+        self.busy = False          # um lote está sendo aplicado
+        self.pending: Optional[CoalescedFrame] = None
+        self.pending_batch = 0
+        self.next_batch = 0
+        self.waiting = 0
+        self.readers: Dict[int, int] = {}
+        self.results: Dict[int, Tuple[str, Optional[Dict[str, Any]], Optional[BaseException]]] = {}
+        self.highest_seq = 0       # maior sequência do cliente recebida
+        self.seen = 0              # bit i: sequência highest_seq - i já recebida
+
+
+class GameInbox:
+    """
+    Serializa os frames de intensidade de cada jogo com combinação de frames.
+
+    O primeiro frame de um jogo ocioso é aplicado na hora pela própria
+    requisição. Os que chegam enquanto ele é aplicado vão para um lote
+    pendente; quando o jogo fica livre, uma das requisições do lote aplica o
+    lote inteiro de uma vez e todas recebem o mesmo estado resultante. Para
+    clientes que aceitam a resposta "queued" (allow_queue), no máximo
+    `capacity` requisições esperam por jogo; além disso o frame entra no
+    lote e a requisição retorna na hora como "queued". Os demais clientes
+    sempre esperam o lote do seu frame, pois dependem do estado do jogo na
+    resposta. Um lote sem requisição esperando é aplicado pela requisição
+    que estava aplicando o anterior, antes de liberar o jogo. Assim cada
+    jogo faz uma atualização no store por lote, qualquer que seja o tamanho
+    da rajada.
+
+    Frames com sequência do cliente passam por uma janela deslizante (como a
+    proteção contra replay do SRTP): um frame fora de ordem ainda é aceito
+    se estiver a menos de `window` frames do mais novo e não tiver sido
+    recebido antes; repetidos e mais antigos são descartados.
+    """
+
+    def __init__(self, capacity: int = 4, window: int = 64, max_games: int = 10000):
+        """
+        Args:
+            capacity: Requisições esperando por jogo antes de responder "queued"
+                      (só para clientes que aceitam essa resposta)
+            window: Frames fora de ordem aceitos atrás do mais novo (1-64)
+            max_games: Jogos com estado na caixa de entrada antes de descartar os ociosos mais antigos
+        """
+        self._capacity = max(capacity, 0)
+        self._window = min(max(window, 1), 64)
+        self._max_games = max_games
+        self._slots: "OrderedDict[str, _GameSlot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"applied": 0, "coalesced": 0, "batches": 0, "queued": 0, "stale": 0}
+        self._logger = logging.getLogger("GameInbox")
+
+    @property
+    def window(self) -> int:
+        """Tamanho da janela de reordenação (frames)"""
+        return self._window
+
+    def submit(self, game_id: str, intensity: float, metering_db: Optional[float], blow_detected: bool,
+               frame_seq: Optional[int], apply: Callable[[CoalescedFrame], Dict[str, Any]],
+               allow_queue: bool = False) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Entrega um frame de intensidade ao jogo
+
+        Args:
+            game_id: ID do jogo
+            intensity: Intensidade do frame (0-1)
+            metering_db: Nível de metering em dB (opcional)
+            blow_detected: Se o frame é um sopro
+            frame_seq: Sequência do frame no cliente (opcional)
+            apply: Aplica um lote ao jogo e retorna o estado resultante; pode
+                   recusar o lote retornando {"dropped": True, "last_frame_seq": n}
+                   (ex: outro worker já aplicou frames bem mais novos)
+            allow_queue: Se o cliente aceita "queued" (sem estado do jogo) quando
+                         já há `capacity` requisições esperando; sem isso a
+                         requisição espera o lote do seu frame
+
+        Returns:
+            Tuple (resultado, dados): ("applied", estado do jogo após o lote
+            com este frame), ("queued", None) (só com allow_queue) ou
+            ("stale", {"last_frame_seq": n})
+
+        Raises:
+            Exception: o erro levantado por apply no lote deste frame
+        """
+        with self._lock:
+            slot = self._slots.get(game_id)
+            if slot is None:
+                slot = self._slots[game_id] = _GameSlot()
+                if len(self._slots) > self._max_games:
+                    self._evict_idle()
+            else:
+                self._slots.move_to_end(game_id)
+            slot.users += 1
+        try:
+            return self._submit(slot, intensity, metering_db, blow_detected, frame_seq, apply, allow_queue)
+        finally:
+            with self._lock:
+                slot.users -= 1
+
+    def _evict_idle(self) -> None:
+        """Descarta os jogos ociosos usados há mais tempo (chamado com self._lock)"""
+        for game_id in list(self._slots):
+            if len(self._slots) <= self._max_games:
+                break
+            if self._slots[game_id].users == 0:
+                del self._slots[game_id]
+
+    def discard(self, game_id: str) -> None:
+        """
+        Descarta o estado do jogo (ex: no fim do jogo)
+
+        Args:
+            game_id: ID do jogo
+        """
+        with self._lock:
+            self._slots.pop(game_id, None)
+
+    def _submit(self, slot: _GameSlot, intensity: float, metering_db: Optional[float], blow_detected: bool,
+                frame_seq: Optional[int], apply: Callable[[CoalescedFrame], Dict[str, Any]],
+                allow_queue: bool) -> Tuple[str, Optional[Dict[str, Any]]]:
+        with slot.condition:
+            if frame_seq is not None and not self._accept_sequence(slot, frame_seq):
+                self._counts["stale"] += 1
+                metrics_registry.inc("aetheria_inbox_frames_total", ("stale",))
+                return "stale", {"last_frame_seq": slot.highest_seq}
+
+            if slot.pending is None:
+                slot.pending = CoalescedFrame()
+                slot.pending_batch = slot.next_batch
+                slot.next_batch += 1
+            slot.pending.add(intensity, metering_db, blow_detected, frame_seq)
+            batch = slot.pending_batch
+
+            if slot.busy:
+                if allow_queue and slot.waiting >= self._capacity:
+                    self._counts["queued"] += 1
+                    metrics_registry.inc("aetheria_inbox_frames_total", ("queued",))
+                    return "queued", None
+                slot.waiting += 1
+                slot.readers[batch] = slot.readers.get(batch, 0) + 1
+                try:
+                    slot.condition.wait_for(lambda: batch in slot.results or not slot.busy)
+                finally:
+                    slot.waiting -= 1
+                if batch in slot.results:
+                    return self._take_result(slot, batch)
+                # O jogo ficou livre e o lote ainda está pendente: esta requisição o aplica
+                slot.readers[batch] -= 1
+
+            frame = slot.pending
+            slot.pending = None
+            slot.busy = True
+
+        own = None
+        while True:
+            result, error = None, None
+            try:
+                result = apply(frame)
+            except Exception as e:
+                error = e
+
+            if error is not None:
+                outcome = "failed"
+            elif result.get("dropped"):
+                outcome = "stale"
+            else:
+                outcome = "coalesced" if frame.frames > 1 else "applied"
+            applied_frames = frame.frames
+            if own is None:
+                own = (outcome, result, error)
+            elif error is not None:
+                self._logger.error("Erro ao aplicar lote de %d frames sem requisição esperando: %s",
+                                   applied_frames, error)
+            with slot.condition:
+                if slot.readers.get(batch):
+                    slot.results[batch] = (outcome, result, error)
+                else:
+                    slot.readers.pop(batch, None)
+                self._counts["batches"] += 1
+                if outcome != "failed":
+                    self._counts[outcome] += applied_frames
+                # Um lote que chegou durante a aplicação e não tem requisição
+                # esperando por ele (todos os frames responderam "queued") é
+                # aplicado por esta requisição antes de liberar o jogo
+                if slot.pending is not None and not slot.readers.get(slot.pending_batch):
+                    frame, batch = slot.pending, slot.pending_batch
+                    slot.pending = None
+                else:
+                    frame = None
+                    slot.busy = False
+                slot.condition.notify_all()
+            if outcome != "failed":
+                metrics_registry.inc("aetheria_inbox_frames_total", (outcome,), applied_frames)
+                metrics_registry.observe("aetheria_inbox_batch_frames", applied_frames)
+            if frame is None:
+                break
+
+        return self._result(*own)
+
+    def _accept_sequence(self, slot: _GameSlot, frame_seq: int) -> bool:
+        """Janela deslizante de sequências (chamado com o lock do slot)"""
+        if frame_seq > slot.highest_seq:
+            shift = frame_seq - slot.highest_seq
+            slot.seen = ((slot.seen << shift) | 1) & ((1 << self._window) - 1) if shift < self._window else 1
+            slot.highest_seq = frame_seq
+            return True
+        offset = slot.highest_seq - frame_seq
+        if offset >= self._window or slot.seen & (1 << offset):
+            return False
+        slot.seen |= 1 << offset
+        return True
+
+    @classmethod
+    def _take_result(cls, slot: _GameSlot, batch: int) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Resultado do lote para uma requisição que esperou (chamado com o lock do slot)"""
+        outcome, result, error = slot.results[batch]
+        slot.readers[batch] -= 1
+        if slot.readers[batch] == 0:
+            del slot.readers[batch]
+            del slot.results[batch]
+        # Cada requisição recebe sua cópia (a resposta ainda é completada por requisição)
+        return cls._result(outcome, dict(result) if result is not None else None, error)
+
+    @staticmethod
+    def _result(outcome: str, result: Optional[Dict[str, Any]],
+                error: Optional[BaseException]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if error is not None:
+            raise error
+        if outcome == "stale":
+            return "stale", {"last_frame_seq": result["last_frame_seq"]}
+        return "applied", result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas da caixa de entrada
+
+        Returns:
+            Dict com os limites, jogos acompanhados e contadores de frames
+            (aplicados sozinhos, combinados, "queued" e atrasados)
+        """
+        with self._lock:
+            games = len(self._slots)
+        return {
+            "capacity": self._capacity,
+            "window": self._window,
+            "games": games,
+            **self._counts
+        }
@@ -3,26 +3,45 @@ Gerenciador de jogos usando padrões de design Factory e Singleton
 Demonstra conceitos avançados de POO
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+from contextlib import contextmanager
 from datetime import datetime
 import logging
 import threading
+import time
 from enum import Enum
-
-import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.base_game import BaseGame
 from models.boat_game import BoatGame
 from models.balloon_game import BalloonGame
-from services.audio_processor import AudioProcessor
+from services.audio_processor import AudioProcessor, UnsupportedSampleRateError
+from services.game_store import GameStore, InMemoryGameStore, GameNotFoundError, create_game_store
+from services.checkpoint import GameCheckpointer
+from services.polling_advisor import PollingAdvisor
+from services.session_recorder import SessionRecorder
+from services.metrics import metrics_registry
+from services.dsp_pool import DSPPool
+from services.overload_guard import OverloadGuard
+from services.game_inbox import GameInbox, CoalescedFrame
 
 class GameType(Enum):
     """Enum para tipos de jogos disponíveis"""
     BOAT = "boat"
     BALLOON = "balloon"
 
+# Classe de cada tipo de jogo (usada nos filtros de listagem)
+GAME_CLASSES = {
+    GameType.BOAT: BoatGame,
+    GameType.BALLOON: BalloonGame
+}
+
+# Tipo de cada classe de jogo (usado nas métricas)
+GAME_TYPE_NAMES = {game_class: game_type.value for game_type, game_class in GAME_CLASSES.items()}
+
+# Classe de cada jogo pelo nome gravado no store
+GAME_CLASSES_BY_NAME = {game_class.__name__: game_class for game_class in GAME_CLASSES.values()}
+
 class GameManager:
     """
     Gerenciador de jogos usando padrão Singleton
@@ -42,14 +61,158 @@ class GameManager:
     
     def __init__(self):
         """Inicializa o gerenciador de jogos"""
-        if not hasattr(self, '_initialized'):
-            self._games: Dict[str, BaseGame] = {}
-            self._audio_processor = AudioProcessor()
-            self._game_counter = 0
-            self._active_games: List[str] = []
+        # O gerenciador pode ser criado pela primeira requisição, então duas
+        # threads podem chegar aqui juntas; só uma inicializa
+        if hasattr(self, '_initialized'):
+            return
+        with self._lock:
+            if not hasattr(self, '_initialized'):
+                # Estado dos jogos: memória do processo (padrão) ou store compartilhado
+                # entre workers, ex: AETHERIA_GAME_STORE=sqlite:///tmp/aetheria_games.db
+                self._store: GameStore = create_game_store(os.environ.get('AETHERIA_GAME_STORE'))
+                # Taxa de amostragem do áudio PCM (filtros e features são projetados para ela)
+                self._audio_processor = AudioProcessor(int(os.environ.get('AETHERIA_AUDIO_SAMPLE_RATE', 44100)))
+                self._game_counter = 0
+                
+                # DSP do áudio PCM em processos separados (opcional, 0 = na thread da requisição)
+                dsp_workers = int(os.environ.get('AETHERIA_DSP_WORKERS', 0))
+                self._dsp_pool: Optional[DSPPool] = (
+                    DSPPool(dsp_workers, sample_rate=self._audio_processor.sample_rate) if dsp_workers > 0 else None
+                )
+                
+                # Sob sobrecarga, frames PCM passam ao caminho só de RMS (AETHERIA_OVERLOAD_GUARD=0 desliga)
+                self._overload_guard: Optional[OverloadGuard] = None
+                if os.environ.get('AETHERIA_OVERLOAD_GUARD', '1') != '0':
+                    self._overload_guard = OverloadGuard(
+                        enter_inflight=int(os.environ.get('AETHERIA_OVERLOAD_ENTER_INFLIGHT', 16)),
+                        exit_inflight=int(os.environ.get('AETHERIA_OVERLOAD_EXIT_INFLIGHT', 8)),
+                        enter_latency_ms=float(os.environ.get('AETHERIA_OVERLOAD_ENTER_LATENCY_MS', 20)),
+                        exit_latency_ms=float(os.environ.get('AETHERIA_OVERLOAD_EXIT_LATENCY_MS', 8)),
+                        min_hold_seconds=float(os.environ.get('AETHERIA_OVERLOAD_MIN_HOLD_SECONDS', 5))
+                    )
+                
+                self._logger = logging.getLogger("GameManager")
+                
+                # Intervalo de envio recomendado ao cliente (estado do jogo + carga)
+                self._polling_advisor = PollingAdvisor(
+                    load_capacity=int(os.environ.get('AETHERIA_POLL_LOAD_CAPACITY', 32))
+                )
+                self._inflight_audio = 0
+                self._inflight_lock = threading.Lock()
+                
+                # Frames de intensidade de cada jogo: rajadas são combinadas e frames atrasados descartados
+                self._inbox = GameInbox(capacity=int(os.environ.get('AETHERIA_INBOX_CAPACITY', 4)),
+                                        window=int(os.environ.get('AETHERIA_INBOX_WINDOW', 64)))
+                
+                # Checkpoint incremental dos jogos em memória (opcional)
+                self._checkpointer: Optional[GameCheckpointer] = None
+                checkpoint_path = os.environ.get('AETHERIA_CHECKPOINT_PATH')
+                if checkpoint_path:
+                    self._setup_checkpoint(checkpoint_path)
+                
+                # Gravação das entradas de cada sessão para replay (opcional)
+                record_dir = os.environ.get('AETHERIA_RECORD_DIR')
+                self._recorder: Optional[SessionRecorder] = (
+                    SessionRecorder(record_dir, sample_rate=self._audio_processor.sample_rate) if record_dir else None
+                )
+                
+                # Relatório do warmup (None até warm_up() terminar)
+                self._warmup_report: Optional[Dict[str, Any]] = None
+                self._warmup_lock = threading.Lock()
+                
+                self._initialized = True
+    
+    def _setup_checkpoint(self, path: str) -> None:
+        """
+        Restaura os jogos do último checkpoint e inicia o checkpoint em segundo plano.
+        Executado na criação do gerenciador (warmup ou primeira requisição).
+        
+        Args:
+            path: Caminho do arquivo de checkpoint
+        """
+        if not isinstance(self._store, InMemoryGameStore):
+            self._logger.warning("Checkpoint ignorado: o store configurado já é persistente")
+            return
+        
+        interval = float(os.environ.get('AETHERIA_CHECKPOINT_INTERVAL', 2.0))
+        self._checkpointer = GameCheckpointer(self._store, path, interval=interval)
+        self._checkpointer.restore()
+        self._game_counter = self._store.sequence
+        self._checkpointer.start()
+    
+    def warm_up(self, chunk_sizes: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Aquece o caminho de áudio antes do tráfego: importa o SciPy, projeta os
+        filtros e executa detect_blow e o processamento de cada tipo de jogo em
+        chunks sintéticos, deixando os caches (FFT, filtros) prontos.
+        Chamadas seguintes retornam o relatório da primeira execução.
+        
+        Args:
+            chunk_sizes: Tamanhos dos chunks em amostras (padrão:
+                         AETHERIA_WARMUP_CHUNK_SIZES ou 1024,4096,8820)
+            
+        Returns:
+            Relatório do warmup (duração total e por etapa, em ms)
+        """
+        with self._warmup_lock:
+            if self._warmup_report is not None:
+                return self._warmup_report
+            
+            if chunk_sizes is None:
+                chunk_sizes = [int(size) for size in
+                               os.environ.get('AETHERIA_WARMUP_CHUNK_SIZES', '1024,4096,8820').split(',')]
+            
+            started = time.perf_counter()
+            stages: Dict[str, float] = {}
+            
+            self._audio_processor.warm_up()
+            stages["filters"] = (time.perf_counter() - started) * 1000
+            
+            if self._dsp_pool:
+                stage_started = time.perf_counter()
+                self._dsp_pool.warm_up()
+                stages["dsp_pool"] = (time.perf_counter() - stage_started) * 1000
             
-            self._logger = logging.getLogger("GameManager")
-            self._initialized = True
+            # Sopro sintético (tom de 440 Hz com ruído), determinístico
+            rng = np.random.default_rng(0)
+            chunks = []
+            for size in chunk_sizes:
+                wave = (0.3 * np.sin(2 * np.pi * 440 * np.arange(size) / self.sample_rate)
+                        + 0.05 * rng.standard_normal(size))
+                chunks.append((wave * 32767).astype(np.int16).tobytes())
+            
+            stage_started = time.perf_counter()
+            for chunk in chunks:
+                self._audio_processor.detect_blow(chunk)
+            stages["detect_blow"] = (time.perf_counter() - stage_started) * 1000
+            
+            # Jogos descartáveis (fora do store): não aparecem na API nem nas métricas
+            for game_type, game_class in GAME_CLASSES.items():
+                stage_started = time.perf_counter()
+                game = game_class(f"warmup_{game_type.value}", "warmup")
+                game.start_game()
+                for chunk in chunks:
+                    game.process_audio_input(chunk, self.sample_rate)
+                game.process_intensity(0.5, True)
+                stages[game_type.value] = (time.perf_counter() - stage_started) * 1000
+            
+            self._warmup_report = {
+                "duration_ms": (time.perf_counter() - started) * 1000,
+                "stages_ms": stages,
+                "chunk_sizes": list(chunk_sizes),
+                "completed_at": datetime.now().isoformat()
+            }
+            self._logger.info("Warmup concluído em %.0f ms", self._warmup_report["duration_ms"])
+            return self._warmup_report
+    
+    def get_warmup_status(self) -> Optional[Dict[str, Any]]:
+        """
+        Relatório do warmup
+        
+        Returns:
+            Relatório de warm_up(), ou None se o warmup ainda não terminou
+        """
+        return self._warmup_report
     
     def create_game(self, game_type: GameType, player_name: str = "Jogador") -> Dict[str, Any]:
         """
@@ -62,29 +225,92 @@ class GameManager:
         Returns:
             Dict com informações do jogo criado
         """
-        self._game_counter += 1
-        game_id = f"{game_type.value}_{self._game_counter}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        # Factory pattern para criar jogos
-        if game_type == GameType.BOAT:
-            game = BoatGame(game_id, player_name)
-        elif game_type == GameType.BALLOON:
-            game = BalloonGame(game_id, player_name)
-        else:
-            raise ValueError(f"Tipo de jogo não suportado: {game_type}")
+        self._game_counter = self._store.next_sequence()
+        game = self._build_game(game_type, player_name, self._game_counter, datetime.now())
         
         # Armazenar jogo
-        self._games[game_id] = game
+        self._store.add(game)
         
-        self._logger.info(f"Jogo criado: {game_id} ({game_type.value}) para {player_name}")
+        if self._recorder:
+            self._recorder.open_session(game.game_id, game_type.value, player_name)
+        
+        self._logger.info("Jogo criado: %s (%s) para %s", game.game_id, game_type.value, player_name)
         
         return {
-            "game_id": game_id,
+            "game_id": game.game_id,
             "game_type": game_type.value,
             "player_name": player_name,
             "created_at": datetime.now().isoformat()
         }
     
+    def _build_game(self, game_type: GameType, player_name: str, sequence: int, created_at: datetime) -> BaseGame:
+        """
+        Instancia o jogo do tipo pedido (Factory pattern)
+        
+        Args:
+            game_type: Tipo do jogo a ser criado
+            player_name: Nome do jogador
+            sequence: Número sequencial usado no ID do jogo
+            created_at: Momento da criação (usado no ID do jogo)
+            
+        Returns:
+            Instância do jogo
+        """
+        game_id = f"{game_type.value}_{sequence}_{created_at.strftime('%Y%m%d_%H%M%S')}"
+        
+        if game_type == GameType.BOAT:
+            return BoatGame(game_id, player_name)
+        elif game_type == GameType.BALLOON:
+            return BalloonGame(game_id, player_name)
+        else:
+            raise ValueError(f"Tipo de jogo não suportado: {game_type}")
+    
+    def create_games(self, requests: List[Tuple[GameType, str]], start: bool = True) -> List[Dict[str, Any]]:
+        """
+        Cria (e opcionalmente inicia) vários jogos em uma única operação no store.
+        Usado para iniciar sessões em grupo sem 2N requisições.
+        
+        Args:
+            requests: Lista de (tipo do jogo, nome do jogador)
+            start: Se os jogos devem ser iniciados antes de serem armazenados
+            
+        Returns:
+            Lista com as informações de cada jogo criado, na mesma ordem
+        """
+        if not requests:
+            return []
+        
+        first_sequence = self._store.next_sequence(len(requests))
+        self._game_counter = first_sequence + len(requests) - 1
+        created_at = datetime.now()
+        
+        games = []
+        results = []
+        for offset, (game_type, player_name) in enumerate(requests):
+            game = self._build_game(game_type, player_name, first_sequence + offset, created_at)
+            info = {
+                "game_id": game.game_id,
+                "game_type": game_type.value,
+                "player_name": player_name,
+                "created_at": created_at.isoformat()
+            }
+            if start:
+                info["start"] = game.start_game()
+            games.append(game)
+            results.append(info)
+        
+        self._store.add_many(games)
+        
+        if self._recorder:
+            for game, info in zip(games, results):
+                self._recorder.open_session(game.game_id, info["game_type"], info["player_name"])
+                if start:
+                    self._recorder.record_start(game.game_id, game.frame_sequence)
+        
+        self._logger.info("%d jogos criados em lote%s", len(games), " e iniciados" if start else "")
+        
+        return results
+    
     def start_game(self, game_id: str) -> Dict[str, Any]:
         """
         Inicia um jogo
@@ -95,17 +321,13 @@ class GameManager:
         Returns:
             Dict com informações do jogo iniciado
         """
-        if game_id not in self._games:
-            raise ValueError(f"Jogo não encontrado: {game_id}")
-        
-        game = self._games[game_id]
-        result = game.start_game()
+        # O store mantém a lista de jogos ativos a partir do estado do jogo
+        result, seq = self._store.update(game_id, lambda game: (game.start_game(), game.frame_sequence))
         
-        # Adicionar à lista de jogos ativos
-        if game_id not in self._active_games:
-            self._active_games.append(game_id)
+        if self._recorder:
+            self._recorder.record_start(game_id, seq)
         
-        self._logger.info(f"Jogo iniciado: {game_id}")
+        self._logger.info("Jogo iniciado: %s", game_id)
         
         return result
     
@@ -119,56 +341,142 @@ class GameManager:
         Returns:
             Dict com estatísticas finais do jogo
         """
-        if game_id not in self._games:
-            raise ValueError(f"Jogo não encontrado: {game_id}")
+        result, seq = self._store.update(game_id, lambda game: (game.end_game(), game.frame_sequence))
+        self._inbox.discard(game_id)
         
-        game = self._games[game_id]
-        result = game.end_game()
+        if self._recorder:
+            self._recorder.record_end(game_id, seq)
         
-        # Remover da lista de jogos ativos
-        if game_id in self._active_games:
-            self._active_games.remove(game_id)
-        
-        self._logger.info(f"Jogo finalizado: {game_id}")
+        self._logger.info("Jogo finalizado: %s", game_id)
         
         return result
     
-    def process_audio_input(self, game_id: str, audio_data: bytes) -> Dict[str, Any]:
+    def end_games(self, game_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Finaliza vários jogos em uma única operação no store
+        
+        Args:
+            game_ids: IDs dos jogos
+            
+        Returns:
+            Lista com o resultado de cada jogo (sucesso ou erro), na mesma ordem
+        """
+        results = []
+        outcomes = self._store.update_many(game_ids, lambda game: (game.end_game(), game.frame_sequence))
+        for game_id, (result, error) in zip(game_ids, outcomes):
+            if error is None:
+                result, seq = result
+                self._inbox.discard(game_id)
+                if self._recorder:
+                    self._recorder.record_end(game_id, seq)
+                results.append({"game_id": game_id, "success": True, "game": result})
+            else:
+                results.append({"game_id": game_id, "success": False, "message": str(error)})
+        
+        self._logger.info("%d de %d jogos finalizados em lote", sum(1 for r in results if r['success']), len(game_ids))
+        
+        return results
+    
+    @property
+    def sample_rate(self) -> int:
+        """Taxa de amostragem do áudio PCM aceita (AETHERIA_AUDIO_SAMPLE_RATE)"""
+        return self._audio_processor.sample_rate
+    
+    def process_audio_input(self, game_id: str, audio_data: bytes,
+                            sample_rate: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Processa entrada de áudio para um jogo específico.
+        Com o servidor sobrecarregado (ver OverloadGuard), o frame é estimado
+        só pelo RMS e processado como intensidade, com "degraded": True
+        (e pode ser combinado com outros pela caixa de entrada do jogo).
+        
+        Args:
+            game_id: ID do jogo
+            audio_data: Dados de áudio
+            sample_rate: Taxa de amostragem informada pelo cliente (None = a configurada)
+            
+        Returns:
+            Dict com dados processados do jogo
+            
+        Raises:
+            UnsupportedSampleRateError: taxa diferente da configurada
+        """
+        if sample_rate is not None and sample_rate != self.sample_rate:
+            raise UnsupportedSampleRateError(sample_rate, self.sample_rate)
+        started = time.perf_counter()
+        with self._track_inflight() as inflight:
+            if self._overload_guard and self._overload_guard.check(inflight - 1):
+                metering_db = AudioProcessor.estimate_level_db(audio_data)
+                game_data = self._apply_intensity(game_id, self.metering_to_intensity(metering_db),
+                                                  metering_db, inflight, "pcm_degraded")
+                game_data["degraded"] = True
+            else:
+                game_data = self._apply_pcm(game_id, audio_data, inflight)
+                # Só o DSP completo alimenta a média: frames degradados são baratos
+                # e fariam a proteção sair com a CPU ainda saturada
+                if self._overload_guard:
+                    self._overload_guard.observe(time.perf_counter() - started)
+        
+        return game_data
+    
+    def _apply_pcm(self, game_id: str, audio_data: bytes, inflight: int) -> Dict[str, Any]:
         """
-        Processa entrada de áudio para um jogo específico
+        Processa um frame PCM com o DSP completo (detect_blow e features do jogo)
         
         Args:
             game_id: ID do jogo
             audio_data: Dados de áudio
+            inflight: Requisições de áudio em andamento (incluindo esta)
             
         Returns:
             Dict com dados processados do jogo
         """
-        if game_id not in self._games:
-            raise ValueError(f"Jogo não encontrado: {game_id}")
+        game_class = GAME_CLASSES_BY_NAME[self._store.game_class_name(game_id)]
+        
+        # DSP fora do lock do jogo: no pool de processos (se configurado) ou nesta thread.
+        # Só as features (valores escalares) voltam; o estado do jogo é alterado aqui.
+        if self._dsp_pool and self._dsp_pool.fits(audio_data):
+            noise_level = (self._audio_processor.background_noise_level
+                           if self._audio_processor.is_calibrated else None)
+            blow_detected, intensity, metadata, features = self._dsp_pool.analyze(audio_data, game_class, noise_level)
+        else:
+            if self._dsp_pool:
+                self._dsp_pool.record_oversized()
+            # Processar áudio com filtros avançados
+            blow_detected, intensity, metadata = self._audio_processor.detect_blow(audio_data)
+            features = game_class.extract_audio_features(np.frombuffer(audio_data, dtype=np.int16),
+                                                         self._audio_processor.sample_rate)
         
-        game = self._games[game_id]
+        frame_info = {}
         
-        # Processar áudio com filtros avançados
-        blow_detected, intensity, metadata = self._audio_processor.detect_blow(audio_data)
+        def apply(game: BaseGame) -> Dict[str, Any]:
+            frame_info["game_type"] = GAME_TYPE_NAMES.get(type(game), "unknown")
+            
+            # Processar no jogo específico
+            game_data = game.process_audio_features(features)
+            
+            # Adicionar metadados de áudio e score
+            game_data.update({
+                "audio_metadata": metadata,
+                "blow_detected": bool(blow_detected),
+                "blow_intensity": float(intensity),
+                "score": game.score  # Score atualizado pelo backend
+            })
+            self._annotate_frame(game, game_data)
+            return game_data
         
-        # Converter dados para formato esperado pelo jogo
-        audio_bytes = audio_data
+        game_data = self._store.update(game_id, apply)
+        game_data["next_poll_ms"] = self._polling_advisor.recommend(game_data["activity"], inflight - 1)
         
-        # Processar no jogo específico
-        game_data = game.process_audio_input(audio_bytes)
+        metrics_registry.inc("aetheria_frames_processed_total", (frame_info["game_type"], "pcm"))
         
-        # Adicionar metadados de áudio e score
-        game_data.update({
-            "audio_metadata": metadata,
-            "blow_detected": bool(blow_detected),
-            "blow_intensity": float(intensity),
-            "score": game.score  # Score atualizado pelo backend
-        })
+        if self._recorder:
+            self._recorder.record_pcm(game_id, game_data["seq"], audio_data)
         
         return game_data
     
-    def process_audio_intensity(self, game_id: str, intensity: float, metering_db: float = None) -> Dict[str, Any]:
+    def process_audio_intensity(self, game_id: str, intensity: float, metering_db: float = None,
+                                frame_seq: Optional[int] = None, allow_queue: bool = False) -> Dict[str, Any]:
         """
         Processa intensidade de áudio diretamente (sem gerar áudio aleatório)
         Usa dados reais do microfone do frontend
@@ -177,15 +485,134 @@ class GameManager:
             game_id: ID do jogo
             intensity: Intensidade do áudio (0-1) do frontend
             metering_db: Nível de metering em dB (opcional)
+            frame_seq: Sequência do frame no cliente (opcional, descarta frames atrasados)
+            allow_queue: Se o cliente aceita {"queued": True} (sem o estado do
+                         jogo) quando o jogo já tem muitas requisições esperando
             
         Returns:
-            Dict com dados processados do jogo
+            Dict com dados processados do jogo, ou {"queued": True} (só com
+            allow_queue) se o frame foi combinado a um lote ainda pendente, ou {"dropped": True,
+            "reason": "stale", "last_frame_seq": n} se o frame estava atrasado
+        """
+        with self._track_inflight() as inflight:
+            return self._apply_intensity(game_id, intensity, metering_db, inflight, "intensity",
+                                         frame_seq, allow_queue)
+    
+    def _apply_intensity(self, game_id: str, intensity: float, metering_db: Optional[float],
+                         inflight: int, source: str, frame_seq: Optional[int] = None,
+                         allow_queue: bool = False) -> Dict[str, Any]:
+        """
+        Entrega um frame de intensidade ao jogo pela caixa de entrada (GameInbox)
+        
+        Args:
+            game_id: ID do jogo
+            intensity: Intensidade do áudio (0-1)
+            metering_db: Nível de metering em dB (opcional)
+            inflight: Requisições de áudio em andamento (incluindo esta)
+            source: Origem do frame nas métricas ("intensity" ou "pcm_degraded")
+            frame_seq: Sequência do frame no cliente (opcional)
+            allow_queue: Se o cliente aceita a resposta {"queued": True}
+            
+        Returns:
+            Dict com dados processados do jogo (ver process_audio_intensity)
+        """
+        blow_detected = self.detect_intensity_blow(intensity, metering_db)
+        outcome, game_data = self._inbox.submit(
+            game_id, intensity, metering_db, blow_detected, frame_seq,
+            lambda frame: self._apply_frames(game_id, frame, source),
+            allow_queue
+        )
+        
+        if outcome == "queued":
+            return {"queued": True}
+        if outcome == "stale":
+            return {"dropped": True, "reason": "stale", "last_frame_seq": game_data["last_frame_seq"]}
+        
+        game_data["next_poll_ms"] = self._polling_advisor.recommend(game_data["activity"], inflight - 1)
+        return game_data
+    
+    def _apply_frames(self, game_id: str, frame: CoalescedFrame, source: str) -> Dict[str, Any]:
+        """
+        Aplica ao jogo um frame de intensidade (ou vários combinados) em uma
+        única atualização no store
+        
+        Args:
+            game_id: ID do jogo
+            frame: Frames acumulados na caixa de entrada
+            source: Origem dos frames nas métricas
+            
+        Returns:
+            Dict com dados processados do jogo, ou {"dropped": True, ...} se
+            outro worker já aplicou frames mais novos do cliente
+        """
+        frame_info = {}
+        
+        def apply(game: BaseGame) -> Dict[str, Any]:
+            # Com vários workers, a caixa de entrada só vê os frames deste processo:
+            # o jogo recusa lotes que ficaram fora da janela de outro worker
+            if frame.frame_seq is not None and not game.accept_client_sequence(frame.frame_seq,
+                                                                               self._inbox.window):
+                return {"dropped": True, "last_frame_seq": game.client_frame_sequence}
+            frame_info["game_type"] = GAME_TYPE_NAMES.get(type(game), "unknown")
+            
+            # Processar no jogo específico usando intensidade diretamente
+            if frame.frames > 1:
+                game_data = game.process_intensity(frame.intensity, frame.blow_detected,
+                                                   frame.frames, frame.blow_frames)
+            else:
+                game_data = game.process_intensity(frame.intensity, frame.blow_detected)
+            
+            # Adicionar metadados e score
+            game_data.update({
+                "blow_detected": bool(frame.blow_detected),
+                "blow_intensity": float(frame.intensity),
+                "score": game.score  # Score atualizado pelo backend
+            })
+            self._annotate_frame(game, game_data)
+            return game_data
+        
+        game_data = self._store.update(game_id, apply)
+        if game_data.get("dropped"):
+            return game_data
+        
+        if frame.metering_db is not None:
+            game_data["audio_metering_db"] = float(frame.metering_db)
+        
+        metrics_registry.inc("aetheria_frames_processed_total", (frame_info["game_type"], source), frame.frames)
+        
+        # Frames degradados são gravados como intensidade: o replay reproduz o que foi aplicado
+        if self._recorder:
+            self._recorder.record_intensity(game_id, game_data["seq"], frame.intensity, frame.metering_db,
+                                            frame.frames, frame.blow_frames)
+        
+        return game_data
+    
+    @staticmethod
+    def metering_to_intensity(metering_db: float) -> float:
         """
-        if game_id not in self._games:
-            raise ValueError(f"Jogo não encontrado: {game_id}")
+        Converte o nível de metering em intensidade (0-1)
+        dB típico: -60 (silêncio) a -2 (sopro forte)
         
-        game = self._games[game_id]
+        Args:
+            metering_db: Nível em dB
+            
+        Returns:
+            Intensidade entre 0 e 1
+        """
+        return max(0.0, min(1.0, (float(metering_db) + 60) / 58))
+    
+    @staticmethod
+    def detect_intensity_blow(intensity: float, metering_db: float = None) -> bool:
+        """
+        Classifica um frame de intensidade como sopro (também usado no replay de sessões)
         
+        Args:
+            intensity: Intensidade do áudio (0-1) do frontend
+            metering_db: Nível de metering em dB (opcional)
+            
+        Returns:
+            True se o frame é um sopro
+        """
         # Detectar sopro baseado na intensidade - equilíbrio entre captar sopros e filtrar ruído
         blow_threshold = 0.15  # 15% - aumentado de 10% para filtrar melhor ruído externo
         blow_detected = False  # Por padrão, não é sopro
@@ -209,20 +636,26 @@ class GameManager:
             # Se não tiver metering_db, usar apenas intensidade
             blow_detected = intensity >= blow_threshold
         
-        # Processar no jogo específico usando intensidade diretamente
-        game_data = game.process_intensity(intensity, blow_detected)
-        
-        # Adicionar metadados e score
-        game_data.update({
-            "blow_detected": bool(blow_detected),
-            "blow_intensity": float(intensity),
-            "score": game.score  # Score atualizado pelo backend
-        })
-        
-        if metering_db is not None:
-            game_data["audio_metering_db"] = float(metering_db)
-        
-        return game_data
+        return blow_detected
+    
+    @staticmethod
+    def _annotate_frame(game: BaseGame, game_data: Dict[str, Any]) -> None:
+        """Adiciona sequência do frame, estado de atividade e se o estado do jogo mudou"""
+        game_data["seq"] = game.next_frame_sequence()
+        game_data["activity"] = game.get_activity_state(game_data["blow_detected"])
+        game_data["state_changed"] = game.consume_state_change()
+    
+    @contextmanager
+    def _track_inflight(self) -> Iterator[int]:
+        """Conta as requisições de áudio em andamento (sinal de carga do servidor)"""
+        with self._inflight_lock:
+            self._inflight_audio += 1
+            inflight = self._inflight_audio
+        try:
+            yield inflight
+        finally:
+            with self._inflight_lock:
+                self._inflight_audio -= 1
     
     def calibrate_audio(self, audio_samples: List[bytes]) -> Dict[str, Any]:
         """
@@ -244,9 +677,9 @@ class GameManager:
         self._audio_processor.calibrate_background_noise(numpy_samples)
         
         # Aplicar calibração a todos os jogos ativos
-        for game_id in self._active_games:
-            game = self._games[game_id]
-            game.calibrate_audio_threshold(self._audio_processor.background_noise_level)
+        noise_level = self._audio_processor.background_noise_level
+        for game_id in self._store.active_ids():
+            self._store.update(game_id, lambda game: game.calibrate_audio_threshold(noise_level))
         
         return self._audio_processor.get_calibration_status()
     
@@ -260,10 +693,7 @@ class GameManager:
         Returns:
             Dict com status do jogo
         """
-        if game_id not in self._games:
-            raise ValueError(f"Jogo não encontrado: {game_id}")
-        
-        game = self._games[game_id]
+        game = self._store.get(game_id)
         
         return {
             "game_id": game_id,
@@ -281,18 +711,53 @@ class GameManager:
         Returns:
             Lista com informações de todos os jogos
         """
-        games_info = []
-        for game_id, game in self._games.items():
-            games_info.append({
-                "game_id": game_id,
-                "player_name": game.player_name,
-                "is_active": game.is_active,
-                "score": game.score,
-                "level": game.level,
-                "game_type": game.__class__.__name__
-            })
+        return self._store.summaries()
+    
+    def list_games(self, game_type: Optional[GameType] = None, is_active: Optional[bool] = None,
+                   player_name: Optional[str] = None, cursor: Optional[str] = None,
+                   limit: int = 100) -> Dict[str, Any]:
+        """
+        Lista jogos paginados por cursor, com filtros atendidos por índices
+        
+        Args:
+            game_type: Filtra por tipo de jogo
+            is_active: Filtra por jogos ativos/inativos
+            player_name: Filtra pelo nome do jogador
+            cursor: Cursor retornado pela página anterior
+            limit: Número máximo de jogos na página
+            
+        Returns:
+            Dict com os jogos da página e o cursor da próxima (ou None)
+        """
+        if cursor:
+            try:
+                after = int(cursor)
+            except ValueError:
+                raise ValueError(f"Cursor inválido: {cursor}")
+        else:
+            after = 0
         
-        return games_info
+        games, next_after = self._store.list_games(
+            game_type=GAME_CLASSES[game_type].__name__ if game_type else None,
+            is_active=is_active,
+            player_name=player_name,
+            after=after,
+            limit=limit
+        )
+        
+        return {
+            "games": games,
+            "next_cursor": str(next_after) if next_after is not None else None
+        }
+    
+    def get_game_ids(self) -> List[str]:
+        """
+        Retorna IDs de todos os jogos armazenados
+        
+        Returns:
+            Lista de IDs de jogos
+        """
+        return self._store.game_ids()
     
     def get_active_games(self) -> List[str]:
         """
@@ -301,7 +766,7 @@ class GameManager:
         Returns:
             Lista de IDs de jogos ativos
         """
-        return self._active_games.copy()
+        return self._store.active_ids()
     
     def cleanup_inactive_games(self) -> int:
         """
@@ -310,17 +775,11 @@ class GameManager:
         Returns:
             Número de jogos removidos
         """
-        inactive_games = []
-        for game_id, game in self._games.items():
-            if not game.is_active:
-                inactive_games.append(game_id)
-        
-        for game_id in inactive_games:
-            del self._games[game_id]
+        removed = self._store.remove_inactive()
         
-        self._logger.info(f"Removidos {len(inactive_games)} jogos inativos")
+        self._logger.info(f"Removidos {removed} jogos inativos")
         
-        return len(inactive_games)
+        return removed
     
     def get_manager_stats(self) -> Dict[str, Any]:
         """
@@ -331,10 +790,15 @@ class GameManager:
         """
         return {
             "total_games_created": self._game_counter,
-            "active_games_count": len(self._active_games),
-            "total_games_in_memory": len(self._games),
+            "active_games_count": len(self._store.active_ids()),
+            "total_games_in_memory": len(self._store),
             "audio_calibrated": self._audio_processor.is_calibrated,
-            "background_noise_level": self._audio_processor.background_noise_level
+            "background_noise_level": self._audio_processor.background_noise_level,
+            "checkpoint": self._checkpointer.get_stats() if self._checkpointer else None,
+            "recorder": self._recorder.get_stats() if self._recorder else None,
+            "dsp_pool": self._dsp_pool.get_stats() if self._dsp_pool else None,
+            "overload": self._overload_guard.get_stats() if self._overload_guard else None,
+            "inbox": self._inbox.get_stats()
         }
 
 # Import necessário para numpy
@@ -0,0 +1,657 @@
+"""
+Armazenamento do estado dos jogos
+Permite trocar o dicionário em memória do GameManager por um store
+compartilhado (SQLite) para que qualquer worker possa atender qualquer jogo
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Callable, TypeVar, Optional, Iterable, Tuple
+import os
+import bisect
+import pickle
+import sqlite3
+import threading
+import logging
+
+from models.base_game import BaseGame
+
+T = TypeVar("T")
+
+
+class GameNotFoundError(ValueError):
+    """Erro lançado quando o jogo não existe no store"""
+
+    def __init__(self, game_id: str):
+        super().__init__(f"Jogo não encontrado: {game_id}")
+        self.game_id = game_id
+
+
+class GameStoreConflictError(RuntimeError):
+    """Erro lançado quando a atualização otimista esgota as tentativas"""
+    pass
+
+
+def summarize_game(game: BaseGame) -> Dict[str, Any]:
+    """
+    Resumo de um jogo no formato usado pela listagem de jogos
+
+    Args:
+        game: Instância do jogo
+
+    Returns:
+        Dict com informações resumidas do jogo
+    """
+    return {
+        "game_id": game.game_id,
+        "player_name": game.player_name,
+        "is_active": game.is_active,
+        "score": game.score,
+        "level": game.level,
+        "game_type": game.__class__.__name__
+    }
+
+
+class GameStore(ABC):
+    """
+    Interface de armazenamento de jogos usada pelo GameManager.
+    Toda mutação passa por update(), que aplica uma função ao jogo
+    e persiste o resultado.
+    """
+
+    @abstractmethod
+    def next_sequence(self, count: int = 1) -> int:
+        """Reserva count números sequenciais para IDs de jogos e retorna o primeiro"""
+        pass
+
+    @abstractmethod
+    def add(self, game: BaseGame) -> None:
+        """Armazena um jogo novo"""
+        pass
+
+    @abstractmethod
+    def add_many(self, games: List[BaseGame]) -> None:
+        """Armazena vários jogos novos em uma única operação"""
+        pass
+
+    @abstractmethod
+    def get(self, game_id: str) -> BaseGame:
+        """Retorna o jogo (lança GameNotFoundError se não existir)"""
+        pass
+
+    @abstractmethod
+    def game_class_name(self, game_id: str) -> str:
+        """Retorna o nome da classe do jogo sem carregar o estado (lança GameNotFoundError)"""
+        pass
+
+    @abstractmethod
+    def update(self, game_id: str, mutator: Callable[[BaseGame], T]) -> T:
+        """Aplica mutator ao jogo, persiste o novo estado e retorna o resultado"""
+        pass
+
+    @abstractmethod
+    def update_many(self, game_ids: List[str],
+                    mutator: Callable[[BaseGame], T]) -> List[Tuple[Optional[T], Optional[Exception]]]:
+        """
+        Aplica mutator a vários jogos em uma única operação
+
+        Returns:
+            Lista (resultado, erro) na mesma ordem de game_ids
+        """
+        pass
+
+    @abstractmethod
+    def remove_inactive(self) -> int:
+        """Remove jogos inativos e retorna quantos foram removidos"""
+        pass
+
+    @abstractmethod
+    def game_ids(self) -> List[str]:
+        """Retorna IDs de todos os jogos armazenados"""
+        pass
+
+    @abstractmethod
+    def active_ids(self) -> List[str]:
+        """Retorna IDs dos jogos ativos"""
+        pass
+
+    @abstractmethod
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Retorna o resumo (summarize_game) de todos os jogos"""
+        pass
+
+    @abstractmethod
+    def list_games(self, game_type: Optional[str] = None, is_active: Optional[bool] = None,
+                   player_name: Optional[str] = None, after: int = 0,
+                   limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Lista uma página de jogos em ordem de criação usando os índices secundários
+
+        Args:
+            game_type: Filtra pelo nome da classe do jogo (ex: "BoatGame")
+            is_active: Filtra por jogos ativos/inativos
+            player_name: Filtra pelo nome do jogador
+            after: Posição (cursor) após a qual a página começa
+            limit: Tamanho máximo da página
+
+        Returns:
+            Tuple (resumos da página, posição para a próxima página ou None)
+        """
+        pass
+
+    @abstractmethod
+    def __contains__(self, game_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class InMemoryGameStore(GameStore):
+    """
+    Store padrão: mantém os objetos dos jogos em um dicionário do processo.
+    Não há serialização, então o custo por requisição é mínimo.
+
+    Cada jogo tem um lock próprio, e os jogos alterados são marcados como
+    "sujos" para que o checkpoint incremental grave apenas o que mudou.
+    Índices secundários (tipo, ativo, jogador) guardam listas ordenadas
+    de números de linha para a listagem paginada não varrer todos os jogos.
+    """
+
+    def __init__(self):
+        self._games: Dict[str, BaseGame] = {}
+        self._game_locks: Dict[str, threading.Lock] = {}
+        # Dicts usados como conjuntos ordenados
+        self._active: Dict[str, None] = {}   # ordem em que os jogos foram iniciados
+        self._dirty: Dict[str, None] = {}    # alterados desde o último checkpoint
+        self._removed: Dict[str, None] = {}  # removidos desde o último checkpoint
+        self._sequence = 0
+        self._lock = threading.Lock()
+        # Protege _dirty (marcado a cada frame, sem disputar self._lock com as
+        # listagens); sempre o último lock adquirido
+        self._dirty_lock = threading.Lock()
+
+        # Índices de listagem: número de linha (ordem de inserção) -> jogo
+        self._rows: Dict[int, str] = {}
+        self._row_of: Dict[str, int] = {}
+        self._next_row = 0
+        self._rebuild_indexes()
+
+    def next_sequence(self, count: int = 1) -> int:
+        with self._lock:
+            first = self._sequence + 1
+            self._sequence += count
+            return first
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    def add(self, game: BaseGame) -> None:
+        with self._lock:
+            self._insert(game)
+            self._removed.pop(game.game_id, None)
+            with self._dirty_lock:
+                self._dirty[game.game_id] = None
+
+    def add_many(self, games: List[BaseGame]) -> None:
+        with self._lock:
+            with self._dirty_lock:
+                for game in games:
+                    self._insert(game)
+                    self._removed.pop(game.game_id, None)
+                    self._dirty[game.game_id] = None
+
+    def get(self, game_id: str) -> BaseGame:
+        game = self._games.get(game_id)
+        if game is None:
+            raise GameNotFoundError(game_id)
+        return game
+
+    def game_class_name(self, game_id: str) -> str:
+        return type(self.get(game_id)).__name__
+
+    def update(self, game_id: str, mutator: Callable[[BaseGame], T]) -> T:
+        game = self.get(game_id)
+        lock = self._game_locks.get(game_id)
+        if lock is None:
+            raise GameNotFoundError(game_id)
+        with lock:
+            try:
+                return mutator(game)
+            finally:
+                with self._dirty_lock:
+                    self._dirty[game_id] = None
+                self._sync_active(game)
+
+    def update_many(self, game_ids: List[str],
+                    mutator: Callable[[BaseGame], T]) -> List[Tuple[Optional[T], Optional[Exception]]]:
+        results = []
+        for game_id in game_ids:
+            try:
+                results.append((self.update(game_id, mutator), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    def remove_inactive(self) -> int:
+        with self._lock:
+            inactive_games = [game_id for game_id, game in self._games.items() if not game.is_active]
+            for game_id in inactive_games:
+                del self._games[game_id]
+                del self._game_locks[game_id]
+                del self._rows[self._row_of.pop(game_id)]
+                self._active.pop(game_id, None)
+                with self._dirty_lock:
+                    self._dirty.pop(game_id, None)
+                self._removed[game_id] = None
+            if inactive_games:
+                self._rebuild_indexes()
+        return len(inactive_games)
+
+    def drain_changes(self) -> Tuple[List[str], List[str]]:
+        """
+        Retorna e limpa os jogos alterados e removidos desde a última chamada
+
+        Returns:
+            Tuple (ids alterados, ids removidos)
+        """
+        with self._lock:
+            with self._dirty_lock:
+                dirty, self._dirty = list(self._dirty), {}
+            removed, self._removed = list(self._removed), {}
+        return dirty, removed
+
+    def snapshot(self, game_id: str) -> Optional[bytes]:
+        """
+        Serializa um jogo de forma consistente (sob o lock do jogo)
+
+        Returns:
+            Snapshot em bytes ou None se o jogo foi removido
+        """
+        game = self._games.get(game_id)
+        lock = self._game_locks.get(game_id)
+        if game is None or lock is None:
+            return None
+        with lock:
+            return pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def restore(self, games: Iterable[BaseGame], sequence: int = 0) -> int:
+        """
+        Carrega jogos em lote (recuperação de checkpoint), sem marcá-los como sujos
+
+        Args:
+            games: Jogos restaurados
+            sequence: Último número sequencial usado antes do reinício
+
+        Returns:
+            Número de jogos restaurados
+        """
+        count = 0
+        with self._lock:
+            for game in games:
+                self._insert(game)
+                count += 1
+            self._sequence = max(self._sequence, sequence)
+        return count
+
+    def game_ids(self) -> List[str]:
+        return list(self._games.keys())
+
+    def active_ids(self) -> List[str]:
+        return list(self._active.keys())
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [summarize_game(game) for game in self._games.values()]
+
+    def list_games(self, game_type: Optional[str] = None, is_active: Optional[bool] = None,
+                   player_name: Optional[str] = None, after: int = 0,
+                   limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        with self._lock:
+            # Escolher o menor índice que atende aos filtros
+            if game_type is not None and is_active is not None:
+                candidates = [self._by_type_active.get((game_type, is_active), [])]
+            else:
+                candidates = [self._all_rows]
+                if game_type is not None:
+                    candidates.append(self._by_type.get(game_type, []))
+                if is_active is not None:
+                    candidates.append(self._by_active[is_active])
+            if player_name is not None:
+                candidates.append(self._by_player.get(player_name, []))
+            rows = min(candidates, key=len)
+
+            page = []
+            last_row = None
+            for i in range(bisect.bisect_right(rows, after), len(rows)):
+                game = self._games[self._rows[rows[i]]]
+                if game_type is not None and game.__class__.__name__ != game_type:
+                    continue
+                if is_active is not None and game.is_active != is_active:
+                    continue
+                if player_name is not None and game.player_name != player_name:
+                    continue
+                if len(page) == limit:
+                    return page, last_row
+                page.append(summarize_game(game))
+                last_row = rows[i]
+            return page, None
+
+    def _insert(self, game: BaseGame) -> None:
+        """Registra o jogo no dicionário e nos índices (chamado com self._lock)"""
+        game_id = game.game_id
+        if game_id in self._row_of:
+            # Substituição do mesmo jogo: reindexar do zero
+            del self._rows[self._row_of.pop(game_id)]
+            self._games.pop(game_id, None)
+            self._active.pop(game_id, None)
+            self._rebuild_indexes()
+
+        self._next_row += 1
+        row = self._next_row
+        self._games[game_id] = game
+        self._game_locks[game_id] = threading.Lock()
+        self._rows[row] = game_id
+        self._row_of[game_id] = row
+        if game.is_active:
+            self._active[game_id] = None
+
+        # Linhas crescem monotonicamente, então append mantém as listas ordenadas
+        game_type = game.__class__.__name__
+        self._all_rows.append(row)
+        self._by_type.setdefault(game_type, []).append(row)
+        self._by_active[game.is_active].append(row)
+        self._by_type_active.setdefault((game_type, game.is_active), []).append(row)
+        self._by_player.setdefault(game.player_name, []).append(row)
+
+    def _rebuild_indexes(self) -> None:
+        """Reconstrói os índices a partir dos jogos (chamado com self._lock)"""
+        self._all_rows: List[int] = []
+        self._by_type: Dict[str, List[int]] = {}
+        self._by_active: Dict[bool, List[int]] = {True: [], False: []}
+        self._by_type_active: Dict[Tuple[str, bool], List[int]] = {}
+        self._by_player: Dict[str, List[int]] = {}
+        for row in sorted(self._rows):
+            game = self._games[self._rows[row]]
+            game_type = game.__class__.__name__
+            self._all_rows.append(row)
+            self._by_type.setdefault(game_type, []).append(row)
+            self._by_active[game.is_active].append(row)
+            self._by_type_active.setdefault((game_type, game.is_active), []).append(row)
+            self._by_player.setdefault(game.player_name, []).append(row)
+
+    def _sync_active(self, game: BaseGame) -> None:
+        """Mantém o conjunto e os índices de jogos ativos coerentes com o estado do jogo"""
+        if (game.game_id in self._active) == game.is_active:
+            return
+        with self._lock:
+            row = self._row_of.get(game.game_id)
+            if row is None:
+                return
+            active = game.is_active
+            if active:
+                self._active[game.game_id] = None
+            else:
+                self._active.pop(game.game_id, None)
+            game_type = game.__class__.__name__
+            self._move_row(row, self._by_active[not active], self._by_active[active])
+            self._move_row(row, self._by_type_active.setdefault((game_type, not active), []),
+                           self._by_type_active.setdefault((game_type, active), []))
+
+    @staticmethod
+    def _move_row(row: int, source: List[int], target: List[int]) -> None:
+        i = bisect.bisect_left(source, row)
+        if i < len(source) and source[i] == row:
+            del source[i]
+        bisect.insort(target, row)
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._games
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+
+class SQLiteGameStore(GameStore):
+    """
+    Store compartilhado em um arquivo SQLite local.
+
+    Cada requisição carrega o snapshot do jogo (pickle de __getstate__),
+    aplica a mutação e grava de volta com versionamento otimista:
+    o UPDATE só é aplicado se a versão lida ainda for a atual; caso
+    contrário outro worker atualizou o jogo e a operação é refeita.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id TEXT NOT NULL UNIQUE,
+            game_type TEXT NOT NULL,
+            player_name TEXT NOT NULL,
+            is_active INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            level INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            state BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_games_type_active ON games (game_type, is_active, seq);
+        CREATE INDEX IF NOT EXISTS idx_games_active ON games (is_active, seq);
+        CREATE INDEX IF NOT EXISTS idx_games_player ON games (player_name, seq);
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, max_retries: int = 50):
+        """
+        Args:
+            path: Caminho do arquivo SQLite compartilhado entre workers
+            max_retries: Tentativas de atualização em caso de conflito de versão
+        """
+        self._path = path
+        self._max_retries = max_retries
+        # Uma conexão por thread e por processo (conexões não sobrevivem a fork)
+        self._local = threading.local()
+        self._logger = logging.getLogger("SQLiteGameStore")
+
+        self._connection().executescript(self._SCHEMA)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, criando se necessário"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row_values(game: BaseGame) -> tuple:
+        """Colunas de resumo + snapshot serializado do jogo"""
+        return (
+            game.__class__.__name__,
+            game.player_name,
+            int(game.is_active),
+            int(game.score),
+            int(game.level),
+            pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+
+    def next_sequence(self, count: int = 1) -> int:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES ('games', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (count,)
+            )
+            value = conn.execute("SELECT value FROM counters WHERE name = 'games'").fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value - count + 1
+
+    _INSERT = (
+        "INSERT INTO games (game_type, player_name, is_active, score, level, state, game_id, version) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, 0)"
+    )
+
+    def add(self, game: BaseGame) -> None:
+        self._connection().execute(self._INSERT, self._row_values(game) + (game.game_id,))
+
+    def add_many(self, games: List[BaseGame]) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(self._INSERT, [self._row_values(game) + (game.game_id,) for game in games])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _load(self, game_id: str) -> tuple:
+        row = self._connection().execute(
+            "SELECT version, state FROM games WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        if row is None:
+            raise GameNotFoundError(game_id)
+        return row[0], pickle.loads(row[1])
+
+    def get(self, game_id: str) -> BaseGame:
+        return self._load(game_id)[1]
+
+    def game_class_name(self, game_id: str) -> str:
+        row = self._connection().execute(
+            "SELECT game_type FROM games WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        if row is None:
+            raise GameNotFoundError(game_id)
+        return row[0]
+
+    def update(self, game_id: str, mutator: Callable[[BaseGame], T]) -> T:
+        conn = self._connection()
+        for _ in range(self._max_retries):
+            version, game = self._load(game_id)
+            result = mutator(game)
+            cursor = conn.execute(
+                "UPDATE games SET game_type = ?, player_name = ?, is_active = ?, score = ?, "
+                "level = ?, state = ?, version = version + 1 WHERE game_id = ? AND version = ?",
+                self._row_values(game) + (game_id, version)
+            )
+            if cursor.rowcount == 1:
+                return result
+            self._logger.debug("Conflito de versão em %s, repetindo", game_id)
+        raise GameStoreConflictError(f"Muitas atualizações concorrentes para o jogo {game_id}")
+
+    def update_many(self, game_ids: List[str],
+                    mutator: Callable[[BaseGame], T]) -> List[Tuple[Optional[T], Optional[Exception]]]:
+        # Uma transação com lock de escrita: sem conflitos de versão dentro do lote
+        conn = self._connection()
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for game_id in game_ids:
+                try:
+                    version, game = self._load(game_id)
+                    result = mutator(game)
+                except Exception as e:
+                    results.append((None, e))
+                    continue
+                conn.execute(
+                    "UPDATE games SET game_type = ?, player_name = ?, is_active = ?, score = ?, "
+                    "level = ?, state = ?, version = version + 1 WHERE game_id = ?",
+                    self._row_values(game) + (game_id,)
+                )
+                results.append((result, None))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def remove_inactive(self) -> int:
+        return self._connection().execute("DELETE FROM games WHERE is_active = 0").rowcount
+
+    def game_ids(self) -> List[str]:
+        rows = self._connection().execute("SELECT game_id FROM games ORDER BY seq")
+        return [row[0] for row in rows]
+
+    def active_ids(self) -> List[str]:
+        rows = self._connection().execute("SELECT game_id FROM games WHERE is_active = 1 ORDER BY seq")
+        return [row[0] for row in rows]
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT game_id, player_name, is_active, score, level, game_type FROM games ORDER BY seq"
+        )
+        return [self._summary_from_row(row) for row in rows]
+
+    def list_games(self, game_type: Optional[str] = None, is_active: Optional[bool] = None,
+                   player_name: Optional[str] = None, after: int = 0,
+                   limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        # Paginação por keyset (seq > cursor) atendida pelos índices idx_games_*
+        conditions = ["seq > ?"]
+        params: List[Any] = [after]
+        if game_type is not None:
+            conditions.append("game_type = ?")
+            params.append(game_type)
+        if is_active is not None:
+            conditions.append("is_active = ?")
+            params.append(int(is_active))
+        if player_name is not None:
+            conditions.append("player_name = ?")
+            params.append(player_name)
+        params.append(limit + 1)
+
+        rows = self._connection().execute(
+            "SELECT game_id, player_name, is_active, score, level, game_type, seq FROM games "
+            f"WHERE {' AND '.join(conditions)} ORDER BY seq LIMIT ?",
+            params
+        ).fetchall()
+
+        next_after = rows[limit - 1][6] if len(rows) > limit else None
+        return [self._summary_from_row(row) for row in rows[:limit]], next_after
+
+    @staticmethod
+    def _summary_from_row(row: tuple) -> Dict[str, Any]:
+        return {
+            "game_id": row[0],
+            "player_name": row[1],
+            "is_active": bool(row[2]),
+            "score": row[3],
+            "level": row[4],
+            "game_type": row[5]
+        }
+
+    def __contains__(self, game_id: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM games WHERE game_id = ?", (game_id,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+
+def create_game_store(url: Optional[str] = None) -> GameStore:
+    """
+    Cria o store a partir de uma URL de configuração
+
+    Args:
+        url: None/"memory" para memória ou "sqlite:///caminho/arquivo.db"
+
+    Returns:
+        Instância de GameStore
+    """
+    if not url or url == "memory":
+        return InMemoryGameStore()
+    if url.startswith("sqlite://"):
+        return SQLiteGameStore(url[len("sqlite://"):])
+    raise ValueError(f"Store de jogos não suportado: {url}")
@@ -0,0 +1,443 @@
+"""
+Rankings de pontuação mantidos de forma incremental
+Cada placar guarda a melhor pontuação de cada jogador em uma skip list
+indexável (a estrutura dos sorted sets do Redis): inserir, remover, achar a
+posição de um jogador e ler as k primeiras posições custam O(log n), sem
+percorrer e ordenar todas as sessões a cada consulta. Os placares são
+alimentados pelo log de pontuações (`scores` do data.json), que só cresce.
+"""
+
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Hashable
+from datetime import datetime, date, timedelta
+import random
+import threading
+
+
+class _Node:
+    """Nó da skip list: próximo nó e distância (em posições) em cada nível"""
+
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        self.width = [1] * level
+
+
+class RankedSkipList:
+    """
+    Lista ordenada de chaves únicas com acesso por posição (skip list
+    indexável). Cada ligação guarda quantas posições ela pula, então a
+    posição de uma chave e a chave de uma posição saem da mesma descida
+    pelos níveis que a busca faz.
+    """
+
+    MAX_LEVEL = 24  # suficiente para ~16 milhões de chaves
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: Semente do sorteio dos níveis (opcional, para reprodutibilidade)
+        """
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1  # níveis em uso (a busca começa no mais alto)
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key: Any) -> None:
+        """
+        Insere uma chave (não pode estar presente)
+
+        Args:
+            key: Chave comparável com as demais
+        """
+        level = self._random_level()
+        if level > self._level:
+            self._level = level
+        chain: List[_Node] = [self._head] * self.MAX_LEVEL
+        steps = [0] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                steps[i] += node.width[i]
+                node = node.next[i]
+            chain[i] = node
+
+        new = _Node(key, level)
+        distance = 0
+        for i in range(level):
+            prev = chain[i]
+            new.next[i] = prev.next[i]
+            prev.next[i] = new
+            new.width[i] = prev.width[i] - distance
+            prev.width[i] = distance + 1
+            distance += steps[i]
+        for i in range(level, self.MAX_LEVEL):
+            chain[i].width[i] += 1  # acima de self._level só a cabeça (distância até o fim)
+        self._size += 1
+
+    def remove(self, key: Any) -> None:
+        """
+        Remove uma chave
+
+        Args:
+            key: Chave presente na lista
+
+        Raises:
+            KeyError: a chave não está na lista
+        """
+        chain: List[_Node] = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                node = node.next[i]
+            chain[i] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for i in range(len(target.next)):
+            chain[i].width[i] += target.width[i] - 1
+            chain[i].next[i] = target.next[i]
+        for i in range(len(target.next), self.MAX_LEVEL):
+            chain[i].width[i] -= 1
+        self._size -= 1
+
+    def index(self, key: Any) -> int:
+        """
+        Posição (a partir de 0) de uma chave presente
+
+        Args:
+            key: Chave presente na lista
+
+        Returns:
+            Quantidade de chaves menores que ela
+
+        Raises:
+            KeyError: a chave não está na lista
+        """
+        node = self._head
+        position = 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+        found = node.next[0]
+        if found is None or found.key != key:
+            raise KeyError(key)
+        return position
+
+    def iter_from(self, start: int) -> Iterator[Any]:
+        """
+        Chaves a partir de uma posição, em ordem
+
+        Args:
+            start: Posição inicial (a partir de 0)
+        """
+        if start < 0 or start >= self._size:
+            return
+        node = self._head
+        remaining = start + 1
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.width[i] <= remaining:
+                remaining -= node.width[i]
+                node = node.next[i]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+
+class Leaderboard:
+    """
+    Placar com a melhor pontuação de cada jogador. Empates ficam com quem
+    chegou primeiro à pontuação.
+    """
+
+    def __init__(self):
+        self._ranking = RankedSkipList()
+        self._keys: Dict[Hashable, Tuple[float, str, Hashable]] = {}
+        self._entries: Dict[Hashable, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def submit(self, player_id: Hashable, score: float, achieved_at: str,
+               details: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Registra uma pontuação; só muda o placar se superar a melhor do jogador
+
+        Args:
+            player_id: ID do jogador
+            score: Pontuação da sessão
+            achieved_at: Quando a pontuação foi feita (ISO 8601, desempate)
+            details: Dados exibidos junto com a posição (ex: nome, sessão)
+
+        Returns:
+            True se a melhor pontuação do jogador mudou
+        """
+        current = self._keys.get(player_id)
+        key = (-score, achieved_at, player_id)
+        if current is not None:
+            if key >= current:
+                return False
+            self._ranking.remove(current)
+        self._ranking.insert(key)
+        self._keys[player_id] = key
+        self._entries[player_id] = dict(details or {}, score=score, achieved_at=achieved_at)
+        return True
+
+    def top(self, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Primeiras posições do placar
+
+        Args:
+            limit: Quantidade de posições
+            offset: Posições puladas antes da primeira retornada
+
+        Returns:
+            Lista de dicts com rank, player_id e a melhor pontuação
+        """
+        result = []
+        for rank, key in enumerate(self._ranking.iter_from(offset), start=offset + 1):
+            if len(result) >= limit:
+                break
+            player_id = key[2]
+            result.append({"rank": rank, "player_id": player_id, **self._entries[player_id]})
+        return result
+
+    def rank(self, player_id: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Posição de um jogador
+
+        Args:
+            player_id: ID do jogador
+
+        Returns:
+            Dict com rank (a partir de 1), a melhor pontuação e o total de
+            jogadores, ou None se o jogador não tem pontuação no placar
+        """
+        key = self._keys.get(player_id)
+        if key is None:
+            return None
+        return {
+            "rank": self._ranking.index(key) + 1,
+            "player_id": player_id,
+            "players": len(self._keys),
+            **self._entries[player_id]
+        }
+
+
+def compact_scores(scores: List[Dict[str, Any]], before: str) -> List[Dict[str, Any]]:
+    """
+    Compacta o log de pontuações: das entradas terminadas antes de `before`
+    fica só a melhor de cada jogador por tipo de jogo, o que basta para os
+    placares gerais (a melhor geral é a melhor entre as de cada tipo). Os
+    placares semanais dessas semanas deixam de ser reconstruíveis, então
+    `before` não deve cair dentro das semanas mantidas.
+
+    Args:
+        scores: Log de pontuações
+        before: Fim (ISO 8601) até o qual as entradas são compactadas
+
+    Returns:
+        Novo log: as melhores entradas antigas, em ordem de tempo, seguidas
+        das entradas recentes na ordem original
+    """
+    best: Dict[Tuple[Hashable, Optional[str]], Dict[str, Any]] = {}
+    recent = []
+    for entry in scores:
+        if entry["ended_at"] >= before:
+            recent.append(entry)
+            continue
+        key = (entry["user_id"], entry.get("game_type"))
+        current = best.get(key)
+        if current is None or (-entry["score"], entry["ended_at"]) < (-current["score"], current["ended_at"]):
+            best[key] = entry
+    return sorted(best.values(), key=lambda entry: entry["ended_at"]) + recent
+
+
+def week_start(moment: datetime) -> date:
+    """Segunda-feira da semana ISO de um instante"""
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+class LeaderboardIndex:
+    """
+    Placares geral e semanal, cada um também por tipo de jogo.
+
+    Os placares são derivados do log de pontuações: `sync` aplica apenas as
+    entradas ainda não vistas, então o fim de uma sessão custa O(log n) e
+    outros processos que escrevem no mesmo log são alcançados sem
+    reconstruir nada. Placares semanais mais antigos que `keep_weeks`
+    semanas são descartados.
+    """
+
+    PERIODS = ("all", "week")
+
+    def __init__(self, keep_weeks: int = 12):
+        """
+        Args:
+            keep_weeks: Semanas mantidas em memória para os placares semanais
+        """
+        self._keep_weeks = max(keep_weeks, 1)
+        self._boards: Dict[Tuple[str, Optional[str]], Leaderboard] = {}
+        self._indexed = 0
+        self._generation = 0
+        self._newest_week: Optional[date] = None
+        self._lock = threading.Lock()
+
+    @property
+    def indexed(self) -> int:
+        """Entradas do log de pontuações já aplicadas"""
+        return self._indexed
+
+    def sync(self, scores: List[Dict[str, Any]], generation: int = 0) -> int:
+        """
+        Aplica as entradas do log de pontuações ainda não indexadas
+
+        Args:
+            scores: Log completo de pontuações (só cresce dentro de uma geração)
+            generation: Geração do log, incrementada quando ele é compactado
+
+        Returns:
+            Número de entradas aplicadas
+        """
+        with self._lock:
+            if generation != self._generation or len(scores) < self._indexed:
+                # O log foi compactado ou substituído (ex: arquivo de dados restaurado): reconstrói
+                self._boards.clear()
+                self._indexed = 0
+                self._generation = generation
+                self._newest_week = None
+            new = scores[self._indexed:]
+            if new:
+                self._apply(new)
+            self._indexed = len(scores)
+            return len(new)
+
+    def _apply(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Aplica entradas novas do log (chamado com self._lock). Em lotes
+        grandes (ex: a primeira carga) cada placar recebe só a melhor
+        entrada de cada jogador, em vez de uma atualização por entrada.
+        """
+        weeks: Dict[str, date] = {}
+        for entry in entries:
+            day = entry["ended_at"][:10]
+            if day not in weeks:
+                weeks[day] = week_start(datetime.fromisoformat(day))
+        newest = max(weeks.values())
+        if self._newest_week is None or newest > self._newest_week:
+            self._newest_week = newest
+            self._prune_weeks()
+        oldest = self._newest_week - timedelta(weeks=self._keep_weeks - 1)
+
+        best: Dict[Tuple[str, Optional[str]], Dict[Hashable, Dict[str, Any]]] = {}
+        for entry in entries:
+            week = weeks[entry["ended_at"][:10]]
+            periods = ("all", f"week:{week.isoformat()}") if week >= oldest else ("all",)
+            game_type = entry.get("game_type")
+            for period in periods:
+                for board_key in ((period, None), (period, game_type)) if game_type else ((period, None),):
+                    players = best.get(board_key)
+                    if players is None:
+                        players = best[board_key] = {}
+                    current = players.get(entry["user_id"])
+                    if current is None or (-entry["score"], entry["ended_at"]) < (-current["score"], current["ended_at"]):
+                        players[entry["user_id"]] = entry
+
+        for board_key, players in best.items():
+            board = self._boards.get(board_key)
+            if board is None:
+                board = self._boards[board_key] = Leaderboard()
+            for player_id, entry in players.items():
+                board.submit(player_id, entry["score"], entry["ended_at"], {
+                    "name": entry.get("name"),
+                    "session_id": entry.get("session_id"),
+                    "game_type": entry.get("game_type")
+                })
+
+    def _prune_weeks(self) -> None:
+        oldest = (self._newest_week - timedelta(weeks=self._keep_weeks - 1)).isoformat()
+        for period, game_type in list(self._boards):
+            if period.startswith("week:") and period[5:] < oldest:
+                del self._boards[(period, game_type)]
+
+    def _board(self, period: str, game_type: Optional[str], now: Optional[datetime]) -> Optional[Leaderboard]:
+        if period not in self.PERIODS:
+            raise ValueError(f"Período inválido: {period} (use {', '.join(self.PERIODS)})")
+        if period == "week":
+            period = f"week:{week_start(now or datetime.now()).isoformat()}"
+        return self._boards.get((period, game_type))
+
+    def top(self, period: str = "all", game_type: Optional[str] = None, limit: int = 10,
+            offset: int = 0, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Primeiras posições de um placar
+
+        Args:
+            period: "all" (geral) ou "week" (semana atual)
+            game_type: Tipo de jogo, ou None para todos os jogos
+            limit: Quantidade de posições
+            offset: Posições puladas
+            now: Instante que define a semana atual (padrão: agora)
+
+        Returns:
+            Dict com o total de jogadores e as posições pedidas
+
+        Raises:
+            ValueError: período inválido
+        """
+        with self._lock:
+            board = self._board(period, game_type, now)
+            if board is None:
+                return {"players": 0, "entries": []}
+            return {"players": len(board), "entries": board.top(limit, offset)}
+
+    def rank(self, player_id: Hashable, period: str = "all", game_type: Optional[str] = None,
+             now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Posição de um jogador em um placar
+
+        Args:
+            player_id: ID do jogador
+            period: "all" (geral) ou "week" (semana atual)
+            game_type: Tipo de jogo, ou None para todos os jogos
+            now: Instante que define a semana atual (padrão: agora)
+
+        Returns:
+            Dict com rank, melhor pontuação e total de jogadores, ou None
+
+        Raises:
+            ValueError: período inválido
+        """
+        with self._lock:
+            board = self._board(period, game_type, now)
+            return board.rank(player_id) if board is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do índice
+
+        Returns:
+            Dict com entradas indexadas, placares e jogadores no placar geral
+        """
+        with self._lock:
+            overall = self._boards.get(("all", None))
+            return {
+                "indexed_scores": self._indexed,
+                "generation": self._generation,
+                "boards": len(self._boards),
+                "players": len(overall) if overall is not None else 0,
+                "newest_week": self._newest_week.isoformat() if self._newest_week else None
+            }
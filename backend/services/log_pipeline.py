@@ -0,0 +1,142 @@
+"""
+Pipeline de logging do backend
+Os registros são entregues a uma fila e escritos por uma thread em segundo
+plano (QueueHandler/QueueListener), então a thread da requisição nunca faz
+I/O de log. Eventos por frame são amostrados (1 a cada N por jogo): quem
+registra passa extra={"sample_key": game_id} e o filtro da fila decide.
+"""
+
+from typing import Dict, Optional, TextIO
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta registros quando a fila está cheia (nunca bloqueia)"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogSampler:
+    """
+    Amostragem de eventos por chave (ex: game_id): deixa passar o 1º evento
+    e depois 1 a cada `every`
+    """
+
+    def __init__(self, every: int = 100, max_keys: int = 10000):
+        """
+        Args:
+            every: Um evento registrado a cada `every` por chave (1 = todos)
+            max_keys: Chaves acompanhadas antes de reiniciar os contadores
+        """
+        self._every = max(every, 1)
+        self._max_keys = max_keys
+        self._counts: Dict[str, int] = {}
+
+    def sample(self, key: str) -> bool:
+        """
+        Decide se o evento desta chave deve ser registrado
+
+        Args:
+            key: Chave da amostragem (ex: game_id)
+
+        Returns:
+            True para registrar o evento
+        """
+        count = self._counts.get(key, 0)
+        if count == 0 and len(self._counts) >= self._max_keys:
+            self._counts.clear()
+        self._counts[key] = (count + 1) % self._every
+        return count == 0
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Amostra os registros que trazem `sample_key` (extra={"sample_key": ...});
+    os demais passam sempre
+    """
+
+    def __init__(self, sampler: LogSampler):
+        super().__init__()
+        self._sampler = sampler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        return key is None or self._sampler.sample(str(key))
+
+
+# Amostragem dos logs por frame (AETHERIA_LOG_SAMPLE_EVERY, padrão 1 a cada 100)
+frame_log_sampler = LogSampler(int(os.environ.get("AETHERIA_LOG_SAMPLE_EVERY", 100)))
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def configure_logging(level: Optional[str] = None, stream: Optional[TextIO] = None,
+                      queue_size: int = 10000) -> DroppingQueueHandler:
+    """
+    Configura o logger raiz com a fila e a thread de escrita (idempotente)
+
+    Args:
+        level: Nível mínimo (padrão: AETHERIA_LOG_LEVEL ou INFO)
+        stream: Destino dos logs (padrão: stderr)
+        queue_size: Registros pendentes antes de começar a descartar
+
+    Returns:
+        Handler da fila (expõe o número de registros descartados)
+    """
+    global _listener, _queue_handler
+
+    root = logging.getLogger()
+    root.setLevel((level or os.environ.get("AETHERIA_LOG_LEVEL", "INFO")).upper())
+    if _queue_handler is not None:
+        return _queue_handler
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    # Amostragem antes de entrar na fila: registros descartados não ocupam a fila
+    _queue_handler.addFilter(SamplingFilter(frame_log_sampler))
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    # Escreve o que ainda estiver na fila ao sair
+    atexit.register(_stop_listener)
+    # Threads não sobrevivem ao fork (ex: workers do gunicorn com preload)
+    os.register_at_fork(after_in_child=_restart_listener)
+    return _queue_handler
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_listener() -> None:
+    """Recria a fila e a thread de escrita no processo filho após um fork"""
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
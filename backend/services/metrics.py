@@ -0,0 +1,263 @@
+"""
+Métricas do backend no formato texto do Prometheus
+Contadores e histogramas são gravados em shards por thread (sem lock no
+caminho da requisição) e somados apenas quando as métricas são lidas
+"""
+
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from bisect import bisect_left
+import threading
+import weakref
+
+# Limites dos buckets de latência (segundos)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas com escrita local por thread.
+
+    Cada thread grava no seu próprio shard (dict simples); a leitura soma
+    todos os shards. Quando uma thread termina, o shard dela é incorporado
+    a um shard acumulado, então os contadores nunca diminuem mesmo com o
+    servidor criando uma thread por requisição.
+    """
+
+    def __init__(self):
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._gauges: Dict[str, Dict[str, Any]] = {}
+        self._shards: List[Dict[tuple, list]] = []
+        self._retired: Dict[tuple, list] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> None:
+        """Declara um contador"""
+        self._definitions[name] = {"kind": "counter", "help": help_text, "labels": label_names}
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """Declara um histograma"""
+        self._definitions[name] = {"kind": "histogram", "help": help_text, "labels": label_names,
+                                   "buckets": tuple(buckets)}
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """
+        Declara um gauge lido no momento da coleta
+
+        Args:
+            name: Nome da métrica
+            help_text: Descrição
+            read: Função que retorna o valor atual
+        """
+        self._gauges[name] = {"help": help_text, "read": read}
+
+    def _shard(self) -> Dict[tuple, list]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+            weakref.finalize(threading.current_thread(), self._retire, shard)
+        return shard
+
+    def _retire(self, shard: Dict[tuple, list]) -> None:
+        """Incorpora o shard de uma thread encerrada ao shard acumulado"""
+        with self._lock:
+            try:
+                self._shards.remove(shard)
+            except ValueError:
+                return
+            self._merge(self._retired, shard)
+
+    def inc(self, name: str, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        """
+        Incrementa um contador
+
+        Args:
+            name: Nome do contador
+            labels: Valores dos labels, na ordem declarada
+            amount: Incremento
+        """
+        shard = self._shard()
+        key = (name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            shard[key] = [amount]
+        else:
+            cell[0] += amount
+
+    def observe(self, name: str, value: float, labels: Tuple[str, ...] = ()) -> None:
+        """
+        Registra uma observação em um histograma
+
+        Args:
+            name: Nome do histograma
+            value: Valor observado (segundos, para latências)
+            labels: Valores dos labels, na ordem declarada
+        """
+        shard = self._shard()
+        key = (name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            buckets = self._definitions[name]["buckets"]
+            # [contagem por bucket (+Inf no final), soma, total]
+            cell = [[0] * (len(buckets) + 1), 0.0, 0]
+            shard[key] = cell
+        cell[0][bisect_left(self._definitions[name]["buckets"], value)] += 1
+        cell[1] += value
+        cell[2] += 1
+
+    @staticmethod
+    def _merge(target: Dict[tuple, list], source: Dict[tuple, list]) -> None:
+        # Cópia do dict: a thread dona do shard pode inserir chaves durante a leitura
+        for key, cell in dict(source).items():
+            current = target.get(key)
+            if len(cell) == 1:
+                if current is None:
+                    target[key] = [cell[0]]
+                else:
+                    current[0] += cell[0]
+            else:
+                if current is None:
+                    target[key] = [list(cell[0]), cell[1], cell[2]]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], cell[0])]
+                    current[1] += cell[1]
+                    current[2] += cell[2]
+
+    def snapshot(self) -> Dict[tuple, list]:
+        """
+        Soma de todos os shards
+
+        Returns:
+            Dict (nome, labels) -> valor do contador ou [buckets, soma, total]
+        """
+        with self._lock:
+            total: Dict[tuple, list] = {}
+            self._merge(total, self._retired)
+            for shard in self._shards:
+                self._merge(total, shard)
+        return total
+
+    def render(self) -> str:
+        """
+        Exporta as métricas no formato texto do Prometheus (0.0.4)
+
+        Returns:
+            Texto da coleta
+        """
+        values = self.snapshot()
+        by_name: Dict[str, List[Tuple[tuple, list]]] = {}
+        for (name, labels), cell in values.items():
+            by_name.setdefault(name, []).append((labels, cell))
+
+        lines = []
+        for name, definition in sorted(self._definitions.items()):
+            lines.append(f"# HELP {name} {definition['help']}")
+            lines.append(f"# TYPE {name} {definition['kind']}")
+            label_names = definition["labels"]
+            for labels, cell in sorted(by_name.get(name, [])):
+                if definition["kind"] == "counter":
+                    lines.append(f"{name}{_format_labels(label_names, labels)} {_format_value(cell[0])}")
+                    continue
+                cumulative = 0
+                bounds = [_format_value(bound) for bound in definition["buckets"]] + ["+Inf"]
+                for bound, count in zip(bounds, cell[0]):
+                    cumulative += count
+                    bucket_labels = _format_labels(label_names + ("le",), labels + (bound,))
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(label_names, labels)} {_format_value(cell[1])}")
+                lines.append(f"{name}_count{_format_labels(label_names, labels)} {cell[2]}")
+
+        for name, gauge in sorted(self._gauges.items()):
+            lines.append(f"# HELP {name} {gauge['help']}")
+            lines.append(f"# TYPE {name} gauge")
+            try:
+                lines.append(f"{name} {_format_value(gauge['read']())}")
+            except Exception:
+                # Um gauge com erro não deve derrubar a coleta inteira
+                continue
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# Registro usado pelo backend (um por processo)
+metrics_registry = MetricsRegistry()
+
+metrics_registry.counter(
+    "aetheria_http_requests_total", "Requisições HTTP por rota, método e status",
+    ("route", "method", "status")
+)
+metrics_registry.histogram(
+    "aetheria_http_request_duration_seconds", "Latência das requisições HTTP por rota",
+    ("route", "method")
+)
+metrics_registry.histogram(
+    "aetheria_dsp_stage_duration_seconds", "Tempo de cada etapa de AudioProcessor.detect_blow",
+    ("stage",), buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+metrics_registry.counter(
+    "aetheria_frames_processed_total", "Frames de áudio processados por tipo de jogo e origem",
+    ("game_type", "source")
+)
+metrics_registry.histogram(
+    "aetheria_dsp_pool_task_seconds", "Tarefas do pool de DSP: espera por um slot e execução no processo",
+    ("phase",), buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+metrics_registry.counter(
+    "aetheria_overload_switches_total", "Trocas de modo da proteção contra sobrecarga (degraded ou full)",
+    ("mode",)
+)
+metrics_registry.counter(
+    "aetheria_admission_total", "Requisições das classes limitadas por resultado (admitted, rejected, timeout)",
+    ("request_class", "outcome")
+)
+metrics_registry.histogram(
+    "aetheria_admission_wait_seconds", "Espera por uma vaga na classe da requisição",
+    ("request_class",), buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+metrics_registry.counter(
+    "aetheria_inbox_frames_total",
+    "Frames de intensidade por resultado na caixa de entrada do jogo (applied, coalesced, queued, stale)",
+    ("outcome",)
+)
+metrics_registry.histogram(
+    "aetheria_inbox_batch_frames", "Frames aplicados por atualização do jogo na caixa de entrada",
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+metrics_registry.counter(
+    "aetheria_archive_sessions_total",
+    "Sessões tratadas pelo arquivamento (archived, already_archived)",
+    ("outcome",)
+)
+metrics_registry.histogram(
+    "aetheria_archive_run_seconds", "Duração da gravação dos segmentos em cada arquivamento",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+metrics_registry.counter(
+    "aetheria_archive_segments_read_total", "Segmentos do arquivo lidos por consultas históricas"
+)
+metrics_registry.counter(
+    "aetheria_export_sessions_total", "Sessões enviadas pelas exportações por formato (ndjson, csv)",
+    ("format",)
+)
@@ -0,0 +1,146 @@
+"""
+Proteção contra sobrecarga no processamento de áudio PCM
+Com a CPU saturada, todas as requisições de /audio ficam lentas e o jogo de
+todos os pacientes trava. Acima dos limites de carga, os frames PCM passam
+a ser estimados só pelo RMS (caminho de intensidade) até a carga baixar.
+"""
+
+from typing import Dict, Any
+import threading
+import time
+
+from services.metrics import metrics_registry
+
+
+class OverloadGuard:
+    """
+    Decide, a cada frame PCM, entre o DSP completo e o modo degradado.
+
+    Sinais: requisições de áudio em andamento e a média móvel exponencial
+    da latência de processamento dos frames com o DSP completo (dentro do
+    GameManager: sem carga, um chunk de 100 ms leva ~3 ms; com a CPU
+    saturada, a disputa pelo GIL multiplica esse tempo). Entra no modo
+    degradado quando qualquer um passa do limite de entrada. Os frames
+    degradados são baratos e não alimentam a média (ela fica congelada no
+    valor que ativou o modo), então a saída depende só das requisições em
+    andamento abaixo do limite de saída. Na volta ao DSP completo, a média
+    congelada é descartada e recomeça do limite de saída de latência; se
+    os frames completos voltarem a passar do limite de entrada, o modo
+    degradado volta. Cada modo dura pelo menos `min_hold_seconds` desde a
+    última troca, evitando alternar a cada frame. Quando o modo degradado
+    volta logo depois de sair (a carga não tinha baixado), o tempo mínimo
+    nele dobra a cada vez, até MAX_HOLD_FACTOR vezes `min_hold_seconds`:
+    com a CPU saturada por muito tempo, as tentativas de voltar ao DSP
+    completo ficam cada vez mais espaçadas.
+    """
+
+    MAX_HOLD_FACTOR = 8
+
+    def __init__(self, enter_inflight: int = 16, exit_inflight: int = 8,
+                 enter_latency_ms: float = 20.0, exit_latency_ms: float = 8.0,
+                 min_hold_seconds: float = 5.0, smoothing: float = 0.2):
+        """
+        Args:
+            enter_inflight: Requisições em andamento que ativam o modo degradado
+            exit_inflight: Requisições em andamento abaixo das quais ele pode sair
+            enter_latency_ms: Latência média (ms) que ativa o modo degradado
+            exit_latency_ms: Latência média (ms) de partida ao voltar ao DSP completo
+            min_hold_seconds: Tempo mínimo em cada modo antes de trocar de novo
+            smoothing: Peso de cada nova amostra na média da latência (0-1)
+        """
+        if exit_inflight > enter_inflight or exit_latency_ms > enter_latency_ms:
+            raise ValueError("Limites de saída devem ser menores ou iguais aos de entrada")
+
+        self._enter_inflight = enter_inflight
+        self._exit_inflight = exit_inflight
+        self._enter_latency = enter_latency_ms / 1000
+        self._exit_latency = exit_latency_ms / 1000
+        self._min_hold = min_hold_seconds
+        self._smoothing = smoothing
+
+        self._degraded = False
+        self._latency = 0.0
+        self._changed_at = 0.0
+        self._hold = min_hold_seconds   # tempo mínimo no modo degradado atual
+        self._switches = {"degraded": 0, "full": 0}
+        self._degraded_frames = 0
+        self._lock = threading.Lock()
+
+    @property
+    def degraded(self) -> bool:
+        """Se o modo degradado está ativo"""
+        return self._degraded
+
+    def check(self, inflight: int) -> bool:
+        """
+        Avalia a carga e retorna o modo para o frame atual
+
+        Args:
+            inflight: Outras requisições de áudio em andamento
+
+        Returns:
+            True se o frame deve ser processado no modo degradado
+        """
+        with self._lock:
+            now = time.monotonic()
+            held = now - self._changed_at
+            if not self._degraded:
+                if held >= self._min_hold and (inflight >= self._enter_inflight
+                                               or self._latency >= self._enter_latency):
+                    # Voltou na primeira oportunidade: a carga não tinha baixado
+                    failed_probe = self._switches["full"] > 0 and held < 2 * self._min_hold
+                    self._hold = (min(self._hold * 2, self._min_hold * self.MAX_HOLD_FACTOR)
+                                  if failed_probe else self._min_hold)
+                    self._switch(True, now)
+            elif held >= self._hold and inflight <= self._exit_inflight:
+                # A média está congelada desde a entrada: sai só pela carga
+                self._switch(False, now)
+            if self._degraded:
+                self._degraded_frames += 1
+            return self._degraded
+
+    def _switch(self, degraded: bool, now: float) -> None:
+        self._degraded = degraded
+        self._changed_at = now
+        if not degraded:
+            self._latency = self._exit_latency
+        mode = "degraded" if degraded else "full"
+        self._switches[mode] += 1
+        metrics_registry.inc("aetheria_overload_switches_total", (mode,))
+
+    def observe(self, seconds: float) -> None:
+        """
+        Registra a latência de processamento de um frame PCM com o DSP
+        completo (frames degradados não são registrados)
+
+        Args:
+            seconds: Duração do processamento do frame
+        """
+        with self._lock:
+            # Congelada no modo degradado (um frame completo que termina depois da troca não conta)
+            if not self._degraded:
+                self._latency += self._smoothing * (seconds - self._latency)
+
+    def switches(self, mode: str) -> int:
+        """Número de trocas para o modo "degraded" ou "full" """
+        return self._switches[mode]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas da proteção
+
+        Returns:
+            Dict com o modo atual, a latência média, os limites e as trocas de modo
+        """
+        return {
+            "degraded": self._degraded,
+            "latency_ms": self._latency * 1000,
+            "degraded_frames": self._degraded_frames,
+            "switches_to_degraded": self._switches["degraded"],
+            "switches_to_full": self._switches["full"],
+            "enter": {"inflight": self._enter_inflight, "latency_ms": self._enter_latency * 1000},
+            "exit": {"inflight": self._exit_inflight, "latency_ms": self._exit_latency * 1000},
+            "min_hold_seconds": self._min_hold,
+            "degraded_hold_seconds": self._hold
+        }
+
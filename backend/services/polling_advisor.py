@@ -0,0 +1,58 @@
+"""
+Recomendação do intervalo de envio de áudio pelo cliente
+Reduz o tráfego enquanto o paciente está parado entre sopros
+sem perder responsividade durante o sopro
+"""
+
+from typing import Dict, Optional
+
+
+class PollingAdvisor:
+    """
+    Calcula o próximo intervalo de envio (ms) a partir do estado do jogo
+    e da carga do servidor.
+
+    Durante o sopro o intervalo é sempre o mínimo; nos demais estados ele
+    cresce com a carga (requisições de áudio em andamento / capacidade).
+    O intervalo é um máximo: o cliente deve enviar antes se detectar
+    localmente o início de um sopro.
+    """
+
+    DEFAULT_INTERVALS_MS: Dict[str, int] = {
+        "blowing": 100,       # sopro em andamento: máxima responsividade
+        "decelerating": 150,  # barco ainda se movendo
+        "leaking": 250,       # balão esvaziando
+        "idle": 400           # nada mudando
+    }
+
+    def __init__(self, intervals_ms: Optional[Dict[str, int]] = None,
+                 load_capacity: int = 32, max_interval_ms: int = 1000):
+        """
+        Args:
+            intervals_ms: Intervalo base por estado de atividade
+            load_capacity: Requisições simultâneas consideradas carga total
+            max_interval_ms: Intervalo máximo recomendado
+        """
+        self._intervals = dict(self.DEFAULT_INTERVALS_MS)
+        if intervals_ms:
+            self._intervals.update(intervals_ms)
+        self._load_capacity = max(load_capacity, 1)
+        self._max_interval = max_interval_ms
+
+    def recommend(self, activity: str, inflight_requests: int = 0) -> int:
+        """
+        Recomenda o intervalo até o próximo envio
+
+        Args:
+            activity: Estado de atividade do jogo (ver BaseGame.get_activity_state)
+            inflight_requests: Requisições de áudio em andamento no servidor
+
+        Returns:
+            Intervalo em milissegundos
+        """
+        base = self._intervals.get(activity, self._intervals["idle"])
+        if activity == "blowing":
+            return base
+
+        load = min(inflight_requests / self._load_capacity, 1.0)
+        return int(min(base * (1.0 + load), self._max_interval))
@@ -0,0 +1,184 @@
+"""
+Profiling sob demanda das requisições (cProfile)
+Perfila uma fração amostrada das requisições, ou todas as requisições de
+um jogo/rota escolhido, e agrega os perfis por rota
+"""
+
+from typing import Dict, Any, Optional, List
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+
+
+class RequestProfiler:
+    """
+    Perfilador de requisições ligado/desligado em tempo de execução.
+
+    Desligado, o custo por requisição é a leitura de um atributo. Ligado,
+    no máximo max_concurrent requisições são perfiladas ao mesmo tempo
+    (as demais seguem sem profiling), o que limita o overhead.
+    """
+
+    def __init__(self, dump_dir: str = "profiles", max_concurrent: int = 1):
+        """
+        Args:
+            dump_dir: Diretório onde os perfis agregados são gravados
+            max_concurrent: Requisições perfiladas simultaneamente
+        """
+        self.enabled = False
+        self._sample_rate = 0.0
+        self._game_id: Optional[str] = None
+        self._route: Optional[str] = None
+        self._dump_dir = dump_dir
+        self._slots = threading.BoundedSemaphore(max(max_concurrent, 1))
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._counts: Dict[str, Dict[str, float]] = {}
+        self._skipped_busy = 0
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, sample_rate: float = 0.0, game_id: Optional[str] = None,
+                  route: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Liga/desliga o profiling
+
+        Args:
+            enabled: Se o profiling está ligado
+            sample_rate: Fração das requisições perfiladas (0-1)
+            game_id: Perfilar todas as requisições deste jogo
+            route: Perfilar todas as requisições desta rota (ex: /api/games/<game_id>/audio)
+
+        Returns:
+            Configuração atual
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate deve estar entre 0 e 1")
+        self._sample_rate = sample_rate
+        self._game_id = game_id or None
+        self._route = route or None
+        self.enabled = enabled
+        return self.get_status()
+
+    def should_profile(self, route: str, game_id: Optional[str]) -> bool:
+        """Decide se a requisição atual deve ser perfilada"""
+        if self._game_id is not None or self._route is not None:
+            return ((self._game_id is None or game_id == self._game_id)
+                    and (self._route is None or route == self._route))
+        return self._sample_rate > 0.0 and random.random() < self._sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """
+        Inicia o profiling da requisição atual
+
+        Returns:
+            Perfil em andamento, ou None se o limite de requisições
+            perfiladas simultaneamente foi atingido
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._skipped_busy += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Outro profiler (ex: debugger) já está ativo
+            self._slots.release()
+            return None
+        return profile
+
+    def stop(self, profile: cProfile.Profile, route: str, elapsed: float) -> None:
+        """
+        Finaliza o profiling e agrega o perfil na rota
+
+        Args:
+            profile: Perfil retornado por start()
+            route: Rota da requisição
+            elapsed: Duração da requisição em segundos
+        """
+        profile.disable()
+        self._slots.release()
+        try:
+            stats = pstats.Stats(profile)
+        except TypeError:
+            # Nenhuma chamada registrada
+            return
+        with self._lock:
+            if route in self._stats:
+                self._stats[route].add(stats)
+            else:
+                self._stats[route] = stats
+            counts = self._counts.setdefault(route, {"requests": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            counts["requests"] += 1
+            counts["total_seconds"] += elapsed
+            counts["max_seconds"] = max(counts["max_seconds"], elapsed)
+
+    def report(self, route: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        """
+        Relatório em texto do perfil agregado de uma rota
+
+        Args:
+            route: Rota
+            sort: Critério de ordenação do pstats (cumulative, tottime, calls...)
+            limit: Número de funções listadas
+
+        Returns:
+            Texto do relatório, ou None se a rota não tem perfis
+        """
+        with self._lock:
+            stats = self._stats.get(route)
+            if stats is None:
+                return None
+            output = io.StringIO()
+            stats.stream = output
+            stats.sort_stats(sort).print_stats(limit)
+            stats.stream = None
+        return output.getvalue()
+
+    def dump(self) -> List[str]:
+        """
+        Grava os perfis agregados (formato pstats, ex: para snakeviz)
+
+        Returns:
+            Caminhos dos arquivos gravados
+        """
+        os.makedirs(self._dump_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        paths = []
+        with self._lock:
+            for route, stats in self._stats.items():
+                name = route.strip("/").replace("/", "_").replace("<", "").replace(">", "") or "root"
+                path = os.path.join(self._dump_dir, f"{timestamp}_{name}.prof")
+                stats.dump_stats(path)
+                paths.append(path)
+        return paths
+
+    def reset(self) -> None:
+        """Descarta os perfis agregados"""
+        with self._lock:
+            self._stats.clear()
+            self._counts.clear()
+            self._skipped_busy = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Configuração e resumo dos perfis coletados
+
+        Returns:
+            Dict com configuração, rotas perfiladas e requisições ignoradas
+        """
+        with self._lock:
+            routes = {route: dict(counts) for route, counts in self._counts.items()}
+            skipped = self._skipped_busy
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self._sample_rate,
+            "game_id": self._game_id,
+            "route": self._route,
+            "dump_dir": self._dump_dir,
+            "routes": routes,
+            "skipped_busy": skipped
+        }
@@ -0,0 +1,263 @@
+"""
+Agregados diários e semanais da evolução de cada paciente
+Cada fim de sessão soma a sessão às linhas do seu dia e da sua semana
+(sessões, completas, duração, soma e máximo da pontuação; no total e por
+tipo de jogo). Os relatórios leem só as linhas do intervalo pedido: um ano
+em semanas são 52 linhas, qualquer que seja o número de sessões. As linhas
+ficam em um arquivo SQLite próprio, fora do data.json que as outras
+requisições leem inteiro.
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Callable, Tuple
+from datetime import datetime, date, timedelta
+import os
+import sqlite3
+import threading
+import logging
+
+PERIODS = ("day", "week")
+
+# Tipo de jogo das linhas com o total de todos os jogos
+ALL_GAMES = ""
+
+
+def period_start(day: date, period: str) -> date:
+    """
+    Primeiro dia do período que contém o dia
+
+    Args:
+        day: Dia
+        period: "day" ou "week" (semana ISO, começando na segunda-feira)
+    """
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _report_totals(sessions: int, completed: int, duration: float, score_sum: float,
+                   score_max: float) -> Dict[str, Any]:
+    """Totais de uma linha com as médias e a taxa de conclusão"""
+    return {
+        "sessions": sessions,
+        "completed": completed,
+        "duration": duration,
+        "score_sum": score_sum,
+        "score_max": score_max,
+        "average_score": score_sum / sessions if sessions else 0,
+        "average_duration": duration / sessions if sessions else 0,
+        "completion_rate": completed / sessions if sessions else 0
+    }
+
+
+class RollupStore:
+    """
+    Linhas agregadas por (paciente, período, início do período, tipo de
+    jogo) em SQLite, atualizadas por upsert: somar uma sessão é um punhado
+    de INSERT ... ON CONFLICT DO UPDATE, e vários workers podem escrever no
+    mesmo arquivo.
+
+    Pacientes com sessões anteriores aos agregados têm o histórico somado
+    uma única vez (`backfill`); a tabela rollup_users registra quem já foi
+    incluído, e a tabela rollup_sessions as sessões já somadas (um fim de
+    sessão repetido pelo cliente não conta a sessão de novo).
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rollups (
+            user_id TEXT NOT NULL,
+            period TEXT NOT NULL,
+            start TEXT NOT NULL,
+            game_type TEXT NOT NULL,
+            sessions INTEGER NOT NULL,
+            completed INTEGER NOT NULL,
+            duration NUMERIC NOT NULL,
+            score_sum NUMERIC NOT NULL,
+            score_max NUMERIC NOT NULL,
+            PRIMARY KEY (user_id, period, start, game_type)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rollup_users (
+            user_id TEXT PRIMARY KEY
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rollup_sessions (
+            session_id TEXT PRIMARY KEY
+        ) WITHOUT ROWID;
+    """
+
+    _UPSERT = (
+        "INSERT INTO rollups (user_id, period, start, game_type, sessions, completed, duration, "
+        "score_sum, score_max) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (user_id, period, start, game_type) DO UPDATE SET "
+        "sessions = sessions + excluded.sessions, "
+        "completed = completed + excluded.completed, "
+        "duration = duration + excluded.duration, "
+        "score_sum = score_sum + excluded.score_sum, "
+        "score_max = MAX(score_max, excluded.score_max)"
+    )
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Caminho do arquivo SQLite (criado no primeiro uso)
+        """
+        self._path = path
+        # Uma conexão por thread e por processo (conexões não sobrevivem a fork)
+        self._local = threading.local()
+        self._logger = logging.getLogger("RollupStore")
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, criando se necessário"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _session_rows(user_id: str, sessions: Iterable[Dict[str, Any]]) -> List[Tuple]:
+        """Linhas (já somadas por período e tipo de jogo) de sessões finalizadas"""
+        totals: Dict[Tuple[str, str, str], List[float]] = {}
+        for session in sessions:
+            if not session.get("ended_at"):
+                continue
+            day = datetime.fromisoformat(session["ended_at"]).date()
+            score = session.get("score") or 0
+            duration = session.get("duration") or 0
+            completed = int(bool(session.get("completed")))
+            game_types = (ALL_GAMES, session["game_type"]) if session.get("game_type") else (ALL_GAMES,)
+            for period in PERIODS:
+                start = period_start(day, period).isoformat()
+                for game_type in game_types:
+                    row = totals.get((period, start, game_type))
+                    if row is None:
+                        totals[(period, start, game_type)] = [1, completed, duration, score, score]
+                    else:
+                        row[0] += 1
+                        row[1] += completed
+                        row[2] += duration
+                        row[3] += score
+                        row[4] = max(row[4], score)
+        return [(user_id, *key, *values) for key, values in totals.items()]
+
+    def has_user(self, user_id: str) -> bool:
+        """Se o histórico do paciente já está nos agregados"""
+        row = self._connection().execute(
+            "SELECT 1 FROM rollup_users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row is not None
+
+    def add_session(self, user_id: str, session: Dict[str, Any],
+                    history: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+        """
+        Soma uma sessão recém-finalizada aos agregados do paciente (uma vez
+        por ID de sessão)
+
+        Args:
+            user_id: ID do paciente
+            session: Sessão finalizada
+            history: Sessões do paciente (incluindo esta), usadas só se o
+                     histórico ainda não foi somado
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            sessions = history() if self._claim_user(conn, user_id) else [session]
+            rows = self._session_rows(user_id, self._claim_sessions(conn, sessions))
+            conn.executemany(self._UPSERT, rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def backfill(self, user_id: str, sessions: Iterable[Dict[str, Any]]) -> int:
+        """
+        Soma o histórico do paciente, se ainda não foi somado
+
+        Args:
+            user_id: ID do paciente
+            sessions: Sessões do paciente
+
+        Returns:
+            Número de linhas gravadas (0 se o histórico já estava somado)
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = (self._session_rows(user_id, self._claim_sessions(conn, sessions))
+                    if self._claim_user(conn, user_id) else [])
+            conn.executemany(self._UPSERT, rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if rows:
+            self._logger.info("Histórico de %s somado aos agregados (%d linhas)", user_id, len(rows))
+        return len(rows)
+
+    @staticmethod
+    def _claim_user(conn: sqlite3.Connection, user_id: str) -> bool:
+        """Registra o paciente; True se o histórico dele ainda não foi somado"""
+        cursor = conn.execute("INSERT OR IGNORE INTO rollup_users (user_id) VALUES (?)", (user_id,))
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def _claim_sessions(conn: sqlite3.Connection,
+                        sessions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Registra as sessões finalizadas; retorna as que ainda não tinham sido somadas"""
+        claimed = []
+        for session in sessions:
+            if not session.get("ended_at"):
+                continue
+            cursor = conn.execute("INSERT OR IGNORE INTO rollup_sessions (session_id) VALUES (?)",
+                                  (session["id"],))
+            if cursor.rowcount == 1:
+                claimed.append(session)
+        return claimed
+
+    def query(self, user_id: str, period: str, start: date, end: date,
+              game_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Linhas de um intervalo
+
+        Args:
+            user_id: ID do paciente
+            period: "day" ou "week"
+            start: Primeiro dia do intervalo
+            end: Último dia do intervalo (inclusive)
+            game_type: Só os totais deste tipo de jogo (opcional)
+
+        Returns:
+            Linhas com atividade cujo período começa no intervalo (a semana
+            que contém `start` entra inteira), em ordem, com médias e taxa
+            de conclusão; sem game_type, cada linha traz também `games`
+
+        Raises:
+            ValueError: período inválido
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Período inválido: {period} (use {', '.join(PERIODS)})")
+        sql = ("SELECT start, game_type, sessions, completed, duration, score_sum, score_max FROM rollups "
+               "WHERE user_id = ? AND period = ? AND start BETWEEN ? AND ?")
+        params = [user_id, period, period_start(start, period).isoformat(), end.isoformat()]
+        if game_type is not None:
+            sql += " AND game_type = ?"
+            params.append(game_type)
+        sql += " ORDER BY start, game_type"
+
+        result: List[Dict[str, Any]] = []
+        for row_start, row_game, *totals in self._connection().execute(sql, params):
+            if game_type is not None:
+                result.append({"start": row_start, **_report_totals(*totals)})
+            elif row_game == ALL_GAMES:
+                result.append({"start": row_start, **_report_totals(*totals), "games": {}})
+            else:
+                # Linhas por jogo vêm logo depois da linha do total (ALL_GAMES = "" ordena antes)
+                result[-1]["games"][row_game] = _report_totals(*totals)
+        return result
@@ -0,0 +1,307 @@
+"""
+Arquivo frio das sessões antigas
+Sessões mais antigas que a idade de retenção saem da lista `sessions` do
+data.json (lida inteira a cada requisição) e vão para segmentos NDJSON
+compactados com gzip, um por mês de início da sessão. Um índice pequeno
+guarda, para cada segmento, o intervalo de tempo e os usuários presentes,
+então uma consulta histórica abre só os segmentos que podem ter sessões
+do usuário e do período pedidos.
+"""
+
+from typing import Dict, Any, Optional, List, Iterator, Iterable, Tuple
+from contextlib import contextmanager
+from datetime import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: as execuções só são serializadas dentro do processo
+    fcntl = None
+
+from services.metrics import metrics_registry
+
+
+class SessionArchive:
+    """
+    Segmentos imutáveis de sessões arquivadas e o índice deles.
+
+    Cada execução do arquivamento grava novos segmentos (nunca altera os
+    existentes) e depois troca o índice de forma atômica; segmentos fora do
+    índice (execução interrompida) são ignorados. O índice registra também
+    o corte da última execução concluída: sessões anteriores a ele que
+    ainda estejam no data.json (o arquivamento parou depois do índice e
+    antes de regravar o data.json) já estão arquivadas e não são duplicadas.
+
+    As execuções são serializadas (threads e workers) por um lock exclusivo
+    no arquivo `archive.lock` do diretório: cada uma relê o índice já com o
+    lock e grava o índice combinado antes de liberá-lo.
+    """
+
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "archive.lock"
+
+    def __init__(self, directory: str, compresslevel: int = 6):
+        """
+        Args:
+            directory: Diretório dos segmentos e do índice (criado no primeiro arquivamento)
+            compresslevel: Nível de compressão do gzip (1-9)
+        """
+        self._directory = directory
+        self._compresslevel = compresslevel
+        # Índice carregado e os usuários de cada segmento (como conjuntos)
+        self._index: Tuple[Dict[str, Any], Dict[str, frozenset]] = ({"archived_before": None, "segments": []}, {})
+        self._index_version: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        # Lock das execuções: reentrante na mesma thread, flock entre processos
+        self._run_lock = threading.RLock()
+        self._run_depth = 0
+        self._run_file = None
+        self._logger = logging.getLogger("SessionArchive")
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def _index_path(self) -> str:
+        return os.path.join(self._directory, self.INDEX_FILE)
+
+    @contextmanager
+    def run_lock(self) -> Iterator[None]:
+        """
+        Lock exclusivo das execuções do arquivamento (entre threads e workers)
+
+        Quem altera o data.json junto com o arquivamento segura o lock a
+        execução inteira; archive() o toma de novo (o lock é reentrante).
+        """
+        with self._run_lock:
+            if self._run_depth == 0:
+                os.makedirs(self._directory, exist_ok=True)
+                self._run_file = open(os.path.join(self._directory, self.LOCK_FILE), "a+b")
+                if fcntl is not None:
+                    fcntl.flock(self._run_file.fileno(), fcntl.LOCK_EX)
+            self._run_depth += 1
+            try:
+                yield
+            finally:
+                self._run_depth -= 1
+                if self._run_depth == 0:
+                    # Fechar o arquivo libera o flock
+                    self._run_file.close()
+                    self._run_file = None
+
+    def _load_index(self) -> Tuple[Dict[str, Any], Dict[str, frozenset]]:
+        """Índice atual e usuários por segmento (relidos só se o arquivo mudou, ex: outro worker arquivou)"""
+        path = self._index_path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return {"archived_before": None, "segments": []}, {}
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if version != self._index_version:
+                with open(path, encoding="utf-8") as f:
+                    index = json.load(f)
+                users = {segment["file"]: frozenset(segment["users"]) for segment in index["segments"]}
+                self._index = (index, users)
+                self._index_version = version
+            return self._index
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        path = self._index_path()
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _read_index(self) -> Dict[str, Any]:
+        """Índice lido do disco agora, sem o cache (chamado com o lock das execuções)"""
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"archived_before": None, "segments": []}
+
+    def archive(self, sessions: Iterable[Dict[str, Any]], cutoff: str) -> Dict[str, Any]:
+        """
+        Grava em segmentos as sessões iniciadas antes do corte
+
+        Args:
+            sessions: Sessões candidatas (todas com started_at < cutoff)
+            cutoff: Início (ISO 8601) a partir do qual as sessões ficam no data.json
+
+        Returns:
+            Dict com sessões arquivadas, já arquivadas antes (ignoradas),
+            segmentos e bytes gravados e a duração
+        """
+        with self.run_lock():
+            return self._archive(sessions, cutoff)
+
+    def _archive(self, sessions: Iterable[Dict[str, Any]], cutoff: str) -> Dict[str, Any]:
+        """Arquivamento (chamado com o lock das execuções)"""
+        started = time.perf_counter()
+        # Relido com o lock: segmentos de outra execução concluída entram no índice combinado
+        index = self._read_index()
+        previous = index.get("archived_before")
+
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        skipped = 0
+        for session in sessions:
+            if previous and session["started_at"] < previous:
+                skipped += 1
+                continue
+            by_month.setdefault(session["started_at"][:7], []).append(session)
+
+        os.makedirs(self._directory, exist_ok=True)
+        run = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        segments = []
+        for month in sorted(by_month):
+            segments.append(self._write_segment(month, run, by_month[month]))
+
+        self._write_index({
+            "archived_before": max(cutoff, previous) if previous else cutoff,
+            "segments": index["segments"] + segments
+        })
+
+        archived = sum(segment["sessions"] for segment in segments)
+        seconds = time.perf_counter() - started
+        metrics_registry.inc("aetheria_archive_sessions_total", ("archived",), archived)
+        metrics_registry.inc("aetheria_archive_sessions_total", ("already_archived",), skipped)
+        metrics_registry.observe("aetheria_archive_run_seconds", seconds)
+        self._logger.info("%d sessões arquivadas em %d segmentos (%.2fs)", archived, len(segments), seconds)
+        return {
+            "archived": archived,
+            "already_archived": skipped,
+            "segments": len(segments),
+            "bytes": sum(segment["bytes"] for segment in segments),
+            "cutoff": cutoff,
+            "seconds": seconds
+        }
+
+    def _write_segment(self, month: str, run: str, sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Grava um segmento (ordenado por início) e retorna sua entrada no índice"""
+        sessions.sort(key=lambda s: s["started_at"])
+        name = f"sessions-{month}-{run}.ndjson.gz"
+        path = os.path.join(self._directory, name)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=self._compresslevel) as f:
+            for session in sessions:
+                f.write(json.dumps(session, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+        os.replace(tmp, path)
+        return {
+            "file": name,
+            "month": month,
+            "first": sessions[0]["started_at"],
+            "last": sessions[-1]["started_at"],
+            "sessions": len(sessions),
+            "bytes": os.path.getsize(path),
+            "users": sorted({session["user_id"] for session in sessions})
+        }
+
+    def snapshot(self, user_id: Optional[str] = None, start: Optional[str] = None,
+                 end: Optional[str] = None) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        Corte da última execução e segmentos do usuário e do período, da
+        mesma versão do índice
+
+        Sessões do data.json iniciadas antes do corte já estão nos segmentos
+        (ver a docstring da classe); quem junta as duas fontes usa o corte e
+        os segmentos da mesma leitura do índice.
+
+        Args:
+            user_id: ID do usuário (None para todos)
+            start: Início mínimo (ISO 8601, inclusive)
+            end: Início máximo (ISO 8601, exclusivo)
+
+        Returns:
+            Tupla (archived_before, entradas do índice em ordem de tempo)
+        """
+        index, users = self._load_index()
+        segments = sorted((
+            segment for segment in index["segments"]
+            if (start is None or segment["last"] >= start)
+            and (end is None or segment["first"] < end)
+            and (user_id is None or user_id in users.get(segment["file"], ()))
+        ), key=lambda segment: segment["first"])
+        return index.get("archived_before"), segments
+
+    def segments(self, user_id: Optional[str] = None, start: Optional[str] = None,
+                 end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Segmentos que podem ter sessões do usuário e do período (pelo índice)
+
+        Args:
+            user_id: ID do usuário (None para todos)
+            start: Início mínimo (ISO 8601, inclusive)
+            end: Início máximo (ISO 8601, exclusivo)
+
+        Returns:
+            Entradas do índice, em ordem de tempo
+        """
+        return self.snapshot(user_id, start, end)[1]
+
+    def iter_sessions(self, user_id: Optional[str] = None, start: Optional[str] = None,
+                      end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Sessões arquivadas do usuário e do período, lidas segmento a segmento
+
+        Args:
+            user_id: ID do usuário (None para todos)
+            start: Início mínimo (ISO 8601, inclusive)
+            end: Início máximo (ISO 8601, exclusivo)
+
+        Yields:
+            Sessões em ordem de início (só um segmento descompactado por vez)
+        """
+        return self.read_segments(self.segments(user_id, start, end), user_id, start, end)
+
+    def read_segments(self, segments: Iterable[Dict[str, Any]], user_id: Optional[str] = None,
+                      start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Sessões do usuário e do período nos segmentos dados (de `snapshot`)
+
+        Args:
+            segments: Entradas do índice, em ordem de tempo
+            user_id: ID do usuário (None para todos)
+            start: Início mínimo (ISO 8601, inclusive)
+            end: Início máximo (ISO 8601, exclusivo)
+
+        Yields:
+            Sessões em ordem de início (só um segmento descompactado por vez)
+        """
+        # Linhas de outros usuários são descartadas sem decodificar o JSON
+        needle = '"user_id":' + json.dumps(user_id, ensure_ascii=False) if user_id is not None else None
+        for segment in segments:
+            metrics_registry.inc("aetheria_archive_segments_read_total")
+            with gzip.open(os.path.join(self._directory, segment["file"]), "rt", encoding="utf-8") as f:
+                for line in f:
+                    if needle is not None and needle not in line:
+                        continue
+                    session = json.loads(line)
+                    if user_id is not None and session["user_id"] != user_id:
+                        continue
+                    if start is not None and session["started_at"] < start:
+                        continue
+                    if end is not None and session["started_at"] >= end:
+                        break
+                    yield session
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do arquivo
+
+        Returns:
+            Dict com o corte da última execução, segmentos, sessões e bytes
+        """
+        index, _ = self._load_index()
+        return {
+            "archived_before": index.get("archived_before"),
+            "segments": len(index["segments"]),
+            "sessions": sum(segment["sessions"] for segment in index["segments"]),
+            "bytes": sum(segment["bytes"] for segment in index["segments"])
+        }
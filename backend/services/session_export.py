@@ -0,0 +1,214 @@
+"""
+Exportação de sessões em NDJSON ou CSV sem montar a resposta em memória
+As sessões vêm do arquivo frio (um segmento descompactado por vez) e do
+data.json, lido em blocos por um decodificador incremental: cada sessão é
+decodificada, filtrada, escrita no bloco de saída e descartada. A memória
+usada não depende do número de sessões exportadas.
+"""
+
+from typing import Dict, Any, Optional, Iterator, Iterable, TextIO
+import csv
+import io
+import json
+import re
+
+from services.metrics import metrics_registry
+from services.session_archive import SessionArchive
+
+# Formatos aceitos e o mimetype de cada um
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Colunas do CSV (campos das sessões gravados por start_session/end_session)
+CSV_FIELDS = ("id", "user_id", "game_type", "started_at", "ended_at", "duration", "score", "completed")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+class _IncrementalDecoder:
+    """
+    Lê valores JSON de um arquivo em blocos. O buffer guarda só o trecho
+    ainda não decodificado; um valor maior que o bloco faz a leitura dobrar
+    até ele caber.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Lê mais um bloco (pelo menos o tamanho do que está pendente); False no fim do arquivo"""
+        if self._eof:
+            return False
+        pending = self._buffer[self._pos:]
+        chunk = self._file.read(max(self._chunk_size, len(pending)))
+        self._buffer, self._pos = pending + chunk, 0
+        self._eof = not chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Próximo caractere que não é espaço ('' no fim do arquivo)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, *chars: str) -> str:
+        """Consome o próximo caractere, que deve ser um dos dados"""
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"JSON inválido: esperado {' ou '.join(chars)}, encontrado {char or 'fim do arquivo'!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decodifica o próximo valor"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Um número cortado pelo fim do bloco ("-3" de "-3.25") continua no
+            # próximo; em JSON válido nenhum valor é seguido desses caracteres
+            if (end == len(self._buffer) or self._buffer[end] in _NUMBER_CHARS) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_json_array(f: TextIO, key: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Elementos de uma lista de um objeto JSON, um por vez
+
+    Args:
+        f: Arquivo de texto com um objeto JSON
+        key: Chave da lista no objeto (ex: "sessions")
+        chunk_size: Caracteres lidos por vez
+
+    Yields:
+        Elementos da lista, em ordem (nada se a chave não existir)
+
+    Raises:
+        ValueError: arquivo não é um objeto JSON válido
+    """
+    decoder = _IncrementalDecoder(f, chunk_size)
+    decoder.expect("{")
+    if decoder.peek() == "}":
+        return
+    while True:
+        name = decoder.value()
+        decoder.expect(":")
+        if name != key:
+            # Outras chaves (ex: users) são decodificadas e descartadas
+            decoder.value()
+        else:
+            decoder.expect("[")
+            if decoder.peek() == "]":
+                return
+            while True:
+                yield decoder.value()
+                if decoder.expect(",", "]") == "]":
+                    return
+        if decoder.expect(",", "}") == "}":
+            return
+
+
+def iter_sessions(archive: SessionArchive, data_file: str, user_id: Optional[str] = None,
+                  start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Sessões arquivadas e do data.json do usuário e do período
+
+    O data.json é aberto antes de ler o índice do arquivo: um arquivamento
+    concluído depois disso só acrescenta ao índice sessões que também estão
+    no data.json aberto, e essas (iniciadas antes do corte) são puladas.
+
+    Args:
+        archive: Arquivo frio das sessões
+        data_file: Caminho do data.json
+        user_id: ID do usuário (None para todos)
+        start: Início mínimo (ISO 8601, inclusive)
+        end: Início máximo (ISO 8601, exclusivo)
+
+    Yields:
+        Sessões, primeiro as arquivadas (em ordem de início), depois as do data.json
+    """
+    try:
+        f = open(data_file, encoding="utf-8")
+    except FileNotFoundError:
+        f = io.StringIO("{}")
+    with f:
+        archived_before, segments = archive.snapshot(user_id, start, end)
+        yield from archive.read_segments(segments, user_id, start, end)
+        for session in iter_json_array(f, "sessions"):
+            if user_id is not None and session["user_id"] != user_id:
+                continue
+            if archived_before is not None and session["started_at"] < archived_before:
+                continue
+            if start is not None and session["started_at"] < start:
+                continue
+            if end is not None and session["started_at"] >= end:
+                continue
+            yield session
+
+
+def export_chunks(sessions: Iterable[Dict[str, Any]], export_format: str,
+                  chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Sessões serializadas em blocos de texto para uma resposta em streaming
+
+    Args:
+        sessions: Sessões a exportar
+        export_format: "ndjson" (uma sessão JSON por linha) ou "csv" (colunas CSV_FIELDS)
+        chunk_size: Tamanho aproximado de cada bloco (caracteres)
+
+    Yields:
+        Blocos de texto; o primeiro sai logo (cabeçalho do CSV ou primeira sessão)
+
+    Raises:
+        ValueError: formato inválido
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Formato inválido: {export_format} (use {', '.join(EXPORT_FORMATS)})")
+    return _export_chunks(sessions, export_format, chunk_size)
+
+
+def _export_chunks(sessions: Iterable[Dict[str, Any]], export_format: str, chunk_size: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, CSV_FIELDS, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    exported = 0
+    try:
+        for session in sessions:
+            if writer is not None:
+                writer.writerow(session)
+            else:
+                buffer.write(json.dumps(session, ensure_ascii=False, separators=(",", ":")))
+                buffer.write("\n")
+            exported += 1
+            # A primeira sessão sai sozinha para a resposta começar na hora
+            if exported == 1 or buffer.tell() >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        metrics_registry.inc("aetheria_export_sessions_total", (export_format,), exported)
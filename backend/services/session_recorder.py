@@ -0,0 +1,280 @@
+"""
+Gravação das sessões de jogo para reprodução posterior
+Cada jogo grava seus eventos (início, frames de áudio, fim) em arquivos
+colunares binários que podem ser lidos diretamente com np.memmap
+"""
+
+from typing import Dict, Any, Optional, List
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 2
+
+# Tipos de evento gravados na coluna "kind"
+EVENT_INTENSITY = 0  # process_audio_intensity (intensity, metering_db, frames, blow_frames)
+EVENT_PCM = 1        # process_audio_input (amostras int16 em pcm.bin)
+EVENT_START = 2      # start_game
+EVENT_END = 3        # end_game
+
+# Colunas de tamanho fixo: um valor por evento, em little-endian
+COLUMNS: Dict[str, str] = {
+    "seq": "<u4",          # sequência do frame (BaseGame.frame_sequence)
+    "timestamp": "<f8",    # segundos desde a época (time.time)
+    "kind": "<u1",         # EVENT_*
+    "intensity": "<f4",    # NaN quando não se aplica
+    "metering_db": "<f4",  # NaN quando não informado
+    "pcm_offset": "<u8",   # primeira amostra do frame em pcm.bin
+    "pcm_length": "<u4",   # número de amostras do frame
+    "frames": "<u2",       # frames de intensidade combinados no evento (versão 2)
+    "blow_frames": "<u2"   # quantos deles foram sopro (só quando frames > 1)
+}
+# Valor das colunas ausentes em segmentos gravados por versões anteriores
+COLUMN_DEFAULTS: Dict[str, int] = {"frames": 1, "blow_frames": 0}
+PCM_DTYPE = "<i2"
+PCM_FILE = "pcm.bin"
+META_FILE = "meta.json"
+# Taxa de amostragem do PCM de gravações sem "sample_rate" no meta.json
+DEFAULT_SAMPLE_RATE = 44100
+
+
+class SessionRecorder:
+    """
+    Grava os eventos de entrada de cada jogo em <diretório>/<game_id>/<pid>/.
+
+    Cada processo escreve no seu próprio segmento, então vários workers
+    podem gravar o mesmo jogo; a ordem dos eventos é dada pela coluna "seq".
+    Os eventos ficam em buffer por jogo e vão para o disco a cada
+    flush_events eventos (ou flush_pcm_bytes de áudio), no fim do jogo e
+    na saída do processo.
+    """
+
+    def __init__(self, directory: str, flush_events: int = 256, flush_pcm_bytes: int = 1 << 20,
+                 sample_rate: int = DEFAULT_SAMPLE_RATE):
+        """
+        Args:
+            directory: Diretório raiz das gravações
+            flush_events: Eventos em buffer por jogo antes de gravar
+            flush_pcm_bytes: Bytes de áudio em buffer por jogo antes de gravar
+            sample_rate: Taxa de amostragem do PCM gravado (a do servidor)
+        """
+        self._directory = directory
+        self._sample_rate = sample_rate
+        self._flush_events = flush_events
+        self._flush_pcm_bytes = flush_pcm_bytes
+        self._buffers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._events_written = 0
+        self._logger = logging.getLogger("SessionRecorder")
+
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.flush_all)
+
+    @property
+    def directory(self) -> str:
+        """Diretório raiz das gravações"""
+        return self._directory
+
+    def open_session(self, game_id: str, game_type: str, player_name: str) -> None:
+        """
+        Registra os metadados do jogo (uma vez, na criação)
+
+        Args:
+            game_id: ID do jogo
+            game_type: Tipo do jogo ("boat", "balloon")
+            player_name: Nome do jogador
+        """
+        session_dir = os.path.join(self._directory, game_id)
+        os.makedirs(session_dir, exist_ok=True)
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "game_id": game_id,
+            "game_type": game_type,
+            "player_name": player_name,
+            "created_at": time.time(),
+            "columns": COLUMNS,
+            "pcm_dtype": PCM_DTYPE,
+            "sample_rate": self._sample_rate
+        }
+        tmp_path = os.path.join(session_dir, META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(session_dir, META_FILE))
+
+    def record_intensity(self, game_id: str, seq: int, intensity: float,
+                         metering_db: Optional[float] = None, frames: int = 1,
+                         blow_frames: int = 0) -> None:
+        """
+        Grava um frame de intensidade (process_audio_intensity); frames
+        combinados pela caixa de entrada do jogo são gravados como um evento
+        com a maior intensidade e o número de frames e de frames de sopro
+        """
+        self._append(game_id, seq, EVENT_INTENSITY, intensity,
+                     float("nan") if metering_db is None else metering_db,
+                     frames=frames, blow_frames=blow_frames if frames > 1 else 0)
+
+    def record_pcm(self, game_id: str, seq: int, audio_data: bytes) -> None:
+        """Grava um frame de áudio bruto PCM int16 (process_audio_input)"""
+        # Ignorar um byte sobrando (o jogo também só lê amostras inteiras)
+        usable = len(audio_data) - len(audio_data) % 2
+        self._append(game_id, seq, EVENT_PCM, float("nan"), float("nan"), audio_data[:usable])
+
+    def record_start(self, game_id: str, seq: int) -> None:
+        """Grava o início do jogo"""
+        self._append(game_id, seq, EVENT_START, float("nan"), float("nan"))
+
+    def record_end(self, game_id: str, seq: int) -> None:
+        """Grava o fim do jogo e descarrega o buffer do jogo"""
+        self._append(game_id, seq, EVENT_END, float("nan"), float("nan"))
+        self.flush(game_id)
+
+    def _append(self, game_id: str, seq: int, kind: int, intensity: float,
+                metering_db: float, pcm: bytes = b"", frames: int = 1, blow_frames: int = 0) -> None:
+        with self._lock:
+            buffer = self._buffers.get(game_id)
+            if buffer is None:
+                buffer = {"rows": [], "pcm": [], "pcm_bytes": 0}
+                self._buffers[game_id] = buffer
+            buffer["rows"].append((seq, time.time(), kind, intensity, metering_db, len(pcm) // 2,
+                                   frames, blow_frames))
+            if pcm:
+                buffer["pcm"].append(pcm)
+                buffer["pcm_bytes"] += len(pcm)
+            full = len(buffer["rows"]) >= self._flush_events or buffer["pcm_bytes"] >= self._flush_pcm_bytes
+        if full:
+            self.flush(game_id)
+
+    def flush(self, game_id: str) -> None:
+        """
+        Grava no disco os eventos em buffer de um jogo
+
+        Args:
+            game_id: ID do jogo
+        """
+        with self._lock:
+            buffer = self._buffers.pop(game_id, None)
+        if buffer is None or not buffer["rows"]:
+            return
+
+        segment_dir = os.path.join(self._directory, game_id, str(os.getpid()))
+        rows = buffer["rows"]
+        with self._write_lock:
+            try:
+                os.makedirs(segment_dir, exist_ok=True)
+                # Áudio primeiro: uma gravação interrompida deixa no máximo
+                # amostras sem evento, que o leitor ignora
+                with open(os.path.join(segment_dir, PCM_FILE), "ab") as f:
+                    pcm_start = f.seek(0, os.SEEK_END) // 2
+                    for chunk in buffer["pcm"]:
+                        f.write(chunk)
+
+                lengths = np.array([row[5] for row in rows], dtype=COLUMNS["pcm_length"])
+                offsets = pcm_start + np.concatenate((np.zeros(1, dtype=np.uint64), np.cumsum(lengths[:-1], dtype=np.uint64)))
+                columns = {
+                    "seq": [row[0] for row in rows],
+                    "timestamp": [row[1] for row in rows],
+                    "kind": [row[2] for row in rows],
+                    "intensity": [row[3] for row in rows],
+                    "metering_db": [row[4] for row in rows],
+                    "pcm_offset": offsets,
+                    "pcm_length": lengths,
+                    "frames": [row[6] for row in rows],
+                    "blow_frames": [row[7] for row in rows]
+                }
+                for name, dtype in COLUMNS.items():
+                    with open(os.path.join(segment_dir, name + ".bin"), "ab") as f:
+                        np.asarray(columns[name], dtype=dtype).tofile(f)
+                self._events_written += len(rows)
+            except OSError as e:
+                self._logger.error(f"Erro ao gravar sessão {game_id}: {str(e)}")
+
+    def flush_all(self) -> None:
+        """Grava no disco os buffers de todos os jogos"""
+        with self._lock:
+            game_ids = list(self._buffers)
+        for game_id in game_ids:
+            self.flush(game_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas da gravação
+
+        Returns:
+            Dict com diretório, eventos gravados e jogos com buffer pendente
+        """
+        with self._lock:
+            pending = sum(len(buffer["rows"]) for buffer in self._buffers.values())
+            return {
+                "directory": self._directory,
+                "events_written": self._events_written,
+                "events_pending": pending,
+                "games_buffered": len(self._buffers)
+            }
+
+
+def _read_column(path: str, dtype: str) -> np.ndarray:
+    """Mapeia uma coluna em memória (arquivo vazio ou ausente vira array vazio)"""
+    if not os.path.exists(path) or os.path.getsize(path) < np.dtype(dtype).itemsize:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def load_session(session_dir: str) -> Dict[str, Any]:
+    """
+    Lê uma sessão gravada, juntando os segmentos de todos os processos
+    em ordem de execução
+
+    Args:
+        session_dir: Diretório do jogo (<diretório>/<game_id>)
+
+    Returns:
+        Dict com "meta", as colunas em "events" (arrays numpy ordenados)
+        e uma lista "pcm" com o array de amostras de cada segmento
+        (events["segment"] indica o segmento de cada evento)
+    """
+    with open(os.path.join(session_dir, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    parts: List[Dict[str, np.ndarray]] = []
+    pcm_segments: List[np.ndarray] = []
+    for entry in sorted(os.listdir(session_dir)):
+        segment_dir = os.path.join(session_dir, entry)
+        if not os.path.isdir(segment_dir):
+            continue
+        columns = {name: _read_column(os.path.join(segment_dir, name + ".bin"), dtype)
+                   for name, dtype in COLUMNS.items()
+                   if name not in COLUMN_DEFAULTS or os.path.exists(os.path.join(segment_dir, name + ".bin"))}
+        pcm = _read_column(os.path.join(segment_dir, PCM_FILE), PCM_DTYPE)
+
+        # Uma gravação interrompida pode deixar colunas de tamanhos diferentes
+        count = min(len(column) for column in columns.values())
+        columns = {name: column[:count] for name, column in columns.items()}
+        for name, default in COLUMN_DEFAULTS.items():
+            if name not in columns:
+                columns[name] = np.full(count, default, dtype=COLUMNS[name])
+        complete = columns["pcm_offset"] + columns["pcm_length"] <= len(pcm)
+        if not complete.all():
+            columns = {name: column[complete] for name, column in columns.items()}
+
+        columns["segment"] = np.full(len(columns["seq"]), len(pcm_segments), dtype=np.uint32)
+        parts.append(columns)
+        pcm_segments.append(pcm)
+
+    names = list(COLUMNS) + ["segment"]
+    if parts:
+        events = {name: np.concatenate([part[name] for part in parts]) for name in names}
+    else:
+        events = {name: np.empty(0, dtype=COLUMNS.get(name, "<u4")) for name in names}
+
+    # Início/fim acontecem depois do frame "seq"; frames de áudio são o frame "seq"
+    after_frame = events["kind"] >= EVENT_START
+    order = np.lexsort((events["timestamp"], after_frame, events["seq"]))
+    events = {name: column[order] for name, column in events.items()}
+
+    return {"meta": meta, "events": events, "pcm": pcm_segments}
@@ -0,0 +1,172 @@
+"""
+Reprodução de sessões gravadas pelo SessionRecorder
+Alimenta BoatGame e BalloonGame com os eventos gravados, sem HTTP e com
+relógio virtual, o mais rápido que a CPU permitir. Usado para testar
+mudanças de física e pontuação contra sessões reais.
+"""
+
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import hashlib
+import json
+import math
+import os
+
+from services.game_manager import GameManager, GameType, GAME_CLASSES
+from services.session_recorder import (
+    load_session, META_FILE, DEFAULT_SAMPLE_RATE, EVENT_INTENSITY, EVENT_PCM, EVENT_START, EVENT_END
+)
+
+
+class VirtualClock:
+    """Relógio controlado pelo replay (avança com os timestamps gravados)"""
+
+    def __init__(self, timestamp: float = 0.0):
+        self._timestamp = timestamp
+
+    def advance_to(self, timestamp: float) -> None:
+        """Avança o relógio (nunca volta no tempo)"""
+        if timestamp > self._timestamp:
+            self._timestamp = timestamp
+
+    def __call__(self) -> datetime:
+        return datetime.fromtimestamp(self._timestamp)
+
+
+def replay_session(session_dir: str) -> Dict[str, Any]:
+    """
+    Reproduz uma sessão gravada
+
+    Args:
+        session_dir: Diretório do jogo gravado (<diretório>/<game_id>)
+
+    Returns:
+        Dict com o resultado final do jogo e um digest dos estados de todos
+        os frames (dois replays com o mesmo digest produziram os mesmos estados)
+    """
+    session = load_session(session_dir)
+    meta = session["meta"]
+    events = session["events"]
+    pcm_segments = session["pcm"]
+
+    game = GAME_CLASSES[GameType(meta["game_type"])](meta["game_id"], meta["player_name"])
+    clock = VirtualClock(meta["created_at"])
+    game.set_clock(clock)
+    # PCM processado na taxa do servidor que gravou (gravações antigas: 44100 Hz)
+    sample_rate = meta.get("sample_rate", DEFAULT_SAMPLE_RATE)
+
+    digest = hashlib.blake2b(digest_size=16)
+    frames = 0
+    errors = 0
+    duration = None
+
+    kinds = events["kind"].tolist()
+    timestamps = events["timestamp"].tolist()
+    intensities = events["intensity"].tolist()
+    meterings = events["metering_db"].tolist()
+    coalesced = events["frames"].tolist()
+    blow_frames = events["blow_frames"].tolist()
+
+    for i, kind in enumerate(kinds):
+        clock.advance_to(timestamps[i])
+        try:
+            if kind == EVENT_INTENSITY:
+                metering_db = None if math.isnan(meterings[i]) else meterings[i]
+                intensity = intensities[i]
+                if coalesced[i] > 1:
+                    # Frames combinados pela caixa de entrada: aplicados como no servidor
+                    game_data = game.process_intensity(intensity, blow_frames[i] > 0, coalesced[i], blow_frames[i])
+                else:
+                    blow_detected = GameManager.detect_intensity_blow(intensity, metering_db)
+                    game_data = game.process_intensity(intensity, blow_detected)
+            elif kind == EVENT_PCM:
+                start = int(events["pcm_offset"][i])
+                samples = pcm_segments[events["segment"][i]][start:start + int(events["pcm_length"][i])]
+                game_data = game.process_audio_input(samples.tobytes(), sample_rate)
+            elif kind == EVENT_START:
+                game.start_game()
+                continue
+            elif kind == EVENT_END:
+                duration = game.end_game()["duration"]
+                continue
+            else:
+                continue
+        except ValueError:
+            # Mesmo erro que a API teria retornado (ex: frame com o jogo inativo)
+            errors += 1
+            continue
+
+        game_data["score"] = game.score
+        digest.update(json.dumps(game_data, sort_keys=True, default=str).encode("utf-8"))
+        frames += 1
+
+    return {
+        "game_id": meta["game_id"],
+        "game_type": meta["game_type"],
+        "events": len(kinds),
+        "frames": frames,
+        "errors": errors,
+        "score": game.score,
+        "level": game.level,
+        "is_active": game.is_active,
+        "duration": duration,
+        "digest": digest.hexdigest()
+    }
+
+
+def find_sessions(directory: str) -> List[str]:
+    """Lista os diretórios de sessões gravadas em ordem"""
+    return sorted(
+        os.path.join(directory, entry) for entry in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, entry, META_FILE))
+    )
+
+
+def replay_directory(directory: str, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Reproduz todas as sessões de um diretório em paralelo
+
+    Args:
+        directory: Diretório raiz das gravações (AETHERIA_RECORD_DIR)
+        workers: Número de processos (padrão: número de CPUs; 1 = sem processos)
+
+    Returns:
+        Lista com o resultado de cada sessão, na ordem de find_sessions
+    """
+    sessions = find_sessions(directory)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sessions) < 2:
+        return [replay_session(session) for session in sessions]
+
+    chunksize = max(1, len(sessions) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(replay_session, sessions, chunksize=chunksize))
+
+
+def compare_results(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Compara dois replays das mesmas sessões
+
+    Args:
+        baseline: Resultados de referência
+        current: Resultados após a mudança
+
+    Returns:
+        Lista de diferenças por sessão (vazia se os replays são iguais)
+    """
+    fields = ("frames", "errors", "score", "level", "is_active", "digest")
+    baseline_by_id = {result["game_id"]: result for result in baseline}
+    differences = []
+    for result in current:
+        before = baseline_by_id.pop(result["game_id"], None)
+        if before is None:
+            differences.append({"game_id": result["game_id"], "change": "nova sessão"})
+            continue
+        changed = {field: [before.get(field), result.get(field)]
+                   for field in fields if before.get(field) != result.get(field)}
+        if changed:
+            differences.append({"game_id": result["game_id"], "change": changed})
+    for game_id in baseline_by_id:
+        differences.append({"game_id": game_id, "change": "sessão ausente"})
+    return differences
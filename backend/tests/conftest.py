@@ -0,0 +1,95 @@
+"""
+Configuração comum dos testes
+Os testes rodam a partir do diretório backend (python -m pytest), como os
+benchmarks, e importam os módulos pelo mesmo caminho
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client():
+    """Cliente de teste da API Flask"""
+    import app as app_module
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def start_game(client):
+    """Cria e inicia um jogo pela API e retorna o ID"""
+    def start(game_type: str = "boat", player_name: str = "Teste") -> str:
+        game_id = client.post("/api/games/create", json={"game_type": game_type,
+                                                         "player_name": player_name}).get_json()["game"]["game_id"]
+        assert client.post(f"/api/games/{game_id}/start").status_code == 200
+        return game_id
+    return start
+
+
+@pytest.fixture
+def admin_headers(monkeypatch):
+    """Headers das rotas administrativas (token configurado só durante o teste)"""
+    import app as app_module
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "token-de-teste")
+    return {"X-Admin-Token": "token-de-teste"}
+
+
+def make_sessions(days: int, users=("u1", "u2")):
+    """Uma sessão finalizada por usuário por dia, a partir de 2026-01-01"""
+    start = datetime(2026, 1, 1, 9, 0)
+    sessions = []
+    for day in range(days):
+        for n, user_id in enumerate(users):
+            started = start + timedelta(days=day, minutes=n)
+            sessions.append({
+                "id": f"s{day}-{user_id}",
+                "user_id": user_id,
+                "game_type": "boat",
+                "started_at": started.isoformat(),
+                "ended_at": (started + timedelta(minutes=5)).isoformat(),
+                "duration": 300,
+                "score": day,
+                "completed": True
+            })
+    return sessions
+
+
+@pytest.fixture
+def archived(tmp_path):
+    """
+    Sessões de 90 dias com as anteriores a março arquivadas e o data.json
+    ainda com todas (a janela entre gravar os segmentos e reescrever o data.json)
+
+    Returns:
+        Tuple (arquivo, caminho do data.json, sessões, resultado do arquivamento)
+    """
+    from services.session_archive import SessionArchive
+
+    sessions = make_sessions(90)
+    cutoff = "2026-03-01T00:00:00"
+    archive = SessionArchive(str(tmp_path / "archive"))
+    result = archive.archive([s for s in sessions if s["started_at"] < cutoff], cutoff)
+    data_file = str(tmp_path / "data.json")
+    with open(data_file, "w", encoding="utf-8") as f:
+        json.dump({"users": {}, "sessions": sessions}, f)
+    return archive, data_file, sessions, result
+
+
+@pytest.fixture
+def archive_client(archived, tmp_path, monkeypatch):
+    """Cliente da API usando o data.json e o arquivo de `archived`"""
+    import app as app_module
+    from services.rollups import RollupStore
+
+    archive, data_file, _, _ = archived
+    monkeypatch.setattr(app_module, "DATA_FILE", data_file)
+    monkeypatch.setattr(app_module, "session_archive", archive)
+    monkeypatch.setattr(app_module, "rollup_store", RollupStore(str(tmp_path / "rollups.db")))
+    return app_module.app.test_client()
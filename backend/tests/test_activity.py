@@ -0,0 +1,82 @@
+"""
+Testes do bitmap de dias ativos (sequências)
+Os resultados são comparados com uma contagem direta sobre o conjunto de dias
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from services.activity import ActivityBitmap
+
+FIRST = date(2026, 1, 1)
+
+
+def random_days(seed: int, span: int = 200, density: float = 0.6):
+    rng = random.Random(seed)
+    return [FIRST + timedelta(days=i) for i in range(span) if rng.random() < density]
+
+
+def longest(days):
+    best = run = 0
+    for i in range(-1, 400):
+        run = run + 1 if FIRST + timedelta(days=i) in days else 0
+        best = max(best, run)
+    return best
+
+
+def current(days, today):
+    day = today if today in days else today - timedelta(days=1)
+    run = 0
+    while day in days:
+        run += 1
+        day -= timedelta(days=1)
+    return run
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_streaks_match_brute_force(seed):
+    days = random_days(seed)
+    active = set(days)
+    # Marcando em ordem aleatória, inclusive dias anteriores ao primeiro
+    shuffled = list(days)
+    random.Random(seed).shuffle(shuffled)
+    bitmap = ActivityBitmap()
+    for day in shuffled:
+        assert bitmap.mark(day)
+    assert not bitmap.mark(shuffled[0])
+
+    assert bitmap.longest_streak == longest(active)
+    assert bitmap.total_days == len(active)
+    for offset in range(-3, 205, 7):
+        today = FIRST + timedelta(days=offset)
+        assert bitmap.current_streak(today) == current(active, today)
+        expected = sum(today - timedelta(days=30) < day <= today for day in active)
+        assert bitmap.active_days(today, 30) == expected
+        assert bitmap.is_active(today) == (today in active)
+
+
+def test_from_days_and_serialization():
+    days = random_days(9)
+    bitmap = ActivityBitmap.from_days(days + days[:5])
+    restored = ActivityBitmap.from_dict(bitmap.to_dict())
+    today = days[-1]
+    assert restored.summary(today) == bitmap.summary(today)
+    assert restored.longest_streak == longest(set(days))
+    assert restored.summary(today)["last_active_day"] == today.isoformat()
+
+
+def test_empty_bitmap():
+    bitmap = ActivityBitmap.from_dict(None)
+    assert bitmap.summary(FIRST) == {
+        "current_streak": 0, "longest_streak": 0, "active_days": 0, "window_days": 30,
+        "total_active_days": 0, "last_active_day": None
+    }
+    assert ActivityBitmap.from_dict(bitmap.to_dict()).to_dict() == bitmap.to_dict()
+
+
+def test_today_without_session_keeps_streak():
+    bitmap = ActivityBitmap.from_days([FIRST, FIRST + timedelta(days=1)])
+    assert bitmap.current_streak(FIRST + timedelta(days=2)) == 2
+    assert bitmap.current_streak(FIRST + timedelta(days=3)) == 0
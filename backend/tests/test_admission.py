@@ -0,0 +1,120 @@
+"""
+Testes do controle de admissão por classe de requisição
+"""
+
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from services.admission import AdmissionController, AdmissionQueue, AdmissionRejected
+
+
+def test_waiting_request_gets_the_released_slot():
+    queue = AdmissionQueue("reporting", max_concurrent=1, max_waiting=1, wait_timeout=5)
+    queue.acquire()
+    admitted = threading.Event()
+
+    def waiter():
+        queue.acquire()
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while queue.get_stats()["waiting"] == 0:
+        time.sleep(0.001)
+
+    # Fila cheia: recusada na hora
+    with pytest.raises(AdmissionRejected) as rejected:
+        queue.acquire()
+    assert rejected.value.reason == "fila cheia"
+    assert not admitted.is_set()
+
+    queue.release()
+    thread.join()
+    assert admitted.is_set()
+    queue.release()
+    stats = queue.get_stats()
+    assert (stats["admitted"], stats["rejected"], stats["running"], stats["waiting"]) == (2, 1, 0, 0)
+
+
+def test_wait_timeout():
+    queue = AdmissionQueue("export", max_concurrent=1, max_waiting=1, wait_timeout=0.05)
+    queue.acquire()
+    started = time.perf_counter()
+    with pytest.raises(AdmissionRejected) as rejected:
+        queue.acquire()
+    assert time.perf_counter() - started >= 0.05
+    assert rejected.value.reason == "tempo de espera esgotado"
+    assert rejected.value.retry_after >= 1
+    assert queue.get_stats()["timeout"] == 1
+    queue.release()
+
+
+def test_concurrency_limit_holds_under_load():
+    queue = AdmissionQueue("reporting", max_concurrent=2, max_waiting=3, wait_timeout=5)
+    running, peak = [0], [0]
+    outcomes = []
+    lock = threading.Lock()
+
+    def request():
+        try:
+            queue.acquire()
+        except AdmissionRejected:
+            with lock:
+                outcomes.append("rejected")
+            return
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.002)
+        with lock:
+            running[0] -= 1
+            outcomes.append("admitted")
+        queue.release()
+
+    threads = [threading.Thread(target=request) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = queue.get_stats()
+    assert peak[0] <= 2
+    assert len(outcomes) == 40
+    assert stats["admitted"] == outcomes.count("admitted")
+    assert stats["rejected"] + stats["timeout"] == outcomes.count("rejected")
+    assert (stats["running"], stats["waiting"]) == (0, 0)
+    assert queue.threads == 5
+
+
+def test_controller_classifies_routes():
+    queues = {"reporting": AdmissionQueue("reporting", 1)}
+    controller = AdmissionController(queues, {("/api/games", "GET"): "reporting"})
+    assert controller.classify("/api/games", "GET") == "reporting"
+    assert controller.classify("/api/games", "POST") is None
+    assert controller.reserved_threads() == 1
+    with pytest.raises(ValueError):
+        AdmissionController(queues, {("/x", "GET"): "export"})
+
+
+def test_reports_are_shed_while_games_keep_playing(client, start_game, monkeypatch):
+    queue = AdmissionQueue("reporting", max_concurrent=1, max_waiting=0)
+    monkeypatch.setattr(app_module, "admission_controller", AdmissionController(
+        {"reporting": queue}, {("/api/games", "GET"): "reporting"}))
+    game_id = start_game()
+
+    queue.acquire()
+    try:
+        response = client.get("/api/games")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        # Frames dos jogos não passam pela fila
+        assert client.post(f"/api/games/{game_id}/audio", json={"audio_intensity": 0.5}).status_code == 200
+    finally:
+        queue.release()
+
+    assert client.get("/api/games").status_code == 200
+    # A vaga é devolvida ao fim de cada requisição
+    assert queue.get_stats()["running"] == 0
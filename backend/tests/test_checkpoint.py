@@ -0,0 +1,148 @@
+"""
+Testes do checkpoint incremental dos jogos em memória
+Cobre o rastreamento dos jogos alterados (drain_changes) e a recuperação
+do arquivo de checkpoint
+"""
+
+import threading
+import time
+
+from models.boat_game import BoatGame
+from models.balloon_game import BalloonGame
+from services.checkpoint import GameCheckpointer
+from services.game_store import InMemoryGameStore
+
+
+def make_store(games: int) -> InMemoryGameStore:
+    store = InMemoryGameStore()
+    for i in range(games):
+        cls = BoatGame if i % 3 else BalloonGame
+        store.add(cls(f"g{i}", f"player{i % 4}"))
+    return store
+
+
+def test_drain_changes_tracks_updates_and_removals():
+    store = make_store(3)
+    assert sorted(store.drain_changes()[0]) == ["g0", "g1", "g2"]
+    assert store.drain_changes() == ([], [])
+
+    store.update("g1", lambda game: game.start_game())
+    assert store.remove_inactive() == 2
+    dirty, removed = store.drain_changes()
+    assert dirty == ["g1"]
+    assert sorted(removed) == ["g0", "g2"]
+
+
+def test_drain_changes_does_not_lose_concurrent_updates():
+    store = make_store(50)
+    store.drain_changes()
+    seen = set()
+    done = threading.Event()
+
+    def drain():
+        while not done.is_set():
+            seen.update(store.drain_changes()[0])
+
+    def touch(ids):
+        for _ in range(20):
+            for game_id in ids:
+                store.update(game_id, lambda game: game.start_game())
+
+    drainer = threading.Thread(target=drain)
+    drainer.start()
+    workers = [threading.Thread(target=touch, args=([f"g{i}" for i in range(k, 50, 5)],)) for k in range(5)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    done.set()
+    drainer.join()
+    seen.update(store.drain_changes()[0])
+
+    assert seen == {f"g{i}" for i in range(50)}
+
+
+def test_checkpoint_restore(tmp_path):
+    path = str(tmp_path / "games.ckpt")
+    store = make_store(10)
+    store.next_sequence(42)
+    checkpointer = GameCheckpointer(store, path, interval=3600)
+    checkpointer.restore()
+    checkpointer.start()
+    checkpointer.checkpoint_once()
+    for i in range(0, 10, 2):
+        store.update(f"g{i}", lambda game: game.start_game())
+    store.remove_inactive()
+    # stop grava o último checkpoint (alterações e remoções)
+    checkpointer.stop()
+
+    restored = InMemoryGameStore()
+    assert GameCheckpointer(restored, path).restore() == 5
+    assert sorted(restored.game_ids()) == sorted(f"g{i}" for i in range(0, 10, 2))
+    assert all(restored.get(game_id).is_active for game_id in restored.game_ids())
+    assert restored.next_sequence() == 43
+    # Jogos restaurados não precisam ser gravados de novo
+    assert restored.drain_changes() == ([], [])
+
+
+def test_checkpoint_ignores_truncated_record(tmp_path):
+    path = str(tmp_path / "games.ckpt")
+    store = make_store(4)
+    checkpointer = GameCheckpointer(store, path, interval=3600)
+    checkpointer.restore()
+    checkpointer.start()
+    checkpointer.stop()
+    with open(path, "ab") as f:
+        f.write(b"\x01\x05\x00\xff\xff")
+
+    restored = InMemoryGameStore()
+    assert GameCheckpointer(restored, path).restore() == 4
+
+
+def test_checkpoint_compacts_log(tmp_path):
+    path = str(tmp_path / "games.ckpt")
+    store = make_store(3)
+    checkpointer = GameCheckpointer(store, path, interval=3600, compact_ratio=2, compact_min_records=10)
+    checkpointer.restore()
+    checkpointer.start()
+    for _ in range(10):
+        for game_id in store.game_ids():
+            store.update(game_id, lambda game: None)
+        checkpointer.checkpoint_once()
+    checkpointer.stop()
+    assert checkpointer.get_stats()["compactions"] > 0
+
+    restored = InMemoryGameStore()
+    assert GameCheckpointer(restored, path).restore() == 3
+    assert sorted(restored.game_ids()) == ["g0", "g1", "g2"]
+
+
+def test_restore_after_concurrent_updates(tmp_path):
+    # Checkpoints em segundo plano enquanto os jogos são alterados: o
+    # arquivo final tem o último estado de cada jogo
+    path = str(tmp_path / "games.ckpt")
+    store = make_store(20)
+    checkpointer = GameCheckpointer(store, path, interval=0.005, compact_min_records=50)
+    checkpointer.restore()
+    checkpointer.start()
+
+    def count_frame(game):
+        game.updates = getattr(game, "updates", 0) + 1
+        time.sleep(0.0002)
+
+    def work(ids):
+        for _ in range(30):
+            for game_id in ids:
+                store.update(game_id, count_frame)
+
+    workers = [threading.Thread(target=work, args=(store.game_ids()[k::4],)) for k in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    checkpointer.stop()
+    assert checkpointer.get_stats()["checkpoints"] > 1
+
+    restored = InMemoryGameStore()
+    assert GameCheckpointer(restored, path).restore() == 20
+    assert all(restored.get(game_id).updates == 30 for game_id in restored.game_ids())
@@ -0,0 +1,93 @@
+"""
+Testes do pool de processos do DSP e da taxa de amostragem do PCM
+"""
+
+import base64
+import threading
+
+import numpy as np
+import pytest
+
+from models.balloon_game import BalloonGame
+from models.boat_game import BoatGame
+from services.audio_processor import AudioProcessor
+from services.dsp_pool import DSPPool
+
+
+def pcm_chunk(seed: int, samples: int = 4410) -> bytes:
+    rng = np.random.default_rng(seed)
+    tone = np.sin(np.linspace(0, 300 * (1 + seed % 3), samples)) * 6000
+    return (tone + rng.standard_normal(samples) * 800).astype(np.int16).tobytes()
+
+
+def analyze_inline(audio: bytes, game_class, noise_level=None, sample_rate=44100):
+    processor = AudioProcessor(sample_rate)
+    processor.is_calibrated = noise_level is not None
+    processor.background_noise_level = noise_level or 0.0
+    blow_detected, intensity, metadata = processor.detect_blow(audio)
+    features = game_class.extract_audio_features(np.frombuffer(audio, dtype=np.int16), sample_rate)
+    return blow_detected, intensity, metadata, features
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = DSPPool(workers=1, slots=2, slot_bytes=1 << 14)
+    pool.warm_up()
+    yield pool
+    pool.close()
+
+
+def test_pool_matches_inline_processing(pool):
+    for seed, game_class, noise in ((1, BoatGame, None), (2, BalloonGame, None), (3, BoatGame, 120.0)):
+        audio = pcm_chunk(seed)
+        assert pool.analyze(audio, game_class, noise) == analyze_inline(audio, game_class, noise)
+
+
+def test_concurrent_requests_share_the_slots(pool):
+    chunks = [pcm_chunk(seed) for seed in range(8)]
+    expected = [analyze_inline(chunk, BoatGame) for chunk in chunks]
+    results = [None] * len(chunks)
+    completed = pool.get_stats()["completed"]
+
+    def analyze(i):
+        results[i] = pool.analyze(chunks[i], BoatGame)
+
+    # Mais requisições que slots: as excedentes esperam um slot livre
+    threads = [threading.Thread(target=analyze, args=(i,)) for i in range(len(chunks))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == expected
+    stats = pool.get_stats()
+    assert stats["pending"] == 0
+    assert stats["completed"] == completed + len(chunks)
+
+
+def test_oversized_chunk_is_rejected(pool):
+    audio = bytes(1 << 15)
+    assert not pool.fits(audio)
+    with pytest.raises(ValueError):
+        pool.analyze(audio, BoatGame)
+
+
+def test_sample_rate_below_minimum_is_rejected():
+    with pytest.raises(ValueError):
+        AudioProcessor(4000)
+
+
+def test_audio_route_checks_sample_rate(client, start_game):
+    from services.game_manager import GameManager
+
+    game_id = start_game()
+    url = f"/api/games/{game_id}/audio"
+    audio = base64.b64encode(pcm_chunk(1)).decode()
+    configured = GameManager().sample_rate
+
+    assert client.post(url, json={"audio_data": audio}).status_code == 200
+    assert client.post(url, json={"audio_data": audio, "sample_rate": configured}).status_code == 200
+    response = client.post(url, json={"audio_data": audio, "sample_rate": configured // 2})
+    assert response.status_code == 400
+    assert response.get_json()["sample_rate"] == configured
+    assert client.post(url, json={"audio_data": audio, "sample_rate": "abc"}).status_code == 400
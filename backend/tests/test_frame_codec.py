@@ -0,0 +1,139 @@
+"""
+Testes da codificação compacta do estado do jogo (frame_codec)
+"""
+
+import math
+
+import pytest
+
+from services.frame_codec import (
+    FrameEncoder, FrameEncodingError, apply_frame, decode_binary, diff_states,
+    encode_binary, flatten_state, unflatten_state
+)
+
+
+def boat_state(seq: int, position: float, **extra):
+    state = {
+        "seq": seq,
+        "blow_detected": position > 1,
+        "blow_intensity": 0.5,
+        "score": int(position * 10),
+        "game_progress": position / 100,
+        "activity": "blowing",
+        "state_changed": True,
+        "boat_position": position,
+        "boat_speed": 1.25,
+        "consecutive_blows": 3,
+        "audio_metadata": {"dominant_frequency": 440.0, "snr": 12.5},
+    }
+    state.update(extra)
+    return state
+
+
+def assert_same_state(decoded, expected):
+    assert decoded.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert_same_state(decoded[key], value)
+        elif isinstance(value, float):
+            assert decoded[key] == pytest.approx(value, rel=1e-6)
+        else:
+            assert decoded[key] == value
+
+
+def test_flatten_round_trip():
+    state = boat_state(1, 2.5, player_name="Ana", tags={"level": 2})
+    flat = flatten_state(state)
+    assert flat["audio_metadata.snr"] == 12.5
+    assert flat["tags.level"] == 2
+    assert unflatten_state(flat) == state
+
+
+def test_binary_keyframe_round_trip():
+    state = boat_state(7, 2.5)
+    payload = encode_binary(7, 0, flatten_state(state), state)
+    seq, base_seq, fields = decode_binary(payload)
+    assert (seq, base_seq) == (7, 0)
+    assert_same_state(unflatten_state(apply_frame(None, base_seq, fields)), state)
+
+
+def test_binary_keeps_unknown_and_out_of_range_fields():
+    # Campos fora do layout e valores que não cabem no tipo vão na seção extra
+    state = boat_state(3, 1.0, player_name="Ana", score=2 ** 40, activity="sleeping",
+                       boat_speed=float("nan"), consecutive_blows=2.5)
+    seq, _, fields = decode_binary(encode_binary(3, 0, flatten_state(state), state))
+    decoded = unflatten_state(fields)
+    assert decoded["player_name"] == "Ana"
+    assert decoded["score"] == 2 ** 40
+    assert decoded["activity"] == "sleeping"
+    assert decoded["consecutive_blows"] == 2.5
+    assert math.isnan(decoded["boat_speed"])
+
+
+def test_binary_rejects_unserializable_extra():
+    state = boat_state(3, 1.0, handle=object())
+    with pytest.raises(FrameEncodingError):
+        encode_binary(3, 0, flatten_state(state), state)
+
+
+def test_diff_states():
+    base = flatten_state(boat_state(1, 1.0))
+    current = flatten_state(boat_state(2, 1.5))
+    assert diff_states(base, current) == {
+        "seq": 2, "blow_detected": True, "score": 15, "game_progress": 0.015, "boat_position": 1.5
+    }
+    assert diff_states(base, dict(current, extra=1)) is None
+
+
+@pytest.mark.parametrize("mode", ["delta", "binary"])
+def test_encoder_deltas_rebuild_every_frame(mode):
+    encoder = FrameEncoder(history_size=4)
+    client_flat, client_seq = None, None
+    for seq in range(1, 10):
+        state = boat_state(seq, seq * 0.75)
+        body, is_keyframe = encoder.encode("g1", state, mode, ack_seq=client_seq)
+        if mode == "binary":
+            _, base_seq, fields = decode_binary(body)
+        else:
+            base_seq = body["base_seq"] or 0
+            fields = flatten_state(body["changes"])
+        assert is_keyframe == (base_seq == 0)
+        assert is_keyframe == (seq == 1)
+        client_flat = apply_frame(client_flat, base_seq, fields)
+        client_seq = seq
+        assert_same_state(unflatten_state(client_flat), state)
+
+
+def test_encoder_sends_keyframe_for_unknown_ack():
+    encoder = FrameEncoder(history_size=2)
+    for seq in range(1, 5):
+        encoder.encode("g1", boat_state(seq, seq), "delta")
+    # O frame 1 já saiu do histórico
+    body, is_keyframe = encoder.encode("g1", boat_state(5, 5.0), "delta", ack_seq=1)
+    assert is_keyframe
+    assert body["base_seq"] is None
+
+
+def test_delta_without_base_is_rejected():
+    with pytest.raises(ValueError):
+        apply_frame(None, 3, {"score": 1})
+
+
+def test_audio_route_binary_and_delta_modes(client, start_game):
+    game_id = start_game()
+    url = f"/api/games/{game_id}/audio"
+    response = client.post(url, json={"audio_intensity": 0.8, "response_mode": "binary"})
+    assert response.mimetype == "application/octet-stream"
+    seq, base_seq, fields = decode_binary(response.data)
+    assert base_seq == 0
+    client_flat = apply_frame(None, base_seq, fields)
+
+    frame = client.post(url, json={"audio_intensity": 0.8, "response_mode": "delta",
+                                   "ack_seq": seq}).get_json()["frame"]
+    assert frame["base_seq"] == seq
+    # Só os campos que mudaram desde o frame confirmado
+    assert set(frame["changes"]) < set(client_flat)
+    state = unflatten_state(apply_frame(client_flat, frame["base_seq"], flatten_state(frame["changes"])))
+    assert state["seq"] == frame["seq"]
+
+    assert client.post(url, json={"audio_intensity": 0.8, "response_mode": "xml"}).status_code == 400
@@ -0,0 +1,206 @@
+"""
+Testes da caixa de entrada por jogo (GameInbox)
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.game_inbox import GameInbox
+
+
+class Counter:
+    """Aplica lotes somando os frames, devagar o bastante para haver combinação"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = 0
+        self.batches = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, frame):
+        time.sleep(self.delay)
+        with self.lock:
+            self.frames += frame.frames
+            self.batches += 1
+            return {"frames": self.frames}
+
+
+def burst(inbox: GameInbox, apply, threads: int, allow_queue: bool = True):
+    """Envia um frame por thread ao mesmo jogo, todos ao mesmo tempo"""
+    barrier = threading.Barrier(threads)
+    outcomes = []
+    lock = threading.Lock()
+
+    def send(i):
+        barrier.wait()
+        outcome, state = inbox.submit("g1", 0.5, None, i % 2 == 0, None, apply, allow_queue)
+        with lock:
+            outcomes.append((outcome, state))
+
+    workers = [threading.Thread(target=send, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return outcomes
+
+
+def test_single_frame_is_applied():
+    inbox = GameInbox()
+    outcome, state = inbox.submit("g1", 0.7, -20.0, True, None, Counter())
+    assert outcome == "applied"
+    assert state == {"frames": 1}
+
+
+def test_frames_are_combined():
+    inbox = GameInbox()
+    seen = []
+
+    def apply(frame):
+        seen.append((frame.intensity, frame.metering_db, frame.frames, frame.blow_frames, frame.frame_seq))
+        return {}
+
+    # O primeiro frame ocupa o jogo; os dois seguintes chegam durante a aplicação
+    started, release = threading.Event(), threading.Event()
+
+    def slow(frame):
+        started.set()
+        release.wait()
+        return apply(frame)
+
+    first = threading.Thread(target=inbox.submit, args=("g1", 0.1, None, False, 1, slow))
+    first.start()
+    started.wait()
+    results = []
+    others = [
+        threading.Thread(target=lambda: results.append(inbox.submit("g1", 0.9, -30.0, True, 2, apply))),
+        threading.Thread(target=lambda: results.append(inbox.submit("g1", 0.4, -10.0, False, 3, apply))),
+    ]
+    for t in others:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    first.join()
+    for t in others:
+        t.join()
+
+    assert seen[0] == (0.1, None, 1, 0, 1)
+    assert seen[1] == (0.9, -10.0, 2, 1, 3)
+    assert [outcome for outcome, _ in results] == ["applied", "applied"]
+
+
+@pytest.mark.parametrize("capacity", [0, 1, 4])
+def test_burst_applies_every_frame(capacity):
+    inbox = GameInbox(capacity=capacity)
+    counter = Counter(delay=0.002)
+    outcomes = [outcome for outcome, _ in burst(inbox, counter, 100)]
+
+    # Frames respondidos como "queued" também são aplicados antes de o jogo ficar livre
+    assert counter.frames == 100
+    assert set(outcomes) <= {"applied", "queued"}
+    if capacity == 0:
+        assert "queued" in outcomes
+    stats = inbox.get_stats()
+    assert stats["applied"] + stats["coalesced"] == 100
+    assert stats["batches"] == counter.batches
+
+
+@pytest.mark.parametrize("capacity", [0, 1])
+def test_burst_without_allow_queue_always_returns_state(capacity):
+    inbox = GameInbox(capacity=capacity)
+    counter = Counter(delay=0.002)
+    results = burst(inbox, counter, 50, allow_queue=False)
+
+    # Clientes antigos dependem do estado do jogo: esperam o lote mesmo além da capacidade
+    assert [outcome for outcome, _ in results] == ["applied"] * 50
+    assert all(state is not None and state["frames"] >= 1 for _, state in results)
+    assert counter.frames == 50
+    assert counter.batches < 50
+    assert inbox.get_stats()["queued"] == 0
+
+
+def test_sequence_window():
+    inbox = GameInbox(window=8)
+    apply = Counter()
+
+    assert inbox.submit("g1", 0.5, None, False, 10, apply)[0] == "applied"
+    assert inbox.submit("g1", 0.5, None, False, 10, apply) == ("stale", {"last_frame_seq": 10})
+    # Fora de ordem mas dentro da janela: aceito uma vez
+    assert inbox.submit("g1", 0.5, None, False, 5, apply)[0] == "applied"
+    assert inbox.submit("g1", 0.5, None, False, 5, apply)[0] == "stale"
+    # Mais antigo que a janela
+    assert inbox.submit("g1", 0.5, None, False, 2, apply)[0] == "stale"
+    # Um salto maior que a janela esquece as sequências antigas
+    assert inbox.submit("g1", 0.5, None, False, 30, apply)[0] == "applied"
+    assert inbox.submit("g1", 0.5, None, False, 23, apply)[0] == "applied"
+    assert inbox.submit("g1", 0.5, None, False, 22, apply)[0] == "stale"
+    assert apply.frames == 4
+
+
+def test_discard_resets_sequence():
+    inbox = GameInbox()
+    apply = Counter()
+    inbox.submit("g1", 0.5, None, False, 10, apply)
+    inbox.discard("g1")
+    assert inbox.submit("g1", 0.5, None, False, 1, apply)[0] == "applied"
+
+
+def test_dropped_batch_is_stale():
+    inbox = GameInbox()
+    outcome, data = inbox.submit("g1", 0.5, None, False, 3, lambda frame: {"dropped": True, "last_frame_seq": 9})
+    assert outcome == "stale"
+    assert data == {"last_frame_seq": 9}
+
+
+def test_error_reaches_submitter_and_frees_game():
+    inbox = GameInbox()
+
+    def fail(frame):
+        raise RuntimeError("falhou")
+
+    with pytest.raises(RuntimeError):
+        inbox.submit("g1", 0.5, None, False, None, fail)
+    assert inbox.submit("g1", 0.5, None, False, None, Counter())[0] == "applied"
+
+
+@pytest.mark.parametrize("allow_queued", [False, True])
+def test_audio_route_queues_only_opted_in_clients(client, start_game, monkeypatch, allow_queued):
+    import app as app_module
+    from services.game_manager import GameManager
+
+    manager = GameManager()
+    game_id = start_game()
+    monkeypatch.setattr(manager, "_inbox", GameInbox(capacity=0))
+    apply_frames = manager._apply_frames
+
+    def slow_apply(*args):
+        time.sleep(0.005)
+        return apply_frames(*args)
+
+    monkeypatch.setattr(manager, "_apply_frames", slow_apply)
+
+    barrier = threading.Barrier(10)
+    responses = []
+
+    def send(i):
+        body = {"audio_intensity": 0.8, "allow_queued": allow_queued}
+        test_client = app_module.app.test_client()
+        barrier.wait()
+        response = test_client.post(f"/api/games/{game_id}/audio", json=body)
+        responses.append((response.status_code, response.get_json()))
+
+    workers = [threading.Thread(target=send, args=(i,)) for i in range(10)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    queued = [body for status, body in responses if status == 202]
+    assert all(body["queued"] for body in queued)
+    if allow_queued:
+        assert queued
+    else:
+        assert not queued
+        assert all(status == 200 and "game_state" in body for status, body in responses)
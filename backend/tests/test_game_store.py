@@ -0,0 +1,160 @@
+"""
+Testes dos stores de jogos (memória e SQLite compartilhado) e da listagem
+paginada por cursor
+"""
+
+import threading
+
+import pytest
+
+from models.boat_game import BoatGame
+from models.balloon_game import BalloonGame
+from services.game_store import (
+    GameNotFoundError, InMemoryGameStore, SQLiteGameStore, create_game_store
+)
+
+
+def count_frame(game):
+    """Mutação de teste: conta quantas vezes o jogo foi atualizado"""
+    game.updates = getattr(game, "updates", 0) + 1
+    return game.updates
+
+
+def test_create_game_store(tmp_path):
+    assert isinstance(create_game_store(None), InMemoryGameStore)
+    assert isinstance(create_game_store("memory"), InMemoryGameStore)
+    store = create_game_store(f"sqlite://{tmp_path / 'games.db'}")
+    assert isinstance(store, SQLiteGameStore)
+    with pytest.raises(ValueError):
+        create_game_store("redis://localhost")
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    # Duas instâncias no mesmo arquivo fazem o papel de dois workers
+    path = str(tmp_path / "games.db")
+    first, second = SQLiteGameStore(path), SQLiteGameStore(path)
+    first.add(BoatGame("g1", "Ana"))
+    second.add_many([BalloonGame("g2", "Bia")])
+
+    second.update("g1", lambda game: game.start_game())
+    assert first.get("g1").is_active
+    assert first.game_class_name("g2") == "BalloonGame"
+    assert first.active_ids() == ["g1"]
+    assert "g2" in first and len(first) == 2
+    assert first.remove_inactive() == 1
+    assert second.game_ids() == ["g1"]
+    with pytest.raises(GameNotFoundError):
+        second.get("g2")
+
+
+def test_sqlite_sequences_are_unique_across_threads(tmp_path):
+    path = str(tmp_path / "games.db")
+    stores = [SQLiteGameStore(path) for _ in range(2)]
+    firsts = []
+    lock = threading.Lock()
+
+    def reserve(store):
+        for _ in range(25):
+            first = store.next_sequence(3)
+            with lock:
+                firsts.append(first)
+
+    threads = [threading.Thread(target=reserve, args=(stores[i % 2],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(firsts) == list(range(1, 301, 3))
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_concurrent_updates_are_not_lost(tmp_path, kind):
+    if kind == "memory":
+        stores = [InMemoryGameStore()] * 2
+    else:
+        stores = [SQLiteGameStore(str(tmp_path / "games.db")) for _ in range(2)]
+    stores[0].add(BoatGame("g1", "Ana"))
+
+    def work(store):
+        for _ in range(50):
+            store.update("g1", count_frame)
+
+    threads = [threading.Thread(target=work, args=(stores[i % 2],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stores[1].get("g1").updates == 200
+
+
+def test_update_many_reports_errors_per_game(tmp_path):
+    store = SQLiteGameStore(str(tmp_path / "games.db"))
+    store.add_many([BoatGame("g1"), BoatGame("g2")])
+    results = store.update_many(["g1", "missing", "g2"], count_frame)
+    assert results[0] == (1, None)
+    assert isinstance(results[1][1], GameNotFoundError)
+    assert results[2] == (1, None)
+
+
+# Listagem paginada: os dois stores devem devolver as mesmas páginas
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    """Store com jogos de dois tipos e quatro jogadores, criados em ordem"""
+    def make(games: int):
+        store = InMemoryGameStore() if request.param == "memory" else SQLiteGameStore(str(tmp_path / "games.db"))
+        store.add_many([(BoatGame if i % 3 else BalloonGame)(f"g{i}", f"player{i % 4}") for i in range(games)])
+        return store
+    return make
+
+
+def list_all(store, limit: int, **filters):
+    ids, cursor, pages = [], 0, 0
+    while cursor is not None:
+        page, cursor = store.list_games(after=cursor, limit=limit, **filters)
+        ids.extend(game["game_id"] for game in page)
+        pages += 1
+    return ids, pages
+
+
+def test_pagination_visits_every_game_once(make_store):
+    store = make_store(50)
+    ids, pages = list_all(store, limit=7)
+    assert ids == [f"g{i}" for i in range(50)]
+    assert pages == 8
+
+
+def test_page_summaries(make_store):
+    store = make_store(5)
+    page, cursor = store.list_games(limit=2)
+    assert cursor is not None
+    assert page[1] == {"game_id": "g1", "player_name": "player1", "is_active": False,
+                       "score": 0, "level": 1, "game_type": "BoatGame"}
+    assert store.list_games(after=cursor, limit=10)[1] is None
+
+
+def test_pagination_with_filters(make_store):
+    store = make_store(50)
+    for i in range(0, 50, 5):
+        store.update(f"g{i}", lambda game: game.start_game())
+
+    ids, _ = list_all(store, limit=3, game_type="BoatGame", is_active=True, player_name="player1")
+    assert ids == [f"g{i}" for i in range(50) if i % 3 and i % 5 == 0 and i % 4 == 1]
+
+    ids, _ = list_all(store, limit=4, game_type="BalloonGame")
+    assert ids == [f"g{i}" for i in range(50) if i % 3 == 0]
+
+    ids, _ = list_all(store, limit=4, is_active=False)
+    assert ids == [f"g{i}" for i in range(50) if i % 5]
+
+
+def test_pagination_after_removal(make_store):
+    store = make_store(20)
+    for i in range(0, 20, 2):
+        store.update(f"g{i}", lambda game: game.start_game())
+    # Jogos nunca iniciados são inativos e saem do store
+    assert store.remove_inactive() == 10
+    ids, _ = list_all(store, limit=3)
+    assert ids == [f"g{i}" for i in range(0, 20, 2)]
+    ids, _ = list_all(store, limit=3, is_active=True, game_type="BalloonGame")
+    assert ids == ["g0", "g6", "g12", "g18"]
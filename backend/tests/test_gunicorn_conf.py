@@ -0,0 +1,25 @@
+"""
+Testes da configuração do gunicorn (store dos jogos)
+"""
+
+import os
+import runpy
+
+import pytest
+
+CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+@pytest.mark.parametrize("workers", ["1", "4"])
+def test_persistent_store_with_any_worker_count(monkeypatch, workers):
+    monkeypatch.setenv("AETHERIA_WORKERS", workers)
+    monkeypatch.delenv("AETHERIA_GAME_STORE", raising=False)
+    runpy.run_path(CONF)
+    assert os.environ["AETHERIA_GAME_STORE"].startswith("sqlite:///")
+
+
+def test_configured_store_is_kept(monkeypatch):
+    monkeypatch.setenv("AETHERIA_WORKERS", "1")
+    monkeypatch.setenv("AETHERIA_GAME_STORE", "memory")
+    assert runpy.run_path(CONF)["workers"] == 1
+    assert os.environ["AETHERIA_GAME_STORE"] == "memory"
@@ -0,0 +1,130 @@
+"""
+Testes dos placares (lista com posição, placar e índice derivado do log)
+Os resultados são comparados com uma ordenação direta das pontuações
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.leaderboard import Leaderboard, LeaderboardIndex, RankedSkipList, compact_scores, week_start
+
+START = datetime(2026, 1, 5, 8, 0)
+
+
+def make_scores(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    scores = []
+    for i in range(count):
+        scores.append({
+            "session_id": f"s{i}",
+            "user_id": f"u{rng.randrange(30)}",
+            "name": None,
+            "game_type": rng.choice(["boat", "balloon"]),
+            "score": rng.randrange(100),
+            "ended_at": (START + timedelta(hours=i * 3)).isoformat()
+        })
+    return scores
+
+
+def expected_board(scores, game_type=None, since=None, until=None):
+    """Melhor pontuação de cada jogador (empate: quem chegou antes), ordenada"""
+    best = {}
+    for entry in scores:
+        if game_type is not None and entry["game_type"] != game_type:
+            continue
+        if since is not None and not since <= entry["ended_at"] < until:
+            continue
+        key = (-entry["score"], entry["ended_at"])
+        if entry["user_id"] not in best or key < best[entry["user_id"]]:
+            best[entry["user_id"]] = key
+    return [(player, -key[0]) for key, player in sorted((key, player) for player, key in best.items())]
+
+
+def test_skip_list_matches_sorted_list():
+    rng = random.Random(1)
+    skip_list, reference = RankedSkipList(seed=3), []
+    for _ in range(2000):
+        key = rng.randrange(500)
+        if key in reference:
+            skip_list.remove(key)
+            reference.remove(key)
+        else:
+            skip_list.insert(key)
+            reference.append(key)
+    reference.sort()
+    assert len(skip_list) == len(reference)
+    assert list(skip_list.iter_from(0)) == reference
+    assert list(skip_list.iter_from(100)) == reference[100:]
+    for position in range(0, len(reference), 17):
+        assert skip_list.index(reference[position]) == position
+
+
+def test_leaderboard_keeps_best_score_per_player():
+    board = Leaderboard()
+    assert board.submit("a", 10, "2026-01-01T10:00:00")
+    assert board.submit("b", 30, "2026-01-01T11:00:00")
+    assert not board.submit("a", 5, "2026-01-01T12:00:00")
+    assert board.submit("a", 30, "2026-01-01T09:00:00", {"name": "Ana"})
+    assert board.submit("c", 30, "2026-01-01T11:00:00")
+
+    assert [entry["player_id"] for entry in board.top(10)] == ["a", "b", "c"]
+    assert board.top(1, offset=1)[0]["rank"] == 2
+    assert board.rank("a")["name"] == "Ana"
+    assert board.rank("c") == {"rank": 3, "player_id": "c", "players": 3, "score": 30,
+                               "achieved_at": "2026-01-01T11:00:00"}
+    assert board.rank("d") is None
+
+
+@pytest.mark.parametrize("batch", [1, 25, 1000])
+def test_index_matches_brute_force(batch):
+    scores = make_scores(600)
+    index = LeaderboardIndex(keep_weeks=4)
+    for end in range(batch, len(scores) + batch, batch):
+        index.sync(scores[:end])
+    assert index.indexed == len(scores)
+
+    now = datetime.fromisoformat(scores[-1]["ended_at"])
+    week = week_start(now)
+    since, until = week.isoformat(), (week + timedelta(weeks=1)).isoformat()
+    for game_type in (None, "boat", "balloon"):
+        expected = expected_board(scores, game_type)
+        result = index.top("all", game_type, limit=len(expected))
+        assert result["players"] == len(expected)
+        assert [(e["player_id"], e["score"]) for e in result["entries"]] == expected
+
+        expected = expected_board(scores, game_type, since, until)
+        result = index.top("week", game_type, limit=100, now=now)
+        assert [(e["player_id"], e["score"]) for e in result["entries"]] == expected
+
+    player, score = expected_board(scores)[5]
+    assert index.rank(player)["rank"] == 6
+    assert index.rank(player)["score"] == score
+
+
+def test_index_drops_old_weeks():
+    scores = make_scores(600)
+    index = LeaderboardIndex(keep_weeks=2)
+    index.sync(scores)
+    first_week = datetime.fromisoformat(scores[0]["ended_at"])
+    assert index.top("week", now=first_week) == {"players": 0, "entries": []}
+    with pytest.raises(ValueError):
+        index.top("month")
+
+
+def test_compacted_log_keeps_overall_boards():
+    scores = make_scores(600)
+    before = scores[400]["ended_at"]
+    compacted = compact_scores(scores, before)
+    assert len(compacted) < len(scores)
+    assert compacted[-200:] == scores[400:]
+
+    # Nova geração: o índice é reconstruído a partir do log compactado
+    index = LeaderboardIndex()
+    index.sync(scores)
+    index.sync(compacted, generation=1)
+    for game_type in (None, "boat", "balloon"):
+        expected = expected_board(scores, game_type)
+        entries = index.top("all", game_type, limit=100)["entries"]
+        assert [(e["player_id"], e["score"]) for e in entries] == expected
@@ -0,0 +1,61 @@
+"""
+Testes do pipeline de logging (fila sem bloqueio e amostragem por chave)
+"""
+
+import logging
+import queue
+
+import numpy as np
+
+from models.boat_game import BoatGame
+from services.log_pipeline import DroppingQueueHandler, LogSampler, SamplingFilter
+
+
+def make_record(message: str, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("teste", logging.DEBUG, __file__, 1, message, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampler_keeps_first_and_every_nth_per_key():
+    sampler = LogSampler(every=3)
+    assert [sampler.sample("a") for _ in range(7)] == [True, False, False, True, False, False, True]
+    # Cada chave tem seu próprio contador
+    assert sampler.sample("b")
+    assert all(LogSampler(every=1).sample("a") for _ in range(5))
+
+
+def test_sampler_resets_when_too_many_keys():
+    sampler = LogSampler(every=10, max_keys=2)
+    assert sampler.sample("a") and sampler.sample("b")
+    assert not sampler.sample("a")
+    # Terceira chave: os contadores recomeçam
+    assert sampler.sample("c")
+    assert sampler.sample("a")
+
+
+def test_filter_samples_only_records_with_key():
+    log_filter = SamplingFilter(LogSampler(every=100))
+    sampled = [log_filter.filter(make_record("frame", sample_key="g1")) for _ in range(250)]
+    assert sum(sampled) == 3
+    assert all(log_filter.filter(make_record("erro")) for _ in range(10))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(make_record(f"registro {i}"))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_game_frame_logs_carry_sample_key(caplog):
+    game = BoatGame("g1", "Ana")
+    game.start_game()
+    audio = (np.sin(np.linspace(0, 200, 4410)) * 8000).astype(np.int16).tobytes()
+    with caplog.at_level(logging.DEBUG, logger="BoatGame"):
+        game.process_audio_input(audio)
+    frame_logs = [record for record in caplog.records if record.name == "BoatGame"
+                  and record.getMessage().startswith("RMS Energy")]
+    assert frame_logs
+    assert all(record.sample_key == "g1" for record in frame_logs)
@@ -0,0 +1,78 @@
+"""
+Testes do registro de métricas (shards por thread) e da rota /api/metrics
+"""
+
+import gc
+import threading
+
+from services.metrics import MetricsRegistry
+
+
+def make_registry() -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requisições", ("route",))
+    registry.histogram("latency_seconds", "Latência", buckets=(0.1, 1.0))
+    return registry
+
+
+def test_counters_and_histograms():
+    registry = make_registry()
+    registry.inc("requests_total", ("/a",))
+    registry.inc("requests_total", ("/a",), 2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        registry.observe("latency_seconds", value)
+
+    snapshot = registry.snapshot()
+    assert snapshot[("requests_total", ("/a",))] == [3]
+    # Bucket inclusivo no limite superior (le), +Inf no final
+    assert snapshot[("latency_seconds", ())] == [[2, 1, 1], 3.65, 4]
+
+
+def test_threads_never_lose_counts():
+    registry = make_registry()
+
+    def work():
+        for _ in range(1000):
+            registry.inc("requests_total", ("/a",))
+            registry.observe("latency_seconds", 0.01)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Leituras durante a escrita não podem falhar
+    for _ in range(20):
+        registry.snapshot()
+    for thread in threads:
+        thread.join()
+    del threads
+    gc.collect()
+
+    # Os shards das threads encerradas são somados ao acumulado
+    snapshot = registry.snapshot()
+    assert snapshot[("requests_total", ("/a",))] == [8000]
+    assert snapshot[("latency_seconds", ())][2] == 8000
+
+
+def test_render_prometheus_text():
+    registry = make_registry()
+    registry.inc("requests_total", ('/a"b',))
+    registry.observe("latency_seconds", 0.5)
+    registry.gauge("games_active", "Jogos ativos", lambda: 3)
+    registry.gauge("broken", "Gauge com erro", lambda: 1 / 0)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a\\"b"} 1' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 0' in lines
+    assert 'latency_seconds_bucket{le="1"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in lines
+    assert "latency_seconds_count 1" in lines
+    assert "games_active 3" in lines
+    assert not any(line.startswith("broken ") for line in lines)
+
+
+def test_metrics_route_counts_requests(client):
+    client.get("/api/health")
+    body = client.get("/api/metrics").get_data(as_text=True)
+    assert "# TYPE aetheria_http_request_duration_seconds histogram" in body
+    assert 'aetheria_http_requests_total{route="/api/health",method="GET",status="200"}' in body
@@ -0,0 +1,146 @@
+"""
+Testes da proteção contra sobrecarga (troca entre DSP completo e modo degradado)
+"""
+
+import threading
+
+import pytest
+
+import services.overload_guard as overload_guard
+from services.overload_guard import OverloadGuard
+
+
+class FakeClock:
+    """Relógio monotônico controlado pelo teste"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(overload_guard.time, "monotonic", clock)
+    return clock
+
+
+def make_guard(**limits) -> OverloadGuard:
+    options = dict(enter_inflight=4, exit_inflight=2, enter_latency_ms=20, exit_latency_ms=8,
+                   min_hold_seconds=5, smoothing=0.5)
+    options.update(limits)
+    return OverloadGuard(**options)
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        OverloadGuard(enter_inflight=4, exit_inflight=8)
+    with pytest.raises(ValueError):
+        OverloadGuard(enter_latency_ms=5, exit_latency_ms=10)
+
+
+def test_enters_on_inflight_and_holds(clock):
+    guard = make_guard()
+    assert not guard.check(3)
+    assert guard.check(4)
+    # Carga baixa de novo, mas dentro do tempo mínimo no modo
+    clock.now += 4
+    assert guard.check(0)
+    clock.now += 1
+    assert not guard.check(0)
+    assert (guard.switches("degraded"), guard.switches("full")) == (1, 1)
+
+
+def test_enters_on_latency(clock):
+    guard = make_guard()
+    for _ in range(4):
+        guard.observe(0.030)
+    assert guard.get_stats()["latency_ms"] > 20
+    assert guard.check(0)
+
+
+def test_does_not_exit_above_exit_inflight(clock):
+    guard = make_guard()
+    assert guard.check(10)
+    clock.now += 60
+    assert guard.check(3)
+    clock.now += 60
+    assert not guard.check(2)
+
+
+def test_concurrent_checks_count_degraded_frames(clock):
+    guard = make_guard()
+    guard.check(10)
+    degraded = []
+    lock = threading.Lock()
+
+    def frames():
+        for i in range(500):
+            result = guard.check(i % 12)
+            guard.observe(0.001)
+            with lock:
+                degraded.append(result)
+
+    threads = [threading.Thread(target=frames) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(degraded)
+    assert guard.get_stats()["degraded_frames"] == 1 + len(degraded)
+
+
+def test_degraded_frames_do_not_feed_latency(clock):
+    guard = make_guard()
+    for _ in range(4):
+        guard.observe(0.030)
+    assert guard.check(0)
+    frozen = guard.get_stats()["latency_ms"]
+    # Frames degradados são baratos: a média não pode cair por causa deles
+    for _ in range(100):
+        guard.observe(0.001)
+    assert guard.get_stats()["latency_ms"] == frozen
+    # Sai pela carga, e a média recomeça do limite de saída
+    clock.now += 5
+    assert not guard.check(0)
+    assert guard.get_stats()["latency_ms"] == pytest.approx(8)
+
+
+def simulate(guard: OverloadGuard, clock: FakeClock, seconds: float, full_cost: float) -> float:
+    """Frames a cada 100 ms com poucas requisições em andamento; retorna a fração degradada"""
+    degraded = 0
+    ticks = int(seconds * 10)
+    for _ in range(ticks):
+        if guard.check(1):
+            degraded += 1
+            guard.observe(0.001)
+        else:
+            guard.observe(full_cost)
+        clock.now += 0.1
+    return degraded / ticks
+
+
+def test_sustained_overload_does_not_flap(clock):
+    guard = make_guard()
+    # DSP completo a 30 ms por frame durante 2 minutos: a cada tentativa de
+    # voltar, o tempo no modo degradado dobra (5, 10, 20, 40, 40 s)
+    assert simulate(guard, clock, 120, 0.030) > 0.75
+    assert guard.switches("degraded") <= 5
+    assert guard.get_stats()["degraded_hold_seconds"] == 40
+
+
+def test_hold_resets_after_load_drops(clock):
+    guard = make_guard()
+    simulate(guard, clock, 60, 0.030)
+    assert guard.get_stats()["degraded_hold_seconds"] > 5
+    # Carga normal: volta ao DSP completo e fica nele
+    simulate(guard, clock, 60, 0.003)
+    assert not guard.degraded
+    switches = guard.switches("degraded")
+    # Uma nova sobrecarga começa com o tempo mínimo normal
+    simulate(guard, clock, 1, 0.030)
+    assert guard.degraded
+    assert guard.switches("degraded") == switches + 1
+    assert guard.get_stats()["degraded_hold_seconds"] == 5
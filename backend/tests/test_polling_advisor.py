@@ -0,0 +1,48 @@
+"""
+Testes do intervalo de envio recomendado e das respostas sem mudança
+"""
+
+from services.polling_advisor import PollingAdvisor
+
+
+def test_blowing_always_uses_minimum_interval():
+    advisor = PollingAdvisor()
+    assert advisor.recommend("blowing") == 100
+    assert advisor.recommend("blowing", inflight_requests=1000) == 100
+
+
+def test_interval_grows_with_load_up_to_maximum():
+    advisor = PollingAdvisor(load_capacity=10, max_interval_ms=700)
+    assert advisor.recommend("idle") == 400
+    assert advisor.recommend("idle", inflight_requests=5) == 600
+    assert advisor.recommend("idle", inflight_requests=50) == 700
+    assert advisor.recommend("decelerating", inflight_requests=10) == 300
+    # Estado desconhecido usa o intervalo de "idle"
+    assert advisor.recommend("unknown") == 400
+
+
+def test_custom_intervals():
+    advisor = PollingAdvisor(intervals_ms={"idle": 250})
+    assert advisor.recommend("idle") == 250
+    assert advisor.recommend("leaking") == 250
+
+
+def test_audio_response_carries_interval(client, start_game):
+    game_id = start_game()
+    state = client.post(f"/api/games/{game_id}/audio", json={"audio_intensity": 0.9}).get_json()["game_state"]
+    assert state["activity"] == "blowing"
+    assert state["next_poll_ms"] == 100
+
+
+def test_unchanged_reply_only_when_allowed(client, start_game):
+    game_id = start_game()
+    url = f"/api/games/{game_id}/audio"
+    # Parado: o estado deixa de mudar depois do primeiro frame
+    for _ in range(3):
+        client.post(url, json={"audio_intensity": 0.0})
+    assert "game_state" in client.post(url, json={"audio_intensity": 0.0}).get_json()
+
+    body = client.post(url, json={"audio_intensity": 0.0, "allow_unchanged": True}).get_json()
+    assert body["unchanged"] is True
+    assert body["next_poll_ms"] >= 400
+    assert "game_state" not in body
@@ -0,0 +1,79 @@
+"""
+Testes do profiling sob demanda (RequestProfiler e rotas administrativas)
+"""
+
+import os
+
+import pytest
+
+import app as app_module
+from services.profiler import RequestProfiler
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def test_selection_by_game_route_and_sample_rate():
+    profiler = RequestProfiler()
+    profiler.configure(True, game_id="g1")
+    assert profiler.should_profile("/api/games/<game_id>/audio", "g1")
+    assert not profiler.should_profile("/api/games/<game_id>/audio", "g2")
+
+    profiler.configure(True, game_id="g1", route="/a")
+    assert not profiler.should_profile("/b", "g1")
+
+    profiler.configure(True, sample_rate=1.0)
+    assert profiler.should_profile("/b", None)
+    profiler.configure(True, sample_rate=0.0)
+    assert not profiler.should_profile("/b", None)
+    with pytest.raises(ValueError):
+        profiler.configure(True, sample_rate=1.5)
+
+
+def test_profiles_are_aggregated_per_route(tmp_path):
+    profiler = RequestProfiler(dump_dir=str(tmp_path), max_concurrent=1)
+    for _ in range(2):
+        profile = profiler.start()
+        busy_work()
+        profiler.stop(profile, "/api/x", 0.25)
+
+    status = profiler.get_status()
+    assert status["routes"]["/api/x"] == {"requests": 2, "total_seconds": 0.5, "max_seconds": 0.25}
+    assert "busy_work" in profiler.report("/api/x", sort="tottime")
+    assert profiler.report("/api/y") is None
+
+    paths = profiler.dump()
+    assert len(paths) == 1 and os.path.getsize(paths[0]) > 0
+    profiler.reset()
+    assert profiler.get_status()["routes"] == {}
+
+
+def test_concurrent_profiles_are_limited():
+    profiler = RequestProfiler(max_concurrent=1)
+    profile = profiler.start()
+    assert profile is not None
+    # O slot está ocupado: a requisição segue sem profiling
+    assert profiler.start() is None
+    assert profiler.get_status()["skipped_busy"] == 1
+    profiler.stop(profile, "/api/x", 0.1)
+    second = profiler.start()
+    assert second is not None
+    profiler.stop(second, "/api/x", 0.1)
+
+
+def test_admin_routes(client, admin_headers, monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, "request_profiler", RequestProfiler(dump_dir=str(tmp_path)))
+    assert client.get("/api/admin/profiling").status_code == 403
+    assert client.get("/api/admin/profiling", headers={"X-Admin-Token": "errado"}).status_code == 403
+
+    response = client.put("/api/admin/profiling", headers=admin_headers,
+                          json={"enabled": True, "route": "/api/health"})
+    assert response.get_json()["profiling"]["route"] == "/api/health"
+    client.get("/api/health")
+
+    report = client.get("/api/admin/profiling/report?route=/api/health", headers=admin_headers)
+    assert report.status_code == 200
+    assert "function calls" in report.get_data(as_text=True)
+    assert client.get("/api/admin/profiling/report?route=/x", headers=admin_headers).status_code == 404
+    assert len(client.post("/api/admin/profiling/dump", headers=admin_headers).get_json()["files"]) == 1
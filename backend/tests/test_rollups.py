@@ -0,0 +1,109 @@
+"""
+Testes dos agregados por dia e por semana (RollupStore)
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from services.rollups import RollupStore
+
+
+def make_session(day: int, game_type: str, score: int, completed: bool = True):
+    ended = datetime(2026, 3, 2, 10, 0) + timedelta(days=day)
+    return {
+        "id": f"s{day}-{game_type}-{score}",
+        "game_type": game_type,
+        "started_at": (ended - timedelta(minutes=2)).isoformat(),
+        "ended_at": ended.isoformat(),
+        "duration": 120,
+        "score": score,
+        "completed": completed
+    }
+
+
+SESSIONS = [make_session(day, game, day * 10 + n, n != 2)
+            for day in range(14) for n, game in enumerate(["boat", "balloon", "boat"])]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RollupStore(str(tmp_path / "rollups.db"))
+
+
+def test_backfill_matches_sessions(store):
+    assert store.backfill("u1", SESSIONS) > 0
+    # O histórico é somado uma única vez
+    assert store.backfill("u1", SESSIONS) == 0
+
+    days = store.query("u1", "day", date(2026, 3, 2), date(2026, 3, 15))
+    assert len(days) == 14
+    assert days[3]["start"] == "2026-03-05"
+    assert days[3]["sessions"] == 3
+    assert days[3]["completed"] == 2
+    assert days[3]["score_max"] == 32
+    assert days[3]["games"]["boat"]["sessions"] == 2
+    assert days[3]["games"]["balloon"]["average_score"] == 31
+
+    weeks = store.query("u1", "week", date(2026, 3, 4), date(2026, 3, 15))
+    # 2026-03-02 é segunda-feira: a semana que contém o início entra inteira
+    assert [week["start"] for week in weeks] == ["2026-03-02", "2026-03-09"]
+    assert sum(week["sessions"] for week in weeks) == len(SESSIONS)
+    assert weeks[0]["completion_rate"] == pytest.approx(14 / 21)
+
+    boat = store.query("u1", "week", date(2026, 3, 2), date(2026, 3, 8), game_type="boat")
+    assert [(row["start"], row["sessions"]) for row in boat] == [("2026-03-02", 14)]
+    assert "games" not in boat[0]
+
+
+def test_add_session_backfills_history_once(store):
+    history = SESSIONS[:6]
+    store.add_session("u1", history[-1], lambda: history)
+    extra = make_session(1, "boat", 99)
+    store.add_session("u1", extra, lambda: pytest.fail("histórico somado de novo"))
+
+    days = store.query("u1", "day", date(2026, 3, 2), date(2026, 3, 3))
+    assert [day["sessions"] for day in days] == [3, 4]
+    assert days[1]["score_max"] == 99
+
+
+def test_unfinished_sessions_and_other_users(store):
+    store.backfill("u1", [dict(SESSIONS[0], ended_at=None)])
+    store.backfill("u2", SESSIONS[:3])
+    assert store.query("u1", "day", date(2026, 3, 1), date(2026, 3, 31)) == []
+    assert store.has_user("u1")
+    assert not store.has_user("u3")
+    with pytest.raises(ValueError):
+        store.query("u2", "month", date(2026, 3, 1), date(2026, 3, 31))
+
+
+def test_repeated_session_end_is_counted_once(store):
+    store.backfill("u1", SESSIONS[:3])
+    # Fim repetido de uma sessão já somada pelo histórico e de uma sessão nova
+    store.add_session("u1", SESSIONS[0], lambda: pytest.fail("histórico somado de novo"))
+    extra = make_session(0, "balloon", 99)
+    for _ in range(3):
+        store.add_session("u1", dict(extra, score=5), lambda: pytest.fail("histórico somado de novo"))
+
+    day = store.query("u1", "day", date(2026, 3, 2), date(2026, 3, 2))[0]
+    assert day["sessions"] == 4
+    assert day["games"]["balloon"]["sessions"] == 2
+    assert day["score_sum"] == 0 + 1 + 2 + 5
+
+
+def test_end_route_retry_does_not_double_count(archive_client):
+    import app as app_module
+
+    headers = {"X-User-ID": "u9"}
+    session = archive_client.post("/api/games/session", json={"game_type": "boat"},
+                                  headers=headers).get_json()["session"]
+    for _ in range(2):
+        response = archive_client.post(f"/api/games/session/{session['id']}/end",
+                                       json={"score": 40, "duration": 60, "completed": True},
+                                       headers=headers)
+        assert response.status_code == 200
+
+    today = date.today()
+    days = app_module.rollup_store.query("u9", "day", today, today)
+    assert [(day["sessions"], day["score_sum"]) for day in days] == [(1, 40)]
+
@@ -0,0 +1,116 @@
+"""
+Testes do arquivo frio de sessões e do histórico, que junta o arquivo e o data.json
+A fixture `archived` (conftest) reproduz a janela entre gravar os segmentos
+e reescrever o data.json, em que as sessões arquivadas estão nas duas fontes
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from services.session_archive import SessionArchive
+from tests.conftest import make_sessions
+
+CUTOFF = "2026-03-01T00:00:00"
+
+
+def test_archive_writes_monthly_segments(archived):
+    archive, _, sessions, result = archived
+    assert result["archived"] == sum(s["started_at"] < CUTOFF for s in sessions)
+    assert result["segments"] == 2
+    assert [segment["month"] for segment in archive.segments()] == ["2026-01", "2026-02"]
+    assert list(archive.iter_sessions("u1")) == [s for s in sessions if s["user_id"] == "u1" and s["started_at"] < CUTOFF]
+
+
+def test_archive_skips_sessions_already_archived(archived):
+    archive, _, sessions, _ = archived
+    result = archive.archive([s for s in sessions if s["started_at"] < "2026-03-10"], "2026-03-10")
+    assert result["already_archived"] == sum(s["started_at"] < CUTOFF for s in sessions)
+    assert len(list(archive.iter_sessions())) == sum(s["started_at"] < "2026-03-10" for s in sessions)
+
+
+def test_segments_filter_by_period(archived):
+    archive, _, sessions, _ = archived
+    february = list(archive.iter_sessions("u2", "2026-02-01", "2026-02-08"))
+    assert [s["id"] for s in february] == [f"s{day}-u2" for day in range(31, 38)]
+    assert archive.segments("u3") == []
+
+
+@pytest.mark.parametrize("hot_rewritten", [False, True])
+def test_history_deduplicates_archived_sessions(archive_client, archived, hot_rewritten):
+    _, data_file, sessions, _ = archived
+    if hot_rewritten:
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump({"users": {}, "sessions": [s for s in sessions if s["started_at"] >= CUTOFF]}, f)
+    response = archive_client.get("/api/stats/history?from=2026-02-20&to=2026-03-04",
+                          headers={"X-User-ID": "u1"}).get_json()
+    expected = [s for s in sessions if s["user_id"] == "u1" and "2026-02-20" <= s["started_at"] < "2026-03-05"]
+    assert response["sessions"] == expected
+    assert response["archived_segments"] == 1
+    assert not response["truncated"]
+
+
+def run_concurrently(*calls):
+    """Executa as funções ao mesmo tempo, uma por thread, e retorna os resultados"""
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def run(i, call):
+        barrier.wait()
+        results[i] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.fixture
+def slow_segments(monkeypatch):
+    """Segmentos gravados devagar (execuções concorrentes se sobrepõem); pausa por instância"""
+    write_segment = SessionArchive._write_segment
+    delays = {}
+
+    def slow_write_segment(self, *args):
+        time.sleep(delays.get(id(self), 0.05))
+        return write_segment(self, *args)
+
+    monkeypatch.setattr(SessionArchive, "_write_segment", slow_write_segment)
+    return delays
+
+
+def test_concurrent_archive_runs_keep_every_segment(tmp_path, slow_segments):
+    sessions = make_sessions(90)
+    directory = str(tmp_path / "archive")
+    # Uma instância por "worker", como no gunicorn
+    workers = [SessionArchive(directory), SessionArchive(directory)]
+    # A execução menor termina por último: sem o lock, seu índice apagaria o da outra
+    slow_segments[id(workers[0])] = 0.2
+    cutoffs = ["2026-02-01T00:00:00", CUTOFF]
+    run_concurrently(*[
+        (lambda archive=archive, cutoff=cutoff:
+         archive.archive([s for s in sessions if s["started_at"] < cutoff], cutoff))
+        for archive, cutoff in zip(workers, cutoffs)
+    ])
+
+    archive = SessionArchive(directory)
+    assert archive.snapshot()[0] == CUTOFF
+    archived = sorted(archive.iter_sessions(), key=lambda s: s["id"])
+    assert archived == sorted((s for s in sessions if s["started_at"] < CUTOFF), key=lambda s: s["id"])
+    assert not [name for name in (tmp_path / "archive").iterdir() if ".tmp" in name.name]
+
+
+def test_concurrent_archive_old_sessions(archive_client, archived, slow_segments):
+    import app as app_module
+
+    archive, data_file, sessions, _ = archived
+    run_concurrently(*[lambda: app_module.archive_old_sessions(older_than_days=0)] * 2)
+
+    with open(data_file, encoding="utf-8") as f:
+        assert json.load(f)["sessions"] == []
+    assert sorted(s["id"] for s in archive.iter_sessions()) == sorted(s["id"] for s in sessions)
+
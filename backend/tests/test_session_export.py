@@ -0,0 +1,117 @@
+"""
+Testes da exportação em streaming: decodificador incremental, junção do
+arquivo com o data.json e serialização em NDJSON/CSV
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from services.session_archive import SessionArchive
+from services.session_export import CSV_FIELDS, export_chunks, iter_json_array, iter_sessions
+
+DOCUMENT = {
+    "users": [{"id": "u1", "name": "Zoë \"Z\" Ünal", "tags": ["a", {"b": [1, 2]}]}],
+    "meta": {"version": 3, "ratio": -3.25e-2, "empty": {}, "none": None},
+    "sessions": [
+        {"id": "s1", "score": -3.25, "duration": 1e3, "completed": True, "note": "vírgula, colchete ] e \\ barra"},
+        {"id": "s2", "score": 123456789, "duration": 0.5, "completed": False, "note": None},
+        12.75,
+        "texto",
+        [],
+        {}
+    ],
+    "after": [1.5, -2]
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_array_across_chunk_boundaries(chunk_size, indent):
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=indent)
+    assert list(iter_json_array(io.StringIO(text), "sessions", chunk_size)) == DOCUMENT["sessions"]
+    assert list(iter_json_array(io.StringIO(text), "after", chunk_size)) == DOCUMENT["after"]
+
+
+@pytest.mark.parametrize("text", ["{}", '{"users": []}', '{"sessions": []}', ' \n{ "sessions" : [ ] } '])
+def test_iter_json_array_empty(text):
+    assert list(iter_json_array(io.StringIO(text), "sessions", 2)) == []
+
+
+@pytest.mark.parametrize("text", ["", "[]", '{"sessions": [1, 2', '{"sessions": [1 2]}', '{"sessions" 1}'])
+def test_iter_json_array_invalid(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), "sessions", 4))
+
+
+SESSIONS = [
+    {"id": f"s{i}", "user_id": "u1", "game_type": "boat", "started_at": f"2026-01-01T09:{i:02d}:00",
+     "ended_at": None, "duration": i * 1.5, "score": i, "completed": i % 2 == 0, "extra": "ignorado"}
+    for i in range(50)
+]
+
+
+def test_export_ndjson():
+    chunks = list(export_chunks(iter(SESSIONS), "ndjson", chunk_size=500))
+    # A primeira sessão sai sozinha; as demais em blocos de ~500 caracteres
+    assert chunks[0].count("\n") == 1
+    assert len(chunks) > 2
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == SESSIONS
+
+
+def test_export_csv():
+    chunks = list(export_chunks(iter(SESSIONS), "csv", chunk_size=500))
+    assert chunks[0] == ",".join(CSV_FIELDS) + "\n"
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert [row["id"] for row in rows] == [s["id"] for s in SESSIONS]
+    assert rows[2]["completed"] == "True"
+    assert "extra" not in rows[0]
+
+
+def test_export_csv_without_sessions():
+    assert list(export_chunks(iter([]), "csv")) == [",".join(CSV_FIELDS) + "\n"]
+
+
+def test_export_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        export_chunks(iter(SESSIONS), "xml")
+
+
+CUTOFF = "2026-03-01T00:00:00"
+
+
+@pytest.mark.parametrize("hot_rewritten", [False, True])
+def test_iter_sessions_yields_each_session_once(archived, hot_rewritten):
+    archive, data_file, sessions, _ = archived
+    if hot_rewritten:
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump({"users": {}, "sessions": [s for s in sessions if s["started_at"] >= CUTOFF]}, f)
+
+    assert list(iter_sessions(archive, data_file)) == sessions
+    assert list(iter_sessions(archive, data_file, "u1", "2026-02-20", "2026-03-05")) == [
+        s for s in sessions if s["user_id"] == "u1" and "2026-02-20" <= s["started_at"] < "2026-03-05"
+    ]
+
+
+def test_iter_sessions_without_data_file(tmp_path):
+    archive = SessionArchive(str(tmp_path / "archive"))
+    assert list(iter_sessions(archive, str(tmp_path / "missing.json"))) == []
+
+
+def test_export_route_deduplicates_archived_sessions(archive_client, archived):
+    _, _, sessions, _ = archived
+    response = archive_client.get("/api/stats/export?format=ndjson", headers={"X-User-ID": "u2"})
+    exported = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert exported == [s for s in sessions if s["user_id"] == "u2"]
+
+
+def test_admin_export_route(archive_client, archived, admin_headers):
+    _, _, sessions, _ = archived
+    assert archive_client.get("/api/admin/export").status_code == 403
+    response = archive_client.get("/api/admin/export?format=csv&from=2026-02-27&to=2026-03-02",
+                                  headers=admin_headers)
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["id"] for row in rows] == [s["id"] for s in sessions if "2026-02-27" <= s["started_at"] < "2026-03-03"]
+    assert archive_client.get("/api/admin/export?format=xml", headers=admin_headers).status_code == 400
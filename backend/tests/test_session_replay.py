@@ -0,0 +1,154 @@
+"""
+Testes da gravação de sessões (SessionRecorder) e do replay
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import services.session_recorder as session_recorder
+from services.session_recorder import (
+    SessionRecorder, load_session, EVENT_INTENSITY, EVENT_PCM, EVENT_START, EVENT_END
+)
+from services.session_replay import compare_results, replay_directory, replay_session
+from models import BoatGame
+
+
+def pcm_frame(seed: int, samples: int = 4410) -> bytes:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(samples) * 3000).astype("<i2").tobytes()
+
+
+def record_game(recorder: SessionRecorder, game_id: str, frames: int = 20) -> None:
+    """Sessão de barco: início, frames de intensidade e PCM alternados, fim"""
+    recorder.open_session(game_id, "boat", "Ana")
+    recorder.record_start(game_id, 0)
+    for seq in range(1, frames + 1):
+        if seq % 4 == 0:
+            recorder.record_pcm(game_id, seq, pcm_frame(seq))
+        else:
+            recorder.record_intensity(game_id, seq, 0.9 if seq % 3 else 0.1, -20.0)
+    recorder.record_intensity(game_id, frames + 1, 0.8, None, frames=5, blow_frames=3)
+    recorder.record_end(game_id, frames + 1)
+
+
+def test_recorded_events_round_trip(tmp_path):
+    recorder = SessionRecorder(str(tmp_path), flush_events=7)
+    record_game(recorder, "g1")
+    session = load_session(str(tmp_path / "g1"))
+    events = session["events"]
+
+    assert session["meta"]["game_type"] == "boat"
+    assert events["kind"].tolist() == (
+        [EVENT_START] + [EVENT_PCM if seq % 4 == 0 else EVENT_INTENSITY for seq in range(1, 21)]
+        + [EVENT_INTENSITY, EVENT_END]
+    )
+    assert events["seq"].tolist() == [0] + list(range(1, 22)) + [21]
+    assert np.isnan(events["metering_db"][-2])
+    assert (events["frames"][-2], events["blow_frames"][-2]) == (5, 3)
+
+    pcm = session["pcm"][0]
+    for i in np.flatnonzero(events["kind"] == EVENT_PCM):
+        start, length = int(events["pcm_offset"][i]), int(events["pcm_length"][i])
+        assert pcm[start:start + length].tobytes() == pcm_frame(int(events["seq"][i]))
+
+
+def test_segments_from_several_workers_are_merged_by_sequence(tmp_path, monkeypatch):
+    recorder = SessionRecorder(str(tmp_path))
+    recorder.open_session("g1", "boat", "Ana")
+    # Cada worker grava no seu segmento; os frames se intercalam
+    for pid, seqs in ((101, [0, 2, 4]), (202, [1, 3, 5])):
+        monkeypatch.setattr(session_recorder.os, "getpid", lambda pid=pid: pid)
+        for seq in seqs:
+            recorder.record_pcm("g1", seq, pcm_frame(seq, 100))
+        recorder.flush("g1")
+
+    session = load_session(str(tmp_path / "g1"))
+    events = session["events"]
+    assert events["seq"].tolist() == list(range(6))
+    for i in range(6):
+        pcm = session["pcm"][events["segment"][i]]
+        start = int(events["pcm_offset"][i])
+        assert pcm[start:start + 100].tobytes() == pcm_frame(i, 100)
+
+
+def test_interrupted_write_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_recorder.os, "getpid", lambda: 101)
+    recorder = SessionRecorder(str(tmp_path))
+    recorder.open_session("g1", "boat", "Ana")
+    for seq in range(3):
+        recorder.record_pcm("g1", seq, pcm_frame(seq, 100))
+    recorder.flush("g1")
+    # Última coluna com um evento a menos e áudio cortado no meio do último frame
+    segment = tmp_path / "g1" / "101"
+    with open(segment / "seq.bin", "ab") as f:
+        f.write(np.uint32(3).tobytes())
+    with open(segment / "pcm.bin", "r+b") as f:
+        f.truncate(os.path.getsize(segment / "pcm.bin") - 10)
+
+    events = load_session(str(tmp_path / "g1"))["events"]
+    assert events["seq"].tolist() == [0, 1]
+
+
+def test_replay_is_deterministic(tmp_path):
+    recorder = SessionRecorder(str(tmp_path))
+    record_game(recorder, "g1")
+    first, second = replay_session(str(tmp_path / "g1")), replay_session(str(tmp_path / "g1"))
+    assert first == second
+    assert first["frames"] == 21
+    assert first["errors"] == 0
+    assert first["is_active"] is False
+    assert first["score"] > 0
+
+
+def test_frames_outside_the_game_count_as_errors(tmp_path):
+    recorder = SessionRecorder(str(tmp_path))
+    recorder.open_session("g1", "balloon", "Ana")
+    recorder.record_intensity("g1", 1, 0.5)
+    recorder.flush("g1")
+    result = replay_session(str(tmp_path / "g1"))
+    assert (result["frames"], result["errors"]) == (0, 1)
+
+
+def test_compare_results(tmp_path):
+    recorder = SessionRecorder(str(tmp_path))
+    record_game(recorder, "g1")
+    record_game(recorder, "g2", frames=12)
+    baseline = replay_directory(str(tmp_path), workers=1)
+    assert [result["game_id"] for result in baseline] == ["g1", "g2"]
+    assert compare_results(baseline, replay_directory(str(tmp_path), workers=1)) == []
+
+    changed = [dict(baseline[0], score=baseline[0]["score"] + 1), {"game_id": "g3"}]
+    differences = compare_results(baseline, changed)
+    assert differences == [
+        {"game_id": "g1", "change": {"score": [baseline[0]["score"], baseline[0]["score"] + 1]}},
+        {"game_id": "g3", "change": "nova sessão"},
+        {"game_id": "g2", "change": "sessão ausente"},
+    ]
+
+
+@pytest.mark.parametrize("sample_rate, stored", [(16000, True), (16000, False), (44100, True)])
+def test_replay_uses_recorded_sample_rate(tmp_path, monkeypatch, sample_rate, stored):
+    recorder = SessionRecorder(str(tmp_path), sample_rate=sample_rate)
+    record_game(recorder, "g1")
+    meta_path = tmp_path / "g1" / session_recorder.META_FILE
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    assert meta["sample_rate"] == sample_rate
+    if not stored:
+        # Gravação anterior ao campo: replay na taxa padrão
+        del meta["sample_rate"]
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    rates = []
+    process_audio_input = BoatGame.process_audio_input
+
+    def spy(self, audio_data, rate=44100):
+        rates.append(rate)
+        return process_audio_input(self, audio_data, rate)
+
+    monkeypatch.setattr(BoatGame, "process_audio_input", spy)
+    assert replay_session(str(tmp_path / "g1"))["errors"] == 0
+    assert rates == [sample_rate if stored else session_recorder.DEFAULT_SAMPLE_RATE] * 5
+